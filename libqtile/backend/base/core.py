@@ -6,7 +6,7 @@ import typing
 from abc import ABCMeta, abstractmethod
 from typing import Any
 
-from libqtile import config, hook
+from libqtile import config, hook, utils
 from libqtile.backend.base.idle_inhibit import IdleInhibitorManager
 from libqtile.backend.base.idle_notify import IdleNotifier
 from libqtile.command.base import CommandObject, ItemT, expose_command
@@ -14,6 +14,8 @@ from libqtile.config import Screen
 from libqtile.group import _Group
 
 if typing.TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+
     from libqtile.backend.base import Internal
     from libqtile.core.manager import Qtile
 
@@ -25,6 +27,8 @@ class Core(CommandObject, metaclass=ABCMeta):
     idle_inhibitor_manager: IdleInhibitorManager[Any]
     idle_notifier: IdleNotifier
     screen_change_timer: asyncio.TimerHandle | None = None
+    frame_timer: asyncio.TimerHandle | None = None
+    _last_frame: float = 0.0
 
     @property
     @abstractmethod
@@ -73,6 +77,18 @@ class Core(CommandObject, metaclass=ABCMeta):
     def ungrab_keys(self) -> None:
         """Release the grabbed key events"""
 
+    def update_key_grabs(
+        self, keys: Sequence[config.Key | config.KeyChord]
+    ) -> list[tuple[int, int]]:
+        """Grab exactly the given keys, releasing any other grabbed keys
+
+        Returns the keysym and modifier mask of each key, like grab_key().
+        Backends where grabbing is expensive should only change the grabs
+        that differ from the ones they already hold.
+        """
+        self.ungrab_keys()
+        return [self.grab_key(key) for key in keys]
+
     @abstractmethod
     def grab_button(self, mouse: config.Mouse) -> int:
         """Configure the backend to grab the mouse event"""
@@ -80,6 +96,21 @@ class Core(CommandObject, metaclass=ABCMeta):
     def ungrab_buttons(self) -> None:
         """Release the grabbed button events"""
 
+    def update_button_grabs(self, mice: Sequence[config.Mouse]) -> list[int | None]:
+        """Grab exactly the given mouse events, releasing any other grabbed buttons
+
+        Returns the modifier mask of each mouse event, like grab_button(), or
+        None if its modifiers are unknown.
+        """
+        self.ungrab_buttons()
+        masks: list[int | None] = []
+        for mouse in mice:
+            try:
+                masks.append(self.grab_button(mouse))
+            except utils.QtileError:
+                masks.append(None)
+        return masks
+
     def grab_pointer(self) -> None:
         """Configure the backend to grab mouse events"""
 
@@ -134,6 +165,27 @@ class Core(CommandObject, metaclass=ABCMeta):
         self.screen_change_timer = None
         hook.fire("screen_change", event)
 
+    def request_frame(self, callback: Callable[[], None]) -> None:
+        """Call the callback when it is time to render the next frame
+
+        By default, frames are rendered at most ``max_fps`` times per second. Backends
+        that know when their outputs are ready for a new frame should override this.
+        """
+        if self.frame_timer is not None:
+            return
+
+        loop = asyncio.get_running_loop()
+        delay = 0.0
+        if self.qtile.config.max_fps > 0:
+            delay = max(0.0, self._last_frame + 1 / self.qtile.config.max_fps - loop.time())
+
+        def frame() -> None:
+            self.frame_timer = None
+            self._last_frame = loop.time()
+            callback()
+
+        self.frame_timer = self.qtile.call_later(delay, frame)
+
     def simulate_keypress(self, modifiers: list[str], key: str) -> None:
         """Simulate a keypress with given modifiers"""
 
@@ -171,6 +223,20 @@ class Core(CommandObject, metaclass=ABCMeta):
             self._inhibited = value
             hook.fire("idle_inhibitor_change", value)
 
+    @property
+    def keyboard_layout(self) -> str:
+        """The keyboard layout in use, e.g. "us dvorak", or "" if it isn't known"""
+        if not hasattr(self, "_keyboard_layout"):
+            self._keyboard_layout = ""
+
+        return self._keyboard_layout
+
+    @keyboard_layout.setter
+    def keyboard_layout(self, value: str):
+        if value != self.keyboard_layout:
+            self._keyboard_layout = value
+            hook.fire("keyboard_layout_change", value)
+
     @expose_command()
     def set_idle_inhibitor(self) -> None:
         """Create a global idle inhibitor."""
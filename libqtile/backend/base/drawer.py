@@ -8,12 +8,13 @@ from copy import copy
 import cairocffi
 
 from libqtile import pangocffi, utils
-from libqtile.images import Img
+from libqtile.images import Img, linear_gradient
 from libqtile.log_utils import logger
 from libqtile.utils import ColorsType
 
 if typing.TYPE_CHECKING:
     from libqtile.backend.base import Internal
+    from libqtile.core.render import Rasterizer
 
 
 class Drawer:
@@ -29,7 +30,8 @@ class Drawer:
         self._height = height
 
         self.surface: cairocffi.RecordingSurface
-        self.last_surface: cairocffi.RecordingSurface
+        # What was last drawn, rendered to an image for mirrors to paint
+        self.last_surface: cairocffi.ImageSurface | None = None
         self.ctx: cairocffi.Context
         self._reset_surface()
 
@@ -37,14 +39,19 @@ class Drawer:
 
         self._enabled = True
 
+        # If set, draws are rendered on worker threads (see Bar's threaded_rendering)
+        self.rasterizer: Rasterizer | None = None
+        self._render_serial = 0
+        self._presented_serial = 0
+
     def finalize(self):
         """Destructor/Clean up resources"""
         if hasattr(self, "surface"):
             self.surface.finish()
             delattr(self, "surface")
-        if hasattr(self, "last_surface"):
+        if self.last_surface is not None:
             self.last_surface.finish()
-            delattr(self, "last_surface")
+            self.last_surface = None
         self.ctx = None
 
     @property
@@ -53,8 +60,9 @@ class Drawer:
 
     @has_mirrors.setter
     def has_mirrors(self, value):
-        if value and not self._has_mirrors:
-            self._create_last_surface()
+        if not value and self.last_surface is not None:
+            self.last_surface.finish()
+            self.last_surface = None
 
         self._has_mirrors = value
 
@@ -85,15 +93,36 @@ class Drawer:
         )
         self.ctx = cairocffi.Context(self.surface)
 
-    def _create_last_surface(self):
-        """Creates a separate RecordingSurface for mirrors to access."""
-        if hasattr(self, "last_surface"):
-            self.last_surface.finish()
-        self.last_surface = cairocffi.RecordingSurface(cairocffi.CONTENT_COLOR_ALPHA, None)
+    def _update_last_surface(self, width: int, height: int):
+        """
+        Render what has just been drawn to an image for mirrors to access.
+
+        This is done once per draw, however many mirrors there are, and the image is
+        reused until the next draw. Mirrors then only need to paint the image rather
+        than replay all of the drawing operations.
+        """
+        scale = self.output_scale
+        size = (max(math.ceil(width * scale), 1), max(math.ceil(height * scale), 1))
+        surface = self.last_surface
+        if surface is None or (surface.get_width(), surface.get_height()) != size:
+            if surface is not None:
+                surface.finish()
+            surface = cairocffi.ImageSurface(cairocffi.FORMAT_ARGB32, *size)
+            surface.set_device_scale(scale, scale)
+            self.last_surface = surface
+
+        ctx = cairocffi.Context(surface)
+        # Replaces the previous contents, including where nothing was drawn
+        ctx.set_operator(cairocffi.OPERATOR_SOURCE)
+        ctx.set_source_surface(self.surface)
+        ctx.paint()
 
     def paint_to(self, drawer: Drawer) -> None:
-        drawer.ctx.set_source_surface(self.last_surface)
-        drawer.ctx.paint()
+        # The image is only resampled if the other drawer is on an output with a
+        # different scale
+        if self.last_surface is not None:
+            drawer.ctx.set_source_surface(self.last_surface)
+            drawer.ctx.paint()
 
     def _rounded_rect(self, x, y, width, height, linewidth):
         aspect = 1.0
@@ -171,7 +200,16 @@ class Drawer:
         src_y  :
             the Y position of the origin in the source surface
         """
-        if self._enabled:
+        if self._enabled and self.rasterizer is not None and not self.has_mirrors:
+            self._draw_in_thread(
+                offsetx=offsetx,
+                offsety=offsety,
+                width=width,
+                height=height,
+                src_x=src_x,
+                src_y=src_y,
+            )
+        elif self._enabled:
             self._draw(
                 offsetx=offsetx,
                 offsety=offsety,
@@ -181,13 +219,71 @@ class Drawer:
                 src_y=src_y,
             )
             if self.has_mirrors:
-                self._create_last_surface()
-                ctx = cairocffi.Context(self.last_surface)
-                ctx.set_source_surface(self.surface)
-                ctx.paint()
+                self._update_last_surface(
+                    max(self.width, src_x + (width or 0)),
+                    max(self.height, src_y + (height or 0)),
+                )
 
         self._reset_surface()
 
+    @property
+    def rendering(self) -> bool:
+        """Whether a draw is still being rendered on a worker thread"""
+        return self._presented_serial < self._render_serial
+
+    def _draw_in_thread(self, **params):
+        """
+        Hand what has been drawn over to a worker thread to be rendered, and copy the
+        result to the window once it is done.
+
+        The recording is a snapshot of the drawing operations of this draw: the drawer
+        starts a new one for the next draw and doesn't touch this one again. If a later
+        draw has already been shown by the time a render is done, it is dropped.
+        """
+        assert self.rasterizer is not None
+        self._render_serial += 1
+        serial = self._render_serial
+        recording = self.surface
+        # Stop _reset_surface() from finishing the recording that the worker is using
+        del self.surface
+
+        width = params["width"] if params["width"] is not None else self.width
+        height = params["height"] if params["height"] is not None else self.height
+        self.rasterizer.submit(
+            recording,
+            max(self.width, params["src_x"] + width),
+            max(self.height, params["src_y"] + height),
+            self.output_scale,
+            lambda image: self._present(serial, image, params),
+        )
+
+    def _present(self, serial, image, params):
+        if serial < self._presented_serial or self.ctx is None:
+            # A later draw has been shown already or we've been finalized
+            return
+        self._presented_serial = serial
+        if image is None or not self._enabled:
+            return
+
+        # Copy the image to the window as if it was what had been drawn
+        recording, self.surface = self.surface, image
+        try:
+            self._draw(**params)
+        finally:
+            self.surface = recording
+
+    def move(
+        self, old_x: int, old_y: int, offsetx: int, offsety: int, width: int, height: int
+    ) -> bool:
+        """
+        Show what was last drawn at (old_x, old_y) at a new position.
+
+        This avoids replaying the drawing operations when only the position of the
+        drawn area has changed. Returns False if the backend can't do this, in which
+        case the caller needs to draw again.
+        """
+        return False
+
     def _draw(
         self,
         offsetx: int = 0,
@@ -229,13 +325,7 @@ class Drawer:
             elif len(colour) == 1:
                 ctx.set_source_rgba(*utils.rgb(colour[0]))
             else:
-                linear = cairocffi.LinearGradient(0.0, 0.0, 0.0, self.height)
-                step_size = 1.0 / (len(colour) - 1)
-                step = 0.0
-                for c in colour:
-                    linear.add_color_stop_rgba(step, *utils.rgb(c))
-                    step += step_size
-                ctx.set_source(linear)
+                ctx.set_source(linear_gradient(colour, self.height))
         else:
             ctx.set_source_rgba(*utils.rgb(colour))
 
@@ -286,9 +376,9 @@ class Drawer:
         sizelayout = self.textlayout("", "ffffff", font_family, font_size, None, markup=markup)
         widths, heights = [], []
         for i in texts:
-            sizelayout.text = i
-            widths.append(sizelayout.width)
-            heights.append(sizelayout.height)
+            width, height = sizelayout.measure(i)
+            widths.append(width)
+            heights.append(height)
         return max(widths), max(heights)
 
     def text_extents(self, text):
@@ -356,6 +446,50 @@ class Drawer:
         self.ctx.restore()
 
 
+class _LayoutKey(typing.NamedTuple):
+    text: str
+    font_family: str
+    font_size: float
+    markup: bool
+    wrap: bool
+    width: int  # in pango units, -1 when unset
+
+
+# Font descriptions by font string. The layouts make their own copy of them.
+_font_descriptions: utils.LRUCache[str, pangocffi.FontDescription] = utils.LRUCache(
+    64, name="font_descriptions"
+)
+# Parsed markup by markup string, or None if the markup is invalid
+_markup: utils.LRUCache[str, tuple | None] = utils.LRUCache(256, name="markup")
+# The pixel size of laid out text, shared by all TextLayouts
+_extents: utils.LRUCache[_LayoutKey, tuple[int, int]] = utils.LRUCache(1024, name="text_extents")
+
+# How many shaped layouts each TextLayout keeps around. Widgets such as GroupBox or
+# TaskList draw the same handful of strings over and over with a single TextLayout.
+LAYOUT_POOL_SIZE = 16
+
+
+def _font_description(font: str) -> pangocffi.FontDescription:
+    desc = _font_descriptions.get(font)
+    if desc is None:
+        desc = pangocffi.FontDescription.from_string(font)
+        _font_descriptions[font] = desc
+    return desc
+
+
+def _parse_markup(value: str) -> tuple | None:
+    parsed = _markup.get(value, False)
+    if parsed is False:
+        try:
+            attrlist, text, _ = pangocffi.parse_markup(value)
+            parsed = (attrlist, text)
+        except pangocffi.BadMarkup as e:
+            logger.warning(e)
+            parsed = None
+        _markup[value] = parsed
+    return parsed
+
+
 class TextLayout:
     def __init__(
         self, drawer, text, colour, font_family, font_size, font_shadow, wrap=True, markup=False
@@ -365,53 +499,115 @@ class TextLayout:
         layout.set_alignment(pangocffi.ALIGN_CENTER)
         if not wrap:  # pango wraps by default
             layout.set_ellipsize(pangocffi.ELLIPSIZE_END)
-        desc = pangocffi.FontDescription.from_string(f"{font_family} {font_size}px")
-        layout.set_font_description(desc)
+        layout.set_font_description(_font_description(f"{font_family} {font_size}px"))
         self.font_shadow = font_shadow
         self.layout = layout
         self.markup = markup
-        self.text = text
         self._width = None
 
+        # Shaped layouts by the text, font and width they were laid out with, so that
+        # going back to a previous state doesn't need shaping the text again
+        self._layouts = utils.LRUCache(LAYOUT_POOL_SIZE, name="text_layouts")
+        self._key = _LayoutKey("", font_family, font_size, markup, wrap, -1)
+        self.text = text
+
     def finalize(self):
+        self._layouts.clear()
         self.layout.finalize()
 
+    def _select(self, key):
+        """Switch to the layout for the given state, laying one out only if needed"""
+        if key == self._key:
+            return
+
+        layout = self._layouts.get(key)
+        if layout is None:
+            current = self._key
+            # The first layout, which has no text yet, is changed in place
+            layout = self.layout.copy() if self._layouts else self.layout
+            if key.font_family != current.font_family:
+                desc = layout.get_font_description()
+                desc.set_family(key.font_family)
+                layout.set_font_description(desc)
+            if key.font_size != current.font_size:
+                desc = layout.get_font_description()
+                desc.set_absolute_size(pangocffi.units_from_double(key.font_size))
+                layout.set_font_description(desc)
+            if key.width != current.width:
+                layout.set_width(key.width)
+            if key.text != current.text:
+                self._set_text(layout, key.text)
+            self._layouts[key] = layout
+
+        self.layout = layout
+        self._key = key
+
+    def _set_text(self, layout, value):
+        if self.markup:
+            parsed = _parse_markup(value)
+            if parsed is not None:
+                attrlist, value = parsed
+                layout.set_attributes(attrlist)
+        layout.set_text(utils.scrub_to_utf8(value))
+
+    def _pixel_size(self):
+        size = _extents.get(self._key)
+        if size is None:
+            size = self.layout.get_pixel_size()
+            _extents[self._key] = size
+        return size
+
+    def measure(self, text):
+        """
+        Get the pixel size of some text, as this layout would lay it out, without
+        shaping it if it was measured before. The layout's own text isn't changed.
+        """
+        if self.markup and text is None:
+            text = ""
+        # The key has the markup flag, as markup is measured without its tags
+        key = self._key._replace(text=text)
+        size = _extents.get(key)
+        if size is None:
+            # Lay it out on a copy, so that neither the layout nor the pool change
+            layout = self.layout.copy()
+            try:
+                self._set_text(layout, text)
+                size = layout.get_pixel_size()
+            finally:
+                layout.finalize()
+            _extents[key] = size
+        return size
+
     @property
     def text(self):
         return self.layout.get_text()
 
     @text.setter
     def text(self, value):
-        if self.markup:
-            # pangocffi doesn't like None here, so we use "".
-            if value is None:
-                value = ""
-            try:
-                attrlist, value, accel_char = pangocffi.parse_markup(value)
-                self.layout.set_attributes(attrlist)
-            except pangocffi.BadMarkup as e:
-                logger.warning(e)
-        self.layout.set_text(utils.scrub_to_utf8(value))
+        # pangocffi doesn't like None here, so we use "".
+        if self.markup and value is None:
+            value = ""
+        self._select(self._key._replace(text=value))
 
     @property
     def width(self):
         if self._width is not None:
             return self._width
         else:
-            return self.layout.get_pixel_size()[0]
+            return self._pixel_size()[0]
 
     @width.setter
     def width(self, value):
         self._width = value
-        self.layout.set_width(pangocffi.units_from_double(value))
+        self._select(self._key._replace(width=pangocffi.units_from_double(value)))
 
     def reset_width(self):
         self._width = None
-        self.layout.set_width(-1)
+        self._select(self._key._replace(width=-1))
 
     @property
     def height(self):
-        return self.layout.get_pixel_size()[1]
+        return self._pixel_size()[1]
 
     def fontdescription(self):
         return self.layout.get_font_description()
@@ -423,9 +619,7 @@ class TextLayout:
 
     @font_family.setter
     def font_family(self, font):
-        d = self.fontdescription()
-        d.set_family(font)
-        self.layout.set_font_description(d)
+        self._select(self._key._replace(font_family=font))
 
     @property
     def font_size(self):
@@ -434,19 +628,33 @@ class TextLayout:
 
     @font_size.setter
     def font_size(self, size):
-        d = self.fontdescription()
-        d.set_absolute_size(pangocffi.units_from_double(size))
-        self.layout.set_font_description(d)
+        self._select(self._key._replace(font_size=size))
 
-    def draw(self, x, y):
+    def draw(self, x, y, ctx=None):
+        if ctx is None:
+            ctx = self.drawer.ctx
         if self.font_shadow is not None:
-            self.drawer.set_source_rgb(self.font_shadow)
-            self.drawer.ctx.move_to(x + 1, y + 1)
-            pangocffi.show_layout(self.drawer.ctx, self.layout)
+            self.drawer.set_source_rgb(self.font_shadow, ctx=ctx)
+            ctx.move_to(x + 1, y + 1)
+            pangocffi.show_layout(ctx, self.layout)
+
+        self.drawer.set_source_rgb(self.colour, ctx=ctx)
+        ctx.move_to(x, y)
+        pangocffi.show_layout(ctx, self.layout)
 
-        self.drawer.set_source_rgb(self.colour)
-        self.drawer.ctx.move_to(x, y)
-        pangocffi.show_layout(self.drawer.ctx, self.layout)
+    def rasterize(self, x, y, width, height):
+        """Draw the layout at the given position of a transparent image of the given size
+
+        The image can then be painted over and over, e.g. while scrolling, without
+        rendering the text again.
+        """
+        scale = self.drawer.output_scale
+        surface = cairocffi.ImageSurface(
+            cairocffi.FORMAT_ARGB32, math.ceil(width * scale), math.ceil(height * scale)
+        )
+        surface.set_device_scale(scale, scale)
+        self.draw(x, y, ctx=cairocffi.Context(surface))
+        return surface
 
     def framed(self, border_width, border_color, pad_x, pad_y, highlight_color=None):
         return TextFrame(
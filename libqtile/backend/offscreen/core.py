@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+from libqtile.backend.offscreen.window import Internal
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+class Core:
+    """
+    Just enough of a core for bars and widgets to be drawn to offscreen windows.
+
+    This isn't a backend that Qtile can be started with: there are no clients, inputs
+    or outputs. It is used by ``qtile bench-bar`` and the test suite to draw bars
+    without a display server.
+    """
+
+    name = "offscreen"
+
+    def create_internal(
+        self, x: int, y: int, width: int, height: int, depth: int = 32
+    ) -> Internal:
+        return Internal(x, y, width, height)
+
+    def request_frame(self, callback: Callable[[], None]) -> None:
+        # There is no display to keep in step with, so a frame is drawn right away
+        asyncio.get_running_loop().call_soon(callback)
+
+    def flush(self) -> None:
+        pass
+
+    def finalize(self) -> None:
+        pass
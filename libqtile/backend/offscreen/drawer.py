@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import cairocffi
+
+from libqtile.backend.base import drawer
+
+if TYPE_CHECKING:
+    from libqtile.backend.offscreen.window import Internal
+
+
+class Drawer(drawer.Drawer):
+    """
+    A drawer for offscreen windows.
+
+    As with the other backends, drawing operations are staged in a RecordingSurface.
+    They are then painted to the window's ImageSurface, which is in memory rather than
+    on a display.
+    """
+
+    _win: Internal
+
+    def _draw(
+        self,
+        offsetx: int = 0,
+        offsety: int = 0,
+        width: int | None = None,
+        height: int | None = None,
+        src_x: int = 0,
+        src_y: int = 0,
+    ) -> None:
+        if width is None:
+            width = self.width
+        if height is None:
+            height = self.height
+
+        with cairocffi.Context(self._win.surface) as context:
+            context.set_operator(cairocffi.OPERATOR_SOURCE)
+            context.set_source_surface(self.surface, offsetx - src_x, offsety - src_y)
+            context.rectangle(offsetx, offsety, width, height)
+            context.fill()
+
+    def move(
+        self, old_x: int, old_y: int, offsetx: int, offsety: int, width: int, height: int
+    ) -> bool:
+        if not self._enabled:
+            return False
+
+        surface = self._win.surface
+        # Take a copy of the old area first, as it may overlap the new one
+        copy = cairocffi.ImageSurface(cairocffi.FORMAT_ARGB32, width, height)
+        with cairocffi.Context(copy) as context:
+            context.set_source_surface(surface, -old_x, -old_y)
+            context.paint()
+        with cairocffi.Context(surface) as context:
+            context.set_operator(cairocffi.OPERATOR_SOURCE)
+            context.set_source_surface(copy, offsetx, offsety)
+            context.rectangle(offsetx, offsety, width, height)
+            context.fill()
+        copy.finish()
+        return True
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import itertools
+from typing import Any
+
+import cairocffi
+
+from libqtile.backend import base
+from libqtile.backend.offscreen.drawer import Drawer
+from libqtile.command.base import expose_command
+
+_wids = itertools.count(1)
+
+
+class Internal(base.Internal):
+    """
+    An internal window that isn't shown anywhere: it is drawn to an image in memory.
+
+    This lets bars, widgets and popups be drawn without a display server, e.g. to
+    benchmark them or to take snapshots of them.
+    """
+
+    def __init__(self, x: int, y: int, width: int, height: int):
+        base.Internal.__init__(self)
+        self._wid = next(_wids)
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.scale = 1
+        self._opacity = 1.0
+        self._visible = False
+        self.surface = cairocffi.ImageSurface(cairocffi.FORMAT_ARGB32, width, height)
+
+    @property
+    def wid(self) -> int:
+        return self._wid
+
+    def create_drawer(self, width: int, height: int) -> Drawer:
+        """Create a Drawer that draws to this window."""
+        return Drawer(self, width, height)
+
+    def hide(self) -> None:
+        self._visible = False
+
+    def unhide(self) -> None:
+        self._visible = True
+
+    @expose_command()
+    def is_visible(self) -> bool:
+        return self._visible
+
+    @expose_command()
+    def kill(self) -> None:
+        self.surface.finish()
+
+    @expose_command()
+    def place(
+        self,
+        x,
+        y,
+        width,
+        height,
+        borderwidth,
+        bordercolor,
+        above=False,
+        margin=None,
+        respect_hints=False,
+    ):
+        self.x = x
+        self.y = y
+        if (width, height) != (self.width, self.height):
+            # Keep what has been drawn so far, like a resized window would
+            surface = cairocffi.ImageSurface(cairocffi.FORMAT_ARGB32, width, height)
+            with cairocffi.Context(surface) as ctx:
+                ctx.set_source_surface(self.surface)
+                ctx.paint()
+            self.surface.finish()
+            self.surface = surface
+            self.width = width
+            self.height = height
+
+    @expose_command()
+    def bring_to_front(self) -> None:
+        pass
+
+    @expose_command()
+    def info(self) -> dict[str, Any]:
+        return dict(x=self.x, y=self.y, width=self.width, height=self.height, id=self.wid)
+
+    def write_to_png(
+        self,
+        path: str,
+        x: int = 0,
+        y: int = 0,
+        width: int | None = None,
+        height: int | None = None,
+    ) -> None:
+        """Save what has been drawn to the window, or to an area of it"""
+        if (x, y, width, height) == (0, 0, None, None):
+            self.surface.write_to_png(path)
+            return
+
+        image = cairocffi.ImageSurface(
+            cairocffi.FORMAT_ARGB32, width or self.width - x, height or self.height - y
+        )
+        with cairocffi.Context(image) as ctx:
+            ctx.set_source_surface(self.surface, -x, -y)
+            ctx.paint()
+        image.write_to_png(path)
+        image.finish()
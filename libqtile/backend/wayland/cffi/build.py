@@ -349,6 +349,7 @@ extern "Python" bool remove_idle_inhibitor_cb(void *userdata, void *inhibitor);
 extern "Python" bool check_inhibited_cb(void *userdata);
 extern "Python" struct qw_qtile_config *get_qtile_config_cb(void *userdata);
 extern "Python" void idle_state_change_cb(void *userdata, int seconds, bool is_idle);
+extern "Python" void on_frame_cb(void *userdata);
 
 extern "Python" int request_focus_cb(void *userdata);
 extern "Python" int request_close_cb(void *userdata);
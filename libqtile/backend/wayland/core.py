@@ -44,7 +44,7 @@ import signal
 import sys
 import time
 from collections import defaultdict
-from collections.abc import Generator
+from collections.abc import Callable, Generator, Sequence
 from pathlib import Path
 from typing import Any
 
@@ -228,6 +228,12 @@ def idle_state_change_cb(userdata: ffi.CData, seconds: int, is_idle: bool) -> No
     core.handle_idle_state_change(seconds, is_idle)
 
 
+@ffi.def_extern()
+def on_frame_cb(userdata: ffi.CData) -> None:
+    core = ffi.from_handle(userdata)
+    core.handle_frame()
+
+
 def get_wlr_log_level() -> int:
     if logger.level <= logging.DEBUG:
         return lib.WLR_DEBUG
@@ -258,7 +264,7 @@ class Core(base.Core):
             os.environ["DISPLAY"] = ffi.string(xwayland_display_name_ptr).decode()
         self._output_reserved_space: dict[Screen, tuple[int, int, int, int]] = {}
         self.current_window = None
-        self.grabbed_keys: list[tuple[int, int]] = []
+        self.grabbed_keys: set[tuple[int, int]] = set()
         self._userdata = ffi.new_handle(self)
         self.qw.cb_data = self._userdata
         self.qw.keyboard_key_cb = lib.keyboard_key_cb
@@ -280,6 +286,8 @@ class Core(base.Core):
         self.qw.check_inhibited_cb = lib.check_inhibited_cb
         self.qw.get_qtile_config_cb = lib.get_qtile_config_cb
         self.qw.idle_state_change_cb = lib.idle_state_change_cb
+        self.qw.on_frame_cb = lib.on_frame_cb
+        self._frame_callback: Callable[[], None] | None = None
         lib.qw_server_start(self.qw)
         os.environ["WAYLAND_DISPLAY"] = self.display_name
         self.qw_cursor = lib.qw_server_get_cursor(self.qw)
@@ -378,6 +386,22 @@ class Core(base.Core):
     def handle_screen_change(self) -> None:
         self.fire_screen_change(None)
 
+    def request_frame(self, callback: Callable[[], None]) -> None:
+        """Call the callback when the next output frame is about to be presented"""
+        if lib.qw_server_schedule_frame(self.qw):
+            self._frame_callback = callback
+        else:
+            # No output is going to send us a frame
+            base.Core.request_frame(self, callback)
+
+    def handle_frame(self) -> None:
+        callback, self._frame_callback = self._frame_callback, None
+        if callback is not None:
+            try:
+                callback()
+            except Exception:
+                logger.exception("Error while rendering a frame")
+
     def get_screen_for_output(self, output: ffi.CData) -> Screen:
         assert self.qtile is not None
 
@@ -666,27 +690,33 @@ class Core(base.Core):
             raise QtileError("Unable to grab keycode. No active keyboard found.")
         return sym
 
-    def grab_key(self, key: config.Key | config.KeyChord) -> tuple[int, int]:
+    def _lookup_key(self, key: config.Key | config.KeyChord) -> tuple[int, int]:
         if isinstance(key.key, str):
             keysym = lib.qwu_keysym_from_name(key.key.encode())
         else:
             keysym = self._get_sym_from_code(key.key)
-        mask_key = translate_masks(key.modifiers)
-        self.grabbed_keys.append((keysym, mask_key))
-        return keysym, mask_key
+        return keysym, translate_masks(key.modifiers)
+
+    def grab_key(self, key: config.Key | config.KeyChord) -> tuple[int, int]:
+        syms = self._lookup_key(key)
+        self.grabbed_keys.add(syms)
+        return syms
 
     def ungrab_key(self, key: config.Key | config.KeyChord) -> tuple[int, int]:
-        if isinstance(key.key, str):
-            keysym = lib.qwu_keysym_from_name(key.key.encode())
-        else:
-            keysym = self._get_sym_from_code(key.key)
-        mask_key = translate_masks(key.modifiers)
-        self.grabbed_keys.remove((keysym, mask_key))
-        return keysym, mask_key
+        syms = self._lookup_key(key)
+        self.grabbed_keys.discard(syms)
+        return syms
 
     def ungrab_keys(self) -> None:
         self.grabbed_keys.clear()
 
+    def update_key_grabs(
+        self, keys: Sequence[config.Key | config.KeyChord]
+    ) -> list[tuple[int, int]]:
+        syms = [self._lookup_key(key) for key in keys]
+        self.grabbed_keys = set(syms)
+        return syms
+
     def grab_button(self, mouse: config.Mouse) -> int:
         return translate_masks(mouse.modifiers)
 
@@ -799,6 +829,7 @@ class Core(base.Core):
             ffi.new("char[]", (options or "").encode()),
             ffi.new("char[]", (variant or "").encode()),
         )
+        self.keyboard_layout = f"{layout} {variant}" if layout and variant else layout or ""
 
     @expose_command()
     @allow_when_locked
@@ -981,7 +1012,8 @@ class Painter:
             logger.warning("Wallpaper image not found: %s", image_path)
             return
 
-        surface = Img.from_path(image_path).default_surface
+        # Decoded outside of the image cache, as the surface is destroyed once painted
+        surface = Img.from_path(image_path).backend.get_surface()
         surface_pointer = ffi.cast("cairo_surface_t *", surface._pointer)
         w_mode = self._mode_map.get(mode or "stretch", lib.WALLPAPER_MODE_STRETCH)
         lib.qw_server_paint_wallpaper(self.core.qw, screen.x, screen.y, surface_pointer, w_mode)
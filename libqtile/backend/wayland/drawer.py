@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import math
 from typing import TYPE_CHECKING
 
 import cairocffi
@@ -63,3 +64,35 @@ class Drawer(drawer.Drawer):
             context.fill()
 
         self._win.set_buffer_with_damage(offsetx, offsety, width, height)
+
+    def move(
+        self, old_x: int, old_y: int, offsetx: int, offsety: int, width: int, height: int
+    ) -> bool:
+        # What we last drew is still in the window's buffer, so we blit it from there
+        if not self._enabled or not self._win.surface:
+            return False
+
+        width = min(width, self._win.width - offsetx)
+        height = min(height, self._win.height - offsety)
+        if width <= 0 or height <= 0:
+            return True
+        scale = self._win.scale
+
+        surface = cairocffi.Surface._from_pointer(self._win.surface, True)  # type: ignore[attr-defined]
+        # Take a copy of the old area first, as it may overlap the new one
+        copy = cairocffi.ImageSurface(
+            cairocffi.FORMAT_ARGB32, math.ceil(width * scale), math.ceil(height * scale)
+        )
+        with cairocffi.Context(copy) as context:
+            context.set_source_surface(surface, -old_x * scale, -old_y * scale)
+            context.paint()
+        # Both surfaces are in buffer pixels, so we don't scale the context here
+        with cairocffi.Context(surface) as context:
+            context.set_operator(cairocffi.OPERATOR_SOURCE)
+            context.set_source_surface(copy, offsetx * scale, offsety * scale)
+            context.rectangle(offsetx * scale, offsety * scale, width * scale, height * scale)
+            context.fill()
+        copy.finish()
+
+        self._win.set_buffer_with_damage(offsetx, offsety, width, height)
+        return True
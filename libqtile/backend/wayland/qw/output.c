@@ -16,6 +16,11 @@ static void qw_output_handle_frame(struct wl_listener *listener, void *data) {
     struct qw_output *output = wl_container_of(listener, output, frame);
     struct wlr_scene *scene = output->server->scene;
 
+    // Let qtile render anything that is waiting for a frame, so that it is in this one
+    if (output->server->on_frame_cb != NULL) {
+        output->server->on_frame_cb(output->server->cb_data);
+    }
+
     struct wlr_scene_output *scene_output = wlr_scene_get_scene_output(scene, output->wlr_output);
 
     wlr_scene_output_commit(scene_output, NULL);
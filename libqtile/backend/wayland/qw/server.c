@@ -111,6 +111,21 @@ void qw_server_loop_output_dims(struct qw_server *server, output_dims_cb_t cb) {
     }
 }
 
+// Ask every active output for a new frame, so that on_frame_cb is called even when nothing
+// else has been damaged.
+bool qw_server_schedule_frame(struct qw_server *server) {
+    bool scheduled = false;
+    struct qw_output *o;
+    wl_list_for_each(o, &server->outputs, link) {
+        if (!o->wlr_output || !o->wlr_output->enabled || o->disabled_by_opm) {
+            continue;
+        }
+        wlr_output_schedule_frame(o->wlr_output);
+        scheduled = true;
+    }
+    return scheduled;
+}
+
 // Initializes event loop and starts the Wayland backend
 void qw_server_start(struct qw_server *server) {
     server->event_loop = wl_display_get_event_loop(server->display);
@@ -157,6 +157,9 @@ typedef struct qw_qtile_config *(*get_qtile_config_cb_t)(void *userdata);
 // Callback for idle state change
 typedef void (*idle_state_change_cb_t)(void *userdata, int seconds, bool is_idle);
 
+// Callback for when an output is about to present a new frame
+typedef void (*on_frame_cb_t)(void *userdata);
+
 enum {
     LAYER_BACKGROUND,   // background, layer shell
     LAYER_BOTTOM,       // bottom, layer shell
@@ -219,6 +222,7 @@ struct qw_server {
     check_inhibited_cb_t check_inhibited_cb;
     get_qtile_config_cb_t get_qtile_config_cb;
     idle_state_change_cb_t idle_state_change_cb;
+    on_frame_cb_t on_frame_cb;
     void *view_activation_cb_data;
     void *cb_data;
     struct qw_layer_view *exclusive_layer;
@@ -337,6 +341,9 @@ int qw_server_get_event_loop_fd(struct qw_server *server);
 // Iterate over outputs and call the provided callback with their geometry
 void qw_server_loop_output_dims(struct qw_server *server, output_dims_cb_t cb);
 
+// Ask every active output for a new frame. Returns false if there are none.
+bool qw_server_schedule_frame(struct qw_server *server);
+
 // Create and initialize a new server instance (allocates memory)
 struct qw_server *qw_server_create(void);
 
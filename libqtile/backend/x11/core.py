@@ -1,11 +1,12 @@
 import asyncio
 import contextlib
 import os
-from collections.abc import Callable, Iterator
+from collections.abc import Callable, Iterator, Sequence
 
 import xcffib
 import xcffib.randr
 import xcffib.render
+import xcffib.xkb
 import xcffib.xproto
 import xcffib.xtest
 from xcffib.xproto import EventMask
@@ -15,6 +16,7 @@ from libqtile.backend import base
 from libqtile.backend.base.idle_inhibit import IdleInhibitorManager, Inhibitor
 from libqtile.backend.x11 import window, xcbq
 from libqtile.backend.x11.idle_notify import IdleNotifier
+from libqtile.backend.x11.stacking import StackingOrder
 from libqtile.backend.x11.xkeysyms import keysyms
 from libqtile.command.base import expose_command
 from libqtile.log_utils import logger
@@ -23,8 +25,11 @@ from libqtile.utils import QtileError
 EVENT_TO_HANDLER = {
     xcffib.xproto.ButtonPressEvent: "handle_ButtonPress",
     xcffib.xproto.ButtonReleaseEvent: "handle_ButtonRelease",
+    xcffib.xproto.CirculateNotifyEvent: "handle_CirculateNotify",
     xcffib.xproto.ClientMessageEvent: "handle_ClientMessage",
+    xcffib.xproto.ConfigureNotifyEvent: "handle_ConfigureNotify",
     xcffib.xproto.ConfigureRequestEvent: "handle_ConfigureRequest",
+    xcffib.xproto.CreateNotifyEvent: "handle_CreateNotify",
     xcffib.xproto.DestroyNotifyEvent: "handle_DestroyNotify",
     xcffib.xproto.EnterNotifyEvent: "handle_EnterNotify",
     xcffib.xproto.ExposeEvent: "handle_Expose",
@@ -35,24 +40,113 @@ EVENT_TO_HANDLER = {
     xcffib.xproto.MapRequestEvent: "handle_MapRequest",
     xcffib.xproto.MotionNotifyEvent: "handle_MotionNotify",
     xcffib.xproto.PropertyNotifyEvent: "handle_PropertyNotify",
+    xcffib.xproto.ReparentNotifyEvent: "handle_ReparentNotify",
     xcffib.randr.ScreenChangeNotifyEvent: "handle_ScreenChangeNotify",
     xcffib.xproto.SelectionNotifyEvent: "handle_SelectionNotify",
     xcffib.xproto.UnmapNotifyEvent: "handle_UnmapNotify",
+    # All XKB events have the same event code, see handle_XkbNotify()
+    xcffib.xkb.NewKeyboardNotifyEvent: "handle_XkbNotify",
 }
 
 if hasattr(xcffib, "xfixes"):
     EVENT_TO_HANDLER[xcffib.xfixes.SelectionNotifyEvent] = "handle_SelectionNotify"
 
 _IGNORED_EVENTS = {
-    xcffib.xproto.CreateNotifyEvent,
     xcffib.xproto.FocusInEvent,
     xcffib.xproto.KeyReleaseEvent,
     # DWM handles this to help "broken focusing windows".
     xcffib.xproto.MapNotifyEvent,
     xcffib.xproto.NoExposureEvent,
+}
+
+# Events which expose the affected window id as an "event" attribute
+_EVENT_WINDOW_EVENTS = {
+    xcffib.xproto.EnterNotifyEvent,
+    xcffib.xproto.LeaveNotifyEvent,
+    xcffib.xproto.MotionNotifyEvent,
+    xcffib.xproto.ButtonPressEvent,
+    xcffib.xproto.ButtonReleaseEvent,
+    xcffib.xproto.KeyPressEvent,
+}
+
+# Events which need any pending MotionNotify to be handled first
+_HANDLE_MOTION_FIRST = {
+    xcffib.xproto.EnterNotifyEvent,
+    xcffib.xproto.LeaveNotifyEvent,
+    xcffib.xproto.ButtonPressEvent,
+    xcffib.xproto.ButtonReleaseEvent,
+}
+
+# Errors caused by races with clients, see the comment in Core._xpoll
+_X_ERRORS = (
+    xcffib.xproto.WindowError,
+    xcffib.xproto.AccessError,
+    xcffib.xproto.DrawableError,
+    xcffib.xproto.GContextError,
+    xcffib.xproto.PixmapError,
+    xcffib.render.PictureError,
+)
+
+# Events which change whether a window is mapped or exists at all. Events for
+# a window are never compressed across one of these.
+_COMPRESSION_BARRIERS = {
+    xcffib.xproto.DestroyNotifyEvent,
+    xcffib.xproto.MapRequestEvent,
     xcffib.xproto.ReparentNotifyEvent,
+    xcffib.xproto.UnmapNotifyEvent,
 }
 
+_CONFIGURE_REQUEST_FIELDS = (
+    (xcffib.xproto.ConfigWindow.X, "x"),
+    (xcffib.xproto.ConfigWindow.Y, "y"),
+    (xcffib.xproto.ConfigWindow.Width, "width"),
+    (xcffib.xproto.ConfigWindow.Height, "height"),
+    (xcffib.xproto.ConfigWindow.BorderWidth, "border_width"),
+    (xcffib.xproto.ConfigWindow.Sibling, "sibling"),
+    (xcffib.xproto.ConfigWindow.StackMode, "stack_mode"),
+)
+
+
+def compress_events(events: list) -> list:
+    """Drop the events in a batch that are superseded by later ones
+
+    Only the last PropertyNotify for each (window, atom) pair is kept, as the
+    handlers read the property's current value anyway. A run of adjacent
+    ConfigureRequests for a window is merged into the last one, with later
+    requests taking precedence for the values they both set. Events are never
+    merged across an event that maps, unmaps, reparents or destroys the
+    window, and the order of the remaining events is preserved.
+    """
+    properties: dict[int, set[int]] = {}
+    # The ConfigureRequest that directly follows the event, in the batch's order
+    following: xcffib.xproto.ConfigureRequestEvent | None = None
+    kept = []
+
+    # Walk backwards so that the latest event for each key is the one we see first
+    for event in reversed(events):
+        cls = event.__class__
+        if cls is xcffib.xproto.ConfigureRequestEvent:
+            if following is not None and following.window == event.window:
+                for flag, field in _CONFIGURE_REQUEST_FIELDS:
+                    if event.value_mask & flag and not following.value_mask & flag:
+                        setattr(following, field, getattr(event, field))
+                        following.value_mask |= flag
+                continue
+            following = event
+        else:
+            following = None
+            if cls is xcffib.xproto.PropertyNotifyEvent:
+                atoms = properties.setdefault(event.window, set())
+                if event.atom in atoms:
+                    continue
+                atoms.add(event.atom)
+            elif cls in _COMPRESSION_BARRIERS:
+                properties.pop(event.window, None)
+        kept.append(event)
+
+    kept.reverse()
+    return kept
+
 
 def get_keys() -> list[str]:
     return list(xcbq.keysyms.keys())
@@ -113,6 +207,15 @@ class Core(base.Core):
         )
         self._root.set_attribute(eventmask=self.eventmask)
 
+        # Now that we receive SubstructureNotify events for the root window,
+        # we can keep track of its stacking order locally.
+        self._stacking = StackingOrder(self._root.query_tree())
+
+        # We are the only writer of _NET_ACTIVE_WINDOW, so we only need to read
+        # it once (it may have been set before a restart)
+        active_window = self._root.get_property("_NET_ACTIVE_WINDOW", "WINDOW", unpack=int)
+        self._active_window: int | None = active_window[0] if active_window else None
+
         self._root.set_property(
             "_NET_SUPPORTED", [self.conn.atoms[x] for x in xcbq.SUPPORTED_ATOMS]
         )
@@ -136,6 +239,10 @@ class Core(base.Core):
             self.conn.xfixes.select_selection_input(self._selection_window, "PRIMARY")
             self.conn.xfixes.select_selection_input(self._selection_window, "CLIPBOARD")
 
+        if hasattr(self.conn, "xkeyboard"):
+            self.conn.xkeyboard.select_events()
+            self._keyboard_layout = self.conn.xkeyboard.get_layout()
+
         primary_atom = self.conn.atoms["PRIMARY"]
         reply = self.conn.conn.core.GetSelectionOwner(primary_atom).reply()
         self._selection["PRIMARY"]["owner"] = reply.owner
@@ -161,8 +268,24 @@ class Core(base.Core):
             | xcbq.ModMasks["lock"]
             | xcbq.AllButtonsMask
             | xcbq.PointerMotionHintMask
+            | xcbq.XkbGroupMask
         )
 
+        # The (keycode, modmask) pairs and (button, modmask): eventmask grabs we
+        # hold on the root window, not counting the _auto_modmasks() variants
+        self._key_grabs: set[tuple[int, int]] = set()
+        self._button_grabs: dict[tuple[int, int], int] = {}
+
+        # For each event class: the attribute holding the window id, the name
+        # of the handler and our own handler, see handle_event()
+        self._dispatch: dict[type, tuple[str | None, str | None, Callable | None]] = {}
+        # The handler for each (window class, event class), or None
+        self._window_handlers: dict[tuple[type, type], Callable | None] = {}
+
+        # The number of events handled and dropped by compress_events()
+        self._events_dispatched = 0
+        self._events_compressed = 0
+
         # The last motion notify event that we still need to handle
         self._motion_notify: xcffib.Event | None = None
         # The last time we were handling a MotionNotify event
@@ -291,11 +414,22 @@ class Core(base.Core):
     def warp_pointer(self, x, y):
         self._root.warp_pointer(x, y)
         self._root.set_input_focus()
-        self._root.set_property("_NET_ACTIVE_WINDOW", self._root.wid)
+        self.set_active_window(self._root.wid)
 
     def clear_focus(self):
         """Clear _NET_ACTIVE_WINDOW so that there is no focused window"""
-        self._root.set_property("_NET_ACTIVE_WINDOW", 0)
+        self.set_active_window(0)
+
+    @property
+    def active_window(self) -> int | None:
+        """The window ID in _NET_ACTIVE_WINDOW"""
+        return self._active_window
+
+    def set_active_window(self, wid: int) -> None:
+        """Set _NET_ACTIVE_WINDOW, if it isn't already set to this window"""
+        if wid != self._active_window:
+            self._root.set_property("_NET_ACTIVE_WINDOW", wid)
+            self._active_window = wid
 
     def convert_selection(self, selection_atom, _type="UTF8_STRING") -> None:
         type_atom = self.conn.atoms[_type]
@@ -308,13 +442,66 @@ class Core(base.Core):
         )
 
     def handle_event(self, event):
-        """Handle an X11 event by forwarding it to the right target"""
-        targets = self._get_target_chain(event)
-        logger.debug("X11 event: %s (targets: %s)", event.__class__.__name__, targets)
-        for target in targets:
-            ret = target(event)
-            if not ret:
-                break
+        """Handle an X11 event by forwarding it to the right target
+
+        Events are handled by functions named `handle_X`, either on the window
+        object itself or on the core, where X is the event name (e.g.
+        EnterNotify, ConfigureNotify, etc).
+
+        The event is passed to the window's handler first, and then to the
+        core's one unless the window's handler returns False or None.
+
+        Which handlers exist for each class of event and window is worked out
+        the first time we see it, so dispatching doesn't need any attribute
+        lookups by name.
+        """
+        assert self.qtile is not None
+
+        cls = event.__class__
+        logger.debug("X11 event: %s", cls.__name__)
+        try:
+            window_attr, handler, core_handler = self._dispatch[cls]
+        except KeyError:
+            window_attr, handler, core_handler = self._dispatch[cls] = self._dispatch_entry(event)
+
+        if handler is None:
+            return
+
+        if window_attr is not None:
+            win = self.qtile.windows_map.get(getattr(event, window_attr))
+            if win is not None:
+                key = (win.__class__, cls)
+                try:
+                    window_handler = self._window_handlers[key]
+                except KeyError:
+                    window_handler = getattr(win.__class__, handler, None)
+                    self._window_handlers[key] = window_handler
+                if window_handler is not None and not window_handler(win, event):
+                    return
+
+        if core_handler is not None:
+            core_handler(event)
+
+    def _dispatch_entry(self, event) -> tuple[str | None, str | None, Callable | None]:
+        """Work out how to dispatch events of the given event's class"""
+        handler = EVENT_TO_HANDLER.get(event.__class__)
+
+        # If handler is None, this event has no handler and should be ignored
+        if handler is None:
+            return None, None, None
+
+        # xcffib sets the event's fields on the instance, so we need one to
+        # find out which attribute holds the affected window's id.
+        if hasattr(event, "window"):
+            window_attr: str | None = "window"
+        elif hasattr(event, "drawable"):
+            window_attr = "drawable"
+        elif event.__class__ in _EVENT_WINDOW_EVENTS:
+            window_attr = "event"
+        else:
+            window_attr = None
+
+        return window_attr, handler, getattr(self, handler, None)
 
     def _xpoll(self) -> None:
         """Poll the connection and dispatch incoming events"""
@@ -322,34 +509,52 @@ class Core(base.Core):
 
         while True:
             try:
-                event = self.conn.conn.poll_for_event()
-                if not event:
-                    break
+                events = self._read_events()
+            except Exception:
+                if self._handle_poll_exception():
+                    return
+                continue
 
-                if event.__class__ in _IGNORED_EVENTS:
-                    continue
+            if not events:
+                break
 
-                if self.idle_notifier.check_event(event):
-                    continue
+            compressed = compress_events(events)
+            self._events_compressed += len(events) - len(compressed)
+            self._events_dispatched += len(compressed)
+
+            for event in compressed:
+                try:
+                    # Motion Notifies are handled later
+                    # Otherwise this is too CPU intensive
+                    if isinstance(event, xcffib.xproto.MotionNotifyEvent):
+                        self._motion_notify = event
+                        continue
 
-                # Motion Notifies are handled later
-                # Otherwise this is too CPU intensive
-                if isinstance(event, xcffib.xproto.MotionNotifyEvent):
-                    self._motion_notify = event
-                else:
-                    # These events need the motion notify event handled first
-                    handle_motion_first = type(event) in [
-                        xcffib.xproto.EnterNotifyEvent,
-                        xcffib.xproto.LeaveNotifyEvent,
-                        xcffib.xproto.ButtonPressEvent,
-                        xcffib.xproto.ButtonReleaseEvent,
-                    ]
                     # Handle events in the correct order
-                    if self._motion_notify and handle_motion_first:
+                    if self._motion_notify and event.__class__ in _HANDLE_MOTION_FIRST:
                         self.handle_event(self._motion_notify)
                         self._motion_notify = None
                     self.handle_event(event)
+                except _X_ERRORS:
+                    pass
+                except Exception:
+                    if self._handle_poll_exception():
+                        return
 
+        # Handle any outstanding motion notify events
+        if self._motion_notify:
+            self.handle_event(self._motion_notify)
+            self._motion_notify = None
+        self.flush()
+
+    def _read_events(self) -> list:
+        """Read all of the events that are currently queued on the connection
+
+        Handling a batch at once lets us drop the events that are superseded
+        by later ones in the same batch, see compress_events().
+        """
+        events: list[xcffib.Event] = []
+        while True:
             # Catch some bad X exceptions. Since X is event based, race
             # conditions can occur almost anywhere in the code. For example, if
             # a window is created and then immediately destroyed (before the
@@ -357,73 +562,44 @@ class Core(base.Core):
             # the window properties, it will throw a WindowError exception. We
             # can essentially ignore it, since the window is already dead and
             # we've got another event in the queue notifying us to clean it up.
-            except (
-                xcffib.xproto.WindowError,
-                xcffib.xproto.AccessError,
-                xcffib.xproto.DrawableError,
-                xcffib.xproto.GContextError,
-                xcffib.xproto.PixmapError,
-                xcffib.render.PictureError,
-            ):
-                pass
-            except Exception:
-                error_code = self.conn.conn.has_error()
-                if error_code:
-                    logger.warning("Shutting down due to disconnection from X server")
-                    self.remove_listener()
-                    self.qtile.stop()
-                    return
-                logger.exception("Got an exception in poll loop")
-        # Handle any outstanding motion notify events
-        if self._motion_notify:
-            self.handle_event(self._motion_notify)
-            self._motion_notify = None
-        self.flush()
+            try:
+                event = self.conn.conn.poll_for_event()
+            except _X_ERRORS:
+                continue
+            if not event:
+                return events
 
-    def _get_target_chain(self, event) -> list[Callable]:
-        """Returns a chain of targets that can handle this event
+            if event.__class__ in _IGNORED_EVENTS:
+                continue
 
-        Finds functions named `handle_X`, either on the window object itself or
-        on the Qtile instance, where X is the event name (e.g.  EnterNotify,
-        ConfigureNotify, etc).
+            if self.idle_notifier.check_event(event):
+                continue
 
-        The event will be passed to each target in turn for handling, until one
-        of the handlers returns False or None, or the end of the chain is
-        reached.
-        """
-        assert self.qtile is not None
+            events.append(event)
 
-        handler = EVENT_TO_HANDLER.get(event.__class__)
+    def _handle_poll_exception(self) -> bool:
+        """Deal with an unexpected exception in the poll loop
 
-        # If handler is None, this event has no handler and should be ignored
-        if handler is None:
-            return []
-
-        # Certain events expose the affected window id as an "event" attribute.
-        event_events = {
-            xcffib.xproto.EnterNotifyEvent,
-            xcffib.xproto.LeaveNotifyEvent,
-            xcffib.xproto.MotionNotifyEvent,
-            xcffib.xproto.ButtonPressEvent,
-            xcffib.xproto.ButtonReleaseEvent,
-            xcffib.xproto.KeyPressEvent,
+        Returns True if we've lost the connection to the X server and have
+        shut down.
+        """
+        assert self.qtile is not None
+        error_code = self.conn.conn.has_error()
+        if error_code:
+            logger.warning("Shutting down due to disconnection from X server")
+            self.remove_listener()
+            self.qtile.stop()
+            return True
+        logger.exception("Got an exception in poll loop")
+        return False
+
+    @expose_command()
+    def event_stats(self) -> dict[str, int]:
+        """Get the number of X events dispatched and dropped by event compression"""
+        return {
+            "dispatched": self._events_dispatched,
+            "compressed": self._events_compressed,
         }
-        if hasattr(event, "window"):
-            window = self.qtile.windows_map.get(event.window)
-        elif hasattr(event, "drawable"):
-            window = self.qtile.windows_map.get(event.drawable)
-        elif event.__class__ in event_events:
-            window = self.qtile.windows_map.get(event.event)
-        else:
-            window = None
-
-        chain = []
-        if window is not None and hasattr(window, handler):
-            chain.append(getattr(window, handler))
-
-        if hasattr(self, handler):
-            chain.append(getattr(self, handler))
-        return chain
 
     def get_valid_timestamp(self):
         """Get a valid timestamp, i.e. not CurrentTime, for X server.
@@ -473,9 +649,9 @@ class Core(base.Core):
         wids = [wid for wid, c in self.qtile.windows_map.items() if isinstance(c, window.Window)]
         self._root.set_property("_NET_CLIENT_LIST", wids)
 
-        # We rely on the stacking order from the X server
+        # We rely on our model of the X server's stacking order
         stacked_wids = []
-        for wid in self._root.query_tree():
+        for wid in self.stacking:
             win = self.qtile.windows_map.get(wid)
             if not win:
                 continue
@@ -485,6 +661,46 @@ class Core(base.Core):
 
         self._root.set_property("_NET_CLIENT_LIST_STACKING", stacked_wids)
 
+    @property
+    def stacking(self) -> StackingOrder:
+        """The stacking order of the root window's children, bottom to top"""
+        if self._stacking.stale:
+            logger.debug("Stacking order out of sync, querying the X server")
+            self._stacking.reset(self._root.query_tree())
+        return self._stacking
+
+    def restack(
+        self, win: window.XWindow, sibling: int | None = None, above: bool = True
+    ) -> None:
+        """Stack a window directly above or below a sibling
+
+        Without a sibling, the window goes to the top or bottom of the stack.
+        Nothing is sent if the window is already there.
+        """
+        if self.stacking.is_stacked(win.wid, sibling, above):
+            return
+        stackmode = xcffib.xproto.StackMode.Above if above else xcffib.xproto.StackMode.Below
+        if sibling is None:
+            win.configure(stackmode=stackmode)
+        else:
+            win.configure(stackmode=stackmode, sibling=sibling)
+        self._stacking.restack(win.wid, sibling, above)
+
+    def restack_windows(self, wids: list[int]) -> None:
+        """Put the given windows into this order, from bottom to top
+
+        Only the windows that are out of order are moved, using the smallest
+        number of ConfigureWindow requests.
+        """
+        assert self.qtile is not None
+        for wid, sibling, above in self.stacking.plan(wids):
+            win = self.qtile.windows_map.get(wid)
+            if isinstance(win, window.Window | window.Internal | window.Static):
+                xwin = win.window
+            else:
+                xwin = window.XWindow(self.conn, wid)
+            self.restack(xwin, sibling, above)
+
     def update_desktops(self, groups, index: int) -> None:
         """Set the current desktops of the window manager
 
@@ -515,6 +731,23 @@ class Core(base.Core):
 
         return keysym, modmask
 
+    def _grab_key_code(self, code: int, modmask: int) -> None:
+        for amask in self._auto_modmasks():
+            self.conn.conn.core.GrabKey(
+                True,
+                self._root.wid,
+                modmask | amask,
+                code,
+                xcffib.xproto.GrabMode.Async,
+                xcffib.xproto.GrabMode.Async,
+            )
+        self._key_grabs.add((code, modmask))
+
+    def _ungrab_key_code(self, code: int, modmask: int) -> None:
+        for amask in self._auto_modmasks():
+            self.conn.conn.core.UngrabKey(code, self._root.wid, modmask | amask)
+        self._key_grabs.discard((code, modmask))
+
     def grab_key(self, key: config.Key | config.KeyChord) -> tuple[int, int]:
         """Map the key to receive events on it"""
         keysym, modmask = self.lookup_key(key)
@@ -524,15 +757,7 @@ class Core(base.Core):
             if code == 0:
                 logger.warning("Can't grab %s (unknown keysym: %02x)", key, keysym)
                 continue
-            for amask in self._auto_modmasks():
-                self.conn.conn.core.GrabKey(
-                    True,
-                    self._root.wid,
-                    modmask | amask,
-                    code,
-                    xcffib.xproto.GrabMode.Async,
-                    xcffib.xproto.GrabMode.Async,
-                )
+            self._grab_key_code(code, modmask)
         return keysym, modmask & self._valid_mask
 
     def ungrab_key(self, key: config.Key | config.KeyChord) -> tuple[int, int]:
@@ -541,8 +766,7 @@ class Core(base.Core):
         codes = self.conn.keysym_to_keycode(keysym)
 
         for code in codes:
-            for amask in self._auto_modmasks():
-                self.conn.conn.core.UngrabKey(code, self._root.wid, modmask | amask)
+            self._ungrab_key_code(code, modmask)
 
         return keysym, modmask & self._valid_mask
 
@@ -551,6 +775,34 @@ class Core(base.Core):
         self.conn.conn.core.UngrabKey(
             xcffib.xproto.Atom.Any, self._root.wid, xcffib.xproto.ModMask.Any
         )
+        self._key_grabs.clear()
+
+    def update_key_grabs(
+        self, keys: Sequence[config.Key | config.KeyChord]
+    ) -> list[tuple[int, int]]:
+        """Grab exactly the given keys, releasing any other grabbed keys
+
+        Only the grabs that differ from the ones we already hold are changed,
+        so reloading the config or switching chords doesn't send a request for
+        every binding.
+        """
+        grabs = set()
+        syms = []
+        for key in keys:
+            keysym, modmask = self.lookup_key(key)
+            for code in self.conn.keysym_to_keycode(keysym):
+                if code == 0:
+                    logger.warning("Can't grab %s (unknown keysym: %02x)", key, keysym)
+                    continue
+                grabs.add((code, modmask))
+            syms.append((keysym, modmask & self._valid_mask))
+
+        for code, modmask in self._key_grabs - grabs:
+            self._ungrab_key_code(code, modmask)
+        for code, modmask in grabs - self._key_grabs:
+            self._grab_key_code(code, modmask)
+
+        return syms
 
     def grab_pointer(self) -> None:
         """Get the focus for pointer events"""
@@ -569,14 +821,13 @@ class Core(base.Core):
         """Ungrab the focus for pointer events"""
         self.conn.conn.core.UngrabPointer(xcffib.xproto.Atom._None)
 
-    def grab_button(self, mouse: config.Mouse) -> int:
-        """Grab the given mouse button for events"""
-        modmask = xcbq.translate_masks(mouse.modifiers)
-
+    def _button_eventmask(self, mouse: config.Mouse) -> int:
         eventmask = EventMask.ButtonPress
         if isinstance(mouse, config.Drag):
             eventmask |= EventMask.ButtonRelease
+        return eventmask
 
+    def _grab_button(self, button: int, modmask: int, eventmask: int) -> None:
         for amask in self._auto_modmasks():
             self.conn.conn.core.GrabButton(
                 True,
@@ -586,10 +837,15 @@ class Core(base.Core):
                 xcffib.xproto.GrabMode.Async,
                 xcffib.xproto.Atom._None,
                 xcffib.xproto.Atom._None,
-                mouse.button_code,
+                button,
                 modmask | amask,
             )
+        self._button_grabs[(button, modmask)] = eventmask
 
+    def grab_button(self, mouse: config.Mouse) -> int:
+        """Grab the given mouse button for events"""
+        modmask = xcbq.translate_masks(mouse.modifiers)
+        self._grab_button(mouse.button_code, modmask, self._button_eventmask(mouse))
         return modmask & self._valid_mask
 
     def ungrab_buttons(self) -> None:
@@ -597,6 +853,34 @@ class Core(base.Core):
         self.conn.conn.core.UngrabButton(
             xcffib.xproto.Atom.Any, self._root.wid, xcffib.xproto.ModMask.Any
         )
+        self._button_grabs.clear()
+
+    def update_button_grabs(self, mice: Sequence[config.Mouse]) -> list[int | None]:
+        """Grab exactly the given mouse events, releasing any other grabbed buttons
+
+        Like update_key_grabs(), only the grabs that changed are sent.
+        """
+        grabs = {}
+        masks: list[int | None] = []
+        for mouse in mice:
+            try:
+                modmask = xcbq.translate_masks(mouse.modifiers)
+            except xcbq.XCBQError:
+                masks.append(None)
+                continue
+            # A later grab of the same button and modifiers replaces an earlier one
+            grabs[(mouse.button_code, modmask)] = self._button_eventmask(mouse)
+            masks.append(modmask & self._valid_mask)
+
+        for button, modmask in self._button_grabs.keys() - grabs.keys():
+            for amask in self._auto_modmasks():
+                self.conn.conn.core.UngrabButton(button, self._root.wid, modmask | amask)
+            del self._button_grabs[(button, modmask)]
+        for (button, modmask), eventmask in grabs.items():
+            if self._button_grabs.get((button, modmask)) != eventmask:
+                self._grab_button(button, modmask, eventmask)
+
+        return masks
 
     def _auto_modmasks(self) -> Iterator[int]:
         """The modifier masks to add"""
@@ -651,6 +935,15 @@ class Core(base.Core):
 
         hook.fire("selection_notify", name, self._selection[name])
 
+    def handle_XkbNotify(self, event) -> None:  # noqa: N802
+        # xcffib makes every XKB event a NewKeyboardNotifyEvent, so the fields
+        # other than xkbType aren't those of the actual event
+        xkb = self.conn.xkeyboard
+        if event.xkbType != xkb.STATE_NOTIFY:
+            # A new keymap, which may have other layouts
+            xkb.refresh_layouts()
+        self.keyboard_layout = xkb.get_layout()
+
     def handle_PropertyNotify(self, event) -> None:  # noqa: N802
         name = self.conn.atoms.get_name(event.atom)
         # it's the selection property
@@ -797,9 +1090,39 @@ class Core(base.Core):
             self.update_client_lists()
             win.change_layer()
 
+    def handle_CreateNotify(self, event) -> None:  # noqa: N802
+        # New windows are created on top of their siblings
+        if event.parent == self._root.wid:
+            self._stacking.add(event.window)
+
+    def handle_ReparentNotify(self, event) -> None:  # noqa: N802
+        if event.event != self._root.wid:
+            return
+        if event.parent == self._root.wid:
+            self._stacking.add(event.window)
+        else:
+            self._stacking.remove(event.window)
+
+    def handle_ConfigureNotify(self, event) -> None:  # noqa: N802
+        # Only the copy sent to the root describes the root's stacking order;
+        # windows selecting StructureNotify get their own copy too.
+        if event.event != self._root.wid or event.window == self._root.wid:
+            return
+        if event.above_sibling == xcffib.XCB_NONE:
+            self._stacking.restack(event.window, above=False)
+        else:
+            self._stacking.restack(event.window, event.above_sibling)
+
+    def handle_CirculateNotify(self, event) -> None:  # noqa: N802
+        if event.event != self._root.wid:
+            return
+        above = event.place == xcffib.xproto.Place.OnTop
+        self._stacking.restack(event.window, above=above)
+
     def handle_DestroyNotify(self, event) -> None:  # noqa: N802
         assert self.qtile is not None
 
+        self._stacking.remove(event.window)
         self.qtile.unmanage(event.window)
         self.update_client_lists()
         if self.qtile.current_window is None:
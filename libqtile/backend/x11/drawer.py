@@ -16,14 +16,18 @@ class Drawer(drawer.Drawer):
     The underlying surface here is an XCBSurface backed by a pixmap. We draw to the
     pixmap starting at offset 0, 0, and when the time comes to display to the window (on
     draw()), we copy the appropriate portion of the pixmap onto the window. In the event
-    that our drawing area is resized, we invalidate the underlying surface and pixmap
-    and recreate them when we need them again with the new geometry.
+    that our drawing area grows beyond the pixmap, or shrinks to less than half of it,
+    we invalidate the underlying surface and pixmap and recreate them when we need them
+    again with the new geometry. Shrinking by less than that keeps the pixmap, so that
+    widgets whose width changes a little with their text don't reallocate it each time.
     """
 
     def __init__(self, conn: xcbq.Connection, win: window.Internal, width: int, height: int):
         drawer.Drawer.__init__(self, win, width, height)
         self.conn = conn
         self._xcb_surface = None
+        self._pixmap: int | None = None
+        self._pixmap_size = (0, 0)
         self._gc = None
         self._depth, self._visual = conn.default_screen._get_depth_and_visual(win._depth)
         # Create an XCBSurface and pixmap
@@ -41,10 +45,8 @@ class Drawer(drawer.Drawer):
 
     @width.setter
     def width(self, width):
-        if width > self._width:
-            self._free_xcb_surface()
-            self._free_pixmap()
         self._width = width
+        self._check_pixmap_size()
 
     @property
     def height(self):
@@ -52,10 +54,28 @@ class Drawer(drawer.Drawer):
 
     @height.setter
     def height(self, height):
-        if height > self._height:
+        self._height = height
+        self._check_pixmap_size()
+
+    @property
+    def pixmap_bytes(self) -> int:
+        """The amount of X server memory used by our pixmap"""
+        if self._pixmap is None:
+            return 0
+        width, height = self._pixmap_size
+        # Pixmaps of depth 24 are stored with 32 bits per pixel
+        return width * height * (4 if self._depth > 16 else 2)
+
+    def _check_pixmap_size(self):
+        width, height = self._pixmap_size
+        if (
+            self._width > width
+            or self._height > height
+            or self._width < width // 2
+            or self._height < height // 2
+        ):
             self._free_xcb_surface()
             self._free_pixmap()
-        self._height = height
 
     @property
     def pixmap(self):
@@ -89,8 +109,7 @@ class Drawer(drawer.Drawer):
             self.conn.conn,
             self._pixmap,
             self._visual,
-            self.width,
-            self.height,
+            *self._pixmap_size,
         )
         return surface
 
@@ -101,12 +120,13 @@ class Drawer(drawer.Drawer):
 
     def _create_pixmap(self):
         pixmap = self.conn.conn.generate_id()
+        # Pixmaps can't be empty, even if the widget we're drawing for is hidden
+        self._pixmap_size = (max(self.width, 1), max(self.height, 1))
         self.conn.conn.core.CreatePixmap(
             self._depth,
             pixmap,
             self._win.wid,
-            self.width,
-            self.height,
+            *self._pixmap_size,
         )
         return pixmap
 
@@ -115,6 +135,7 @@ class Drawer(drawer.Drawer):
             with contextlib.suppress(xcffib.ConnectionException):
                 self.conn.conn.core.FreePixmap(self._pixmap)
             self._pixmap = None
+            self._pixmap_size = (0, 0)
 
     def _check_xcb(self):
         # If the Drawer has been resized/invalidated we need to recreate these
@@ -141,6 +162,17 @@ class Drawer(drawer.Drawer):
         if self._gc is None:
             self._gc = self._create_gc()
 
+        if width is None:
+            width = self.width
+        if height is None:
+            height = self.height
+
+        # We can't copy more than we have, so grow to cover the requested area
+        if src_x + width > self.width:
+            self.width = src_x + width
+        if src_y + height > self.height:
+            self.height = src_y + height
+
         # Recreate an XCBSurface
         self._check_xcb()
 
@@ -156,9 +188,29 @@ class Drawer(drawer.Drawer):
             src_y,  # srcx, srcy
             offsetx,
             offsety,  # dstx, dsty
-            self.width if width is None else width,
-            self.height if height is None else height,
+            width,
+            height,
+        )
+
+    def move(self, old_x, old_y, offsetx, offsety, width, height):
+        # Our pixmap still holds what we last drew, so we can copy it again.
+        if not self._enabled or self._gc is None or self._pixmap is None:
+            return False
+        if width > self._pixmap_size[0] or height > self._pixmap_size[1]:
+            return False
+
+        self.conn.conn.core.CopyArea(
+            self._pixmap,
+            self._win.wid,
+            self._gc,
+            0,
+            0,  # srcx, srcy
+            offsetx,
+            offsety,  # dstx, dsty
+            width,
+            height,
         )
+        return True
 
     def _find_root_visual(self):
         for i in self.conn.default_screen.allowed_depths:
@@ -0,0 +1,155 @@
+from bisect import bisect_left
+from collections.abc import Iterable, Iterator, Sequence
+
+# (window, sibling, above): stack `window` directly above or below `sibling`
+Restack = tuple[int, int, bool]
+
+
+class StackingOrder:
+    """A local model of the stacking order of the root window's children.
+
+    The order is kept from bottom to top, like the reply to a QueryTree
+    request. It is seeded once from the server and then kept up to date from
+    the restack requests we issue ourselves and from the ConfigureNotify,
+    CirculateNotify, CreateNotify, ReparentNotify and DestroyNotify events we
+    receive for the root's children, so that layering decisions don't need a
+    round trip to the server.
+
+    If an event references a window that we don't know about, the model is
+    marked as stale and the owner is expected to resynchronise it with
+    ``reset()``.
+    """
+
+    def __init__(self, wids: Iterable[int] = ()) -> None:
+        self._order: list[int] = []
+        self.stale = False
+        self.reset(wids)
+
+    def reset(self, wids: Iterable[int]) -> None:
+        """Replace the whole model with the given bottom-to-top order"""
+        self._order = list(wids)
+        self.stale = False
+
+    def __contains__(self, wid: object) -> bool:
+        return wid in self._order
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._order)
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __getitem__(self, index: int) -> int:
+        return self._order[index]
+
+    def index(self, wid: int) -> int:
+        return self._order.index(wid)
+
+    def add(self, wid: int) -> None:
+        """A window was created or reparented to the root, i.e. it is on top"""
+        self.remove(wid)
+        self._order.append(wid)
+
+    def remove(self, wid: int) -> None:
+        """A window was destroyed or reparented away from the root"""
+        try:
+            self._order.remove(wid)
+        except ValueError:
+            pass
+
+    def restack(self, wid: int, sibling: int | None = None, above: bool = True) -> None:
+        """Move a window directly above or below a sibling
+
+        Without a sibling, the window is moved to the top (or bottom) of the
+        whole stack, as the X server does for ConfigureWindow requests that
+        have a stack mode but no sibling.
+        """
+        if wid not in self._order:
+            self.stale = True
+        self.remove(wid)
+
+        if sibling is None:
+            if above:
+                self._order.append(wid)
+            else:
+                self._order.insert(0, wid)
+            return
+
+        try:
+            index = self._order.index(sibling)
+        except ValueError:
+            # We've missed something, so place the window where the server
+            # would put it without a sibling and ask for a resync.
+            self.stale = True
+            self.restack(wid, above=above)
+            return
+
+        self._order.insert(index + 1 if above else index, wid)
+
+    def is_stacked(self, wid: int, sibling: int | None = None, above: bool = True) -> bool:
+        """Whether the window is already where restack() would put it"""
+        try:
+            index = self._order.index(wid)
+        except ValueError:
+            return False
+
+        if sibling is None:
+            return index == (len(self._order) - 1 if above else 0)
+
+        neighbour = index - 1 if above else index + 1
+        return 0 <= neighbour < len(self._order) and self._order[neighbour] == sibling
+
+    def plan(self, desired: Sequence[int]) -> list[Restack]:
+        """Work out the restack requests needed to put windows in a given order
+
+        ``desired`` lists windows from bottom to top. Only their relative order
+        is enforced: windows not in ``desired`` are not moved. The windows that
+        are already correctly ordered with respect to each other (the longest
+        subsequence of ``desired`` whose current stacking positions increase)
+        stay where they are and every other window is stacked relative to its
+        neighbour in ``desired``, which gives the minimal number of requests.
+        """
+        wids = [wid for wid in desired if wid in self._order]
+        if len(wids) < 2:
+            return []
+
+        positions = {wid: i for i, wid in enumerate(self._order)}
+        keep = _longest_increasing([positions[wid] for wid in wids])
+        if len(keep) == len(wids):
+            return []
+
+        ops: list[Restack] = []
+        for i, wid in enumerate(wids):
+            if i in keep:
+                continue
+            if i == 0:
+                # Nothing below us to stack on top of, so go below the first
+                # window that is staying where it is.
+                ops.append((wid, wids[min(keep)], False))
+            else:
+                ops.append((wid, wids[i - 1], True))
+        return ops
+
+
+def _longest_increasing(values: Sequence[int]) -> set[int]:
+    """Return the indices of a longest strictly increasing subsequence"""
+    tails: list[int] = []  # values ending the best subsequence of each length
+    tail_indices: list[int] = []
+    previous: list[int] = [-1] * len(values)
+
+    for i, value in enumerate(values):
+        length = bisect_left(tails, value)
+        if length == len(tails):
+            tails.append(value)
+            tail_indices.append(i)
+        else:
+            tails[length] = value
+            tail_indices[length] = i
+        previous[i] = tail_indices[length - 1] if length else -1
+
+    indices = set()
+    i = tail_indices[-1] if tail_indices else -1
+    while i != -1:
+        indices.add(i)
+        i = previous[i]
+    return indices
@@ -463,6 +463,7 @@ class _Window:
         self.window, self.qtile = window, qtile
         self.hidden = False
         self.icons = {}
+        self._click_grabbed = False
         window.set_attribute(eventmask=self._window_mask)
         self._group = None
 
@@ -771,28 +772,35 @@ class _Window:
         self.window.set_attribute(eventmask=self._window_mask)
 
     def _grab_click(self):
-        # Grab buttons 1 - 3  to focus upon click when unfocussed
-        for amask in self.qtile.core._auto_modmasks():
-            for i in range(1, 4):
-                self.qtile.core.conn.conn.core.GrabButton(
-                    True,
-                    self.window.wid,
-                    EventMask.ButtonPress,
-                    xcffib.xproto.GrabMode.Sync,
-                    xcffib.xproto.GrabMode.Async,
-                    xcffib.xproto.Atom._None,
-                    xcffib.xproto.Atom._None,
-                    i,
-                    amask,
-                )
+        # Grab buttons 1 - 3  to focus upon click when unfocussed. Clicks with
+        # modifiers bound in the config are still caught by the grabs on the
+        # root window, as those take precedence over grabs on its children.
+        if self._click_grabbed:
+            return
+        for i in range(1, 4):
+            self.qtile.core.conn.conn.core.GrabButton(
+                True,
+                self.window.wid,
+                EventMask.ButtonPress,
+                xcffib.xproto.GrabMode.Sync,
+                xcffib.xproto.GrabMode.Async,
+                xcffib.xproto.Atom._None,
+                xcffib.xproto.Atom._None,
+                i,
+                xcffib.xproto.ModMask.Any,
+            )
+        self._click_grabbed = True
 
     def _ungrab_click(self):
         # Ungrab buttons 1 - 3 when focussed
+        if not self._click_grabbed:
+            return
         self.qtile.core.conn.conn.core.UngrabButton(
             xcffib.xproto.Atom.Any,
             self.window.wid,
             xcffib.xproto.ModMask.Any,
         )
+        self._click_grabbed = False
 
     def get_pid(self):
         return self.window.get_net_wm_pid()
@@ -935,13 +943,7 @@ class _Window:
         _type = self.window.get_wm_type() or ""
 
         # Check if this window is focused
-        active_window = self.qtile.core._root.get_property(
-            "_NET_ACTIVE_WINDOW", "WINDOW", unpack=int
-        )
-        if active_window and active_window[0] == self.window.wid:
-            focus = True
-        else:
-            focus = False
+        focus = self.qtile.core.active_window == self.window.wid
 
         desktop = _type == "desktop"
         below = "_NET_WM_STATE_BELOW" in state
@@ -1002,9 +1004,10 @@ class _Window:
         moved = (self.previous_layer > layering) - (layering > self.previous_layer)
         self.previous_layer = layering
 
-        stack = list(self.qtile.core._root.query_tree())
+        stack = self.qtile.core.stacking
         if self.wid not in stack or len(stack) < 2:
             return
+        positions = {wid: i for i, wid in enumerate(stack)}
 
         # Get all windows for the group and add Static windows to ensure these are included
         # in the stacking
@@ -1031,10 +1034,10 @@ class _Window:
         )
 
         # Remove any windows that aren't in the server's stack
-        windows = list(filter(lambda w: w[0].wid in stack, windows))
+        windows = list(filter(lambda w: w[0].wid in positions, windows))
 
-        # Sort this list to match stacking order reported by server
-        windows.sort(key=lambda w: stack.index(w[0].wid))
+        # Sort this list to match the server's stacking order
+        windows.sort(key=lambda w: positions[w[0].wid])
 
         # Get lists of windows on lower, higher or same "layer" as window
         lower = [w[0].wid for w in windows if w[2] > layering]
@@ -1055,7 +1058,7 @@ class _Window:
                     for k, v in self.qtile.windows_map.items()
                     if v.window.get_wm_transient_for() == parent
                 )
-                window_group.sort(key=stack.index)
+                window_group.sort(key=positions.__getitem__)
 
                 # Make sure we're above the last window in that group
                 sibling = window_group[-1]
@@ -1141,8 +1144,6 @@ class _Window:
         # stacked incorrectly and, if so, restack them. However, we don't need to configure stacking for this
         # window
         if sibling == self.wid:
-            index = stack.index(self.wid)
-
             # We need to make sure the bars are included so add them now
             if group_bars:
                 for group_bar in group_bars:
@@ -1153,37 +1154,24 @@ class _Window:
                         higher.append(group_bar.window.wid)
 
                 # Sort the list to match the server's stacking order
-                lower.sort(key=lambda wid: stack.index(wid))
-                higher.sort(key=lambda wid: stack.index(wid))
-
-            for wid in [w for w in lower if stack.index(w) > index]:
-                self.qtile.windows_map[wid].window.configure(
-                    stackmode=xcffib.xproto.StackMode.Below, sibling=same[0]
-                )
-
-            # We reverse higher as each window will be placed above the last item in the current layer
-            # this means the last item we stack will be just above the current layer.
-            for wid in [w for w in higher[::-1] if stack.index(w) < index]:
-                self.qtile.windows_map[wid].window.configure(
-                    stackmode=xcffib.xproto.StackMode.Above, sibling=same[-1]
-                )
+                lower.sort(key=positions.__getitem__)
+                higher.sort(key=positions.__getitem__)
 
+            # Only the windows that are on the wrong side of the current layer get moved
+            self.qtile.core.restack_windows(lower + same + higher)
             return
 
         # Window needs new stacking info. We tell the server to stack the window
         # above or below a given "sibling"
-        self.window.configure(
-            stackmode=xcffib.xproto.StackMode.Above if above else xcffib.xproto.StackMode.Below,
-            sibling=sibling,
-        )
+        self.qtile.core.restack(self.window, sibling, above)
 
         # Move window's children if we were moved upwards
         if above:
-            self.raise_children(stack=stack)
+            self.raise_children()
 
         self.qtile.core.update_client_lists()
 
-    def raise_children(self, stack=None):
+    def raise_children(self):
         """Ensure any transient windows are moved up with the parent."""
         children = [
             k
@@ -1191,15 +1179,11 @@ class _Window:
             if v.window.get_wm_transient_for() == self.window.wid
         ]
         if children:
-            if stack is None:
-                stack = list(self.qtile.core._root.query_tree())
-            parent = self.window.wid
-            children.sort(key=stack.index)
-            for child in children:
-                self.qtile.windows_map[child].window.configure(
-                    stackmode=xcffib.xproto.StackMode.Above, sibling=parent
-                )
-                parent = child
+            stack = self.qtile.core.stacking
+            positions = {wid: i for i, wid in enumerate(stack)}
+            children = [wid for wid in children if wid in positions]
+            children.sort(key=positions.__getitem__)
+            self.qtile.core.restack_windows([self.window.wid, *children])
 
     def paint_borders(self, color, width):
         self.borderwidth = width
@@ -1297,10 +1281,12 @@ class _Window:
         if warp and self.qtile.config.cursor_warp:
             self.window.warp_pointer(self.width // 2, self.height // 2)
 
-        # update net wm state
-        state = list(self.window.get_property("_NET_WM_STATE", "ATOM", unpack=int))
+        # update net wm state, only writing it if it actually changes
+        prev_state = list(self.window.get_property("_NET_WM_STATE", "ATOM", unpack=int))
+        state = prev_state.copy()
         state_focused = self.qtile.core.conn.atoms["_NET_WM_STATE_FOCUSED"]
-        state.append(state_focused)
+        if state_focused not in state:
+            state.append(state_focused)
 
         if self.urgent:
             self.urgent = False
@@ -1309,20 +1295,21 @@ class _Window:
             if atom in state:
                 state.remove(atom)
 
-        self.window.set_property("_NET_WM_STATE", state)
+        if state != prev_state:
+            self.window.set_property("_NET_WM_STATE", state)
 
         # re-grab button events on the previously focussed window,
         # but only un-grab them on focus by click
-        old = self.qtile.core._root.get_property("_NET_ACTIVE_WINDOW", "WINDOW", unpack=int)
-        if old and old[0] in self.qtile.windows_map:
-            old_win = self.qtile.windows_map[old[0]]
+        old = self.qtile.core.active_window
+        if old != self.window.wid and old in self.qtile.windows_map:
+            old_win = self.qtile.windows_map[old]
             if not isinstance(old_win, base.Internal):
                 old_win._grab_click()
                 state = list(old_win.window.get_property("_NET_WM_STATE", "ATOM", unpack=int))
                 if state_focused in state:
                     state.remove(state_focused)
                     old_win.window.set_property("_NET_WM_STATE", state)
-        self.qtile.core._root.set_property("_NET_ACTIVE_WINDOW", self.window.wid)
+        self.qtile.core.set_active_window(self.window.wid)
 
         # Check if we need to restack a previously focused fullscreen window
         self.qtile.core.check_stacking(self)
@@ -1486,7 +1473,7 @@ class _Window:
     @expose_command()
     def bring_to_front(self):
         if self.get_wm_type() != "desktop":
-            self.window.configure(stackmode=xcffib.xproto.StackMode.Above)
+            self.qtile.core.restack(self.window)
             self.raise_children()
             self.qtile.core.update_client_lists()
 
@@ -1713,7 +1700,7 @@ class Window(_Window, base.Window):
 
     @floating.setter
     def floating(self, do_float):
-        stack = self.qtile.core._root.query_tree()
+        stack = self.qtile.core.stacking
         tiled = [win.window.wid for win in (self.group.tiled_windows if self.group else [])]
         tiled_stack = [wid for wid in stack if wid in tiled and wid != self.window.wid]
         if do_float and self._float_state == FloatStates.NOT_FLOATING:
@@ -1728,12 +1715,9 @@ class Window(_Window, base.Window):
 
                 # Make sure floating window is placed above tiled windows
                 if tiled_stack and (not self.kept_above or self.qtile.config.floats_kept_above):
-                    stack_list = list(stack)
                     highest_tile = tiled_stack[-1]
-                    if stack_list.index(self.window.wid) < stack_list.index(highest_tile):
-                        self.window.configure(
-                            stackmode=xcffib.xproto.StackMode.Above, sibling=highest_tile
-                        )
+                    if stack.index(self.window.wid) < stack.index(highest_tile):
+                        self.qtile.core.restack(self.window, highest_tile)
             else:
                 # if we are setting floating early, e.g. from a hook, we don't have a screen yet
                 self._float_state = FloatStates.FLOATING
@@ -1751,9 +1735,7 @@ class Window(_Window, base.Window):
             if self.kept_above and self.qtile.config.floats_kept_above:
                 self.keep_above(enable=False)
             if tiled_stack:
-                self.window.configure(
-                    stackmode=xcffib.xproto.StackMode.Above, sibling=tiled_stack[-1]
-                )
+                self.qtile.core.restack(self.window, tiled_stack[-1])
             hook.fire("float_change")
 
     @property
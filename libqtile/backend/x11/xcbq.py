@@ -16,6 +16,7 @@ import xcffib
 import xcffib.randr
 import xcffib.screensaver
 import xcffib.xinerama
+import xcffib.xkb
 import xcffib.xproto
 from xcffib.xfixes import SelectionEventMask
 from xcffib.xproto import CW, EventMask, WindowClass
@@ -48,6 +49,8 @@ AllButtonsMask = 0b11111 << 8
 ButtonMotionMask = 1 << 13
 ButtonReleaseMask = 1 << 3
 PointerMotionHintMask = 1 << 7
+# The keyboard group, which clients using XKB get in the state of core events
+XkbGroupMask = 0b11 << 13
 
 NormalHintsFlags = {
     "USPosition": 1,  # User-specified x, y
@@ -498,11 +501,131 @@ class XFixes:
         self.conn.xfixes.ext.SelectSelectionInput(window.wid, _selection, self.selection_mask)
 
 
+# Symbols files that xkeyboard-config uses for options rather than layouts, which
+# appear in the keymap's symbols name alongside the layouts
+XkbOptionSymbols = {
+    "altwin",
+    "capslock",
+    "compose",
+    "ctrl",
+    "eurosign",
+    "group",
+    "inet",
+    "keypad",
+    "kpdl",
+    "level3",
+    "level5",
+    "lv3",
+    "nbsp",
+    "parens",
+    "pc",
+    "rupeesign",
+    "shift",
+    "srvr_ctrl",
+    "terminate",
+    "typo",
+}
+
+
+class Xkb:
+    """
+    The keyboard's layouts and which one is in use. With the extension, the layouts
+    of a keymap are groups that can be switched between in-protocol, without
+    loading a new keymap, and the server tells us when the group changes.
+    """
+
+    # The xkbType of the events that we select, which xcffib reports as
+    # NewKeyboardNotifyEvents
+    NEW_KEYBOARD_NOTIFY = 0
+    STATE_NOTIFY = 2
+    NAMES_NOTIFY = 6
+
+    # The most groups a keymap can have
+    MAX_GROUPS = 4
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.ext = conn.conn(xcffib.xkb.key)
+        self.ext.UseExtension(1, 0).reply()
+        self._layouts: list[str] | None = None
+
+    def select_events(self) -> None:
+        """Be told when the group or keymap changes"""
+        events = (
+            xcffib.xkb.EventType.NewKeyboardNotify
+            | xcffib.xkb.EventType.StateNotify
+            | xcffib.xkb.EventType.NamesNotify
+        )
+        keyboard = xcffib.xkb.NKNDetail.Keycodes | xcffib.xkb.NKNDetail.DeviceID
+        state = xcffib.xkb.StatePart.GroupState
+        names = xcffib.xkb.NameDetail.Symbols | xcffib.xkb.NameDetail.GroupNames
+        self.ext.SelectEvents(
+            xcffib.xkb.ID.UseCoreKbd,
+            events,
+            0,
+            0,
+            0,
+            0,
+            [keyboard, keyboard, state, state, names, names],
+        )
+
+    @staticmethod
+    def parse_symbols(symbols: str) -> list[str]:
+        """
+        Get the layouts of each group from a keymap's symbols name, e.g.
+        "pc+us+us(dvorak):2+inet(evdev)" has the layouts "us" and "us dvorak"
+        """
+        layouts: dict[int, str] = {}
+        for part in symbols.split("+"):
+            name, _, group = part.partition(":")
+            layout, _, variant = name.rstrip(")").partition("(")
+            if not layout or layout in XkbOptionSymbols:
+                continue
+            index = int(group) - 1 if group.isdigit() else 0
+            if index in layouts:
+                continue
+            layouts[index] = f"{layout} {variant}" if variant else layout
+        return [layouts.get(i, "") for i in range(max(layouts, default=-1) + 1)]
+
+    def refresh_layouts(self) -> None:
+        """Forget the layouts, after the keymap has changed"""
+        self._layouts = None
+
+    @property
+    def layouts(self) -> list[str]:
+        """The layout of each group"""
+        if self._layouts is None:
+            reply = self.ext.GetNames(
+                xcffib.xkb.ID.UseCoreKbd, xcffib.xkb.NameDetail.Symbols
+            ).reply()
+            symbols = self.conn.atoms.get_name(reply.symbolsName) if reply.symbolsName else ""
+            self._layouts = self.parse_symbols(symbols)
+        return self._layouts
+
+    def get_group(self) -> int:
+        return self.ext.GetState(xcffib.xkb.ID.UseCoreKbd).reply().group
+
+    def get_layout(self) -> str:
+        """The layout in use, e.g. "us dvorak", or "" if it isn't known"""
+        group = self.get_group()
+        layouts = self.layouts
+        return layouts[group] if group < len(layouts) else ""
+
+    def lock_group(self, group: int) -> None:
+        """Switch to the group"""
+        self.ext.LatchLockState(xcffib.xkb.ID.UseCoreKbd, 0, 0, True, group, 0, False, 0)
+        self.conn.flush()
+
+
 class Connection:
+    # Only set if the X server has the extension
+    xkeyboard: Xkb
+
     _extmap = {
         "xinerama": Xinerama,
         "randr": RandR,
         "xfixes": XFixes,
+        "xkeyboard": Xkb,
         "mit-screen-saver": ScreenSaver,
     }
 
@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import asyncio
 import typing
 from collections import defaultdict
 from typing import Any
@@ -159,6 +158,14 @@ class Bar(Gap, configurable.Configurable, CommandObject):
             True,
             "Reserve screen space (when set to 'False', bar will be drawn above windows).",
         ),
+        (
+            "threaded_rendering",
+            False,
+            "Render widgets to images on worker threads, so that the main thread only "
+            "needs to copy the images to the bar. This keeps slow widget drawing from "
+            "delaying input. Widgets with mirrors, mirrors and the systray are still "
+            "rendered on the main thread.",
+        ),
     ]
 
     def __init__(self, widgets: list[_Widget], size: int, **config: Any) -> None:
@@ -173,7 +180,13 @@ class Bar(Gap, configurable.Configurable, CommandObject):
         self.drawer: Drawer
         self._configured = False
         self._draw_queued = False
-        self.future: asyncio.Handle | None = None
+
+        # Widgets that need to be redrawn on the next draw, unless the whole bar is
+        # redrawn, and the geometry of every widget when it was last drawn so that
+        # widgets that have only moved can be copied rather than redrawn.
+        self._redraw_all = True
+        self._dirty_widgets: set[_Widget] = set()
+        self._drawn_geometry: dict[_Widget, tuple[int, int, int, int]] = {}
 
         # The part of the margins that was reserved by clients
         self._reserved_space: list[int] = [0, 0, 0, 0]  # [N, E, S, W]
@@ -343,6 +356,8 @@ class Bar(Gap, configurable.Configurable, CommandObject):
 
         try:
             widget._configure(self.qtile, self)
+            if self.threaded_rendering and widget.render_in_thread:
+                widget.drawer.rasterizer = self.qtile.renderer.rasterizer
 
             if self.horizontal:
                 widget.offsety = self.border_width[0]
@@ -400,8 +415,9 @@ class Bar(Gap, configurable.Configurable, CommandObject):
         return None
 
     def finalize(self) -> None:
-        if self.future:
-            self.future.cancel()
+        if self._draw_queued and self.qtile is not None:
+            self.qtile.cancel_draw(self)
+            self._draw_queued = False
         for widget in self.widgets:
             if not widget.finalized:
                 widget.finalize()
@@ -627,7 +643,13 @@ class Bar(Gap, configurable.Configurable, CommandObject):
         self._saved_focus = None
         self._has_keyboard = None
 
-    def draw(self) -> None:
+    def draw(self, widget: _Widget | None = None) -> None:
+        """Redraw the bar
+
+        If a widget is given, then only that widget has changed (e.g. it has changed
+        its length). The other widgets are then only redrawn if their length has
+        changed too, and are otherwise copied to their new position.
+        """
         assert self.qtile is not None
 
         if not hasattr(self, "drawer"):
@@ -635,19 +657,27 @@ class Bar(Gap, configurable.Configurable, CommandObject):
             return
         if not self.widgets:
             return  # calling self._actual_draw in this case would cause a NameError.
+        if widget is None:
+            self._redraw_all = True
+        else:
+            self._dirty_widgets.add(widget)
         if not self._draw_queued:
-            # Delay actually drawing the bar until the event loop is idle, and only once
-            # even if this method is called multiple times during the same task.
-            self.future = self.qtile.call_soon(self._actual_draw)
+            # Delay actually drawing the bar until the next frame, and only once even if
+            # this method is called multiple times before then.
+            self.qtile.schedule_draw(self, self._actual_draw)
             self._draw_queued = True
 
     def _actual_draw(self) -> None:
+        assert self.qtile is not None
         self._draw_queued = False
         if not hasattr(self, "drawer"):
             return
+        redraw_all, self._redraw_all = self._redraw_all, False
+        dirty, self._dirty_widgets = self._dirty_widgets, set()
+
         self._resize(self.length, self.widgets)
-        # We draw the border before the widgets
-        if any(self.border_width):
+        # We draw the border before the widgets. It doesn't change when widgets do.
+        if redraw_all and any(self.border_width):
             # The border is drawn "outside" of the bar (i.e. not in the space that the
             # widgets occupy) so we need to add the additional space
             width = self.width + self.border_width[1] + self.border_width[3]
@@ -693,12 +723,44 @@ class Bar(Gap, configurable.Configurable, CommandObject):
                     src_y=src_y,
                 )
 
+        # Widgets that have only moved are copied from what they last drew, which
+        # needs to happen before anything is drawn over where they were.
+        drawn_geometry = {}
+        to_draw = []
+        moves = []
         for i in self.widgets:
             # Widgets are finalized before bars so a queued draw can run while
             # the bar is alive but its widgets are already dead
             if i.finalized:
                 continue
+            geometry = (i.offsetx, i.offsety, i.width, i.height)
+            drawn_geometry[i] = geometry
+            previous = self._drawn_geometry.get(i)
+            if redraw_all or i in dirty or previous is None or previous[2:] != geometry[2:]:
+                to_draw.append(i)
+            elif previous != geometry:
+                if i.redraw_on_move:
+                    to_draw.append(i)
+                else:
+                    moves.append((i, previous))
+        self._drawn_geometry = drawn_geometry
+
+        # Widgets moving towards the start of the bar are copied first, starting from
+        # the start, and then those moving towards the end, starting from the end, so
+        # that no widget is copied over another one that still needs to be copied.
+        axis = 0 if self.horizontal else 1
+        backwards = [(i, prev) for i, prev in moves if drawn_geometry[i][axis] < prev[axis]]
+        forwards = [(i, prev) for i, prev in moves if drawn_geometry[i][axis] > prev[axis]]
+        for i, (x, y, width, height) in backwards + forwards[::-1]:
+            # What a widget last drew isn't there to copy until it has been rendered
+            if i.drawer.rendering or not i.drawer.move(x, y, i.offsetx, i.offsety, width, height):
+                to_draw.append(i)
+
+        for i in to_draw:
+            # This draw covers any redraw that the widget has requested itself
+            self.qtile.cancel_draw(i)
             try:
+                i.fit_drawer()
                 i.draw()
             except Exception:
                 logger.exception("Widget failed to draw")
@@ -712,12 +774,13 @@ class Bar(Gap, configurable.Configurable, CommandObject):
 
         # Widgets are offset by the top/left border but this is not included in self.length
         # so we adjust the end of the bar area for this offset
+        last = self.widgets[-1]
         if self.horizontal:
             bar_end = self.length + self.border_width[3]
-            widget_end = i.offsetx + i.length
+            widget_end = last.offsetx + last.length
         else:
             bar_end = self.length + self.border_width[0]
-            widget_end = i.offsety + i.length
+            widget_end = last.offsety + last.length
 
         if widget_end < bar_end:
             # Defines a rectangle for the area enclosed by the bar's borders and the end of the
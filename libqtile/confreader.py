@@ -47,6 +47,8 @@ class Config:
     floats_kept_above: bool
     reconfigure_screens: bool
     screen_change_debounce_timeout: int | float
+    max_fps: int | float
+    image_cache_size: int | float
     wmname: str
     auto_minimize: bool
     # Really we'd want to check this Any is libqtile.backend.wayland.ImportConfig, but
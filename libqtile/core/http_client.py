@@ -0,0 +1,369 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from typing import TYPE_CHECKING
+
+from libqtile.log_utils import logger
+from libqtile.utils import LRUCache, get_cache_dir
+
+if TYPE_CHECKING:
+    from typing import Any
+
+# The response headers that are kept, and cached with the body
+KEPT_HEADERS = ("Cache-Control", "Content-Type", "ETag", "Last-Modified")
+
+# How often the responses cached on disk are pruned, in seconds
+PRUNE_INTERVAL = 3600
+
+
+class Response:
+    """A response to a request, which may have come from the cache"""
+
+    def __init__(
+        self, status: int, body: bytes, headers: dict[str, str], fetched: float, cached: bool
+    ) -> None:
+        self.status = status
+        self.body = body
+        self.headers = headers
+        # When the response was fetched or last revalidated, as a timestamp
+        self.fetched = fetched
+        # Whether the response came from the cache, without being fetched again
+        self.cached = cached
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched
+
+    @property
+    def text(self) -> str:
+        charset = "utf-8"
+        for param in self.headers.get("Content-Type", "").split(";")[1:]:
+            name, _, value = param.strip().partition("=")
+            if name.lower() == "charset" and value:
+                charset = value.strip('"')
+        try:
+            return self.body.decode(charset, errors="replace")
+        except LookupError:
+            return self.body.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return json.loads(self.text)
+
+
+class HttpClient:
+    """
+    Fetches URLs for the widgets that poll web services
+
+    Connections are kept open and reused between requests, up to
+    ``max_connections`` of them at once. Responses to GET requests are cached in
+    memory and on disk, so that they are still used after a restart: a widget says
+    for how long a response can be used before it is fetched again, and once that
+    is up it is revalidated with the server, if the server gave it an ETag or
+    Last-Modified date. Widgets that fetch a URL that is already being fetched get
+    that response rather than fetching it again.
+
+    Files are only read and written on a worker thread. The cache on disk is kept
+    to ``max_cache_bytes``, dropping the responses that were used longest ago, and
+    responses that haven't been used for ``max_cache_age`` seconds are dropped.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 8,
+        timeout: float = 30,
+        cache_dir: str | None = None,
+        max_cache_bytes: int = 16 * 1024 * 1024,
+        max_cache_age: float = 30 * 24 * 3600,
+    ) -> None:
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.max_cache_bytes = max_cache_bytes
+        self.max_cache_age = max_cache_age
+        self._cache_dir = cache_dir
+        # When the cache on disk was last pruned, from time.monotonic()
+        self._pruned: float | None = None
+        self._cache: LRUCache[str, Response] = LRUCache(64, name="http")
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._session: Any = None
+        self._session_loop: asyncio.AbstractEventLoop | None = None
+
+        self.requests = 0
+        self.fetched = 0
+        self.cached = 0
+        self.revalidated = 0
+        self.coalesced = 0
+        self.stale = 0
+        self.errors = 0
+
+    @property
+    def cache_dir(self) -> str:
+        if self._cache_dir is None:
+            self._cache_dir = os.path.join(get_cache_dir(), "http")
+        # The responses may be private, so only the user can read them
+        os.makedirs(self._cache_dir, mode=0o700, exist_ok=True)
+        return self._cache_dir
+
+    @staticmethod
+    def _key(url: str, headers: dict[str, str] | None) -> str:
+        request = json.dumps([url, sorted((headers or {}).items())])
+        return hashlib.sha256(request.encode()).hexdigest()
+
+    async def _get_session(self) -> Any:
+        import aiohttp
+
+        loop = asyncio.get_running_loop()
+        if self._session is not None and self._session_loop is not loop:
+            await self._drop_session()
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+            self._session_loop = loop
+        return self._session
+
+    async def _drop_session(self) -> None:
+        """Let go of the session made on another event loop, closing its connections"""
+        session, loop = self._session, self._session_loop
+        self._session = None
+        self._session_loop = None
+        if session is None or session.closed:
+            return
+        if loop is not None and loop.is_running():
+            # Its loop is running on another thread, and can close it
+            asyncio.run_coroutine_threadsafe(session.close(), loop)
+            return
+        connector = session.connector
+        session.detach()
+        if connector is None:
+            return
+        if loop is None or loop.is_closed():
+            # Its connections went with its loop, so there is nothing to wait for
+            await connector.close()
+        else:
+            # The connections are closed now, and waited for when its loop runs again
+            loop.call_soon(asyncio.ensure_future, connector.close())
+
+    def _load(self, key: str) -> Response | None:
+        # Runs on a worker thread
+        path = os.path.join(self.cache_dir, key)
+        try:
+            with open(path + ".json") as f:
+                meta = json.load(f)
+            with open(path, "rb") as f:
+                body = f.read()
+            # Keep the files that are used, when pruning
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        try:
+            return Response(meta["status"], body, meta["headers"], meta["fetched"], True)
+        except (KeyError, TypeError):
+            return None
+
+    @staticmethod
+    def _write(path: str, data: bytes) -> None:
+        # Write the file whole, so that a crash can't leave half of one
+        fd = os.open(path + ".tmp", os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_CLOEXEC, 0o600)
+        with open(fd, "wb") as f:
+            os.fchmod(fd, 0o600)
+            f.write(data)
+        os.replace(path + ".tmp", path)
+
+    def _save(self, key: str, response: Response) -> None:
+        # Runs on a worker thread
+        path = os.path.join(self.cache_dir, key)
+        meta = dict(status=response.status, headers=response.headers, fetched=response.fetched)
+        try:
+            self._write(path, response.body)
+            self._write(path + ".json", json.dumps(meta).encode())
+        except OSError:
+            logger.exception("Could not cache the response")
+
+        now = time.monotonic()
+        if self._pruned is None or now - self._pruned > PRUNE_INTERVAL:
+            self._pruned = now
+            self._prune()
+
+    def _prune(self) -> None:
+        """
+        Remove the cached responses that haven't been used for max_cache_age seconds,
+        and then those used longest ago until the cache fits in max_cache_bytes
+        """
+        # The size of each response's files, and when it was last used
+        entries: dict[str, list[float]] = {}
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    stat = entry.stat(follow_symlinks=False)
+                    key = entry.name.split(".")[0]
+                    size, used = entries.setdefault(key, [0, 0])
+                    entries[key] = [size + stat.st_size, max(used, stat.st_mtime)]
+        except OSError:
+            logger.exception("Could not prune the cached responses")
+            return
+
+        total = sum(size for size, _ in entries.values())
+        oldest = time.time() - self.max_cache_age
+        for key, (size, used) in sorted(entries.items(), key=lambda item: item[1][1]):
+            if used >= oldest and total <= self.max_cache_bytes:
+                break
+            path = os.path.join(self.cache_dir, key)
+            for name in (path, path + ".json", path + ".tmp", path + ".json.tmp"):
+                try:
+                    os.remove(name)
+                except FileNotFoundError:
+                    pass
+                except OSError:
+                    logger.exception("Could not remove the cached response %s", name)
+            total -= size
+
+    async def _lookup(self, key: str, persist: bool) -> Response | None:
+        response = self._cache.get(key)
+        if response is None and persist:
+            loop = asyncio.get_running_loop()
+            response = await loop.run_in_executor(None, self._load, key)
+            if response is not None:
+                self._cache[key] = response
+        return response
+
+    async def _store(self, key: str, response: Response, persist: bool) -> None:
+        if "no-store" in response.headers.get("Cache-Control", ""):
+            return
+        self._cache[key] = response
+        if persist:
+            await asyncio.get_running_loop().run_in_executor(None, self._save, key, response)
+
+    async def fetch(
+        self,
+        url: str,
+        *,
+        method: str = "GET",
+        data: bytes | str | None = None,
+        headers: dict[str, str] | None = None,
+        ttl: float = 0,
+        persist: bool = True,
+    ) -> Response:
+        """
+        Fetch a URL. A GET response that was fetched less than ``ttl`` seconds ago is
+        used again without asking the server. Unless ``persist`` is False, responses
+        are also cached on disk. Other requests, like POSTs, aren't cached.
+        """
+        self.requests += 1
+        if method != "GET" or data is not None:
+            return await self._request(method, url, data, headers)
+
+        key = self._key(url, headers)
+        cached = await self._lookup(key, persist)
+        if cached is not None and cached.age < ttl:
+            self.cached += 1
+            return cached
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            return await asyncio.shield(inflight)
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            response = await self._revalidate(key, url, headers, cached, persist)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Don't warn that nothing else waited for it
+            future.exception()
+            raise
+        else:
+            future.set_result(response)
+            return response
+        finally:
+            del self._inflight[key]
+
+    async def _revalidate(
+        self,
+        key: str,
+        url: str,
+        headers: dict[str, str] | None,
+        cached: Response | None,
+        persist: bool,
+    ) -> Response:
+        import aiohttp
+
+        headers = dict(headers or {})
+        if cached is not None:
+            if "ETag" in cached.headers:
+                headers["If-None-Match"] = cached.headers["ETag"]
+            if "Last-Modified" in cached.headers:
+                headers["If-Modified-Since"] = cached.headers["Last-Modified"]
+
+        try:
+            response = await self._request("GET", url, None, headers)
+        except (aiohttp.ClientError, TimeoutError):
+            if cached is None:
+                raise
+            # Better out of date than nothing
+            self.stale += 1
+            logger.warning("Could not fetch %s, using a response from %ds ago", url, cached.age)
+            return cached
+
+        if response.status == 304 and cached is not None:
+            self.revalidated += 1
+            response = Response(
+                cached.status,
+                cached.body,
+                {**cached.headers, **response.headers},
+                response.fetched,
+                True,
+            )
+            await self._store(key, response, persist)
+        elif response.status == 200:
+            await self._store(key, response, persist)
+        return response
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        data: bytes | str | None,
+        headers: dict[str, str] | None,
+    ) -> Response:
+        session = await self._get_session()
+        try:
+            async with session.request(method, url, data=data, headers=headers) as r:
+                body = await r.read()
+        except Exception:
+            self.errors += 1
+            raise
+        self.fetched += 1
+        kept = {name: r.headers[name] for name in KEPT_HEADERS if name in r.headers}
+        return Response(r.status, body, kept, time.time(), False)
+
+    async def close(self) -> None:
+        """Close the connections that are kept open"""
+        if self._session_loop is not asyncio.get_running_loop():
+            await self._drop_session()
+            return
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._session_loop = None
+
+    def info(self) -> dict[str, int]:
+        return dict(
+            requests=self.requests,
+            fetched=self.fetched,
+            cached=self.cached,
+            revalidated=self.revalidated,
+            coalesced=self.coalesced,
+            stale=self.stale,
+            errors=self.errors,
+        )
+
+
+client = HttpClient()
@@ -20,7 +20,7 @@ from pathlib import Path
 from typing import Any, Literal
 
 import libqtile
-from libqtile import bar, hook, ipc, utils
+from libqtile import bar, hook, images, ipc, utils
 from libqtile.backend import base
 from libqtile.command import interface
 from libqtile.command.base import (
@@ -46,8 +46,12 @@ from libqtile.config import (
 )
 from libqtile.config import ScratchPad as ScratchPadConfig
 from libqtile.confreader import Config
+from libqtile.core.http_client import client as http_client
 from libqtile.core.lifecycle import lifecycle
 from libqtile.core.loop import LoopContext
+from libqtile.core.processes import runner as process_runner
+from libqtile.core.render import RenderScheduler
+from libqtile.core.sampler import Sampler
 from libqtile.core.state import QtileState
 from libqtile.dgroups import DGroups
 from libqtile.extension.base import _Extension
@@ -86,6 +90,8 @@ class Qtile(CommandObject):
     ) -> None:
         self.core: base.Core = kore
         self.config = config
+        self.renderer = RenderScheduler(kore)
+        self.sampler = Sampler(self)
         self.no_spawn = no_spawn
         self._state: QtileState | str | None = state
         self.socket_path = socket_path
@@ -135,6 +141,7 @@ class Qtile(CommandObject):
         self.dgroups = DGroups(self, self.config.groups, self.config.dgroups_key_binder)
 
         _Widget.global_defaults = self.config.widget_defaults
+        images.cache.max_bytes = int(self.config.image_cache_size * 1024 * 1024)
         _Extension.global_defaults = self.config.extension_defaults
 
         for installed_extension in _Extension.installed_extensions:
@@ -153,11 +160,8 @@ class Qtile(CommandObject):
         self._process_screens(reloading=not initial)
 
         # Map and Grab keys
-        for key in self.config.keys:
-            self.grab_key(key)
-
-        for button in self.config.mouse:
-            self.grab_button(button)
+        self._set_keys(self.config.keys)
+        self._set_buttons(self.config.mouse)
 
         if self._state:
             if isinstance(self._state, str):
@@ -230,6 +234,7 @@ class Qtile(CommandObject):
         Finalizes the Qtile instance on exit.
         """
         self._eventloop = asyncio.get_running_loop()
+        process_runner.loop = self._eventloop
         self.core.qtile = self
         self.load_config(initial=True)
         self.core.setup_listener()
@@ -261,6 +266,7 @@ class Qtile(CommandObject):
                 if lifecycle.behavior != lifecycle.behavior.RESTART:
                     await self.graceful_shutdown()
         finally:
+            await http_client.close()
             self.finalize()
             self.core.remove_listener()
 
@@ -341,9 +347,10 @@ class Qtile(CommandObject):
         self._state = QtileState(self, restart=False)
         self._finalize_configurables()
         hook.clear()
-        self.ungrab_keys()
+        # The backend keeps its key and button grabs until the new config's
+        # bindings are set, so that only the ones that changed are regrabbed
+        self.keys_map.clear()
         self.chord_stack.clear()
-        self.core.ungrab_buttons()
         self._mouse_map.clear()
         self.groups_map.clear()
         self.groups.clear()
@@ -378,6 +385,9 @@ class Qtile(CommandObject):
         self._finalize_configurables()
         remove_dbus_rules()
         inhibitor.stop()
+        self.renderer.finalize()
+        self.sampler.finalize()
+        process_runner.finalize()
         self.core.finalize()
 
     def add_autogen_group(self, screen_idx: int) -> _Group:
@@ -571,11 +581,22 @@ class Qtile(CommandObject):
 
         Useful when a keyboard mapping event is received.
         """
-        self.core.ungrab_keys()
-        keys = self.keys_map.copy()
+        self._set_keys(list(self.keys_map.values()))
+
+    def _set_keys(self, keys: Sequence[Key | KeyChord]) -> None:
+        """Grab exactly the given keys, releasing any others
+
+        The backend only changes the grabs that differ from the ones it
+        already holds, so switching between sets of bindings (e.g. when
+        reloading the config or entering a chord) doesn't drop every grab.
+        """
         self.keys_map.clear()
-        for key in keys.values():
-            self.grab_key(key)
+        for key, syms in zip(keys, self.core.update_key_grabs(keys)):
+            if syms in self.keys_map:
+                if self.keys_map[syms] == key:
+                    continue
+                logger.warning("Key spec duplicated, overriding previous: %s", key)
+            self.keys_map[syms] = key
 
     def grab_key(self, key: Key | KeyChord) -> None:
         """Grab the given key event"""
@@ -602,18 +623,16 @@ class Qtile(CommandObject):
         if self.chord_stack:
             hook.fire("enter_chord", chord.name)
 
-        self.ungrab_keys()
-        for key in chord.submappings:
-            self.grab_key(key)
+        self._set_keys(chord.submappings)
 
     @expose_command()
     def ungrab_chord(self) -> None:
         """Leave a chord mode"""
         hook.fire("leave_chord")
 
-        self.ungrab_keys()
         if not self.chord_stack:
             logger.debug("ungrab_chord was called when no chord mode was active")
+            self.ungrab_keys()
             return
         # The first pop is necessary: Otherwise we would be stuck in a mode;
         # we could not leave it: the code below would re-enter the old mode.
@@ -625,26 +644,24 @@ class Qtile(CommandObject):
                 self.grab_chord(chord)
                 break
         else:
-            for key in self.config.keys:
-                self.grab_key(key)
+            self._set_keys(self.config.keys)
 
     @expose_command()
     def ungrab_all_chords(self) -> None:
         """Leave all chord modes and grab the root bindings"""
         hook.fire("leave_chord")
-        self.ungrab_keys()
         self.chord_stack.clear()
-        for key in self.config.keys:
-            self.grab_key(key)
+        self._set_keys(self.config.keys)
 
-    def grab_button(self, button: Mouse) -> None:
-        """Grab the given mouse button event"""
-        try:
-            button.modmask = self.core.grab_button(button)
-        except utils.QtileError:
-            logger.warning("Unknown modifier(s): %s", button.modifiers)
-            return
-        self._mouse_map[button.button_code].append(button)
+    def _set_buttons(self, buttons: Sequence[Mouse]) -> None:
+        """Grab exactly the given mouse buttons, releasing any others"""
+        self._mouse_map.clear()
+        for button, modmask in zip(buttons, self.core.update_button_grabs(buttons)):
+            if modmask is None:
+                logger.warning("Unknown modifier(s): %s", button.modifiers)
+                continue
+            button.modmask = modmask
+            self._mouse_map[button.button_code].append(button)
 
     def update_desktops(self) -> None:
         try:
@@ -1088,6 +1105,15 @@ class Qtile(CommandObject):
 
         return self._eventloop.call_later(delay, f)
 
+    def schedule_draw(self, key: Any, func: Callable[[], None]) -> None:
+        """Call func on the next frame. Scheduling it again with the same key before
+        then replaces it, so that it is only called once."""
+        self.renderer.schedule(key, func)
+
+    def cancel_draw(self, key: Any) -> None:
+        """Cancel a draw scheduled with `schedule_draw`."""
+        self.renderer.cancel(key)
+
     def run_in_executor(self, func: Callable, *args: Any) -> asyncio.Future:
         """A wrapper for running a function in the event loop's default
         executor."""
@@ -1940,6 +1966,35 @@ class Qtile(CommandObject):
         tracemalloc.take_snapshot().dump(malloc_dump)
         return True, malloc_dump
 
+    @expose_command()
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """
+        Get statistics of the work that qtile does, and saves, on behalf of widgets:
+
+        - ``render``: how many redraws were requested, how many frames and redraws
+          were actually rendered, and how many widget draws were rendered on worker
+          threads (see the bars' ``threaded_rendering`` option)
+        - ``caches``: the hits, misses and size of each of qtile's caches, e.g. of
+          shaped text layouts, and how many bytes of the ``image_cache_size`` the
+          decoded images take
+        - ``sampler``: how many reads of system metrics, e.g. of CPU or memory usage,
+          were shared between widgets, and how many samples were given to widgets
+        - ``processes``: how many commands widgets have run, how many of those were
+          cached, failed, timed out or were slow, and the slowest command
+        - ``http``: how many requests widgets have made, and how many of those were
+          fetched, answered from the cache, revalidated with the server, shared with
+          another widget's request or failed
+        """
+        caches: dict[str, Any] = utils.cache_stats()
+        caches["images"] = images.cache.info()
+        return dict(
+            render=self.renderer.info(),
+            caches=caches,
+            sampler=self.sampler.info(),
+            processes=process_runner.info(),
+            http=http_client.info(),
+        )
+
     @expose_command()
     def get_test_data(self) -> Any:
         """
@@ -0,0 +1,359 @@
+from __future__ import annotations
+
+import asyncio
+import subprocess
+import threading
+import time
+from typing import TYPE_CHECKING
+
+from libqtile.log_utils import logger
+from libqtile.utils import ASYNC_PIDS
+
+if TYPE_CHECKING:
+    from typing import Any
+
+    Command = str | list[str]
+
+
+class ProcessRunner:
+    """
+    Runs the commands that widgets get their information from
+
+    Every command is given a timeout, after which it is killed, so that a tool that
+    hangs can't hang the widget, or Qtile if it is run from the event loop. No more
+    than ``max_processes`` commands run at once: the rest wait for a turn. Commands
+    run from worker threads wait for theirs on the event loop, except those given
+    arguments that only ``subprocess.run()`` takes, which have a limit of their own.
+    Results can
+    be cached for a while, so that widgets running the same command at about the same
+    time only run it once. Commands that take longer than ``slow`` seconds are
+    logged.
+    """
+
+    def __init__(
+        self,
+        max_processes: int = 8,
+        timeout: float = 30,
+        slow: float = 2,
+        loop_timeout: float = 2,
+    ) -> None:
+        self.max_processes = max_processes
+        self.timeout = timeout
+        # The timeout of commands run synchronously on an event loop, which is frozen
+        # until they are done
+        self.loop_timeout = loop_timeout
+        self.slow = slow
+        # The loop that commands are run on, set by Qtile when it starts
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self._semaphore_loop: asyncio.AbstractEventLoop | None = None
+        self._cache: dict[tuple, tuple[float, str]] = {}
+        self._inflight: dict[tuple, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        # Limits the commands run straight from worker threads, which can't wait on
+        # the loop's semaphore
+        self._sync_semaphore = threading.BoundedSemaphore(max_processes)
+
+        self.runs = 0
+        self.cached = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.slow_runs = 0
+        self.running = 0
+        self.waiting = 0
+        self.slowest: tuple[float, str] = (0.0, "")
+
+    @staticmethod
+    def _key(command: Command, shell: bool, stderr: bool | None) -> tuple:
+        return (tuple(command) if isinstance(command, list) else command, shell, stderr)
+
+    def _cached(self, key: tuple) -> str | None:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            expires, output = entry
+            if expires < time.monotonic():
+                del self._cache[key]
+                return None
+            self.cached += 1
+            return output
+
+    def _store(self, key: tuple, cache: float, output: str) -> None:
+        with self._lock:
+            now = time.monotonic()
+            # Drop what has expired, so the cache doesn't grow with one-off commands
+            for k in [k for k, (expires, _) in self._cache.items() if expires < now]:
+                del self._cache[k]
+            self._cache[key] = (now + cache, output)
+
+    def _finished(self, command: Command, started: float) -> None:
+        duration = time.monotonic() - started
+        with self._lock:
+            self.runs += 1
+            if duration > self.slowest[0]:
+                self.slowest = (duration, str(command))
+            if duration > self.slow:
+                self.slow_runs += 1
+        if duration > self.slow:
+            logger.warning("%s took %.1fs to run", command, duration)
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_processes)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def run(
+        self,
+        command: Command,
+        shell: bool = False,
+        *,
+        timeout: float | None = None,
+        cache: float = 0,
+        check: bool = True,
+        stderr: bool | None = False,
+    ) -> str:
+        """
+        Run a command, returning its output. If ``check`` is set and the command
+        fails, raises ``subprocess.CalledProcessError``, and if it takes longer than
+        ``timeout`` seconds, it is killed and ``subprocess.TimeoutExpired`` is raised.
+        Output is cached for ``cache`` seconds. If ``stderr`` is set, it is included
+        in the output, and if it is None, it goes to Qtile's stderr.
+        """
+        key = self._key(command, shell, stderr)
+        if cache:
+            output = self._cached(key)
+            if output is not None:
+                return output
+            # Share the run of a command that is already running
+            inflight = self._inflight.get(key)
+            if inflight is not None:
+                with self._lock:
+                    self.cached += 1
+                return await asyncio.shield(inflight)
+            future = asyncio.get_running_loop().create_future()
+            self._inflight[key] = future
+            try:
+                output = await self._run(command, shell, timeout, check, stderr)
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                future.set_exception(e)
+                # Don't warn that nothing else waited for it
+                future.exception()
+                raise
+            else:
+                future.set_result(output)
+                self._store(key, cache, output)
+                return output
+            finally:
+                del self._inflight[key]
+
+        return await self._run(command, shell, timeout, check, stderr)
+
+    async def _run(
+        self,
+        command: Command,
+        shell: bool,
+        timeout: float | None,
+        check: bool,
+        stderr: bool | None,
+    ) -> str:
+        if timeout is None:
+            timeout = self.timeout
+        semaphore = self._get_semaphore()
+        with self._lock:
+            self.waiting += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            with self._lock:
+                self.waiting -= 1
+
+        with self._lock:
+            self.running += 1
+        started = time.monotonic()
+        try:
+            stdout = asyncio.subprocess.PIPE
+            stderr_to: int | None = None
+            if stderr is True:
+                stderr_to = asyncio.subprocess.STDOUT
+            elif stderr is False:
+                stderr_to = asyncio.subprocess.DEVNULL
+            if shell:
+                if isinstance(command, list):
+                    command = " ".join(command)
+                p = await asyncio.create_subprocess_shell(
+                    command, stdin=asyncio.subprocess.DEVNULL, stdout=stdout, stderr=stderr_to
+                )
+            else:
+                args = [command] if isinstance(command, str) else command
+                p = await asyncio.create_subprocess_exec(
+                    *args, stdin=asyncio.subprocess.DEVNULL, stdout=stdout, stderr=stderr_to
+                )
+
+            if p.pid is not None:
+                ASYNC_PIDS.add(p.pid)
+            try:
+                out, _ = await asyncio.wait_for(p.communicate(), timeout)
+            except (TimeoutError, asyncio.CancelledError) as e:
+                if p.returncode is None:
+                    p.kill()
+                    await p.wait()
+                if isinstance(e, TimeoutError):
+                    with self._lock:
+                        self.timeouts += 1
+                    logger.warning("%s timed out after %ss and was killed", command, timeout)
+                    raise subprocess.TimeoutExpired(command, timeout) from None
+                raise
+            finally:
+                if p.pid is not None:
+                    ASYNC_PIDS.discard(p.pid)
+        except OSError:
+            with self._lock:
+                self.failures += 1
+            raise
+        finally:
+            with self._lock:
+                self.running -= 1
+            semaphore.release()
+            self._finished(command, started)
+
+        output = out.decode("utf-8", errors="replace")
+        if check and p.returncode:
+            with self._lock:
+                self.failures += 1
+            raise subprocess.CalledProcessError(p.returncode, command, output)
+        return output
+
+    def run_sync(
+        self,
+        command: Command,
+        shell: bool = False,
+        *,
+        timeout: float | None = None,
+        cache: float = 0,
+        check: bool = True,
+        stderr: Any = False,
+        **kwargs: Any,
+    ) -> str:
+        """
+        Like ``run()``, for code that can't await, like ``poll()`` methods that run on
+        worker threads. Other keyword arguments, e.g. ``cwd`` or ``env``, are passed to
+        ``subprocess.run()``, and ``stderr`` can also be given as for
+        ``subprocess.run()``. Commands given such arguments aren't cached.
+
+        On an event loop this blocks the loop, freezing the desktop, until the command
+        is done, so there ``run()`` should be used instead. If it is used anyway, the
+        command is killed after ``loop_timeout`` seconds unless it is given a
+        ``timeout``, and ``subprocess.TimeoutExpired`` is raised if it can't start
+        within that time because ``max_processes`` commands are already running.
+        """
+        try:
+            running: asyncio.AbstractEventLoop | None = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        loop = self.loop
+        # Other values of stderr, e.g. a file, can only be given to subprocess.run()
+        direct = bool(kwargs) or not (stderr is None or isinstance(stderr, bool))
+        if running is None and not direct:
+            if loop is not None and loop.is_running():
+                future = asyncio.run_coroutine_threadsafe(
+                    self.run(
+                        command, shell, timeout=timeout, cache=cache, check=check, stderr=stderr
+                    ),
+                    loop,
+                )
+                return future.result()
+
+        if direct:
+            cache = 0
+        key = self._key(command, shell, stderr)
+        if cache:
+            output = self._cached(key)
+            if output is not None:
+                return output
+
+        if timeout is None:
+            timeout = self.timeout if running is None else self.loop_timeout
+        if stderr is True:
+            stderr = subprocess.STDOUT
+        elif stderr is False:
+            stderr = subprocess.DEVNULL
+        if "input" not in kwargs:
+            kwargs.setdefault("stdin", subprocess.DEVNULL)
+        kwargs.setdefault("encoding", "utf-8")
+        kwargs.setdefault("errors", "replace")
+
+        with self._lock:
+            self.waiting += 1
+        try:
+            # Don't freeze the loop waiting for a turn any longer than for the command
+            acquired = self._sync_semaphore.acquire(
+                timeout=self.loop_timeout if running is not None else None
+            )
+        finally:
+            with self._lock:
+                self.waiting -= 1
+        if not acquired:
+            with self._lock:
+                self.timeouts += 1
+            logger.warning("%s couldn't start within %ss", command, self.loop_timeout)
+            raise subprocess.TimeoutExpired(command, self.loop_timeout)
+
+        started = time.monotonic()
+        with self._lock:
+            self.running += 1
+        try:
+            result = subprocess.run(
+                command,
+                shell=shell,
+                stdout=subprocess.PIPE,
+                stderr=stderr,
+                timeout=timeout,
+                check=check,
+                **kwargs,
+            )
+        except subprocess.TimeoutExpired:
+            with self._lock:
+                self.timeouts += 1
+            logger.warning("%s timed out after %ss and was killed", command, timeout)
+            raise
+        except (subprocess.CalledProcessError, OSError):
+            with self._lock:
+                self.failures += 1
+            raise
+        finally:
+            with self._lock:
+                self.running -= 1
+            self._sync_semaphore.release()
+            self._finished(command, started)
+
+        if cache:
+            self._store(key, cache, result.stdout)
+        return result.stdout
+
+    def finalize(self) -> None:
+        with self._lock:
+            self._cache.clear()
+        self.loop = None
+
+    def info(self) -> dict[str, Any]:
+        return dict(
+            runs=self.runs,
+            cached=self.cached,
+            failures=self.failures,
+            timeouts=self.timeouts,
+            slow=self.slow_runs,
+            running=self.running,
+            waiting=self.waiting,
+            slowest_time=round(self.slowest[0], 3),
+            slowest_command=self.slowest[1],
+        )
+
+
+runner = ProcessRunner()
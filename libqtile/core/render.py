@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+import cairocffi
+
+from libqtile.log_utils import logger
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Hashable
+
+    from libqtile.backend.base import Core
+
+
+class RenderScheduler:
+    """Collects redraws and presents them at most once per frame
+
+    Bars, widgets and popups ask for a redraw with ``schedule()`` instead of drawing
+    straight away. The first request asks the backend for a frame and, when that frame
+    comes, every pending redraw is done once, however many times it was requested in
+    the meantime. How frames are paced is up to the backend: on Wayland they follow the
+    outputs' frame events, on X11 they are capped by the ``max_fps`` config option.
+    """
+
+    def __init__(self, core: Core) -> None:
+        self.core = core
+        self._pending: dict[Hashable, Callable[[], None]] = {}
+        # The redraws of the frame being rendered, so that they can still be cancelled
+        self._rendering: dict[Hashable, Callable[[], None]] = {}
+        self._frame_requested = False
+        self.rasterizer = Rasterizer()
+
+        self.requests = 0
+        self.frames = 0
+        self.renders = 0
+
+    def schedule(self, key: Hashable, callback: Callable[[], None]) -> None:
+        """Call the callback on the next frame, once for each key"""
+        self.requests += 1
+        self._pending[key] = callback
+        if not self._frame_requested:
+            self._frame_requested = True
+            self.core.request_frame(self.render)
+
+    def cancel(self, key: Hashable) -> None:
+        """Drop the pending redraw for this key, e.g. if it has been drawn already"""
+        self._pending.pop(key, None)
+        self._rendering.pop(key, None)
+
+    def render(self) -> None:
+        """Do all of the pending redraws"""
+        self._frame_requested = False
+        if not self._pending:
+            return
+
+        self.frames += 1
+        # Redraws requested while rendering this frame are left for the next one
+        self._rendering, self._pending = self._pending, {}
+        while self._rendering:
+            key = next(iter(self._rendering))
+            callback = self._rendering.pop(key)
+            self.renders += 1
+            try:
+                callback()
+            except Exception:
+                logger.exception("Error while rendering %s", key)
+
+    def finalize(self) -> None:
+        self._pending.clear()
+        self.rasterizer.finalize()
+
+    def info(self) -> dict[str, int]:
+        return dict(
+            requests=self.requests,
+            frames=self.frames,
+            renders=self.renders,
+            pending=len(self._pending),
+            **self.rasterizer.info(),
+        )
+
+
+class Rasterizer:
+    """Renders drawers' recorded operations to images on worker threads
+
+    This is used by the bars' ``threaded_rendering`` option. Cairo and pango release
+    the GIL while they render, so the main thread can get on with handling events
+    while the workers turn the recordings into pixels. Only copying the finished images
+    to the windows is left to the main thread.
+    """
+
+    def __init__(self) -> None:
+        self._executor: ThreadPoolExecutor | None = None
+        self.rasterized = 0
+        self.failed = 0
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=min(4, os.cpu_count() or 1), thread_name_prefix="qtile-render"
+            )
+        return self._executor
+
+    def submit(
+        self,
+        recording: cairocffi.RecordingSurface,
+        width: int,
+        height: int,
+        scale: float,
+        callback: Callable[[cairocffi.ImageSurface | None], None],
+    ) -> None:
+        """
+        Render the area of the recording from (0, 0) to (width, height) to an image,
+        which is then passed to the callback on the main thread. The recording must not
+        be used by anything else once submitted. If rendering fails, the callback is
+        given None.
+        """
+        loop = asyncio.get_running_loop()
+        future = asyncio.wrap_future(
+            self.executor.submit(self._rasterize, recording, width, height, scale), loop=loop
+        )
+        future.add_done_callback(lambda f: self._done(f, callback))
+
+    @staticmethod
+    def _rasterize(
+        recording: cairocffi.RecordingSurface, width: int, height: int, scale: float
+    ) -> cairocffi.ImageSurface:
+        # Runs on a worker thread, so this mustn't touch anything but its arguments
+        image = cairocffi.ImageSurface(
+            cairocffi.FORMAT_ARGB32,
+            max(math.ceil(width * scale), 1),
+            max(math.ceil(height * scale), 1),
+        )
+        image.set_device_scale(scale, scale)
+        with cairocffi.Context(image) as ctx:
+            ctx.set_source_surface(recording)
+            ctx.paint()
+        recording.finish()
+        image.flush()
+        return image
+
+    def _done(
+        self,
+        future: asyncio.Future,
+        callback: Callable[[cairocffi.ImageSurface | None], None],
+    ) -> None:
+        if future.cancelled():
+            return
+        try:
+            image = future.result()
+        except Exception:
+            logger.exception("Error while rendering on a worker thread")
+            self.failed += 1
+            image = None
+        else:
+            self.rasterized += 1
+        callback(image)
+
+    def finalize(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def info(self) -> dict[str, int]:
+        return dict(rasterized=self.rasterized, rasterize_failures=self.failed)
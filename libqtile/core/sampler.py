@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from libqtile.log_utils import logger
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from libqtile.core.manager import Qtile
+
+
+class Source(NamedTuple):
+    """
+    Something that the sampler reads, by calling ``func(*args)``, e.g.
+    ``Source(psutil.virtual_memory)``. Widgets that use equal sources share them.
+    """
+
+    func: Callable[..., Any]
+    args: tuple = ()
+
+    def read(self) -> Any:
+        return self.func(*self.args)
+
+
+_files: dict[str, int] = {}
+_files_lock = threading.Lock()
+
+
+def read_file(path: str) -> str:
+    """
+    Read a small file, like those in /proc and /sys, keeping it open to read it
+    again next time. The kernel generates these files again when they are read from
+    the start, so there is no need to open them every time.
+    """
+    with _files_lock:
+        fd = _files.get(path)
+        if fd is None:
+            fd = os.open(path, os.O_RDONLY | os.O_CLOEXEC)
+            _files[path] = fd
+
+    chunks = []
+    offset = 0
+    try:
+        while True:
+            chunk = os.pread(fd, 4096, offset)
+            chunks.append(chunk)
+            offset += len(chunk)
+            if len(chunk) < 4096:
+                break
+    except OSError:
+        # The file may have gone, e.g. if the device was unplugged, so open it again
+        # next time
+        close_file(path)
+        raise
+    return b"".join(chunks).decode()
+
+
+def close_file(path: str) -> None:
+    with _files_lock:
+        fd = _files.pop(path, None)
+    if fd is not None:
+        os.close(fd)
+
+
+def file_source(path: str) -> Source:
+    """A source that reads a file from /proc or /sys"""
+    return Source(read_file, (path,))
+
+
+class Subscription:
+    def __init__(
+        self, sampler: Sampler, interval: float, callback: Callable, sources: tuple[Source, ...]
+    ) -> None:
+        self.sampler = sampler
+        self.interval = interval
+        self.callback = callback
+        self.sources = sources
+        self._cancelled = False
+
+    def cancel(self) -> None:
+        if not self._cancelled:
+            self._cancelled = True
+            self.sampler._unsubscribe(self)
+
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+
+class Sampler:
+    """
+    Reads system metrics for widgets
+
+    Widgets like ``CPU``, ``Memory``, ``Net`` and the graphs subscribe to the sources
+    that they need, e.g. ``psutil.virtual_memory`` or a file in /sys, and are given a
+    sample of them every interval. Every source is read once per interval however many
+    widgets, on however many screens, use it, and sources are read on a worker thread
+    rather than on the event loop.
+    """
+
+    def __init__(self, qtile: Qtile) -> None:
+        self.qtile = qtile
+        self._subscriptions: dict[float, list[Subscription]] = {}
+        # The timer of each interval, with a token to tell stale reads apart if the
+        # interval is stopped and started again while it is being read
+        self._timers: dict[float, tuple[object, asyncio.TimerHandle]] = {}
+        self._failing: set[Source] = set()
+
+        self.reads = 0
+        self.samples = 0
+
+    def subscribe(
+        self, interval: float, callback: Callable[..., None], *sources: Source
+    ) -> Subscription:
+        """
+        Call the callback with a sample of each of the sources every interval, until
+        the returned subscription is cancelled.
+        """
+        subscription = Subscription(self, interval, callback, sources)
+        self._subscriptions.setdefault(interval, []).append(subscription)
+        if interval not in self._timers:
+            self._schedule(interval, object())
+        return subscription
+
+    def _unsubscribe(self, subscription: Subscription) -> None:
+        subscriptions = self._subscriptions.get(subscription.interval, [])
+        if subscription in subscriptions:
+            subscriptions.remove(subscription)
+        if not subscriptions:
+            self._subscriptions.pop(subscription.interval, None)
+            _, timer = self._timers.pop(subscription.interval, (None, None))
+            if timer is not None:
+                timer.cancel()
+
+    def _schedule(self, interval: float, token: object) -> None:
+        timer = self.qtile.call_later(interval, self._tick, interval, token)
+        self._timers[interval] = (token, timer)
+
+    def _current(self, interval: float, token: object) -> bool:
+        return interval in self._timers and self._timers[interval][0] is token
+
+    def _tick(self, interval: float, token: object) -> None:
+        if not self._current(interval, token):
+            return
+        sources = {
+            source: None
+            for subscription in self._subscriptions[interval]
+            for source in subscription.sources
+        }
+        future = self.qtile.run_in_executor(self._read, list(sources))
+        future.add_done_callback(lambda f: self._deliver(interval, token, f))
+
+    async def read_now(self, *sources: Source) -> list[Any]:
+        """
+        Read the sources once, on a worker thread, e.g. for a widget's first sample
+        or when it is updated by hand. Raises the first error that a source raised.
+        """
+        samples = await self.qtile.run_in_executor(self._read, list(sources))
+        self.reads += len(samples)
+        values = []
+        for source in sources:
+            sample = samples[source]
+            if isinstance(sample, Exception):
+                raise sample
+            values.append(sample)
+        return values
+
+    def _read(self, sources: list[Source]) -> dict[Source, Any]:
+        # Runs on a worker thread
+        samples = {}
+        for source in sources:
+            try:
+                samples[source] = source.read()
+            except Exception as e:
+                samples[source] = e
+        return samples
+
+    def _deliver(self, interval: float, token: object, future: asyncio.Future) -> None:
+        if future.cancelled() or not self._current(interval, token):
+            return
+        # Read again an interval after this read, however long it took
+        self._schedule(interval, token)
+
+        samples = future.result()
+        self.reads += len(samples)
+        for source, sample in samples.items():
+            if isinstance(sample, Exception):
+                # Only log a failing source once, rather than every interval
+                if source not in self._failing:
+                    self._failing.add(source)
+                    logger.error("Failed to read %s: %s", source, sample)
+            else:
+                self._failing.discard(source)
+
+        for subscription in list(self._subscriptions[interval]):
+            if subscription.cancelled():
+                continue
+            # Sources that failed, or were subscribed to after this read started
+            if any(
+                isinstance(samples.get(source, None), Exception) or source not in samples
+                for source in subscription.sources
+            ):
+                continue
+            values = [samples[source] for source in subscription.sources]
+            self.samples += 1
+            try:
+                subscription.callback(*values)
+            except Exception:
+                logger.exception("Error in sampler callback %s", subscription.callback)
+
+    def finalize(self) -> None:
+        for _, timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+        self._subscriptions.clear()
+        for path in list(_files):
+            close_file(path)
+
+    def info(self) -> dict[str, int]:
+        return dict(
+            reads=self.reads,
+            samples=self.samples,
+            subscriptions=sum(len(s) for s in self._subscriptions.values()),
+        )
@@ -0,0 +1,365 @@
+"""
+Things that widgets can watch for changes, rather than polling them on a timer
+
+Each watch calls back from the event loop when there is something new: a line of a
+long-running command's output, a change to a file or a kernel uevent. Nothing runs
+while nothing changes.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import ctypes
+import ctypes.util
+import os
+import socket
+import struct
+import time
+from typing import TYPE_CHECKING
+
+from libqtile.log_utils import logger
+from libqtile.utils import ASYNC_PIDS, create_task
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+    from typing import Any
+
+# From <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+
+_EVENT = struct.Struct("iIII")
+
+# From <linux/netlink.h>
+NETLINK_KOBJECT_UEVENT = 15
+
+
+class Watch:
+    """Something that can be watched for changes"""
+
+    def start(self, callback: Callable[[Any], None]) -> None:
+        """
+        Call the callback with each change, until stopped. Raises OSError if this
+        can't be watched here, e.g. without inotify.
+        """
+        raise NotImplementedError
+
+    def stop(self) -> None:
+        raise NotImplementedError
+
+
+class FdWatch(Watch):
+    """
+    Watches a readable file descriptor, calling back with what ``read(fd)`` returns
+    each time it is readable. The file descriptor isn't closed when the watch stops.
+    """
+
+    def __init__(self, fd: int, read: Callable[[int], Any] | None = None) -> None:
+        self.fd = fd
+        self.read = read or (lambda fd: os.read(fd, 4096))
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def start(self, callback: Callable[[Any], None]) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._loop.add_reader(self.fd, self._readable, callback)
+
+    def _readable(self, callback: Callable[[Any], None]) -> None:
+        try:
+            data = self.read(self.fd)
+        except BlockingIOError:
+            return
+        callback(data)
+
+    def stop(self) -> None:
+        if self._loop is not None:
+            self._loop.remove_reader(self.fd)
+            self._loop = None
+
+
+_libc = None
+
+
+def _inotify() -> Any:
+    global _libc
+    if _libc is None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        _libc = libc
+    return _libc
+
+
+class FileWatch(Watch):
+    """
+    Watches files or directories with inotify, calling back with the path of each
+    one that changed, or of the file in a directory that changed. This works for the
+    attributes in /sys that the kernel notifies about, like a backlight's
+    brightness, but not for files in /proc.
+
+    If there were too many changes to keep up with, so that some were lost, it
+    calls back with None.
+    """
+
+    def __init__(
+        self, paths: Sequence[str], mask: int = IN_MODIFY | IN_CLOSE_WRITE | IN_ATTRIB
+    ) -> None:
+        self.paths = list(paths)
+        self.mask = mask
+        self._fd: int | None = None
+        self._watches: dict[int, str] = {}
+        self._reader: FdWatch | None = None
+
+    def start(self, callback: Callable[[Any], None]) -> None:
+        libc = _inotify()
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+
+        errors = []
+        for path in self.paths:
+            wd = libc.inotify_add_watch(fd, os.fsencode(path), self.mask)
+            if wd < 0:
+                errno = ctypes.get_errno()
+                errors.append(OSError(errno, os.strerror(errno), path))
+            else:
+                self._watches[wd] = path
+        if not self._watches:
+            os.close(fd)
+            raise errors[0] if errors else OSError("Nothing to watch")
+        for error in errors:
+            logger.debug("Not watching %s: %s", error.filename, error)
+
+        self._fd = fd
+        self._reader = FdWatch(fd, lambda fd: os.read(fd, 64 * 1024))
+        self._reader.start(lambda data: self._events(data, callback))
+
+    def watching(self, path: str) -> bool:
+        """
+        Whether the path is being watched. It isn't if it didn't exist when the watch
+        started, or if it has gone since.
+        """
+        return path in self._watches.values()
+
+    def add(self, path: str) -> bool:
+        """Watch another path, or one that couldn't be watched, returning whether it is"""
+        if self._fd is None:
+            return False
+        wd = _inotify().inotify_add_watch(self._fd, os.fsencode(path), self.mask)
+        if wd < 0:
+            return False
+        self._watches[wd] = path
+        if path not in self.paths:
+            self.paths.append(path)
+        return True
+
+    def _events(self, data: bytes, callback: Callable[[Any], None]) -> None:
+        changed: dict[str | None, None] = {}
+        offset = 0
+        while offset + _EVENT.size <= len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = data[offset : offset + length].rstrip(b"\0")
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                changed[None] = None
+                continue
+            path = self._watches.get(wd)
+            if path is None:
+                continue
+            if mask & IN_IGNORED:
+                # The file has gone, so the kernel has removed the watch
+                del self._watches[wd]
+            if name:
+                path = os.path.join(path, os.fsdecode(name))
+            changed[path] = None
+
+        # A burst of events for the same file is one change
+        for path in changed:
+            callback(path)
+
+    def stop(self) -> None:
+        if self._reader is not None:
+            self._reader.stop()
+            self._reader = None
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        self._watches.clear()
+
+
+class UeventWatch(Watch):
+    """
+    Watches the kernel's uevents, e.g. when a power supply is plugged in or a
+    battery's charge changes, calling back with a dict of each event's properties
+    like ``ACTION``, ``SUBSYSTEM`` and ``POWER_SUPPLY_CAPACITY``. Only events of the
+    subsystem are passed on, if one is given.
+    """
+
+    def __init__(self, subsystem: str | None = None) -> None:
+        self.subsystem = subsystem
+        self._socket: socket.socket | None = None
+        self._reader: FdWatch | None = None
+
+    def start(self, callback: Callable[[Any], None]) -> None:
+        family = getattr(socket, "AF_NETLINK", None)
+        if family is None:
+            raise OSError("Netlink is not available")
+        sock = socket.socket(
+            family,
+            socket.SOCK_DGRAM | socket.SOCK_NONBLOCK | socket.SOCK_CLOEXEC,
+            NETLINK_KOBJECT_UEVENT,
+        )
+        try:
+            # Group 1 has the kernel's own events, which anyone may listen to
+            sock.bind((0, 1))
+        except OSError:
+            sock.close()
+            raise
+
+        self._socket = sock
+        self._reader = FdWatch(sock.fileno(), lambda fd: sock.recv(64 * 1024))
+        self._reader.start(lambda data: self._event(data, callback))
+
+    def _event(self, data: bytes, callback: Callable[[Any], None]) -> None:
+        event = {}
+        for field in data.split(b"\0")[1:]:
+            key, sep, value = field.decode(errors="replace").partition("=")
+            if sep:
+                event[key] = value
+        if self.subsystem is None or event.get("SUBSYSTEM") == self.subsystem:
+            callback(event)
+
+    def stop(self) -> None:
+        if self._reader is not None:
+            self._reader.stop()
+            self._reader = None
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+
+class CommandWatch(Watch):
+    """
+    Runs a long-running command, like ``pactl subscribe`` or ``nvidia-smi --loop``,
+    calling back with each line that it prints. If the command exits, it is started
+    again after ``restart_delay`` seconds, waiting longer each time if it keeps
+    exiting soon after starting.
+    """
+
+    # Commands that ran for less than this long are restarted more slowly each time
+    min_uptime = 60
+    max_restart_delay = 300
+
+    def __init__(
+        self, command: str | list[str], shell: bool = False, restart_delay: float = 2
+    ) -> None:
+        self.command = command
+        self.shell = shell
+        self.restart_delay = restart_delay
+        self._task: asyncio.Task | None = None
+        self._process: asyncio.subprocess.Process | None = None
+
+    def start(self, callback: Callable[[Any], None]) -> None:
+        self._task = create_task(self._run(callback))
+
+    async def _spawn(self) -> asyncio.subprocess.Process:
+        stdin = asyncio.subprocess.DEVNULL
+        stdout = asyncio.subprocess.PIPE
+        if self.shell:
+            command = self.command
+            if isinstance(command, list):
+                command = " ".join(command)
+            return await asyncio.create_subprocess_shell(command, stdin=stdin, stdout=stdout)
+        command = self.command
+        if isinstance(command, str):
+            command = [command]
+        return await asyncio.create_subprocess_exec(*command, stdin=stdin, stdout=stdout)
+
+    async def _run(self, callback: Callable[[Any], None]) -> None:
+        delay = self.restart_delay
+        while True:
+            started = time.monotonic()
+            try:
+                self._process = await self._spawn()
+            except OSError:
+                logger.exception("Failed to run %s", self.command)
+            else:
+                await self._read(self._process, callback)
+
+            if time.monotonic() - started >= self.min_uptime:
+                delay = self.restart_delay
+            logger.warning("%s stopped, restarting it in %ss", self.command, delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_restart_delay)
+
+    async def _read(
+        self, process: asyncio.subprocess.Process, callback: Callable[[Any], None]
+    ) -> None:
+        if process.pid is not None:
+            ASYNC_PIDS.add(process.pid)
+        try:
+            assert process.stdout is not None
+            async for line in process.stdout:
+                try:
+                    callback(line.decode(errors="replace").rstrip("\n"))
+                except Exception:
+                    logger.exception("Error handling output of %s", self.command)
+            await process.wait()
+        finally:
+            if process.pid is not None:
+                ASYNC_PIDS.discard(process.pid)
+            self._process = None
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._process is not None and self._process.returncode is None:
+            try:
+                self._process.terminate()
+            except ProcessLookupError:
+                pass
+        self._process = None
+
+
+class Throttle:
+    """
+    Calls a function when triggered, but at most once every interval: triggers that
+    come sooner are put off until the interval is up, and are then one call however
+    many there were.
+    """
+
+    def __init__(self, interval: float, func: Callable[[], None]) -> None:
+        self.interval = interval
+        self.func = func
+        self._last = -float("inf")
+        self._handle: asyncio.TimerHandle | None = None
+
+    def __call__(self) -> None:
+        if self._handle is not None:
+            return
+        delay = self._last + self.interval - time.monotonic()
+        if delay <= 0:
+            self._call()
+        else:
+            self._handle = asyncio.get_running_loop().call_later(delay, self._call)
+
+    def _call(self) -> None:
+        self._handle = None
+        self._last = time.monotonic()
+        self.func()
+
+    def cancel(self) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
@@ -1120,6 +1120,28 @@ hooks: list[Hook] = [
 
         """,
     ),
+    Hook(
+        "keyboard_layout_change",
+        """
+        Called when the keyboard layout changes, either to another layout of the
+        keymap or to a new keymap.
+
+        **Arguments**
+
+            ``layout`` (str): The layout and its variant, if there is one, e.g.
+            "us dvorak".
+
+        .. code::
+
+          from libqtile import hook
+          from libqtile.log_utils import logger
+
+          @hook.subscribe.keyboard_layout_change
+          def on_layout_change(layout):
+              logger.info(f"Keyboard layout is now {layout}")
+
+        """,
+    ),
 ]
 
 
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import os
-from collections import namedtuple
+from collections import OrderedDict, namedtuple
 from copy import copy
 from math import pi
+from typing import TYPE_CHECKING, NamedTuple
 
 import cairocffi
 import cairocffi.pixbuf
@@ -11,6 +14,9 @@ import cairocffi.pixbuf
 from libqtile import utils
 from libqtile.utils import ColorsType, scan_files
 
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
 
 class LoadingError(Exception):
     pass
@@ -19,6 +25,148 @@ class LoadingError(Exception):
 _SurfaceInfo = namedtuple("_SurfaceInfo", ("surface", "file_type"))
 
 
+class _Operation(NamedTuple):
+    """A change drawn on an image's surface, and what identifies it in the cache"""
+
+    apply: Callable[[Img, cairocffi.ImageSurface], None]
+    # Returns None if the result can't be cached
+    key: Callable[[Img], tuple | None]
+
+
+# Gradients by their colours and height, as the same ones are drawn over and over
+_gradients: utils.LRUCache[tuple, cairocffi.LinearGradient] = utils.LRUCache(64, name="gradients")
+
+
+def _new_linear_gradient(colours: list, height: float) -> cairocffi.LinearGradient:
+    gradient = cairocffi.LinearGradient(0.0, 0.0, 0.0, height)
+    step_size = 1.0 / (len(colours) - 1)
+    step = 0.0
+    for c in colours:
+        gradient.add_color_stop_rgba(step, *utils.rgb(c))
+        step += step_size
+    return gradient
+
+
+def linear_gradient(colours: list, height: float) -> cairocffi.LinearGradient:
+    """Get a vertical gradient through the colours, spread over the given height"""
+    try:
+        key = (tuple(colours), height)
+        gradient = _gradients.get(key)
+    except TypeError:
+        # Colours given as lists can't be cached
+        return _new_linear_gradient(colours, height)
+
+    if gradient is None:
+        gradient = _new_linear_gradient(colours, height)
+        _gradients[key] = gradient
+    return gradient
+
+
+class ImageCache:
+    """
+    Decoded and scaled images, shared by all Img instances
+
+    Surfaces are kept by the file they were decoded from, their size and the
+    operations applied to them, until they take more than ``max_bytes`` together, at
+    which point the least recently used are dropped. Surfaces in the cache are shared,
+    so they must not be drawn on.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self._max_bytes = max_bytes
+        self._surfaces: OrderedDict[tuple, cairocffi.ImageSurface] = OrderedDict()
+        self.bytes = 0
+        self.stats = utils.CACHE_STATS.setdefault("images", utils.CacheStats())
+
+    def __len__(self) -> int:
+        return len(self._surfaces)
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, max_bytes: int) -> None:
+        self._max_bytes = max_bytes
+        self._evict()
+
+    @staticmethod
+    def _size(surface: cairocffi.ImageSurface) -> int:
+        return surface.get_stride() * surface.get_height()
+
+    def get(self, key: tuple) -> cairocffi.ImageSurface | None:
+        try:
+            surface = self._surfaces[key]
+        except KeyError:
+            self.stats.misses += 1
+            return None
+        self._surfaces.move_to_end(key)
+        self.stats.hits += 1
+        return surface
+
+    def put(self, key: tuple, surface: cairocffi.ImageSurface) -> None:
+        size = self._size(surface)
+        if size > self._max_bytes:
+            # It would only push everything else out
+            return
+        self.pop(key)
+        self._surfaces[key] = surface
+        self.bytes += size
+        self.stats.size += 1
+        self._evict()
+
+    def pop(self, key: tuple) -> None:
+        surface = self._surfaces.pop(key, None)
+        if surface is not None:
+            self.bytes -= self._size(surface)
+            self.stats.size -= 1
+
+    def _evict(self) -> None:
+        while self.bytes > self._max_bytes:
+            _, surface = self._surfaces.popitem(last=False)
+            self.bytes -= self._size(surface)
+            self.stats.size -= 1
+            self.stats.evictions += 1
+
+    def clear(self) -> None:
+        self.stats.size -= len(self._surfaces)
+        self._surfaces.clear()
+        self.bytes = 0
+
+    def info(self) -> dict[str, int | float]:
+        return dict(self.stats.info(), bytes=self.bytes, max_bytes=self._max_bytes)
+
+
+# See the image_cache_size config option
+cache = ImageCache(64 * 1024 * 1024)
+
+# The surfaces being decoded on worker threads, by their keys in the cache
+_decoding: dict[tuple, asyncio.Future] = {}
+
+# The files found by Loader, by directory and name
+_found: utils.LRUCache[tuple[str, str], str] = utils.LRUCache(256, name="image_paths")
+
+
+def _decode_async(key: tuple, decode, *args) -> asyncio.Future:
+    """
+    Decode a surface on a worker thread and put it in the cache. Surfaces that are
+    already being decoded aren't decoded again.
+    """
+    future = _decoding.get(key)
+    if future is None:
+        future = asyncio.get_running_loop().run_in_executor(None, decode, *args)
+        _decoding[key] = future
+
+        def done(future):
+            del _decoding[key]
+            if not future.cancelled() and future.exception() is None:
+                cache.put(key, future.result())
+
+        future.add_done_callback(done)
+    # Don't cancel it for everybody waiting for it
+    return asyncio.shield(future)
+
+
 def get_cairo_surface(bytes_img, width=None, height=None):
     try:
         surf, fmt = cairocffi.pixbuf.decode_to_image_surface(bytes_img, width, height)
@@ -129,10 +277,34 @@ _ImgSize = namedtuple("_ImgSize", ("width", "height"))
 
 
 class ImageFileBackend:
-    """Backend for encoded image files (PNG, JPEG, etc)"""
+    """Backend for encoded image files (PNG, JPEG, etc)
+
+    Given a path rather than the file's contents, the file is only read when it has
+    to be decoded, i.e. when it isn't in the cache already.
+    """
+
+    def __init__(self, bytes_img=None, path=None, mtime=None):
+        self._bytes_img = bytes_img
+        self.path = path
+        self.mtime = mtime
+        self._key = None
 
-    def __init__(self, bytes_img):
-        self.bytes_img = bytes_img
+    @property
+    def bytes_img(self):
+        if self._bytes_img is None:
+            with open(self.path, "rb") as fobj:
+                self._bytes_img = fobj.read()
+        return self._bytes_img
+
+    @property
+    def key(self):
+        """What identifies the image in the cache"""
+        if self._key is None:
+            if self.path is not None:
+                self._key = (self.path, self.mtime)
+            else:
+                self._key = (hashlib.sha1(self.bytes_img).hexdigest(),)
+        return self._key
 
     def get_surface(self, width=None, height=None):
         surf, _ = get_cairo_surface(self.bytes_img, width, height)
@@ -141,12 +313,17 @@ class ImageFileBackend:
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, ImageFileBackend):
             return False
+        if self.path is not None and other.path is not None:
+            return self.key == other.key
         return self.bytes_img == other.bytes_img
 
 
 class ImageBufferBackend:
     """Backend for raw pixel data"""
 
+    # The data can be changed in place, so its surfaces aren't cached
+    key = None
+
     def __init__(self, data, format, width, height):
         self.data = data
         self.format = format
@@ -189,6 +366,10 @@ class Img:
     - height :: pattern height in pixels
     - theta :: rotation of pattern counter clockwise in degrees
     Pattern is first stretched, then rotated.
+
+    Decoded and scaled surfaces are kept in a cache that is shared by all instances,
+    so that images used by several widgets, or on several screens, are only decoded
+    once for each size.
     """
 
     def __init__(self, bytes_img=None, name="", path=""):
@@ -207,10 +388,10 @@ class Img:
         return new
 
     def _common_init(self, backend, name="", path=""):
-        self.backend = backend
+        self.backend: ImageFileBackend | ImageBufferBackend | None = backend
         self.name = name
         self.path = path
-        self._operations = []
+        self._operations: list[_Operation] = []
         self._resources = []
 
     @classmethod
@@ -231,28 +412,82 @@ class Img:
     @classmethod
     def from_path(cls, image_path):
         "Create an Img instance from image_path"
-        with open(image_path, "rb") as fobj:
-            bytes_img = fobj.read()
+        mtime = os.stat(image_path).st_mtime_ns
         name = os.path.basename(image_path)
         name, file_type = os.path.splitext(name)
         img = cls.__new__(cls)
-        img._common_init(ImageFileBackend(bytes_img), name=name, path=image_path)
+        img._common_init(
+            ImageFileBackend(path=image_path, mtime=mtime), name=name, path=image_path
+        )
+        return img
+
+    @classmethod
+    async def load_async(cls, image_path, width=None, height=None):
+        """
+        Create an Img instance from image_path, decoding the image on a worker thread
+        rather than on the event loop. If width or height are given, the image is
+        resized as with resize(), and decoded at that size too.
+        """
+        loop = asyncio.get_running_loop()
+        img = await loop.run_in_executor(None, cls.from_path, image_path)
+
+        key = (*img.backend.key, None, None)
+        surf = cache.get(key)
+        if surf is None:
+            surf = await _decode_async(key, img.backend.get_surface)
+        img._default_surface = surf
+        if width is None and height is None:
+            return img
+
+        img.resize(width, height)
+        key = (*img.backend.key, img.width, img.height)
+        surf = cache.get(key)
+        if surf is None:
+            surf = await _decode_async(key, img.backend.get_surface, img.width, img.height)
+        img._surface = surf
+        img._surface_shared = True
         return img
 
     def _reset(self):
-        if hasattr(self, "surface"):
-            self.surface.finish()
+        surface = self.__dict__.get("_surface")
+        if surface is not None:
+            # Surfaces from the cache can be used by other images, so they are left
+            # for the garbage collector
+            if not self._surface_shared:
+                surface.finish()
             del self.surface
-        if hasattr(self, "pattern"):
-            # patterns do not need to be finish()ed, only surfaces do
-            del self.pattern
+        # patterns do not need to be finish()ed, only surfaces do
+        del self.pattern
+
+    def _cache_key(self):
+        """What identifies the image's surface, at its size, in the cache"""
+        key = self.backend.key
+        if key is None:
+            return None
+        for operation in self._operations:
+            op_key = operation.key(self)
+            if op_key is None:
+                return None
+            key += op_key
+        return (*key, self.width, self.height)
+
+    def _get_surface(self, width=None, height=None):
+        """Get the backend's surface at the given size, from the cache if it is there"""
+        if self.backend.key is None:
+            return self.backend.get_surface(width, height)
+        key = (*self.backend.key, width, height)
+        surf = cache.get(key)
+        if surf is None:
+            surf = self.backend.get_surface(width, height)
+            cache.put(key, surf)
+        return surf
 
     @property
     def default_surface(self):
         try:
             return self._default_surface
         except AttributeError:
-            surf = self.backend.get_surface()
+            surf = self._get_surface()
             self._default_surface = surf
             return surf
 
@@ -327,7 +562,13 @@ class Img:
                 ctx.set_source(cairocffi.SurfacePattern(img._resources[resource_idx].surface))
                 ctx.paint()
 
-        self._operations.append(func)
+        def key(img):
+            overlay_key = img._resources[resource_idx]._cache_key()
+            if overlay_key is None:
+                return None
+            return ("paste", overlay_key, offsetx, offsety)
+
+        self._operations.append(_Operation(func, key))
         self._reset()
         return self
 
@@ -341,13 +582,7 @@ class Img:
                     elif len(colour) == 1:
                         ctx.set_source_rgba(*utils.rgb(colour[0]))
                     else:
-                        linear = cairocffi.LinearGradient(0.0, 0.0, 0.0, img.height)
-                        step_size = 1.0 / (len(colour) - 1)
-                        step = 0.0
-                        for c in colour:
-                            linear.add_color_stop_rgba(step, *utils.rgb(c))
-                            step += step_size
-                        ctx.set_source(linear)
+                        ctx.set_source(linear_gradient(colour, img.height))
                 else:
                     ctx.set_source_rgba(*utils.rgb(colour))
 
@@ -355,7 +590,7 @@ class Img:
                 ctx.mask(cairocffi.SurfacePattern(surface))
                 ctx.fill()
 
-        self._operations.append(func)
+        self._operations.append(_Operation(func, lambda img: ("paint_mask", repr(colour))))
         self._reset()
         return self
 
@@ -364,12 +599,28 @@ class Img:
         try:
             return self._surface
         except AttributeError:
-            surf = self.backend.get_surface(self.width, self.height)
-            for operation in self._operations:
-                operation(self, surf)
+            pass
 
-            self._surface = surf
-            return surf
+        key = self._cache_key()
+        surf = None if key is None else cache.get(key)
+        shared = surf is not None
+        if surf is None:
+            surf = self._get_surface(self.width, self.height)
+            # Only the backends of files put their surfaces in the cache
+            shared = self.backend.key is not None
+            if self._operations:
+                # The operations draw on the surface, so leave the cached one alone
+                if self.backend.key is not None:
+                    surf = _copy_surface(surf)
+                for operation in self._operations:
+                    operation.apply(self, surf)
+                shared = key is not None
+                if key is not None:
+                    cache.put(key, surf)
+
+        self._surface = surf
+        self._surface_shared = shared
+        return surf
 
     @surface.deleter
     def surface(self):
@@ -408,12 +659,26 @@ class Img:
         )
 
 
+def _copy_surface(surface):
+    copied = cairocffi.ImageSurface(
+        surface.get_format(), surface.get_width(), surface.get_height()
+    )
+    with cairocffi.Context(copied) as ctx:
+        ctx.set_source_surface(surface)
+        ctx.set_operator(cairocffi.OPERATOR_SOURCE)
+        ctx.paint()
+    return copied
+
+
 class Loader:
     """Loader - create Img() instances from image names
 
     load icons with Loader e.g.,
     >>> ldr = Loader('/usr/share/icons/Adwaita/24x24', '/usr/share/icons/Adwaita')
     >>> d_loaded_images = ldr('audio-volume-muted', 'audio-volume-low')
+
+    The files that are found are remembered, so that the directories are only
+    searched again for images that weren't found or have since been removed.
     """
 
     def __init__(self, *directories, **kwargs):
@@ -422,6 +687,21 @@ class Loader:
         self.directories = list(directories)
 
     def __call__(self, *names):
+        return {name: Img.from_path(path) for name, path in self._find(*names).items()}
+
+    async def load_async(self, *names, width=None, height=None):
+        """
+        Like calling the loader, but decode the images on worker threads, as with
+        Img.load_async
+        """
+        paths = self._find(*names)
+        imgs = await asyncio.gather(
+            *(Img.load_async(path, width, height) for path in paths.values())
+        )
+        return dict(zip(paths, imgs))
+
+    def _find(self, *names):
+        """Find the path of the image file for each name"""
         d = {}
         seen = set()
         set_names = set()
@@ -433,11 +713,20 @@ class Loader:
                 set_names.add(n + ".*")
 
         for directory in self.directories:
-            d_matches = scan_files(directory, *(set_names - seen))
-            for name, paths in d_matches.items():
-                if paths:
-                    d[name if name in names else name[:-2]] = Img.from_path(paths[0])
-                    seen.add(name)
+            found = {}
+            for name in set_names - seen:
+                path = _found.get((directory, name))
+                if path is not None and os.path.exists(path):
+                    found[name] = path
+            missing = set_names - seen - found.keys()
+            if missing:
+                for name, paths in scan_files(directory, *missing).items():
+                    if paths:
+                        found[name] = _found[(directory, name)] = paths[0]
+
+            for name, path in found.items():
+                d[name if name in names else name[:-2]] = path
+                seen.add(name)
 
         if seen != set_names:
             msg = "Wasn't able to find images corresponding to the names: {}"
@@ -55,6 +55,7 @@ pango_ffi.cdef(
 
     // https://developer.gnome.org/pango/stable/pango-Layout-Objects.html
     PangoLayout *pango_cairo_create_layout (cairo_t *cr);
+    PangoLayout *pango_layout_copy (PangoLayout *src);
     void g_object_unref(gpointer object);
 
     void
@@ -70,6 +71,8 @@ pango_ffi.cdef(
     pango_layout_set_attributes (PangoLayout *layout,
                                  PangoAttrList *attrs);
     void
+    pango_attr_list_unref (PangoAttrList *list);
+    void
     pango_layout_set_text (PangoLayout *layout,
                            const char *text,
                            int length);
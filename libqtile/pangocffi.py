@@ -35,14 +35,21 @@ ALIGNMENTS = {
 
 
 class PangoLayout:
-    def __init__(self, cairo_t):
+    def __init__(self, cairo_t, pointer=None):
         self._cairo_t = cairo_t
-        self._pointer = pangocairo.pango_cairo_create_layout(cairo_t)
+        if pointer is None:
+            pointer = pangocairo.pango_cairo_create_layout(cairo_t)
 
         def free(p):
             gobject.g_object_unref(p)
 
-        self._pointer = ffi.gc(self._pointer, free)
+        self._pointer = ffi.gc(pointer, free)
+
+    def copy(self):
+        """Copy the layout with all of its settings and text, but not its shaping"""
+        layout = PangoLayout(self._cairo_t, pango.pango_layout_copy(self._pointer))
+        layout._desc = getattr(self, "_desc", None)
+        return layout
 
     def finalize(self):
         self._desc = None
@@ -138,7 +145,9 @@ def parse_markup(value, accel_marker=0):
     if ret == 0:
         raise BadMarkup(f"parse_markup() failed for: {value}")
 
-    return attr_list[0], ffi.string(text[0]), chr(accel_marker)
+    # The layouts that the attributes are set on hold their own reference
+    attrs = ffi.gc(attr_list[0], pango.pango_attr_list_unref)
+    return attrs, ffi.string(text[0]), chr(accel_marker)
 
 
 def markup_escape_text(text):
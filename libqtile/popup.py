@@ -98,7 +98,9 @@ class Popup(configurable.Configurable):
         )
 
     def draw(self) -> None:
-        self.drawer.draw()
+        # Present what has been drawn on the next frame, once, however many times
+        # this is called before then
+        self.qtile.schedule_draw(self, self.drawer.draw)
 
     def place(self) -> None:
         self.win.place(
@@ -120,6 +122,7 @@ class Popup(configurable.Configurable):
         self.win.hide()
 
     def kill(self) -> None:
+        self.qtile.cancel_draw(self)
         self.win.kill()
         self.layout.finalize()
         self.drawer.finalize()
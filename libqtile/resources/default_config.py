@@ -202,6 +202,14 @@ reconfigure_screens = True
 # screen_change hook, coalescing bursts of events into a single one.
 screen_change_debounce_timeout = 1
 
+# The maximum number of times per second that bars, widgets and popups are
+# redrawn on X11. On Wayland, they are redrawn when the outputs need a new frame.
+max_fps = 60
+
+# The most memory, in megabytes, that decoded and scaled images (e.g. widget icons)
+# are cached in, so that images used in several places are only decoded once.
+image_cache_size = 64
+
 # If things like steam games want to auto-minimize themselves when losing
 # focus, should we respect this or not?
 auto_minimize = True
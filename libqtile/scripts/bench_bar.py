@@ -0,0 +1,297 @@
+"""
+Benchmark drawing a bar's widgets, without a display server
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+import libqtile
+from libqtile import confreader, utils
+from libqtile.backend.offscreen.core import Core
+from libqtile.config import Screen
+from libqtile.core.render import RenderScheduler
+from libqtile.core.sampler import Sampler
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from typing import Any
+
+    from libqtile.bar import Bar
+    from libqtile.widget.base import _Widget
+
+
+class _Qtile:
+    """The parts of the Qtile object that bars and widgets use to draw themselves"""
+
+    def __init__(self, config: confreader.Config | None = None) -> None:
+        self.core = Core()
+        self.config = config
+        self.renderer = RenderScheduler(self.core)  # type: ignore[arg-type]
+        self.sampler = Sampler(self)  # type: ignore[arg-type]
+        self.renamed_widgets: list[str] = []
+        self.widgets_map: dict[str, _Widget] = {}
+        self.groups: list = []
+        self.groups_map: dict = {}
+        self.windows_map: dict = {}
+        self.screens: list[Screen] = []
+        self.current_screen: Screen | None = None
+        self.current_window = None
+
+    def call_soon(self, func: Callable, *args: Any) -> asyncio.Handle:
+        return asyncio.get_running_loop().call_soon(func, *args)
+
+    def call_soon_threadsafe(self, func: Callable, *args: Any) -> asyncio.Handle:
+        return asyncio.get_running_loop().call_soon_threadsafe(func, *args)
+
+    def call_later(self, delay: int | float, func: Callable, *args: Any) -> asyncio.TimerHandle:
+        return asyncio.get_running_loop().call_later(delay, func, *args)
+
+    def run_in_executor(self, func: Callable, *args: Any) -> asyncio.Future:
+        return asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    def schedule_draw(self, key: Any, func: Callable[[], None]) -> None:
+        self.renderer.schedule(key, func)
+
+    def cancel_draw(self, key: Any) -> None:
+        self.renderer.cancel(key)
+
+    def register_widget(self, w: _Widget) -> None:
+        name = w.name
+        i = 0
+        while name in self.widgets_map:
+            i += 1
+            name = f"{w.name}_{i}"
+        self.widgets_map[name] = w
+
+    def finalize(self) -> None:
+        self.renderer.finalize()
+        self.sampler.finalize()
+
+
+@dataclass
+class WidgetStats:
+    name: str
+    times: list[float] = field(default_factory=list)
+    allocations: list[int] = field(default_factory=list)
+
+    @property
+    def mean(self) -> float:
+        return statistics.fmean(self.times) if self.times else 0.0
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.times) if self.times else 0.0
+
+    @property
+    def max(self) -> float:
+        return max(self.times, default=0.0)
+
+    @property
+    def allocated(self) -> float:
+        """Mean peak of the memory allocated by a draw, in bytes"""
+        return statistics.fmean(self.allocations) if self.allocations else 0.0
+
+
+class BarBench:
+    """
+    Draws a bar to an offscreen window, timing its widgets.
+
+    ``configure()`` needs to be awaited from a running event loop first, as widgets
+    set up their timers when they are configured.
+    """
+
+    def __init__(
+        self,
+        bar: Bar,
+        position: str = "top",
+        width: int = 1920,
+        height: int = 1080,
+        config: confreader.Config | None = None,
+    ) -> None:
+        self.bar = bar
+        self.qtile = _Qtile(config)
+        if position == "top":
+            self.screen = Screen(top=bar, x=0, y=0, width=width, height=height)
+        elif position == "bottom":
+            self.screen = Screen(bottom=bar, x=0, y=0, width=width, height=height)
+        elif position == "left":
+            self.screen = Screen(left=bar, x=0, y=0, width=width, height=height)
+        elif position == "right":
+            self.screen = Screen(right=bar, x=0, y=0, width=width, height=height)
+        else:
+            raise ValueError(f"Unknown bar position: {position}")
+        self.qtile.screens.append(self.screen)
+        self.qtile.current_screen = self.screen
+
+    async def configure(self, settle: float = 0) -> None:
+        self.bar._configure(self.qtile, self.screen)  # type: ignore[arg-type]
+        for widget in self.widgets:
+            # Time the whole of the drawing, rather than handing it to a worker thread
+            widget.drawer.rasterizer = None
+        # Let the widgets' timers, async setup and the first frame run
+        await asyncio.sleep(settle)
+
+    @property
+    def widgets(self) -> list[_Widget]:
+        return [w for w in self.bar.widgets if not w.finalized]
+
+    def _draw(self, widget: _Widget) -> None:
+        widget.fit_drawer()
+        widget.draw()
+
+    def render(self, iterations: int) -> list[WidgetStats]:
+        """Draw each widget a number of times, returning how long that took"""
+        stats = [WidgetStats(widget.name) for widget in self.widgets]
+
+        # Time first and count allocations separately, as tracing slows everything down
+        for widget, stat in zip(self.widgets, stats):
+            for _ in range(iterations):
+                start = time.perf_counter()
+                self._draw(widget)
+                stat.times.append(time.perf_counter() - start)
+
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        try:
+            for widget, stat in zip(self.widgets, stats):
+                for _ in range(iterations):
+                    tracemalloc.reset_peak()
+                    before = tracemalloc.get_traced_memory()[0]
+                    self._draw(widget)
+                    stat.allocations.append(tracemalloc.get_traced_memory()[1] - before)
+        finally:
+            if not tracing:
+                tracemalloc.stop()
+
+        return stats
+
+    def snapshot(self, directory: str) -> list[str]:
+        """
+        Write what the bar and each of its widgets look like to PNG files, so that
+        they can be compared between runs. Returns the paths written.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.bar._actual_draw()
+        window = self.bar.window
+        assert window is not None
+        path = os.path.join(directory, "bar.png")
+        window.write_to_png(path)  # type: ignore[attr-defined]
+        paths = [path]
+
+        for i, widget in enumerate(self.widgets):
+            if not widget.width or not widget.height:
+                continue
+            path = os.path.join(directory, f"{i:02d}-{widget.name}.png")
+            window.write_to_png(  # type: ignore[attr-defined]
+                path, widget.offsetx, widget.offsety, widget.width, widget.height
+            )
+            paths.append(path)
+        return paths
+
+    def finalize(self) -> None:
+        self.bar.finalize()
+        self.qtile.finalize()
+
+
+def print_stats(stats: list[WidgetStats]) -> None:
+    width = max((len(s.name) for s in stats), default=6)
+    print(
+        f"{'widget':<{width}}  {'mean ms':>9}  {'median ms':>9}  {'max ms':>9}  {'alloc KiB':>9}"
+    )
+    for s in sorted(stats, key=lambda s: s.mean, reverse=True):
+        print(
+            f"{s.name:<{width}}  {s.mean * 1000:>9.3f}  {s.median * 1000:>9.3f}  "
+            f"{s.max * 1000:>9.3f}  {s.allocated / 1024:>9.1f}"
+        )
+    total = sum(s.mean for s in stats)
+    print(f"{'total':<{width}}  {total * 1000:>9.3f}")
+
+
+async def _bench(args, bar: Bar, config: confreader.Config) -> None:
+    bench = BarBench(bar, args.position, args.width, args.height, config)
+    libqtile.init(bench.qtile)
+    try:
+        await bench.configure(args.settle)
+        print_stats(bench.render(args.iterations))
+        if args.output:
+            for path in bench.snapshot(args.output):
+                print(f"Wrote {path}")
+    finally:
+        bench.finalize()
+
+
+def bench_bar(args) -> None:
+    config = confreader.Config(args.configfile)
+    config.load()
+
+    try:
+        screen = config.screens[args.screen]
+    except IndexError:
+        sys.exit(f"The config has no screen {args.screen}")
+    bar = getattr(screen, args.position, None)
+    if bar is None or not hasattr(bar, "widgets"):
+        sys.exit(f"Screen {args.screen} has no {args.position} bar")
+
+    asyncio.run(_bench(args, bar, config))
+
+
+def add_subcommand(subparsers, parents):
+    parser = subparsers.add_parser(
+        "bench-bar",
+        parents=parents,
+        help="Time how long a bar's widgets take to draw, without a display.",
+    )
+    parser.add_argument(
+        "-c",
+        "--config",
+        action="store",
+        default=utils.get_config_file(),
+        dest="configfile",
+        help="Use the specified configuration file.",
+    )
+    parser.add_argument(
+        "-s",
+        "--screen",
+        type=int,
+        default=0,
+        help="Index of the screen whose bar is drawn.",
+    )
+    parser.add_argument(
+        "-b",
+        "--bar",
+        dest="position",
+        default="top",
+        choices=("top", "bottom", "left", "right"),
+        help="Position of the bar to draw.",
+    )
+    parser.add_argument(
+        "-n",
+        "--iterations",
+        type=int,
+        default=100,
+        help="Number of times each widget is drawn.",
+    )
+    parser.add_argument("--width", type=int, default=1920, help="Width of the screen.")
+    parser.add_argument("--height", type=int, default=1080, help="Height of the screen.")
+    parser.add_argument(
+        "--settle",
+        type=float,
+        default=1.0,
+        help="Seconds to let widgets update before they are timed.",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default=None,
+        help="Directory to write PNG snapshots of the bar and its widgets to.",
+    )
+    parser.set_defaults(func=bench_bar)
@@ -5,6 +5,7 @@ from pathlib import Path
 
 from libqtile.log_utils import get_default_log, init_log
 from libqtile.scripts import (
+    bench_bar,
     check,
     cmd_obj,
     launch,
@@ -53,6 +54,7 @@ def main():
     start.add_subcommand(subparsers, [parent_parser])
     shell.add_subcommand(subparsers, [parent_parser])
     top.add_subcommand(subparsers, [parent_parser])
+    bench_bar.add_subcommand(subparsers, [parent_parser])
     run_cmd.add_subcommand(subparsers, [parent_parser])
     cmd_obj.add_subcommand(subparsers, [parent_parser])
     check.add_subcommand(subparsers, [parent_parser])
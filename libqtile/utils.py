@@ -3,8 +3,9 @@ from __future__ import annotations
 import asyncio
 import glob
 import importlib
+import math
 import os
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 from collections.abc import Callable, Coroutine, Sequence
 from importlib.metadata import PackageNotFoundError, distribution
 from pathlib import Path
@@ -82,7 +83,22 @@ def rgb(x: ColorType) -> tuple[float, float, float, float]:
         with alpha: (255, 0, 0, 0.5)
 
     Which is returned as (1.0, 0.0, 0.0, 0.5).
+
+    Colours are drawn over and over with the same few specifications, so the parsed
+    values are cached.
     """
+    try:
+        value = _colours.get(x)
+    except TypeError:
+        # Colours given as lists can't be cached
+        return _parse_rgb(x)
+    if value is None:
+        value = _parse_rgb(x)
+        _colours[x] = value
+    return value
+
+
+def _parse_rgb(x: ColorType) -> tuple[float, float, float, float]:
     if isinstance(x, tuple | list):
         if len(x) == 4:
             alpha = x[-1]
@@ -107,7 +123,7 @@ def rgb(x: ColorType) -> tuple[float, float, float, float]:
         if len(x) == 8:
             alpha = int(x[6:8], 16) / 255.0
         vals += (alpha,)  # type: ignore
-        return rgb(vals)  # type: ignore
+        return _parse_rgb(vals)  # type: ignore
     raise ValueError("Invalid RGB specifier.")
 
 
@@ -160,6 +176,97 @@ def scrub_to_utf8(text: str | bytes) -> str:
         return text.decode("utf-8", "ignore")
 
 
+class CacheStats:
+    """Hit and miss counters of a cache, or of a group of caches sharing a name"""
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.size = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def info(self) -> dict[str, int | float]:
+        return dict(
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            size=self.size,
+            hit_rate=round(self.hit_rate, 3),
+        )
+
+
+# The statistics of all named caches, by name
+CACHE_STATS: dict[str, CacheStats] = {}
+
+
+def cache_stats() -> dict[str, dict[str, int | float]]:
+    """Get the statistics of all named caches"""
+    return {name: stats.info() for name, stats in sorted(CACHE_STATS.items())}
+
+
+class LRUCache[K, V]:
+    """A mapping that holds at most ``maxsize`` items, dropping the least recently used
+
+    Caches given a ``name`` report their hits and misses in ``cache_stats()``. Caches
+    with the same name, e.g. one per object, share their statistics.
+    """
+
+    def __init__(self, maxsize: int, name: str | None = None) -> None:
+        self.maxsize = maxsize
+        self._items: OrderedDict[K, V] = OrderedDict()
+        if name is None:
+            self.stats = CacheStats()
+        else:
+            self.stats = CACHE_STATS.setdefault(name, CacheStats())
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._items
+
+    def get(self, key: K, default: Any = None) -> Any:
+        """Get an item, marking it as the most recently used"""
+        try:
+            value = self._items[key]
+        except KeyError:
+            self.stats.misses += 1
+            return default
+        self._items.move_to_end(key)
+        self.stats.hits += 1
+        return value
+
+    def __setitem__(self, key: K, value: V) -> None:
+        if key in self._items:
+            self._items.move_to_end(key)
+        else:
+            self.stats.size += 1
+        self._items[key] = value
+        while len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+            self.stats.evictions += 1
+            self.stats.size -= 1
+
+    def pop(self, key: K, default: Any = None) -> Any:
+        if key not in self._items:
+            return default
+        self.stats.size -= 1
+        return self._items.pop(key)
+
+    def clear(self) -> None:
+        self.stats.size -= len(self._items)
+        self._items.clear()
+
+
+# Parsed colours by their specification, see rgb()
+_colours: LRUCache[ColorType, tuple[float, float, float, float]] = LRUCache(1024, name="colours")
+
+
 def get_cache_dir() -> str:
     """
     Returns the cache directory and create if it doesn't exists
@@ -617,37 +724,21 @@ def remove_dbus_rules() -> None:
 ASYNC_PIDS: set[int] = set()
 
 
-async def acall_process(command: str | list[str], shell: bool = False) -> str:
+async def acall_process(
+    command: str | list[str], shell: bool = False, timeout: float | None = None
+) -> str:
     """
-    Like call_process, but the async version. Tracks PIDs in ASYNC_PIDS.
+    Like call_process, but the async version. Runs the command with the shared
+    process runner in libqtile.core.processes, which tracks PIDs in ASYNC_PIDS.
+    By default the command is waited for however long it takes; given a
+    ``timeout``, it is killed after that many seconds and
+    ``subprocess.TimeoutExpired`` is raised.
     """
-    stdin = asyncio.subprocess.DEVNULL
-    stdout = asyncio.subprocess.PIPE
-    stderr = asyncio.subprocess.STDOUT
-
-    if shell:
-        if isinstance(command, list):
-            command = " ".join(command)
-        p = await asyncio.subprocess.create_subprocess_shell(
-            command, stdin=stdin, stdout=stdout, stderr=stderr
-        )
-    else:
-        if isinstance(command, str):
-            command = [command]
-        p = await asyncio.subprocess.create_subprocess_exec(
-            *command, stdin=stdin, stdout=stdout, stderr=stderr
-        )
+    from libqtile.core.processes import runner
 
-    if p.pid is not None:
-        ASYNC_PIDS.add(p.pid)
-
-    try:
-        (out, _) = await p.communicate()
-        return out.decode("utf-8")
-    finally:
-        # Remove PID from tracking list when process completes
-        if p.pid is not None:
-            ASYNC_PIDS.discard(p.pid)
+    if timeout is None:
+        timeout = math.inf
+    return await runner.run(command, shell, timeout=timeout, check=False, stderr=True)
 
 
 def reap_zombies() -> None:
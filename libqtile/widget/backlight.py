@@ -4,6 +4,7 @@ import shlex
 from functools import partial
 
 from libqtile.command.base import expose_command
+from libqtile.core.watchers import FileWatch
 from libqtile.log_utils import logger
 from libqtile.widget import base
 
@@ -26,7 +27,7 @@ def find_default_backlight() -> str:
     return "QTILE_BACKLIGHT_NOT_FOUND"
 
 
-class Backlight(base.InLoopPollText):
+class Backlight(base.EventText):
     """A simple widget to show the current brightness of a monitor.
 
     If the change_command parameter is set to None, the widget will attempt to
@@ -34,6 +35,9 @@ class Backlight(base.InLoopPollText):
     having the correct udev rules, so be sure Qtile's udev rules are installed
     correctly.
 
+    The widget updates as soon as the brightness changes, by watching the
+    brightness files with inotify.
+
     You can also bind keyboard shortcuts to the backlight widget with:
 
     .. code-block:: python
@@ -65,7 +69,11 @@ class Backlight(base.InLoopPollText):
             "max_brightness",
             "Name of file with the maximum brightness in /sys/class/backlight/backlight_name",
         ),
-        ("update_interval", 0.2, "The delay in seconds between updates"),
+        (
+            "fallback_interval",
+            0.2,
+            "The delay in seconds between updates if the brightness can't be watched",
+        ),
         ("step", 10, "Percent of backlight every scroll changed"),
         ("format", "{percent:2.0%}", "Display format"),
         ("change_command", "xbacklight -set {0}", "Execute command to change value"),
@@ -73,7 +81,7 @@ class Backlight(base.InLoopPollText):
     ]
 
     def __init__(self, **config):
-        base.InLoopPollText.__init__(self, **config)
+        base.EventText.__init__(self, **config)
         self.add_defaults(Backlight.defaults)
         self._future = None
 
@@ -98,7 +106,15 @@ class Backlight(base.InLoopPollText):
     def finalize(self):
         if self._future and not self._future.done():
             self._future.cancel()
-        base.InLoopPollText.finalize(self)
+        base.EventText.finalize(self)
+
+    def watches(self):
+        # Changes made by the hardware, e.g. with a brightness key handled by the
+        # firmware, are notified on actual_brightness rather than brightness
+        actual_brightness = os.path.join(
+            os.path.dirname(self.brightness_file), "actual_brightness"
+        )
+        return [FileWatch([self.brightness_file, actual_brightness])]
 
     def _load_file(self, path):
         try:
@@ -4,16 +4,20 @@ import asyncio
 import copy
 import inspect
 import math
-import subprocess
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from libqtile import bar, configurable, confreader, hook
 from libqtile.command import interface
 from libqtile.command.base import CommandObject, ItemT, expose_command
+from libqtile.core import processes
+from libqtile.core.watchers import Throttle
 from libqtile.lazy import LazyCall
 from libqtile.log_utils import logger
 from libqtile.utils import ColorType, create_task
 
+if TYPE_CHECKING:
+    from libqtile.core.sampler import Subscription
+
 # Each widget class must define which bar orientation(s) it supports by setting
 # these bits in an 'orientations' class attribute. Simply having the attribute
 # inherited by superclasses is discouraged, because if a superclass that was
@@ -104,6 +108,15 @@ class _Widget(CommandObject, configurable.Configurable):
 
     offsetx: int = 0
     offsety: int = 0
+
+    # Whether the widget needs to be redrawn when the bar moves it, e.g. because it
+    # places other windows relative to itself, rather than copying what it last drew
+    redraw_on_move = False
+
+    # Whether the widget can be rendered on a worker thread with the bar's
+    # threaded_rendering option, i.e. it only uses its drawer to draw itself
+    render_in_thread = True
+
     defaults: list[tuple[str, Any, str]] = [
         ("background", None, "Widget background color"),
         (
@@ -143,7 +156,7 @@ class _Widget(CommandObject, configurable.Configurable):
             raise confreader.ConfigError("Widget width must be an int")
 
         self.configured = False
-        self._futures: list[asyncio.Handle] = []
+        self._futures: list[asyncio.Handle | Subscription] = []
         self._mirrors: set[_Widget] = set()
         self.finalized = False
 
@@ -198,7 +211,12 @@ class _Widget(CommandObject, configurable.Configurable):
 
         self.qtile = qtile
         self.bar = bar
-        self.drawer = bar.window.create_drawer(self.bar.width, self.bar.height)
+        # The drawer only needs to cover the widget, not the whole bar. We may not know
+        # our length yet, so the bar fits the drawer to it before drawing the widget.
+        if bar.horizontal:
+            self.drawer = bar.window.create_drawer(self._length, bar.height)
+        else:
+            self.drawer = bar.window.create_drawer(bar.width, self._length)
 
         # Clear this flag as widget may be restarted (e.g. if screen removed and re-added)
         self.finalized = False
@@ -305,6 +323,11 @@ class _Widget(CommandObject, configurable.Configurable):
         elif self.bar.screen.right is self.bar:
             self.rotate_drawer_right()
 
+    def fit_drawer(self):
+        """Resize the drawer to the space allocated to the widget by the bar."""
+        self.drawer.width = self.width
+        self.drawer.height = self.height
+
     def draw_at_default_position(self):
         """Default position to draw the widget in horizontal and vertical bars."""
         self.drawer.draw(
@@ -319,6 +342,19 @@ class _Widget(CommandObject, configurable.Configurable):
         """
         raise NotImplementedError
 
+    def request_draw(self):
+        """
+        Ask for the widget to be drawn on the next frame. This can be called
+        any number of times before then, but the widget is only drawn once.
+        The same restriction on the length of the widget applies as for draw.
+        """
+        self.qtile.schedule_draw(self, self._scheduled_draw)
+
+    def _scheduled_draw(self):
+        # The widget may have been finalized since the draw was requested
+        if not self.finalized:
+            self.draw()
+
     def calculate_length(self):
         """
         Must be implemented if the widget can take CALCULATED for length.
@@ -342,13 +378,35 @@ class _Widget(CommandObject, configurable.Configurable):
         self._futures.append(future)
         return future
 
+    def sample(self, interval, callback, *sources):
+        """
+        Call the callback with a sample of each of the sources (see
+        ``libqtile.core.sampler.Source``) every interval. The sources are read
+        once for all of the widgets that use them at the same interval.
+        """
+        if self.finalized:
+            return
+
+        subscription = self.qtile.sampler.subscribe(interval, callback, *sources)
+        self._futures.append(subscription)
+        return subscription
+
     def call_process(self, command, **kwargs):
         """
-        This method uses `subprocess.check_output` to run the given command
-        and return the string from stdout, which is decoded when using
-        Python 3.
+        Run the given command and return the string from stdout, like
+        ``subprocess.check_output()``, whose keyword arguments it takes. Commands are
+        run by the shared runner in ``libqtile.core.processes``, which kills them
+        after a timeout; see its ``run_sync()``. As this waits for the command, it
+        should be called from a worker thread, e.g. in a ``BackgroundPoll`` widget's
+        ``poll()``, rather than from the event loop: there, use ``acall_process()``.
         """
-        return subprocess.check_output(command, **kwargs, encoding="utf-8")
+        # Like check_output(), leave stderr alone unless told otherwise
+        kwargs.setdefault("stderr", None)
+        return processes.runner.run_sync(command, **kwargs)
+
+    async def acall_process(self, command, **kwargs):
+        """The async version of ``call_process()``"""
+        return await processes.runner.run(command, **kwargs)
 
     def _remove_dead_timers(self):
         """Remove completed and cancelled timers from the list."""
@@ -409,7 +467,7 @@ class _Widget(CommandObject, configurable.Configurable):
             # infinite loop when we call bar.draw(). mirror.draw() will trigger a resize
             # if it's the wrong size.
             if mirror.length_type == bar.CALCULATED and mirror.bar is not self.bar:
-                mirror.bar.draw()
+                mirror.bar.draw(mirror)
             else:
                 mirror.draw()
 
@@ -509,6 +567,8 @@ class _TextBox(_Widget):
         self._scroll_queued = False
         self._scroll_timer = None
         self._scroll_width = width
+        self._scroll_raster = None
+        self._scroll_raster_key = None
 
     @property
     def text(self):
@@ -637,7 +697,10 @@ class _TextBox(_Widget):
             x = self.padding if self.length_type != bar.STATIC else 0
             y = (self.bar.size - self.layout.height) / 2 + 1
 
-        self.layout.draw(x - self._scroll_offset, y)
+        if self._should_scroll:
+            self._draw_scrolled_text(x, y, height)
+        else:
+            self.layout.draw(x - self._scroll_offset, y)
         self.drawer.ctx.restore()
 
         self.draw_at_default_position()
@@ -654,6 +717,37 @@ class _TextBox(_Widget):
                 interval = self.scroll_interval
             self._scroll_timer = self.timeout_add(interval, self.do_scroll)
 
+    def _draw_scrolled_text(self, x, y, height):
+        """
+        Paint the scrolled text from an image of the whole text, so that each scroll
+        step doesn't need to render the text again. The image is only rendered again
+        when the text or how it looks changes.
+        """
+        layout = self.layout
+        key = (
+            self.formatted_text,
+            layout.text,
+            layout.font_family,
+            layout.font_size,
+            layout.colour,
+            layout.font_shadow,
+            layout.markup,
+            layout.width,
+            height,
+            y,
+            self.drawer.output_scale,
+        )
+        # Leave some room for the shadow and for glyphs overhanging the layout
+        margin = 2
+        if self._scroll_raster is None or key != self._scroll_raster_key:
+            self._scroll_raster = layout.rasterize(margin, y, layout.width + 2 * margin, height)
+            self._scroll_raster_key = key
+
+        self.drawer.ctx.set_source_surface(
+            self._scroll_raster, x - self._scroll_offset - margin, 0
+        )
+        self.drawer.ctx.paint()
+
     def do_scroll(self):
         # Allow the next scroll tick to be queued
         self._scroll_queued = False
@@ -681,7 +775,7 @@ class _TextBox(_Widget):
                 self._scroll_timer = self.timeout_add(self.scroll_delay, self.hide_scroll)
             # If neither of these options then the text is no longer updated.
 
-        self.draw()
+        self.request_draw()
 
     def reset_scroll(self):
         self._scroll_offset = 0
@@ -689,7 +783,7 @@ class _TextBox(_Widget):
         self._scroll_queued = False
         if self._scroll_timer:
             self._scroll_timer.cancel()
-        self.draw()
+        self.request_draw()
 
     def hide_scroll(self):
         self.update("")
@@ -725,7 +819,7 @@ class _TextBox(_Widget):
             self.layout.font_shadow = self.fontshadow
             self.layout.colour = self.foreground
             self.layout.markup = self.markup
-        self.bar.draw()
+        self.bar.draw(self)
 
     @expose_command()
     def info(self):
@@ -751,11 +845,11 @@ class _TextBox(_Widget):
         self.text = text
 
         # If our width hasn't changed, we just draw ourselves. Otherwise,
-        # we draw the whole bar.
+        # the bar needs to make room for us.
         if self.layout.width == old_width and (self.bar.horizontal or self.rotate):
-            self.draw()
+            self.request_draw()
         else:
-            self.bar.draw()
+            self.bar.draw(self)
 
 
 class InLoopPollText(_TextBox):
@@ -777,8 +871,54 @@ class InLoopPollText(_TextBox):
     def __init__(self, default_text="N/A", **config):
         _TextBox.__init__(self, default_text, **config)
         self.add_defaults(InLoopPollText.defaults)
+        self._read_task = None
+
+    def sources(self):
+        """
+        The system metrics that the widget shows, as a list of
+        ``libqtile.core.sampler.Source``. Widgets that have sources are given
+        samples of them every ``update_interval`` by the sampler, which reads them
+        once for all of the widgets that use them, and turn them into text with
+        ``parse()``. The sources are read on a worker thread, and the widget shows
+        its default text until the first sample arrives.
+        """
+        return []
+
+    def parse(self, *samples):
+        """Return the text to show for a sample of each of the widget's sources"""
+        raise NotImplementedError
+
+    def on_error(self, error):
+        """
+        Return the text to show when the widget's sources can't be read, with the
+        error that was raised, or None to leave the text as it is.
+        """
+        return None
+
+    def _sampled(self, *samples):
+        self.update(self.parse(*samples))
+
+    async def _read_now(self, sources):
+        try:
+            samples = await self.qtile.sampler.read_now(*sources)
+        except Exception as e:
+            logger.exception("Failed to read the sources of %s.", self.name)
+            if not self.finalized:
+                text = self.on_error(e)
+                if text is not None:
+                    self.update(text)
+            return
+        if not self.finalized:
+            self._sampled(*samples)
 
     def timer_setup(self):
+        sources = self.sources()
+        if sources:
+            self.tick()
+            if self.update_interval is not None:
+                self.sample(self.update_interval, self._sampled, *sources)
+            return
+
         update_interval = self.tick()
         # If self.update_interval is defined and .tick() returns None, re-call
         # after self.update_interval
@@ -794,9 +934,18 @@ class InLoopPollText(_TextBox):
         _TextBox.button_press(self, x, y, button)
 
     def poll(self):
+        sources = self.sources()
+        if sources:
+            return self.parse(*(source.read() for source in sources))
         return "N/A"
 
     def tick(self):
+        sources = self.sources()
+        if sources:
+            # Read the sources on a worker thread rather than polling them here
+            if self._read_task is None or self._read_task.done():
+                self._read_task = create_task(self._read_now(sources))
+            return
         text = self.poll()
         self.update(text)
 
@@ -805,6 +954,11 @@ class InLoopPollText(_TextBox):
         """Immediately poll the widget. Existing timers are unaffected."""
         self.tick()
 
+    def finalize(self):
+        if self._read_task is not None:
+            self._read_task.cancel()
+        _TextBox.finalize(self)
+
 
 class BackgroundPoll(_TextBox):
     """A common interface for wrapping blocking events which when triggered
@@ -876,6 +1030,104 @@ class BackgroundPoll(_TextBox):
         super().finalize()
 
 
+class EventText(_TextBox):
+    """A common interface for text widgets that update when something changes,
+    rather than on a timer.
+
+    Widgets return what they watch from ``watches()``, as a list of
+    ``libqtile.core.watchers.Watch``: the lines of a long-running command, files
+    watched with inotify, kernel uevents or a readable file descriptor. Each
+    change is passed to ``on_event()`` and the widget's text is then updated with
+    ``poll()``, at most once every ``rate_limit`` seconds however many changes
+    there are. Nothing runs while nothing changes.
+
+    If what the widget watches can't be watched, e.g. without inotify, it polls
+    every ``fallback_interval`` seconds instead."""
+
+    defaults = [
+        (
+            "update_interval",
+            None,
+            "Also update every this many seconds, if none, the widget only updates when "
+            "what it watches changes.",
+        ),
+        (
+            "fallback_interval",
+            60,
+            "Update interval in seconds if what the widget watches can't be watched.",
+        ),
+        ("rate_limit", 0.1, "Minimum time in seconds between updates."),
+        ("restart_delay", 2, "Seconds to wait before restarting a watched command that exits."),
+    ]  # type: list[tuple[str, Any, str]]
+
+    def __init__(self, default_text="N/A", **config):
+        _TextBox.__init__(self, default_text, **config)
+        self.add_defaults(EventText.defaults)
+        self._watching = []
+        self._throttle = None
+
+    def watches(self):
+        """What the widget watches, as a list of ``libqtile.core.watchers.Watch``"""
+        return []
+
+    def on_event(self, event):
+        """
+        Called with each change to what the widget watches, e.g. a line of output or
+        the path of a file that changed, before the widget is updated.
+        """
+
+    def _event(self, event):
+        if self.finalized:
+            return
+        try:
+            self.on_event(event)
+        except Exception:
+            logger.exception("Error handling an event in %s", self.name)
+        self._throttle()
+
+    def timer_setup(self):
+        self._throttle = Throttle(self.rate_limit, self.tick)
+        interval = self.update_interval
+        for watch in self.watches():
+            try:
+                watch.start(self._event)
+            except OSError as e:
+                logger.info("%s can't watch for changes, polling instead: %s", self.name, e)
+                if self.fallback_interval is not None and (
+                    interval is None or interval > self.fallback_interval
+                ):
+                    interval = self.fallback_interval
+            else:
+                self._watching.append(watch)
+
+        self.tick()
+        if interval is not None:
+            self.timeout_add(interval, self._poll_every, (interval,))
+
+    def _poll_every(self, interval):
+        self.tick()
+        self.timeout_add(interval, self._poll_every, (interval,))
+
+    def poll(self):
+        return "N/A"
+
+    def tick(self):
+        self.update(self.poll())
+
+    @expose_command()
+    def force_update(self):
+        """Immediately poll the widget."""
+        self.tick()
+
+    def finalize(self):
+        for watch in self._watching:
+            watch.stop()
+        self._watching.clear()
+        if self._throttle is not None:
+            self._throttle.cancel()
+        _TextBox.finalize(self)
+
+
 class PaddingMixin(configurable.Configurable):
     """Mixin that provides padding(_x|_y|)."""
 
@@ -950,6 +1202,9 @@ class Mirror(_Widget):
     their contents. Currently, this is all widgets except for `Systray`.
     """
 
+    # We paint the widget's image, which it updates in place
+    render_in_thread = False
+
     def __init__(self, reflection, **config):
         _Widget.__init__(self, reflection.length, **config)
         self.reflects = reflection
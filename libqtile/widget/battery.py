@@ -1,17 +1,20 @@
+import asyncio
 import os
 import platform
 import re
 from abc import ABC, abstractmethod
 from enum import Enum, unique
 from pathlib import Path
-from subprocess import CalledProcessError, check_output
+from subprocess import SubprocessError
 from typing import Any, NamedTuple
 
 from libqtile import bar, configurable, images
 from libqtile.command.base import expose_command
+from libqtile.core.processes import runner
+from libqtile.core.watchers import UeventWatch
 from libqtile.images import Img
 from libqtile.log_utils import logger
-from libqtile.utils import ColorsType, send_notification
+from libqtile.utils import ColorsType, create_task, send_notification
 from libqtile.widget import base
 
 
@@ -88,8 +91,8 @@ class _FreeBSDBattery(_Battery):
 
     def update_status(self) -> BatteryStatus:
         try:
-            info = check_output(["acpiconf", "-i", self.battery]).decode("utf-8")
-        except CalledProcessError:
+            info = runner.run_sync(["acpiconf", "-i", self.battery], timeout=5)
+        except SubprocessError:
             raise RuntimeError("acpiconf exited incorrectly")
 
         stat_match = re.search(r"State:\t+([a-z]+)", info)
@@ -364,7 +367,7 @@ class _LinuxBattery(_Battery, configurable.Configurable):
         )
 
 
-class Battery(base.InLoopPollText):
+class Battery(base.EventText):
     """
     A text-based battery monitoring widget supporting both Linux and FreeBSD.
 
@@ -446,14 +449,19 @@ class Battery(base.InLoopPollText):
             None,
             "Background color on charging battery. Set to None to disable.",
         ),
-        ("update_interval", 60, "Seconds between status updates"),
+        (
+            "update_interval",
+            60,
+            "Seconds between status updates. On Linux, the widget also updates as soon "
+            "as the kernel reports a change to a power supply, e.g. when it is plugged in.",
+        ),
         ("battery", 0, "Which battery should be monitored (battery number or name)"),
         ("notify_below", None, "Send a notification below this battery level."),
         ("notification_timeout", 10, "Time in seconds to display notification. 0 for no expiry."),
     ]
 
     def __init__(self, **config) -> None:
-        base.InLoopPollText.__init__(self, "", **config)
+        base.EventText.__init__(self, "", **config)
         self.add_defaults(self.defaults)
 
         self._battery = self._load_battery(**config)
@@ -465,7 +473,7 @@ class Battery(base.InLoopPollText):
             self.low_background = self.background
         self.normal_background = self.background
 
-        base.InLoopPollText._configure(self, qtile, bar)
+        base.EventText._configure(self, qtile, bar)
 
     @expose_command()
     def charge_to_full(self):
@@ -475,6 +483,9 @@ class Battery(base.InLoopPollText):
     def charge_dynamically(self):
         self._battery.force_charge = False
 
+    def watches(self):
+        return [UeventWatch("power_supply")]
+
     @staticmethod
     def _load_battery(**config):
         """Function used to load the Battery object
@@ -605,6 +616,7 @@ class BatteryIcon(base._Widget):
         self.image_padding = 0
         self.images: dict[str, Img] = {}
         self.current_icon = "battery-missing"
+        self._images_task: asyncio.Task | None = None
 
         self._battery = self._load_battery(**config)
 
@@ -623,7 +635,8 @@ class BatteryIcon(base._Widget):
 
     def _configure(self, qtile, bar) -> None:
         base._Widget._configure(self, qtile, bar)
-        self.setup_images()
+        # The icons are decoded in the background and drawn once they are ready
+        self._images_task = create_task(self._load_images())
 
     def setup_images(self) -> None:
         d_imgs = images.Loader(self.theme_path)(*self.icon_names)
@@ -633,6 +646,20 @@ class BatteryIcon(base._Widget):
             img.resize(height=new_height)
             self.images[key] = img
 
+    async def _load_images(self) -> None:
+        new_height = (self.bar.size - 2) * self.scale
+        try:
+            d_imgs = await images.Loader(self.theme_path).load_async(
+                *self.icon_names, height=new_height
+            )
+        except Exception:
+            logger.exception("Could not load the battery icons from %s", self.theme_path)
+            return
+        finally:
+            self._images_task = None
+        self.images.update(d_imgs)
+        self.bar.draw(self)
+
     def calculate_length(self):
         if not self.images:
             return 0
@@ -645,14 +672,20 @@ class BatteryIcon(base._Widget):
         icon = self._get_icon_key(status)
         if icon != self.current_icon:
             self.current_icon = icon
-            self.draw()
+            self.request_draw()
 
     def draw(self) -> None:
         self.drawer.clear(self.background or self.bar.background)
-        image = self.images[self.current_icon]
-        self.drawer.draw_image(image, self.padding, (self.bar.size - image.height) // 2)
+        image = self.images.get(self.current_icon)
+        if image is not None:
+            self.drawer.draw_image(image, self.padding, (self.bar.size - image.height) // 2)
         self.draw_at_default_position()
 
+    def finalize(self) -> None:
+        if self._images_task is not None:
+            self._images_task.cancel()
+        base._Widget.finalize(self)
+
     @staticmethod
     def _get_icon_key(status: BatteryStatus) -> str:
         key = "battery"
@@ -1,5 +1,5 @@
 import os
-from subprocess import CalledProcessError, Popen
+from subprocess import Popen, SubprocessError
 
 from libqtile.log_utils import logger
 from libqtile.widget import base
@@ -70,6 +70,7 @@ class CheckUpdates(base.BackgroundPoll):
             "useful if it takes time to check system updates.",
         ),
         ("update_interval", 60, "Update interval in seconds."),
+        ("timeout", 120, "Seconds after which the command checking for updates is killed."),
         ("execute", None, "Command to execute on click"),
         ("display_format", "Updates: {updates}", "Display format if updates available"),
         ("colour_no_updates", "ffffff", "Colour when there's no updates."),
@@ -109,8 +110,8 @@ class CheckUpdates(base.BackgroundPoll):
     def _check_updates(self):
         # type: () -> str
         try:
-            updates = self.call_process(self.cmd, shell=True)
-        except CalledProcessError:
+            updates = self.call_process(self.cmd, shell=True, timeout=self.timeout)
+        except SubprocessError:
             updates = ""
         num_updates = self.custom_command_modify(len(updates.splitlines()))
 
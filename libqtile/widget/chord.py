@@ -44,7 +44,7 @@ class Chord(base._TextBox):
             else:
                 self.reset_colours()
 
-            self.bar.draw()
+            self.bar.draw(self)
 
         hook.subscribe.enter_chord(hook_enter_chord)
         hook.subscribe.leave_chord(self.clear)
@@ -56,4 +56,4 @@ class Chord(base._TextBox):
     def clear(self, *args):
         self.reset_colours()
         self.text = ""
-        self.bar.draw()
+        self.bar.draw(self)
@@ -1,5 +1,6 @@
 import psutil
 
+from libqtile.core.sampler import Source
 from libqtile.widget import base
 
 
@@ -25,11 +26,13 @@ class CPU(base.InLoopPollText):
         super().__init__("", **config)
         self.add_defaults(CPU.defaults)
 
-    def poll(self):
+    def sources(self):
+        return [Source(psutil.cpu_percent), Source(psutil.cpu_freq)]
+
+    def parse(self, percent, freq):
         variables = dict()
 
-        variables["load_percent"] = round(psutil.cpu_percent(), 1)
-        freq = psutil.cpu_freq()
+        variables["load_percent"] = round(percent, 1)
         if psutil.__version__ == "5.9.0":
             variables["freq_current"] = round(freq.current, 1)
         else:
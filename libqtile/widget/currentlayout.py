@@ -1,9 +1,11 @@
+import asyncio
 import itertools
 import os
 
 from libqtile import bar, hook
 from libqtile.images import Img
 from libqtile.log_utils import logger
+from libqtile.utils import create_task
 from libqtile.widget import base
 
 
@@ -26,6 +28,10 @@ class CurrentLayout(base._TextBox):
     - dirs in `custom_icon_paths` config argument
     - `~/.icons`
     - built-in qtile icons
+
+    The icons are decoded in the background when the bar is set up, and nothing is
+    drawn in their place until they are ready. If they can't be loaded, the names of
+    the layouts are shown instead.
     """
 
     defaults = [
@@ -54,6 +60,7 @@ class CurrentLayout(base._TextBox):
 
         self.icons_loaded = False
         self.img_length = 0
+        self._load_task = None
 
     def _configure(self, qtile, bar):
         assert self.mode in ("text", "icon", "both")
@@ -63,7 +70,7 @@ class CurrentLayout(base._TextBox):
         self.icon_paths = []
         self.surfaces = {}
         self._update_icon_paths()
-        self._setup_images()
+        self._load_task = create_task(self._setup_images())
         self.setup_hooks()
 
         self.add_callbacks(
@@ -90,7 +97,7 @@ class CurrentLayout(base._TextBox):
     def hook_response(self, layout, group):
         if group.screen is not None and group.screen == self.bar.screen:
             self.text = layout.name
-            self.bar.draw()
+            self.bar.draw(self)
 
     def setup_hooks(self):
         """
@@ -108,7 +115,7 @@ class CurrentLayout(base._TextBox):
         if self.mode == "both":
             return
         self.mode = "text" if self.mode != "text" else "icon"
-        self.bar.draw()
+        self.bar.draw(self)
 
     def draw(self):
         if self.mode != "text":
@@ -118,6 +125,12 @@ class CurrentLayout(base._TextBox):
 
     def draw_icon(self):
         if not self.icons_loaded:
+            # Leave the icon's space empty until it is decoded
+            if self.mode == "both":
+                base._TextBox.draw(self)
+            else:
+                self.drawer.clear(self.background or self.bar.background)
+                self.draw_at_default_position()
             return
         try:
             surface = self.surfaces[self.current_layout]
@@ -213,11 +226,12 @@ class CurrentLayout(base._TextBox):
                 if os.path.isfile(icon_file_path):
                     return icon_file_path
 
-    def _setup_images(self):
+    async def _setup_images(self):
         """
         Loads layout icons.
         """
         new_height = (self.bar.size - 2) * self.scale
+        paths = {}
         for names in self._get_layout_names():
             layout_name = names[0]
             # Python doesn't have an ordered set but we can use a dictionary instead
@@ -232,10 +246,20 @@ class CurrentLayout(base._TextBox):
             else:
                 logger.warning('No icon found for layout "%s"', layout_name)
                 icon_file_path = self.find_icon_file_path("unknown")
+            paths[layout_name] = icon_file_path
 
-            img = Img.from_path(icon_file_path)
-
-            img.resize(height=new_height)
+        try:
+            imgs = await asyncio.gather(
+                *(Img.load_async(path, height=new_height) for path in paths.values())
+            )
+        except Exception:
+            logger.exception("Could not load the layout icons, showing their names instead")
+            self.mode = "text"
+            self.bar.draw(self)
+            return
+        finally:
+            self._load_task = None
+        for layout_name, img in zip(paths, imgs):
             img_length = img.width if self.bar.horizontal else img.height
             if img_length > self.img_length:
                 self.img_length = img_length
@@ -243,7 +267,11 @@ class CurrentLayout(base._TextBox):
             self.surfaces[layout_name] = img
 
         self.icons_loaded = True
+        if self.mode != "text":
+            self.bar.draw(self)
 
     def finalize(self):
+        if self._load_task is not None:
+            self._load_task.cancel()
         self.remove_hooks()
         base._TextBox.finalize(self)
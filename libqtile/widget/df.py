@@ -1,5 +1,6 @@
 import os
 
+from libqtile.core.sampler import Source
 from libqtile.widget import base
 
 
@@ -40,8 +41,10 @@ class DF(base.InLoopPollText):
 
         base.InLoopPollText.draw(self)
 
-    def poll(self):
-        statvfs = os.statvfs(self.partition)
+    def sources(self):
+        return [Source(os.statvfs, (self.partition,))]
+
+    def parse(self, statvfs):
 
         size = statvfs.f_frsize * statvfs.f_blocks / self.calc
         free = statvfs.f_frsize * statvfs.f_bfree / self.calc
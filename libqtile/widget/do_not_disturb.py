@@ -1,11 +1,11 @@
-from subprocess import check_output
+from subprocess import SubprocessError
 
 from libqtile.lazy import lazy
 from libqtile.log_utils import logger
 from libqtile.widget import base
 
 
-class DoNotDisturb(base.InLoopPollText):
+class DoNotDisturb(base.BackgroundPoll):
     """
     Displays Do Not Disturb status for notification server Dunst by default.
     Can be used with other servers by changing the poll command and mouse callbacks.
@@ -18,7 +18,7 @@ class DoNotDisturb(base.InLoopPollText):
             "Function that returns the notification server status. "
             "Define the function on your configuration file and "
             "pass it like poll_function=my_func. "
-            "Must return either true or false",
+            "Must return either true or false. It is run on a worker thread.",
         ),
         ("enabled_icon", "X", "Icon that displays when do not disturb is enabled"),
         ("disabled_icon", "O", "Icon that displays when do not disturb is disabled"),
@@ -26,7 +26,7 @@ class DoNotDisturb(base.InLoopPollText):
     ]
 
     def __init__(self, **config):
-        base.InLoopPollText.__init__(self, **config)
+        base.BackgroundPoll.__init__(self, **config)
         self.add_defaults(DoNotDisturb.defaults)
         self.status_retrieved_error = False
         if self.poll_function is None:
@@ -38,10 +38,14 @@ class DoNotDisturb(base.InLoopPollText):
             )
 
     def dunst_status(self):
-        status = check_output(["dunstctl", "is-paused"]).strip()
-        if status == b"true":
-            return True
-        return False
+        try:
+            status = self.call_process(["dunstctl", "is-paused"], timeout=5).strip()
+        except (SubprocessError, OSError):
+            if not self.status_retrieved_error:
+                logger.exception("Could not get the status of dunst")
+                self.status_retrieved_error = True
+            return False
+        return status == "true"
 
     def poll(self):
         check = None
@@ -1,8 +1,7 @@
 import json
 from typing import Any
 
-import aiohttp
-
+from libqtile.core.http_client import client as http_client
 from libqtile.log_utils import logger
 from libqtile.widget import base
 
@@ -22,6 +21,10 @@ except ImportError:
 class GenPollUrl(base.BackgroundPoll):
     """A generic text widget that polls an url and parses it using parse function
 
+    Widgets share their connections, and responses are cached, also on disk, so that
+    restarting Qtile doesn't fetch everything again. Once a response is older than
+    ``cache_ttl`` it is revalidated with the server, which only sends it again if it
+    has changed.
 
     Widget requirements: aiohttp_.
 
@@ -36,6 +39,13 @@ class GenPollUrl(base.BackgroundPoll):
         ("user_agent", "Qtile", "Set the user agent"),
         ("headers", {}, "Extra Headers"),
         ("xml", False, "Is XML?"),
+        (
+            "cache_ttl",
+            None,
+            "How long a response is used for, in seconds, before it is fetched again, "
+            "including after a restart. By default it is just under ``update_interval``, "
+            "so that each poll fetches it. POST requests aren't cached.",
+        ),
     ]
 
     def __init__(self, **config):
@@ -56,18 +66,25 @@ class GenPollUrl(base.BackgroundPoll):
         headers = self.headers.copy()
         data = self.data
 
+        if self.cache_ttl is not None:
+            ttl = self.cache_ttl
+        else:
+            ttl = self.update_interval * 0.9 if self.update_interval else 0
+
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.request(
-                    method="POST" if data else "GET", url=self.url, data=data, headers=headers
-                ) as response:
-                    if self.json:
-                        body = await response.json()
-                    elif self.xml:
-                        text_body = await response.text()
-                        body = xmlparse(text_body)
-                    else:
-                        body = await response.text()
+            response = await http_client.fetch(
+                self.url,
+                method="POST" if data else "GET",
+                data=data,
+                headers=headers,
+                ttl=ttl,
+            )
+            if self.json:
+                body = response.json()
+            elif self.xml:
+                body = xmlparse(response.text)
+            else:
+                body = response.text
 
             text = self.parse(body)
         except Exception:
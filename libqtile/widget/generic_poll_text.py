@@ -1,3 +1,4 @@
+from libqtile.core.watchers import CommandWatch, Throttle
 from libqtile.utils import acall_process
 from libqtile.widget import base
 
@@ -25,23 +26,59 @@ class GenPollText(base.BackgroundPoll):
 
 
 class GenPollCommand(base.BackgroundPoll):
-    """A generic text widget to display output from scripts or shell commands"""
+    """A generic text widget to display output from scripts or shell commands
+
+    Rather than running the command often to notice changes quickly, it can be
+    run whenever a long-running command like ``pactl subscribe`` prints
+    something:
+
+    .. code-block:: python
+
+        widget.GenPollCommand(
+            cmd="pamixer --get-volume-human",
+            watch_cmd="pactl subscribe",
+        )
+    """
 
     defaults = [
         ("update_interval", 60, "update time in seconds"),
         ("cmd", None, "command line as a string or list of arguments to execute"),
         ("shell", False, "run command through shell to enable piping and shell expansion"),
         ("parse", None, "Function to parse output of command"),
+        (
+            "watch_cmd",
+            None,
+            "A long-running command whose every line of output means that the widget "
+            "needs to be updated, e.g. ``pactl subscribe``. It is run like ``cmd`` and "
+            "started again if it exits.",
+        ),
+        ("rate_limit", 0.1, "Minimum time in seconds between updates from ``watch_cmd``."),
     ]
 
     def __init__(self, **config):
         base.BackgroundPoll.__init__(self, "", **config)
         self.add_defaults(GenPollCommand.defaults)
+        self._watch = None
+        self._throttle = None
 
     def _configure(self, qtile, bar):
         base.BackgroundPoll._configure(self, qtile, bar)
         self.add_callbacks({"Button1": self.force_update})
 
+    def timer_setup(self):
+        base.BackgroundPoll.timer_setup(self)
+        if self.watch_cmd:
+            self._throttle = Throttle(self.rate_limit, self.force_update)
+            self._watch = CommandWatch(self.watch_cmd, self.shell)
+            self._watch.start(lambda line: self._throttle())
+
+    def finalize(self):
+        if self._watch is not None:
+            self._watch.stop()
+        if self._throttle is not None:
+            self._throttle.cancel()
+        base.BackgroundPoll.finalize(self)
+
     async def apoll(self):
         out = await acall_process(self.cmd, self.shell)
         if self.parse:
@@ -1,11 +1,14 @@
 import itertools
+import math
 import operator
 import time
+from collections import deque
 from os import statvfs
 
 import cairocffi
 import psutil
 
+from libqtile.core.sampler import Source, file_source
 from libqtile.log_utils import logger
 from libqtile.widget import base
 
@@ -36,10 +39,13 @@ class _Graph(base._Widget, base.MarginMixin):
     def __init__(self, width=100, **config):
         base._Widget.__init__(self, width, **config)
         self.add_defaults(_Graph.defaults)
-        self.values = [0] * self.samples
         self.maxvalue = 0
         self.oldtime = time.time()
         self.lag_cycles = 0
+        # The graph as last rendered, see _render_graph
+        self._raster = None
+        self._raster_key = None
+        self.fulfill(0)
 
     def _configure(self, qtile, bar):
         super()._configure(qtile, bar)
@@ -47,7 +53,7 @@ class _Graph(base._Widget, base.MarginMixin):
             self.drawer.ctx.set_antialias(cairocffi.ANTIALIAS_NONE)
 
     def timer_setup(self):
-        self.timeout_add(self.frequency, self.update)
+        self.sample(self.frequency, self.update, *self.sources())
 
     @property
     def graphwidth(self):
@@ -60,48 +66,43 @@ class _Graph(base._Widget, base.MarginMixin):
     def step(self):
         return self.graphwidth / float(self.samples)
 
-    def _for_each_step(self, values):
-        yield from enumerate(
-            itertools.islice(
-                values,
-                max(int(-(self.graphwidth / self.step()) + len(values)), 0),
-                len(values),
-            )
-        )
+    def _set_source(self, ctx, colour):
+        # Gradients run down the whole widget, which starts above the graph's raster
+        ctx.save()
+        ctx.translate(0, -self._raster_y)
+        self.drawer.set_source_rgb(colour, ctx=ctx)
+        ctx.restore()
 
-    def _prepare_context(self):
-        self.drawer.ctx.set_line_join(cairocffi.LINE_JOIN_ROUND)
+    def _prepare_context(self, ctx):
+        ctx.set_line_join(cairocffi.LINE_JOIN_ROUND)
         if self.graph_color is not None:
-            self.drawer.set_source_rgb(self.graph_color)
-        self.drawer.ctx.set_line_width(self.line_width)
+            self._set_source(ctx, self.graph_color)
+        ctx.set_line_width(self.line_width)
 
-    def draw_box(self, x, y, values):
-        self._prepare_context()
-        for _, val in self._for_each_step(values):
+    def draw_box(self, ctx, x, y, values, step):
+        self._prepare_context(ctx)
+        for val in values:
             val = self.val(val)
-            self.drawer.ctx.rectangle(x, y - val, self.step(), val)
-            x += self.step()
-        self.drawer.ctx.fill()
-        self.drawer.ctx.stroke()
-
-    def draw_line(self, x, y, values):
-        self._prepare_context()
-        for _, val in self._for_each_step(values):
-            self.drawer.ctx.line_to(x, y - self.val(val))
-            x += self.step()
-        self.drawer.ctx.stroke()
-
-    def draw_linefill(self, x, y, values):
-        self._prepare_context()
-        for index, val in self._for_each_step(values):
-            self.drawer.ctx.line_to(x + index * self.step(), y - self.val(val))
-        self.drawer.ctx.stroke_preserve()
-        self.drawer.ctx.line_to(
-            x + (len(values) - 1) * self.step(), y - 1 + self.line_width / 2.0
-        )
-        self.drawer.ctx.line_to(x, y - 1 + self.line_width / 2.0)
-        self.drawer.set_source_rgb(self.fill_color)
-        self.drawer.ctx.fill()
+            ctx.rectangle(x, y - val, step, val)
+            x += step
+        ctx.fill()
+
+    def draw_line(self, ctx, x, y, values, step):
+        self._prepare_context(ctx)
+        for val in values:
+            ctx.line_to(x, y - self.val(val))
+            x += step
+        ctx.stroke()
+
+    def draw_linefill(self, ctx, x, y, values, step):
+        self._prepare_context(ctx)
+        for index, val in enumerate(values):
+            ctx.line_to(x + index * step, y - self.val(val))
+        ctx.stroke_preserve()
+        ctx.line_to(x + (len(values) - 1) * step, y - 1 + self.line_width / 2.0)
+        ctx.line_to(x, y - 1 + self.line_width / 2.0)
+        self._set_source(ctx, self.fill_color)
+        ctx.fill()
 
     def val(self, val):
         if self.start_pos == "bottom":
@@ -123,50 +124,152 @@ class _Graph(base._Widget, base.MarginMixin):
                 self.graphheight + self.border_width,
             )
             self.drawer.ctx.stroke()
-        x = self.margin_x + self.border_width
-        y = self.margin_y + self.border_width
-        if self.start_pos == "bottom":
-            y += self.graphheight
-        elif not self.start_pos == "top":
-            raise ValueError(f"Unknown starting position: {self.start_pos}.")
-        k = 1.0 / (self.maxvalue or 1)
-        scaled = [self.graphheight * val * k for val in reversed(self.values)]
 
-        if self.type == "box":
-            self.draw_box(x, y, scaled)
-        elif self.type == "line":
-            self.draw_line(x, y, scaled)
-        elif self.type == "linefill":
-            self.draw_linefill(x, y, scaled)
-        else:
-            raise ValueError(f"Unknown graph type: {self.type}.")
+        raster = self._render_graph()
+        if raster is not None:
+            # The raster has a column per sample, which is stretched to the graph's
+            # width, and spare rows for lines drawn at the top and bottom of the graph
+            pad = (raster.get_height() - self.graphheight) / 2
+            ctx = self.drawer.ctx
+            ctx.save()
+            ctx.translate(self.margin_x + self.border_width, self.margin_y + self.border_width)
+            ctx.scale(self.graphwidth / raster.get_width(), 1)
+            ctx.set_source_surface(raster, 0, -pad)
+            ctx.rectangle(0, -pad, raster.get_width(), raster.get_height())
+            ctx.fill()
+            ctx.restore()
 
         self.draw_at_default_position()
 
+    def _render_graph(self):
+        """
+        Render the samples to an image of the graph.
+
+        While the graph's scale and size stay the same, the last image is reused: it
+        is shifted to the left by the samples pushed since it was rendered, and only
+        the columns of the new samples are drawn. Images are not changed once they
+        have been rendered, as a draw that uses one may not have finished with it.
+        """
+        if self.graphwidth <= 0 or self.graphheight <= 0:
+            return None
+        if self.type not in ("box", "line", "linefill"):
+            raise ValueError(f"Unknown graph type: {self.type}.")
+        if self.start_pos not in ("bottom", "top"):
+            raise ValueError(f"Unknown starting position: {self.start_pos}.")
+
+        column = max(round(self.step()), 1)
+        pad = math.ceil(self.line_width / 2)
+        width = column * self.samples
+        height = self.graphheight + 2 * pad
+        self._raster_y = self.margin_y + self.border_width - pad
+        key = (
+            width,
+            height,
+            self.maxvalue,
+            self.type,
+            self.start_pos,
+            self.graph_color,
+            self.fill_color,
+            self.line_width,
+        )
+        new_samples, self._new_samples = self._new_samples, 0
+        previous = self._raster if key == self._raster_key else None
+        if previous is not None and not new_samples:
+            return previous
+
+        raster = cairocffi.ImageSurface(cairocffi.FORMAT_ARGB32, width, height)
+        with cairocffi.Context(raster) as ctx:
+            if self.type == "box":
+                ctx.set_antialias(cairocffi.ANTIALIAS_NONE)
+            if previous is None or new_samples >= self.samples:
+                self._draw_columns(ctx, 0, width, column, pad)
+            else:
+                shift = new_samples * column
+                ctx.set_source_surface(previous, -shift, 0)
+                ctx.paint()
+                # Tidy the start of the graph, where lines to samples that have just
+                # been dropped may still show, then draw the new samples.
+                self._draw_columns(ctx, 0, column + pad, column, pad)
+                self._draw_columns(ctx, width - shift - column - pad, width, column, pad)
+
+        self._raster = raster
+        self._raster_key = key
+        return raster
+
+    def _draw_columns(self, ctx, x1, x2, column, pad):
+        """Redraw the part of the graph's raster between x1 and x2"""
+        x1 = max(x1, 0)
+        ctx.save()
+        ctx.rectangle(x1, 0, x2 - x1, self.graphheight + 2 * pad)
+        ctx.clip()
+        ctx.set_operator(cairocffi.OPERATOR_CLEAR)
+        ctx.paint()
+        ctx.set_operator(cairocffi.OPERATOR_OVER)
+
+        # The samples that are drawn in or near the area, so that lines from the
+        # samples on either side of it are drawn as well
+        first = max(int((x1 - self.line_width) // column), 0)
+        last = min(math.ceil((x2 + self.line_width) / column) + 1, self.samples)
+        k = self.graphheight / (self.maxvalue or 1)
+        values = [val * k for val in itertools.islice(reversed(self.values), first, last)]
+        y = pad + self.graphheight if self.start_pos == "bottom" else pad
+        draw = getattr(self, f"draw_{self.type}")
+        draw(ctx, first * column, y, values, column)
+        ctx.restore()
+
     def push(self, value):
         if self.lag_cycles > self.samples:
             # compensate lag by sending the same value up to
             # the graph samples limit
             self.lag_cycles = 1
 
-        self.values = ([value] * min(self.samples, self.lag_cycles)) + self.values
-        self.values = self.values[: self.samples]
+        for _ in range(min(self.samples, self.lag_cycles)):
+            self.values.appendleft(value)
+            self._pushed += 1
+            self._new_samples += 1
+            # Keep the candidates for the maximum: the samples that aren't smaller
+            # than any sample pushed after them, from the oldest one
+            while self._maxima and self._maxima[-1][1] <= value:
+                self._maxima.pop()
+            self._maxima.append((self._pushed, value))
+            if self._maxima[0][0] <= self._pushed - self.samples:
+                self._maxima.popleft()
 
         if not self.fixed_upper_bound:
-            self.maxvalue = max(self.values)
-        self.draw()
+            self.maxvalue = self._maxima[0][1]
+        self.request_draw()
 
-    def update(self):
+    def update(self, *samples):
         # lag detection
         newtime = time.time()
         self.lag_cycles = int((newtime - self.oldtime) / self.frequency)
         self.oldtime = newtime
 
-        self.update_graph()
-        self.timeout_add(self.frequency, self.update)
+        self.update_graph(*samples)
+
+    def sources(self):
+        """
+        The system metrics that the graph shows, as a list of
+        ``libqtile.core.sampler.Source``, which are read by the sampler off the
+        event loop and once for all of the widgets that use them.
+        """
+        raise NotImplementedError
+
+    def update_graph(self, *samples):
+        """Add a sample of each of the graph's sources to the graph"""
+        raise NotImplementedError
 
     def fulfill(self, value):
-        self.values = [value] * len(self.values)
+        # The samples, newest first
+        self.values = deque([value] * self.samples, maxlen=self.samples)
+        self._pushed = self.samples
+        self._maxima = deque([(self._pushed, value)])
+        # Samples pushed since the graph was last rendered
+        self._new_samples = self.samples
+
+    def finalize(self):
+        self._raster = None
+        base._Widget.finalize(self)
 
 
 class CPUGraph(_Graph):
@@ -188,15 +291,17 @@ class CPUGraph(_Graph):
         _Graph.__init__(self, **config)
         self.add_defaults(CPUGraph.defaults)
         self.maxvalue = 100
-        self.oldvalues = self._getvalues()
+        if isinstance(self.core, int) and self.core > psutil.cpu_count() - 1:
+            raise ValueError(f"No such core: {self.core}")
+        self.oldvalues = self._getvalues(self.sources()[0].read())
 
-    def _getvalues(self):
+    def sources(self):
         if isinstance(self.core, int):
-            if self.core > psutil.cpu_count() - 1:
-                raise ValueError(f"No such core: {self.core}")
-            cpu = psutil.cpu_times(percpu=True)[self.core]
-        else:
-            cpu = psutil.cpu_times()
+            return [Source(psutil.cpu_times, (True,))]
+        return [Source(psutil.cpu_times)]
+
+    def _getvalues(self, cpu_times):
+        cpu = cpu_times[self.core] if isinstance(self.core, int) else cpu_times
 
         user = cpu.user * 100
         nice = cpu.nice * 100
@@ -205,8 +310,8 @@ class CPUGraph(_Graph):
 
         return (int(user), int(nice), int(sys), int(idle))
 
-    def update_graph(self):
-        nval = self._getvalues()
+    def update_graph(self, cpu_times):
+        nval = self._getvalues(cpu_times)
         oval = self.oldvalues
         busy = nval[0] + nval[1] + nval[2] - oval[0] - oval[1] - oval[2]
         total = busy + nval[3] - oval[3]
@@ -235,23 +340,25 @@ class MemoryGraph(_Graph):
 
     def __init__(self, **config):
         _Graph.__init__(self, **config)
-        val = self._getvalues()
+        val = self._getvalues(psutil.virtual_memory())
         self.maxvalue = val["MemTotal"]
 
         mem = val["MemTotal"] - val["MemFree"] - val["Buffers"] - val["Cached"]
         self.fulfill(mem)
 
-    def _getvalues(self):
+    def sources(self):
+        return [Source(psutil.virtual_memory)]
+
+    def _getvalues(self, mem):
         val = {}
-        mem = psutil.virtual_memory()
         val["MemTotal"] = int(mem.total / 1024 / 1024)
         val["MemFree"] = int(mem.free / 1024 / 1024)
         val["Buffers"] = int(mem.buffers / 1024 / 1024)
         val["Cached"] = int(mem.cached / 1024 / 1024)
         return val
 
-    def update_graph(self):
-        val = self._getvalues()
+    def update_graph(self, mem):
+        val = self._getvalues(mem)
         self.push(val["MemTotal"] - val["MemFree"] - val["Buffers"] - val["Cached"])
 
 
@@ -268,21 +375,22 @@ class SwapGraph(_Graph):
 
     def __init__(self, **config):
         _Graph.__init__(self, **config)
-        val = self._getvalues()
+        val = self._getvalues(psutil.swap_memory())
         self.maxvalue = val["SwapTotal"]
         swap = val["SwapTotal"] - val["SwapFree"]
         self.fulfill(swap)
 
-    def _getvalues(self):
+    def sources(self):
+        return [Source(psutil.swap_memory)]
+
+    def _getvalues(self, swap):
         val = {}
-        swap = psutil.swap_memory()
         val["SwapTotal"] = int(swap.total / 1024 / 1024)
         val["SwapFree"] = int(swap.free / 1024 / 1024)
         return val
 
-    def update_graph(self):
-        val = self._getvalues()
-
+    def update_graph(self, swap_memory):
+        val = self._getvalues(swap_memory)
         swap = val["SwapTotal"] - val["SwapFree"]
 
         # can change, swapon/off
@@ -319,17 +427,19 @@ class NetGraph(_Graph):
         if self.bandwidth_type != "down" and self.bandwidth_type != "up":
             raise ValueError(f"bandwidth type {self.bandwidth_type} not known!")
         self.bytes = 0
-        self.bytes = self._get_values()
+        self.bytes = self._get_values(psutil.net_io_counters(True))
 
-    def _get_values(self):
-        net = psutil.net_io_counters(pernic=True)
+    def sources(self):
+        return [Source(psutil.net_io_counters, (True,))]
+
+    def _get_values(self, net):
         if self.bandwidth_type == "up":
             return net[self.interface].bytes_sent
         if self.bandwidth_type == "down":
             return net[self.interface].bytes_recv
 
-    def update_graph(self):
-        val = self._get_values()
+    def update_graph(self, net):
+        val = self._get_values(net)
         change = val - self.bytes
         self.bytes = val
         self.push(change)
@@ -362,19 +472,20 @@ class HDDGraph(_Graph):
         self.add_defaults(HDDGraph.defaults)
         stats = statvfs(self.path)
         self.maxvalue = stats.f_blocks * stats.f_frsize
-        values = self._get_values()
+        values = self._get_values(stats)
         self.fulfill(values)
 
-    def _get_values(self):
-        stats = statvfs(self.path)
+    def sources(self):
+        return [Source(statvfs, (self.path,))]
+
+    def _get_values(self, stats):
         if self.space_type == "used":
             return (stats.f_blocks - stats.f_bfree) * stats.f_frsize
         else:
             return stats.f_bavail * stats.f_frsize
 
-    def update_graph(self):
-        val = self._get_values()
-        self.push(val)
+    def update_graph(self, stats):
+        self.push(self._get_values(stats))
 
 
 class HDDBusyGraph(_Graph):
@@ -394,17 +505,12 @@ class HDDBusyGraph(_Graph):
         self.path = f"/sys/block/{self.device}/stat"
         self._prev = 0
 
-    def _get_values(self):
-        try:
-            # io_ticks is field number 9
-            with open(self.path) as f:
-                io_ticks = int(f.read().split()[9])
-        except OSError:
-            return 0
+    def sources(self):
+        return [file_source(self.path)]
+
+    def update_graph(self, stat):
+        # io_ticks is field number 9
+        io_ticks = int(stat.split()[9])
         activity = io_ticks - self._prev
         self._prev = io_ticks
-        return activity
-
-    def update_graph(self):
-        val = self._get_values()
-        self.push(val)
+        self.push(activity)
@@ -36,7 +36,7 @@ class _GroupBase(base._TextBox, base.PaddingMixin, base.MarginMixin):
         self.setup_hooks()
 
     def _hook_response(self, *args, **kwargs):
-        self.bar.draw()
+        self.bar.draw(self)
 
     def setup_hooks(self):
         hook.subscribe.client_managed(self._hook_response)
@@ -1,3 +1,4 @@
+from libqtile.core.sampler import file_source
 from libqtile.widget import base
 
 
@@ -21,11 +22,13 @@ class HDD(base.InLoopPollText):
         self.path = f"/sys/block/{self.device}/stat"
         self._prev = 0
 
-    def poll(self):
+    def sources(self):
+        return [file_source(self.path)]
+
+    def parse(self, stat):
         variables = dict()
         # Field index 9 contains the number of milliseconds the device has been performing I/O operations
-        with open(self.path) as f:
-            io_ticks = int(f.read().split()[9])
+        io_ticks = int(stat.split()[9])
 
         variables["HDDPercent"] = round(
             max(min(((io_ticks - self._prev) / self.update_interval) / 10, 100.0), 0.0), 1
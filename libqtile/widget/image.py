@@ -4,11 +4,16 @@ from libqtile import bar
 from libqtile.command.base import expose_command
 from libqtile.images import Img
 from libqtile.log_utils import logger
+from libqtile.utils import create_task
 from libqtile.widget import base
 
 
 class Image(base._Widget, base.MarginMixin):
-    """Display a PNG image on the bar"""
+    """Display a PNG image on the bar
+
+    The image is decoded in the background, and the widget is empty until it is
+    ready.
+    """
 
     orientations = base.ORIENTATION_BOTH
     defaults = [
@@ -21,31 +26,54 @@ class Image(base._Widget, base.MarginMixin):
     def __init__(self, length=bar.CALCULATED, **config):
         base._Widget.__init__(self, length, **config)
         self.add_defaults(Image.defaults)
+        self.img = None
+        self._load_task = None
 
     def _configure(self, qtile, bar):
         base._Widget._configure(self, qtile, bar)
         self._update_image()
 
     def _update_image(self):
-        self.img = None
+        if self._load_task is not None:
+            self._load_task.cancel()
+            self._load_task = None
 
         if not self.filename:
             logger.warning("Image filename not set!")
+            self._set_image(None)
             return
 
         self.filename = os.path.expanduser(self.filename)
 
         if not os.path.exists(self.filename):
             logger.warning("Image does not exist: %s", self.filename)
+            self._set_image(None)
             return
 
-        img = Img.from_path(self.filename)
+        # The current image is shown until the new one is decoded
+        self._load_task = create_task(self._load_image(self.filename))
+
+    async def _load_image(self, filename):
+        new_height = self.bar.size - (self.margin_top * 2) if self.scale else None
+        try:
+            img = await Img.load_async(filename, height=new_height)
+        except Exception:
+            logger.exception("Could not load image: %s", filename)
+            img = None
+        else:
+            img.theta = self.rotate
+        self._load_task = None
+        self._set_image(img)
+
+    def _set_image(self, img):
+        old_length = self.calculate_length()
         self.img = img
-        img.theta = self.rotate
-        if not self.scale:
+        if not self.configured:
             return
-        new_height = self.bar.size - (self.margin_top * 2)
-        img.resize(height=new_height)
+        if self.calculate_length() == old_length:
+            self.request_draw()
+        else:
+            self.bar.draw(self)
 
     def draw(self):
         if self.img is None:
@@ -63,11 +91,10 @@ class Image(base._Widget, base.MarginMixin):
 
     @expose_command()
     def update(self, filename):
-        old_length = self.calculate_length()
         self.filename = filename
         self._update_image()
 
-        if self.calculate_length() == old_length:
-            self.draw()
-        else:
-            self.bar.draw()
+    def finalize(self):
+        if self._load_task is not None:
+            self._load_task.cancel()
+        base._Widget.finalize(self)
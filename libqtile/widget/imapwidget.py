@@ -1,20 +1,178 @@
-import imaplib
+import asyncio
 import re
+import ssl
 
 import keyring
 
+from libqtile.command.base import expose_command
 from libqtile.confreader import ConfigError
 from libqtile.log_utils import logger
+from libqtile.utils import create_task
 from libqtile.widget import base
 
+# The longest line read from the server, which is long enough for SEARCH responses
+# that list tens of thousands of messages
+LINE_LIMIT = 1024 * 1024
 
-class ImapWidget(base.BackgroundPoll):
+
+class ImapError(Exception):
+    pass
+
+
+def _quotable(string):
+    # Quoted strings can only have 7-bit characters, other than CR and LF
+    return string.isascii() and not any(c in string for c in "\r\n\0")
+
+
+def _quote(string):
+    return '"' + string.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+class ImapConnection:
+    """
+    A connection to an IMAP server that can wait for a mailbox to change with IDLE
+    """
+
+    def __init__(self, host, port=993, use_ssl=True, timeout=30):
+        self.host = host
+        self.port = port
+        self.use_ssl = use_ssl
+        self.timeout = timeout
+        self.capabilities = set()
+        self._reader = None
+        self._writer = None
+        self._tag = 0
+
+    async def connect(self):
+        context = ssl.create_default_context() if self.use_ssl else None
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port, ssl=context, limit=LINE_LIMIT),
+            self.timeout,
+        )
+        greeting = await self._readline()
+        if not greeting.startswith("* OK"):
+            raise ImapError(f"Unexpected greeting: {greeting}")
+
+    async def _readline(self, timeout=None):
+        line = await asyncio.wait_for(self._reader.readline(), timeout or self.timeout)
+        if not line:
+            raise ConnectionResetError("The IMAP server closed the connection")
+        return line.decode(errors="replace").rstrip("\r\n")
+
+    def _send(self, line):
+        self._writer.write(line.encode() + b"\r\n")
+
+    async def command(self, command, *args):
+        """
+        Run a command, returning its untagged responses. The arguments are sent as
+        quoted strings, or as literals if they can't be quoted, e.g. passwords with
+        characters other than ASCII.
+        """
+        self._tag += 1
+        tag = f"Q{self._tag}"
+        line = f"{tag} {command}".encode()
+        for arg in args:
+            if _quotable(arg):
+                line += b" " + _quote(arg).encode()
+                continue
+            # Send the length, and then the string once the server is ready for it
+            data = arg.encode()
+            self._writer.write(line + b" {%d}\r\n" % len(data))
+            await self._writer.drain()
+            response = await self._readline()
+            if not response.startswith("+"):
+                raise ImapError(f"The literal was refused: {response}")
+            line = data
+        self._writer.write(line + b"\r\n")
+        await self._writer.drain()
+        return await self._complete(tag)
+
+    async def _complete(self, tag):
+        untagged = []
+        while True:
+            line = await self._readline()
+            if line.startswith(tag + " "):
+                status = line[len(tag) + 1 :]
+                if not status.startswith("OK"):
+                    raise ImapError(status)
+                return untagged
+            if line.startswith("* "):
+                untagged.append(line[2:])
+
+    async def login(self, user, password):
+        untagged = await self.command("LOGIN", user, password)
+        untagged += await self.command("CAPABILITY")
+        for response in untagged:
+            if response.upper().startswith("CAPABILITY "):
+                self.capabilities = set(response.upper().split()[1:])
+
+    async def examine(self, mbox):
+        await self.command(f"EXAMINE {mbox}")
+
+    async def unseen(self):
+        """The number of unseen messages in the examined mailbox"""
+        if "ESEARCH" in self.capabilities:
+            # Rather than every unseen message, ask for just the count
+            responses = await self.command("SEARCH RETURN (COUNT) UNSEEN")
+            for response in responses:
+                match = re.match(r"ESEARCH .*\bCOUNT (\d+)", response, re.IGNORECASE)
+                if match:
+                    return int(match.group(1))
+            # A server may send no ESEARCH response when nothing matches
+            return 0
+
+        # STATUS mustn't be used on the examined mailbox, so list the unseen messages
+        responses = await self.command("SEARCH UNSEEN")
+        searches = [r.split()[1:] for r in responses if r.upper().split()[:1] == ["SEARCH"]]
+        if not searches:
+            raise ImapError(f"The server didn't list the unseen messages: {responses}")
+        return sum(len(numbers) for numbers in searches)
+
+    async def idle(self, timeout):
+        """
+        Wait for the mailbox to change for up to ``timeout`` seconds, returning
+        whether it did
+        """
+        self._tag += 1
+        tag = f"Q{self._tag}"
+        self._send(f"{tag} IDLE")
+        await self._writer.drain()
+        line = await self._readline()
+        if not line.startswith("+"):
+            raise ImapError(f"IDLE was refused: {line}")
+
+        changed = False
+        try:
+            while not changed:
+                line = await self._readline(timeout)
+                # New, expunged or flagged messages
+                changed = bool(re.match(r"\* \d+ (EXISTS|EXPUNGE|FETCH)", line, re.IGNORECASE))
+        except TimeoutError:
+            pass
+        self._send("DONE")
+        await self._writer.drain()
+        await self._complete(tag)
+        return changed
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            self._reader = None
+
+
+class ImapWidget(base._TextBox):
     """Email IMAP widget
 
     This widget will scan one of your imap email boxes and report the number of
     unseen messages present.  I've configured it to only work with imap with
     ssl. Your password can be obtained from the Gnome Keyring.
 
+    The widget stays connected to the server, which tells it when the mailbox
+    changes with IDLE. Servers that don't support IDLE are polled every
+    ``update_interval`` seconds over the same connection. If the connection is
+    lost, the widget reconnects, waiting longer each time that doesn't work.
+
     Writing your password to the keyring initially is as simple as (changing
     out <userid> and <password> for your userid and password):
 
@@ -54,12 +212,23 @@ class ImapWidget(base.BackgroundPoll):
         ("user", None, "email username"),
         ("password", None, "email password"),
         ("server", None, "email server name"),
+        ("port", 993, "email server port"),
+        ("ssl", True, "connect to the server with ssl"),
         ("hide_no_unseen", False, "hide when there are no unseen messages"),
+        ("update_interval", 600, "Update interval in seconds, for servers without IDLE."),
+        (
+            "idle_timeout",
+            300,
+            "Seconds after which IDLE is restarted, to keep the connection alive.",
+        ),
+        ("reconnect_delay", 2, "Seconds to wait before reconnecting the first time."),
+        ("max_reconnect_delay", 300, "The longest to wait before reconnecting, in seconds."),
     ]
 
     def __init__(self, **config):
-        base.BackgroundPoll.__init__(self, "", **config)
+        base._TextBox.__init__(self, "", **config)
         self.add_defaults(ImapWidget.defaults)
+        self._task = None
         if self.user is None:
             raise ConfigError("You must set the 'user' parameter for the IMAP widget.")
 
@@ -70,18 +239,57 @@ class ImapWidget(base.BackgroundPoll):
             else:
                 logger.critical("Gnome Keyring Error")
 
-    def poll(self):
-        im = imaplib.IMAP4_SSL(self.server, 993)
+    async def _run(self):
+        delay = self.reconnect_delay
+        while True:
+            connection = ImapConnection(self.server, self.port, self.ssl)
+            try:
+                await connection.connect()
+                await connection.login(self.user, self.password)
+                await connection.examine(self.mbox)
+                delay = self.reconnect_delay
+                idle = "IDLE" in connection.capabilities
+                if not idle:
+                    logger.info("%s doesn't support IDLE, polling it instead", self.server)
+                while True:
+                    self.update(self._format(await connection.unseen()))
+                    if idle:
+                        # Wait for a change, restarting IDLE now and then so that
+                        # neither the server nor the network drop the connection
+                        while not await connection.idle(self.idle_timeout):
+                            await connection.command("NOOP")
+                    else:
+                        await asyncio.sleep(self.update_interval)
+            # ValueError covers lines that are too long and responses that don't parse
+            except (OSError, ImapError, TimeoutError, ValueError) as e:
+                logger.warning(
+                    "Lost the connection to %s, reconnecting in %ss: %s", self.server, delay, e
+                )
+            finally:
+                connection.close()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    def _format(self, count):
+        if count == 0 and self.hide_no_unseen:
+            return ""
+        return self.label + str(count)
+
+    def timer_setup(self):
         if self.password is None:
-            text = "No password error"
-        else:
-            im.login(self.user, self.password)
-            status, response = im.status(self.mbox, "(UNSEEN)")
-            im.logout()
-            text = response[0].decode()
-            count = re.sub(r"\).*$", "", re.sub(r"^.*N\s", "", text))
-            if count == "0" and self.hide_no_unseen:
-                return ""
-
-            text = self.label + count
-        return text
+            self.update("No password error")
+            return
+        self._task = create_task(self._run())
+
+    @expose_command()
+    def force_update(self):
+        """Reconnect to the server and count the unseen messages again."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = create_task(self._run())
+
+    def finalize(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        base._TextBox.finalize(self)
@@ -75,6 +75,8 @@ class KeyboardKbdd(base.BackgroundPoll):
         if self.colours:
             self._set_colour(layout_changed)
         self.keyboard = self.configured_keyboards[layout_changed]
+        # Show the new layout straight away, rather than at the next poll
+        self.update(self.keyboard)
 
     def _set_colour(self, index):
         if isinstance(self.colours, list):
@@ -1,30 +1,47 @@
-import re
+from __future__ import annotations
+
 from abc import ABCMeta, abstractmethod
 from pathlib import Path
-from subprocess import CalledProcessError, check_output
+from subprocess import SubprocessError
+from typing import TYPE_CHECKING
 
+from libqtile import hook
 from libqtile.command.base import expose_command
 from libqtile.confreader import ConfigError
 from libqtile.core.manager import Qtile
+from libqtile.core.processes import runner
 from libqtile.log_utils import logger
+from libqtile.utils import create_task
 from libqtile.widget import base
 
+if TYPE_CHECKING:
+    from libqtile.backend.x11.xcbq import Xkb
+
 
 class _BaseLayoutBackend(metaclass=ABCMeta):
     def __init__(self, qtile: Qtile):
         """
         This handles getting and setter the keyboard layout with the appropriate
-        backend.
+        backend. The backend's core fires the keyboard_layout_change hook when the
+        layout changes.
         """
+        self.core = qtile.core
+
+    def configure(self, keyboards: list[str], options: str | None) -> None:
+        """
+        Prepare to switch between the keyboard layouts, and set the first one.
+        """
+        self.set_keyboard(keyboards[0], options)
 
-    @abstractmethod
     def get_keyboard(self) -> str:
         """
         Return the currently used keyboard layout as a string
 
         Examples: "us", "us dvorak".  In case of error returns "unknown".
         """
+        return self.core.keyboard_layout or "unknown"
 
+    @abstractmethod
     def set_keyboard(self, layout: str, options: str | None) -> None:
         """
         Set the keyboard layout with specified options.
@@ -32,60 +49,84 @@ class _BaseLayoutBackend(metaclass=ABCMeta):
 
 
 class _X11LayoutBackend(_BaseLayoutBackend):
-    kb_layout_regex = re.compile(r"layout:\s+(?P<layout>[\w-]+)")
-    kb_variant_regex = re.compile(r"variant:\s+(?P<variant>[\w-]+)")
+    """
+    Loads a keymap with all of the configured layouts as its groups, and then
+    switches between them with XKB, which needs no processes and tells the core
+    about the switch. A keymap can only have four groups, so with more layouts
+    than that each switch loads a keymap with setxkbmap.
+    """
 
-    def get_keyboard(self) -> str:
+    def __init__(self, qtile: Qtile) -> None:
+        from libqtile.backend.x11 import core as x11core
+
+        _BaseLayoutBackend.__init__(self, qtile)
+        assert isinstance(qtile.core, x11core.Core)
+        xkb = getattr(qtile.core.conn, "xkeyboard", None)
+        if xkb is None:
+            raise ConfigError("KeyboardLayout needs the X server to have the XKB extension")
+        self.xkb: Xkb = xkb
+        self.keyboards: list[str] = []
+
+    def configure(self, keyboards: list[str], options: str | None) -> None:
+        if len(keyboards) > self.xkb.MAX_GROUPS:
+            self.keyboards = []
+            self.set_keyboard(keyboards[0], options)
+            return
+
+        self.keyboards = keyboards
+        if self.xkb.layouts == keyboards and not options:
+            # The keymap already has the layouts
+            self.xkb.lock_group(0)
+            return
+
+        layouts = []
+        variants = []
+        for keyboard in keyboards:
+            layout, _, variant = keyboard.partition(" ")
+            layouts.append(layout)
+            variants.append(variant)
+        command = ["setxkbmap", "-layout", ",".join(layouts), "-variant", ",".join(variants)]
+        create_task(self._load_keymap(command, options, group=0))
+
+    async def _load_keymap(self, command: list[str], options: str | None, group: int) -> None:
+        if options:
+            command = [*command, "-option", options]
         try:
-            command = "setxkbmap -verbose 10 -query"
-            setxkbmap_output = check_output(command.split(" ")).decode()
-        except CalledProcessError:
-            logger.exception("Can not get the keyboard layout:")
-            return "unknown"
+            await runner.run(command, timeout=5)
+        except SubprocessError:
+            logger.error("Cannot change the keyboard layout.")
+            return
         except OSError:
-            logger.exception("Please, check that xset is available:")
-            return "unknown"
+            logger.error("Please, check that setxkbmap is available.")
+            return
 
-        match_layout = self.kb_layout_regex.search(setxkbmap_output)
-        if match_layout is None:
-            return "ERR"
-        keyboard = match_layout.group("layout")
+        # Load Xmodmap if it's available
+        if Path("~/.Xmodmap").expanduser().is_file():
+            try:
+                await runner.run("xmodmap $HOME/.Xmodmap", shell=True, timeout=5)
+            except SubprocessError:
+                logger.error("Could not load ~/.Xmodmap.")
 
-        match_variant = self.kb_variant_regex.search(setxkbmap_output)
-        if match_variant:
-            keyboard += " " + match_variant.group("variant")
-        return keyboard
+        self.xkb.refresh_layouts()
+        self.xkb.lock_group(group)
 
     def set_keyboard(self, layout: str, options: str | None) -> None:
+        if layout in self.keyboards:
+            self.xkb.lock_group(self.keyboards.index(layout))
+            return
+
         command = ["setxkbmap"]
         command.extend(layout.split(" "))
-        if options:
-            command.extend(["-option", options])
-        try:
-            check_output(command)
-        except CalledProcessError:
-            logger.error("Cannot change the keyboard layout.")
-        except OSError:
-            logger.error("Please, check that setxkbmap is available.")
-        else:
-            # Load Xmodmap if it's available
-            if Path("~/.Xmodmap").expanduser().is_file():
-                try:
-                    check_output("xmodmap $HOME/.Xmodmap", shell=True)
-                except CalledProcessError:
-                    logger.error("Could not load ~/.Xmodmap.")
+        create_task(self._load_keymap(command, options, group=0))
 
 
 class _WaylandLayoutBackend(_BaseLayoutBackend):
     def __init__(self, qtile: Qtile) -> None:
         from libqtile.backend.wayland import core as waylandcore
 
+        _BaseLayoutBackend.__init__(self, qtile)
         assert isinstance(qtile.core, waylandcore.Core)
         self.set_keymap = qtile.core.set_keymap
-        self._layout: str = ""
-
-    def get_keyboard(self) -> str:
-        return self._layout
 
     def set_keyboard(self, layout: str, options: str | None) -> None:
         maybe_variant: str | None = None
@@ -94,7 +135,6 @@ class _WaylandLayoutBackend(_BaseLayoutBackend):
         else:
             layout_name = layout
         self.set_keymap(layout_name, options, maybe_variant)
-        self._layout = layout
 
 
 layout_backends = {
@@ -103,7 +143,7 @@ layout_backends = {
 }
 
 
-class KeyboardLayout(base.InLoopPollText):
+class KeyboardLayout(base._TextBox):
     """Widget for changing and displaying the current keyboard layout
 
     To use this widget effectively you need to specify keyboard layouts you want to use
@@ -114,12 +154,15 @@ class KeyboardLayout(base.InLoopPollText):
 
         Key([mod], "space", lazy.widget["keyboardlayout"].next_keyboard(), desc="Next keyboard layout."),
 
-    When running Qtile with the X11 backend, this widget requires setxkbmap to be available.
-    Xmodmap will also be used if .Xmodmap file is available.
+    The widget is updated when the layout changes, rather than polling it. When running
+    Qtile with the X11 backend, the configured layouts are loaded as one keymap with
+    setxkbmap, unless the keymap already has them, and are then switched between
+    without running anything. Xmodmap will also be used if .Xmodmap file is available.
+    An X11 keymap can only have four layouts, so with more than that each switch runs
+    setxkbmap.
     """
 
     defaults = [
-        ("update_interval", 1, "Update time in seconds."),
         (
             "configured_keyboards",
             ["us"],
@@ -138,18 +181,28 @@ class KeyboardLayout(base.InLoopPollText):
     ]
 
     def __init__(self, **config):
-        base.InLoopPollText.__init__(self, **config)
+        base._TextBox.__init__(self, "", **config)
         self.add_defaults(KeyboardLayout.defaults)
         self.add_callbacks({"Button1": self.next_keyboard})
 
     def _configure(self, qtile, bar):
-        base.InLoopPollText._configure(self, qtile, bar)
+        base._TextBox._configure(self, qtile, bar)
 
         if qtile.core.name not in layout_backends:
             raise ConfigError("KeyboardLayout does not support backend: " + qtile.core.name)
 
         self.backend = layout_backends[qtile.core.name](qtile)
-        self.backend.set_keyboard(self.configured_keyboards[0], self.option)
+        hook.subscribe.keyboard_layout_change(self._layout_changed)
+        self.backend.configure(self.configured_keyboards, self.option)
+        self.text = self._format(self.backend.get_keyboard())
+
+    def _format(self, keyboard):
+        if keyboard in self.display_map.keys():
+            return self.display_map[keyboard]
+        return keyboard.upper()
+
+    def _layout_changed(self, layout):
+        self.update(self._format(layout or "unknown"))
 
     @expose_command()
     def next_keyboard(self):
@@ -172,10 +225,6 @@ class KeyboardLayout(base.InLoopPollText):
 
         self.backend.set_keyboard(next_keyboard, self.option)
 
-        self.tick()
-
-    def poll(self):
-        keyboard = self.backend.get_keyboard()
-        if keyboard in self.display_map.keys():
-            return self.display_map[keyboard]
-        return keyboard.upper()
+    def finalize(self):
+        hook.unsubscribe.keyboard_layout_change(self._layout_changed)
+        base._TextBox.finalize(self)
@@ -222,7 +222,7 @@ class LaunchBar(base._Widget):
                     exec(cmd[7:].lstrip())
                 else:
                     self.qtile.spawn(cmd)
-            self.draw()
+            self.request_draw()
 
     def draw(self):
         """Draw the icons in the widget."""
@@ -3,6 +3,7 @@ from itertools import cycle
 from psutil import getloadavg
 
 from libqtile.command.base import expose_command
+from libqtile.core.sampler import Source
 from libqtile.widget import base
 
 
@@ -31,14 +32,17 @@ class Load(base.InLoopPollText):
     @expose_command()
     def next_load(self):
         self.set_time()
-        self.update(self.poll())
+        self.tick()
 
-    def poll(self):
+    def sources(self):
+        return [Source(getloadavg)]
+
+    def parse(self, loadavg):
         loads = {}
         (
             loads["1m"],
             loads["5m"],
             loads["15m"],
-        ) = getloadavg()  # Gets the load averages as a dictionary.
+        ) = loadavg  # Gets the load averages as a dictionary.
         load = loads[self.time]
         return self.format.format(time=self.time, load=load)
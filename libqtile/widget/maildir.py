@@ -1,11 +1,19 @@
-import mailbox
 import os.path
 
+from libqtile.core.watchers import IN_CREATE, IN_DELETE, IN_MOVED_FROM, IN_MOVED_TO, FileWatch
+from libqtile.log_utils import logger
 from libqtile.widget import base
 
 
-class Maildir(base.BackgroundPoll):
-    """A simple widget showing the number of new mails in maildir mailboxes"""
+class Maildir(base.EventText):
+    """A simple widget showing the number of new mails in maildir mailboxes
+
+    The new mails of each subfolder are counted once, and the counts are then kept up
+    to date as mails arrive, are read or are deleted, which inotify tells the widget
+    about. Without inotify, the subfolders are counted every ``fallback_interval``
+    seconds, as are subfolders that can't be watched, e.g. until they are created.
+    Subfolders are counted on a worker thread.
+    """
 
     defaults = [
         ("maildir_path", "~/Mail", "path to the Maildir folder"),
@@ -32,7 +40,7 @@ class Maildir(base.BackgroundPoll):
     ]
 
     def __init__(self, **config):
-        base.BackgroundPoll.__init__(self, "", **config)
+        base.EventText.__init__(self, "", **config)
         self.add_defaults(Maildir.defaults)
 
         # if it looks like a list of strings then we just convert them
@@ -40,27 +48,139 @@ class Maildir(base.BackgroundPoll):
         if isinstance(self.sub_folders[0], str):
             self.sub_folders = [{"path": folder, "label": folder} for folder in self.sub_folders]
 
+        # The names of the mails in the "new" directory of each subfolder, by its path
+        self._new: dict[str, set[str]] = {}
+        # The subfolders being counted on a worker thread, with the names of the mails
+        # that changed meanwhile
+        self._scanning: dict[str, set[str]] = {}
+        self._watch: FileWatch | None = None
+        # The timer to try watching subfolders that aren't watched again
+        self._retry = None
+
+    def _new_dirs(self):
+        maildir_path = os.path.expanduser(self.maildir_path)
+        return [
+            os.path.join(maildir_path, sub_folder["path"], "new")
+            for sub_folder in self.sub_folders
+        ]
+
+    def watches(self):
+        mask = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO
+        self._watch = FileWatch(self._new_dirs(), mask=mask)
+        return [self._watch]
+
+    @staticmethod
+    def _is_mail(name):
+        # Like mailbox.Maildir, which doesn't count dotfiles as mail
+        return not name.startswith(".")
+
+    def _scan(self, new_dir):
+        try:
+            return set(filter(self._is_mail, os.listdir(new_dir)))
+        except OSError:
+            logger.warning("Could not read maildir folder %s", new_dir)
+            return set()
+
+    def _rescan(self, new_dirs):
+        """Count the mails of the subfolders again on a worker thread"""
+        # Those being counted already also get the changes made meanwhile
+        new_dirs = [new_dir for new_dir in new_dirs if new_dir not in self._scanning]
+        if not new_dirs:
+            return
+        for new_dir in new_dirs:
+            self._scanning[new_dir] = set()
+        future = self.qtile.run_in_executor(self._scan_dirs, new_dirs)
+        future.add_done_callback(lambda future: self._scanned(new_dirs, future))
+
+    def _scan_dirs(self, new_dirs):
+        return [self._scan(new_dir) for new_dir in new_dirs]
+
+    def _scanned(self, new_dirs, future):
+        try:
+            scanned = future.result()
+        except Exception:
+            logger.exception("Could not count the mails in %s", new_dirs)
+            scanned = [set() for _ in new_dirs]
+        for new_dir, names in zip(new_dirs, scanned):
+            # The mails that changed while the folder was listed may or may not have
+            # been listed
+            for name in self._scanning.pop(new_dir):
+                if os.path.lexists(os.path.join(new_dir, name)):
+                    names.add(name)
+                else:
+                    names.discard(name)
+            self._new[new_dir] = names
+        if not self.finalized:
+            self._update()
+
+    def on_event(self, path):
+        if path is None:
+            # Changes were lost, so count everything again
+            self._rescan(self._new_dirs())
+            return
+        new_dir, name = os.path.split(path)
+        if path in self._new or path in self._scanning:
+            # The directory itself changed, e.g. it was removed
+            self._rescan([path])
+        elif new_dir in self._scanning:
+            if self._is_mail(name):
+                self._scanning[new_dir].add(name)
+        elif new_dir in self._new and self._is_mail(name):
+            if os.path.lexists(path):
+                self._new[new_dir].add(name)
+            else:
+                self._new[new_dir].discard(name)
+
+    def _watch_unwatched(self):
+        """
+        Watch the subfolders that aren't watched, as they didn't exist or were removed,
+        counting them again, and try again later for those that still can't be.
+        """
+        unwatched = False
+        changed = []
+        for new_dir in self._new_dirs():
+            if self._watch.watching(new_dir):
+                continue
+            if self._watch.add(new_dir) or os.path.isdir(new_dir):
+                # Its changes weren't watched until now
+                changed.append(new_dir)
+            else:
+                self._new[new_dir] = set()
+            unwatched = unwatched or not self._watch.watching(new_dir)
+        self._rescan(changed)
+
+        if unwatched and self._retry is None and self.fallback_interval is not None:
+            self._retry = self.timeout_add(self.fallback_interval, self._retry_watches)
+
+    def _retry_watches(self):
+        self._retry = None
+        self.tick()
+
+    def tick(self):
+        if not self._watching:
+            # Nothing tells the widget about changes, so count everything again
+            self._rescan(self._new_dirs())
+        else:
+            if self._watch in self._watching:
+                self._watch_unwatched()
+            self._rescan([d for d in self._new_dirs() if d not in self._new])
+        self._update()
+
+    def _update(self):
+        # Until everything has been counted once
+        if all(new_dir in self._new for new_dir in self._new_dirs()):
+            self.update(self.poll())
+
     def poll(self):
-        """Scans the mailbox for new messages
+        """Counts the new messages in the mailbox
 
         Returns
         =======
         A string representing the current mailbox state
         """
         state = {}
-
-        def to_maildir_fmt(paths):
-            for path in iter(paths):
-                yield path.rsplit(":")[0]
-
-        for sub_folder in self.sub_folders:
-            path = os.path.join(os.path.expanduser(self.maildir_path), sub_folder["path"])
-            maildir = mailbox.Maildir(path)
-            state[sub_folder["label"]] = 0
-
-            for file in to_maildir_fmt(os.listdir(os.path.join(path, "new"))):
-                if file in maildir:
-                    state[sub_folder["label"]] += 1
+        for sub_folder, new_dir in zip(self.sub_folders, self._new_dirs()):
+            state[sub_folder["label"]] = len(self._new.get(new_dir, ()))
 
         return self.format_text(state)
 
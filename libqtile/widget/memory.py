@@ -1,5 +1,6 @@
 import psutil
 
+from libqtile.core.sampler import Source
 from libqtile.widget import base
 
 __all__ = ["Memory"]
@@ -48,9 +49,10 @@ class Memory(base.InLoopPollText):
         self.calc_mem = self.measures[self.measure_mem]
         self.calc_swap = self.measures[self.measure_swap]
 
-    def poll(self):
-        mem = psutil.virtual_memory()
-        swap = psutil.swap_memory()
+    def sources(self):
+        return [Source(psutil.virtual_memory), Source(psutil.swap_memory)]
+
+    def parse(self, mem, swap):
         val = {}
         val["MemUsed"] = mem.used / self.calc_mem
         val["MemTotal"] = mem.total / self.calc_mem
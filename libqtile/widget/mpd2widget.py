@@ -4,13 +4,19 @@ A widget for Music Player Daemon (MPD) based on python-mpd2.
 This widget exists since python-mpd library is no longer supported.
 """
 
+import asyncio
+import inspect
+import time
 from collections import defaultdict
 from html import escape
 
-from mpd import CommandError, ConnectionError, MPDClient
+from mpd import CommandError, ConnectionError, MPDError
+from mpd.asyncio import MPDClient
+from mpd.base import mpd_command_provider, mpd_commands
 
 from libqtile import utils
 from libqtile.log_utils import logger
+from libqtile.utils import create_task
 from libqtile.widget import base
 
 # Mouse Interaction
@@ -30,6 +36,31 @@ keys = {
 play_states = {"play": "\u25b6", "pause": "\u23f8", "stop": "\u25a0"}
 
 
+@mpd_command_provider
+class _MPDClient(MPDClient):
+    """
+    python-mpd2's asyncio client can't send command lists, so this adds the one that
+    the widget needs, to get the status and the current song in one round trip.
+    """
+
+    def _write_command(self, command, args=()):
+        if command == "status_currentsong":
+            command = "command_list_ok_begin\nstatus\ncurrentsong\ncommand_list_end"
+        super()._write_command(command, args)
+
+    @mpd_commands("status_currentsong")
+    def _parse_status_currentsong(self, lines):
+        # Each command's response ends with list_OK
+        responses = [[]]
+        for line in lines:
+            if line == "list_OK":
+                responses.append([])
+            else:
+                responses[-1].append(line)
+        status, current_song = responses[:2]
+        return self._parse_object(status), self._parse_object(current_song)
+
+
 def option(char):
     """
     old status mapping method.
@@ -80,9 +111,14 @@ format_fns = {
 }
 
 
-class Mpd2(base.BackgroundPoll):
+class Mpd2(base._TextBox):
     r"""Mpd2 Object.
 
+    The widget keeps a connection to MPD open, and MPD tells it when the player,
+    the volume or the playback options change, so that it updates straight away
+    and doesn't ask MPD for anything while nothing changes. The elapsed time of the
+    playing track is counted by the widget itself.
+
     Parameters
     ==========
     status_format:
@@ -163,7 +199,11 @@ class Mpd2(base.BackgroundPoll):
     """
 
     defaults = [
-        ("update_interval", 1, "Interval of update widget"),
+        (
+            "update_interval",
+            1,
+            "Interval in seconds to update the elapsed time of the playing track, if it is shown",
+        ),
         ("host", "localhost", "Host of mpd server"),
         ("port", 6600, "Port of mpd server"),
         ("password", None, "Password for auth on mpd server"),
@@ -180,94 +220,150 @@ class Mpd2(base.BackgroundPoll):
             default_undefined_status_value,
             "text to display when status key is undefined.",
         ),
-        ("timeout", 30, "MPDClient timeout"),
-        ("idletimeout", 5, "MPDClient idle command timeout"),
+        ("timeout", 30, "Timeout in seconds to connect to mpd"),
+        (
+            "idletimeout",
+            5,
+            "(Deprecated) MPDClient idle command timeout. The widget waits for mpd to "
+            "tell it about changes, without a timeout.",
+        ),
+        ("reconnect_delay", 2, "Seconds to wait before reconnecting the first time."),
+        ("max_reconnect_delay", 300, "The longest to wait before reconnecting, in seconds."),
         ("no_connection", "No connection", "Text when mpd is disconnected"),
         ("color_progress", None, "Text color to indicate track progress."),
         ("space", "-", "Space keeper"),
     ]
 
+    # The subsystems that MPD tells the widget about changes to
+    subsystems = ["player", "mixer", "options"]
+
     def __init__(self, **config):
         """Constructor."""
         super().__init__("", **config)
 
         self.add_defaults(Mpd2.defaults)
+        if "idletimeout" in config:
+            logger.warning(
+                "The use of `idletimeout` is deprecated. Mpd2 waits for mpd to tell it "
+                "about changes, without a timeout."
+            )
         if self.color_progress:
             self.color_progress = utils.hex(self.color_progress)
 
-    def _configure(self, qtile, bar):
-        super()._configure(qtile, bar)
-        self.client = MPDClient()
-        self.client.timeout = self.timeout
-        self.client.idletimeout = self.idletimeout
+        self.client = None
+        self._task = None
+        self._tick = None
+        self._status = None
+        self._current_song = None
+        # When the status was fetched, to count the elapsed time from
+        self._status_time = 0.0
+
+    def timer_setup(self):
+        self._task = create_task(self._run())
 
     @property
     def connected(self):
-        """Attempt connection to mpd server."""
-        try:
-            self.client.ping()  # pylint: disable=E1101
-        except (OSError, ConnectionError):
+        return self.client is not None and self.client.connected
+
+    async def _connect(self):
+        client = _MPDClient()
+        await asyncio.wait_for(client.connect(self.host, self.port), self.timeout)
+        if self.password:
+            await client.password(self.password)  # pylint: disable=E1101
+        return client
+
+    async def _run(self):
+        """Stay connected to the mpd server, updating the widget when it changes."""
+        delay = self.reconnect_delay
+        while True:
             try:
-                self.client.connect(self.host, self.port)
-                if self.password:
-                    self.client.password(self.password)  # pylint: disable=E1101
-            except (OSError, ConnectionError, CommandError):
-                return False
-        return True
-
-    def poll(self):
-        """
-        Called by qtile manager.
-
-        poll the mpd server and update widget.
-        """
-        if self.connected:
-            return self.update_status()
-        else:
-            return self.no_connection
-
-    def update_status(self):
+                self.client = await self._connect()
+                delay = self.reconnect_delay
+                await self.update_status()
+                async for _ in self.client.idle(self.subsystems):
+                    await self.update_status()
+            except (OSError, TimeoutError, MPDError) as e:
+                logger.debug("Lost the connection to mpd, reconnecting in %ss: %s", delay, e)
+            finally:
+                if self.client is not None:
+                    self.client.disconnect()
+                    self.client = None
+
+            self._status = None
+            self._show()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def update_status(self):
         """get updated info from mpd server and call format."""
-        self.client.command_list_ok_begin()
-        self.client.status()  # pylint: disable=E1101
-        self.client.currentsong()  # pylint: disable=E1101
-        status, current_song = self.client.command_list_end()
-
-        return self.formatter(status, current_song)
+        status, current_song = await self.client.status_currentsong()  # pylint: disable=E1101
+        self._status = status
+        self._current_song = current_song
+        self._status_time = time.monotonic()
+        self._show()
+
+    def _shows_elapsed(self):
+        return bool(
+            "elapsed" in self.status_format
+            or "remaining" in self.status_format
+            or self.color_progress
+        )
+
+    def _show(self):
+        if self._tick is not None:
+            self._tick.cancel()
+            self._tick = None
+
+        if self._status is None:
+            self.update(self.no_connection)
+            return
+
+        status = dict(self._status)
+        if status.get("state") == "play" and "elapsed" in status:
+            # Count the time since the status was fetched, rather than ask for it
+            elapsed = float(status["elapsed"]) + time.monotonic() - self._status_time
+            if "duration" in status:
+                elapsed = min(elapsed, float(status["duration"]))
+            status["elapsed"] = f"{elapsed:.3f}"
+            if self._shows_elapsed():
+                self._tick = self.timeout_add(self.update_interval, self._show)
+
+        self.update(self.formatter(status, dict(self._current_song)))
 
     def button_press(self, x, y, button):
         """handle click event on widget."""
-        base.BackgroundPoll.button_press(self, x, y, button)
-        m_name = self.mouse_buttons[button]
+        base._TextBox.button_press(self, x, y, button)
+        m_name = self.mouse_buttons.get(button)
 
-        if self.connected:
+        if m_name is not None and self.connected:
             if hasattr(self, m_name):
-                self.__try_call(m_name)
+                create_task(self.__try_call(m_name))
             elif hasattr(self.client, m_name):
-                self.__try_call(m_name, self.client)
+                create_task(self.__try_call(m_name, self.client))
 
-    def __try_call(self, attr_name, obj=None):
+    async def __try_call(self, attr_name, obj=None):
         err1 = "Class {Class} has no attribute {attr}."
         err2 = 'attribute "{Class}.{attr}" is not callable.'
         context = obj or self
         try:
-            getattr(context, attr_name)()
+            result = getattr(context, attr_name)()
+            if inspect.isawaitable(result):
+                await result
         except (AttributeError, TypeError) as e:
             if isinstance(e, AttributeError):
                 err = err1.format(Class=type(context).__name__, attr=attr_name)
             else:
                 err = err2.format(Class=type(context).__name__, attr=attr_name)
             logger.exception("%s %s", err, e.args[0])
+        except (ConnectionError, CommandError) as e:
+            logger.warning("mpd could not %s: %s", attr_name, e)
 
-    def toggle(self):
+    async def toggle(self):
         """toggle play/pause."""
-        status = self.client.status()  # pylint: disable=E1101
-        play_status = status["state"]
-
-        if play_status == "play":
-            self.client.pause()  # pylint: disable=E1101
+        if self._status is not None and self._status["state"] == "play":
+            await self.client.pause()  # pylint: disable=E1101
         else:
-            self.client.play()  # pylint: disable=E1101
+            await self.client.play()  # pylint: disable=E1101
 
     def formatter(self, status, current_song):
         """format song info."""
@@ -364,10 +460,10 @@ class Mpd2(base.BackgroundPoll):
 
     def finalize(self):
         """finalize."""
-        super().finalize()
-
-        try:
-            self.client.close()  # pylint: disable=E1101
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self.client is not None:
             self.client.disconnect()
-        except ConnectionError:
-            pass
+            self.client = None
+        super().finalize()
@@ -2,6 +2,7 @@ from math import log
 
 import psutil
 
+from libqtile.core.sampler import Source
 from libqtile.widget import base
 
 
@@ -103,10 +104,14 @@ class Net(base.InLoopPollText):
 
         return converted_bytes, unit
 
-    def get_stats(self):
+    def sources(self):
+        return [Source(psutil.net_io_counters, (self.interface != ["all"],))]
+
+    def get_stats(self, net=None):
+        if net is None:
+            net = self.sources()[0].read()
         interfaces = {}
         if self.interface == ["all"]:
-            net = psutil.net_io_counters(pernic=False)
             interfaces["all"] = {
                 "down": net.bytes_recv,
                 "up": net.bytes_sent,
@@ -114,7 +119,6 @@ class Net(base.InLoopPollText):
             }
             return interfaces
         else:
-            net = psutil.net_io_counters(pernic=True)
             for iface in net:
                 down = net[iface].bytes_recv
                 up = net[iface].bytes_sent
@@ -125,9 +129,9 @@ class Net(base.InLoopPollText):
                 }
             return interfaces
 
-    def poll(self):
+    def parse(self, net):
         ret_stat = []
-        new_stats = self.get_stats()
+        new_stats = self.get_stats(net)
         for intf in self.interface:
             if intf not in new_stats:
                 ret_stat.append(self.missing_interface.format(interface=intf))
@@ -124,7 +124,7 @@ class Notify(base._TextBox):
 
             if timeout:
                 self.timeout_add(timeout, self.clear, method_args=(ClosedReason.expired,))
-        self.bar.draw()
+        self.bar.draw(self)
         return True
 
     @expose_command()
@@ -133,7 +133,7 @@ class Notify(base._TextBox):
             return
 
         self.set_notif_text(notifier.notifications[self.current_id])
-        self.bar.draw()
+        self.bar.draw(self)
 
     @expose_command()
     def clear(self, reason=ClosedReason.dismissed):
@@ -145,7 +145,7 @@ class Notify(base._TextBox):
         self.text = ""
         self.background = self.background_normal
         self.current_id = len(notifier.notifications) - 1
-        self.bar.draw()
+        self.bar.draw(self)
 
     def on_close(self, nid):
         if self.current_id < len(notifier.notifications):
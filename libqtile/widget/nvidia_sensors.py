@@ -1,6 +1,7 @@
 import csv
 import re
 
+from libqtile.core.watchers import CommandWatch
 from libqtile.widget import base
 
 sensors_mapping = {
@@ -14,8 +15,12 @@ def _all_sensors_names_correct(sensors):
     return all(map(lambda x: x in sensors_mapping, sensors))
 
 
-class NvidiaSensors(base.BackgroundPoll):
-    """Displays temperature, fan speed and performance level Nvidia GPU."""
+class NvidiaSensors(base.EventText):
+    """Displays temperature, fan speed and performance level Nvidia GPU.
+
+    The sensors are read by a single ``nvidia-smi --loop`` process, which is
+    started again if it exits, rather than by running ``nvidia-smi`` every
+    update."""
 
     defaults = [
         (
@@ -40,28 +45,40 @@ class NvidiaSensors(base.BackgroundPoll):
     ]
 
     def __init__(self, **config):
-        base.BackgroundPoll.__init__(self, "", **config)
+        base.EventText.__init__(self, "", **config)
         self.add_defaults(NvidiaSensors.defaults)
         self.foreground_normal = self.foreground
-
-    def _get_sensors_data(self, command):
-        return csv.reader(
-            self.call_process(command, shell=True).strip().replace(" ", "").split("\n")
-        )
+        # nvidia-smi reads the sensors every update_interval, so the widget only needs
+        # to update when it prints them
+        self.loop_ms = int(self.update_interval * 1000)
+        self.update_interval = None
+        self.sensors = sorted(self._parse_format_string())
+        # The latest reading of each GPU, by its index
+        self._readings = {}
 
     def _parse_format_string(self):
         return {sensor for sensor in re.findall("{(.+?)}", self.format)}
 
-    def poll(self):
-        sensors = self._parse_format_string()
-        if not _all_sensors_names_correct(sensors):
-            return "Wrong sensor name"
+    def watches(self):
+        if not _all_sensors_names_correct(self.sensors):
+            return []
         bus_id = f"-i {self.gpu_bus_id}" if self.gpu_bus_id else ""
-        command = "nvidia-smi {} --query-gpu={} --format=csv,noheader".format(
-            bus_id, ",".join(sensors_mapping[sensor] for sensor in sensors)
+        command = "nvidia-smi {} --query-gpu=index,{} --format=csv,noheader --loop-ms={}".format(
+            bus_id, ",".join(sensors_mapping[sensor] for sensor in self.sensors), self.loop_ms
         )
+        return [CommandWatch(command, shell=True, restart_delay=self.restart_delay)]
+
+    def on_event(self, line):
+        # nvidia-smi prints a line for each GPU every interval
+        for row in csv.reader([line.replace(" ", "")]):
+            if len(row) == len(self.sensors) + 1:
+                self._readings[row[0]] = dict(zip(self.sensors, row[1:]))
+
+    def poll(self):
+        if not _all_sensors_names_correct(self.sensors):
+            return "Wrong sensor name"
         try:
-            sensors_data = [dict(zip(sensors, gpu)) for gpu in self._get_sensors_data(command)]
+            sensors_data = list(self._readings.values())
             for gpu in sensors_data:
                 if gpu.get("temp"):
                     if int(gpu["temp"]) > self.threshold:
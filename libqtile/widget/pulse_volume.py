@@ -196,7 +196,7 @@ class PulseVolume(VolumeBase):
     def _configure(self, qtile, bar):
         VolumeBase._configure(self, qtile, bar)
         if self.theme_path:
-            self.setup_images()
+            self.load_images()
         pulse.subscribe(self.get_vals)
 
     async def _change_volume(self, volume):
@@ -253,9 +253,9 @@ class PulseVolume(VolumeBase):
         length = self.length
         self._update_drawer()
         if self.length == length:
-            self.draw()
+            self.request_draw()
         else:
-            self.bar.draw()
+            self.bar.draw(self)
 
     def finalize(self):
         # Close the connection to the server
@@ -38,7 +38,7 @@ class QuickExit(base._TextBox):
         self.countdown -= 1
         self.text = self.countdown_format.format(self.countdown)
         self.timer = self.timeout_add(self.timer_interval, self.update)
-        self.draw()
+        self.request_draw()
 
         if self.countdown == 0:
             self.qtile.stop()
@@ -51,4 +51,4 @@ class QuickExit(base._TextBox):
             self.update()
         else:
             self.__reset()
-            self.draw()
+            self.request_draw()
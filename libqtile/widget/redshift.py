@@ -1,8 +1,10 @@
+import asyncio
 import subprocess
 from shutil import which
 
 from libqtile.command.base import expose_command
 from libqtile.log_utils import logger
+from libqtile.utils import create_task
 from libqtile.widget.base import _TextBox
 
 
@@ -184,6 +186,9 @@ class Redshift(_TextBox):
             }
         )
         self.error = None
+        # Run redshift one command at a time, in order, so that a reset can't undo a
+        # later change
+        self._redshift_lock = asyncio.Lock()
 
     def _configure(self, qtile, bar):
         _TextBox._configure(self, qtile, bar)
@@ -437,22 +442,15 @@ class Redshift(_TextBox):
         """
         Call reset on redshift to reset to default settings.
         """
-        try:
-            subprocess.run([self.redshift_path, "-x"], check=True)
-        except (TypeError, FileNotFoundError) as e:
-            self.widget_error(
-                f"redshift: could not find redshift executable, check redshift_path: {e}"
-            )
-        except subprocess.CalledProcessError as e:
-            self.widget_error(f"redshift: could not enable redshift: {e}")
+        create_task(self._redshift([self.redshift_path, "-x"]))
 
     @expose_command
     def run_redshift(self):
         """
         Run redshift command with defined parameters.
         """
-        try:
-            subprocess.run(
+        create_task(
+            self._redshift(
                 [
                     self.redshift_path,
                     "-P",
@@ -462,14 +460,19 @@ class Redshift(_TextBox):
                     str(self.brightness),
                     "-g",
                     self.gamma_val._redshift_fmt(),
-                ],
-                check=True,
+                ]
             )
+        )
+
+    async def _redshift(self, command):
+        try:
+            async with self._redshift_lock:
+                await self.acall_process(command, timeout=10)
         except (TypeError, FileNotFoundError) as e:
             self.widget_error(
                 f"redshift: could not find redshift executable, check redshift_path: {e}"
             )
-        except subprocess.CalledProcessError as e:
+        except subprocess.SubprocessError as e:
             self.widget_error(f"redshift: could not enable redshift: {e}")
 
     def widget_error(self, error_msg: str):
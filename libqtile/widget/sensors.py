@@ -1,9 +1,10 @@
 import psutil
 
+from libqtile.core.sampler import Source
 from libqtile.widget import base
 
 
-class ThermalSensor(base.BackgroundPoll):
+class ThermalSensor(base.InLoopPollText):
     """Widget to display temperature sensor information
 
     For using the thermal sensor widget you need to have lm-sensors installed.
@@ -37,32 +38,26 @@ class ThermalSensor(base.BackgroundPoll):
     ]
 
     def __init__(self, **config):
-        base.BackgroundPoll.__init__(self, **config)
+        base.InLoopPollText.__init__(self, "N/A", **config)
         self.add_defaults(ThermalSensor.defaults)
-        temp_values = self.get_temp_sensors()
-
-        if temp_values is None:
-            self.data = "sensors command not found"
-        elif len(temp_values) == 0:
-            self.data = "Temperature sensors not found"
-        elif self.tag_sensor is None:
-            for k in temp_values:
-                self.tag_sensor = k
-                break
 
     def _configure(self, qtile, bar):
         self.unit = "°C" if self.metric else "°F"
-        base.BackgroundPoll._configure(self, qtile, bar)
+        base.InLoopPollText._configure(self, qtile, bar)
         self.foreground_normal = self.foreground
 
-    def get_temp_sensors(self):
+    def sources(self):
+        return [Source(psutil.sensors_temperatures, (not self.metric,))]
+
+    def get_temp_sensors(self, temps=None):
         """
         Reads temperatures from sys-fs via psutil.
         Output will be read Fahrenheit if user has specified it to be.
         """
 
         temperature_list = {}
-        temps = psutil.sensors_temperatures(fahrenheit=not self.metric)
+        if temps is None:
+            temps = self.sources()[0].read()
         empty_index = 0
         for kernel_module in temps:
             for sensor in temps[kernel_module]:
@@ -76,8 +71,17 @@ class ThermalSensor(base.BackgroundPoll):
 
         return temperature_list
 
-    def poll(self):
-        temp_values = self.get_temp_sensors()
+    def on_error(self, error):
+        return "sensors command not found"
+
+    def parse(self, temps):
+        temp_values = self.get_temp_sensors(temps)
+        if not temp_values:
+            return "Temperature sensors not found"
+
+        # Show the first sensor unless one was chosen
+        if self.tag_sensor is None and temp_values:
+            self.tag_sensor = next(iter(temp_values))
 
         # Temperature not available
         if (temp_values is None) or (self.tag_sensor not in temp_values):
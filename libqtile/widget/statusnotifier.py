@@ -63,7 +63,7 @@ class StatusNotifier(base._Widget):
         base._Widget._configure(self, qtile, bar)
 
     def draw_callback(self, x=None):
-        self.bar.draw()
+        self.bar.draw(self)
 
     async def _config_async(self):
         await host.start(
@@ -51,7 +51,7 @@ class Icon(window._Window):
         if name == "_XEMBED_INFO":
             info = self.window.get_property("_XEMBED_INFO", unpack=int)
             if info and info[1]:
-                self.systray.bar.draw()
+                self.systray.bar.draw(self.systray)
 
         return False
 
@@ -59,7 +59,7 @@ class Icon(window._Window):
         wid = event.window
         icon = self.qtile.windows_map.pop(wid)
         self.systray.tray_icons.remove(icon)
-        self.systray.bar.draw()
+        self.systray.bar.draw(self.systray)
         return False
 
     handle_UnmapNotify = handle_DestroyNotify  # noqa: N815
@@ -90,6 +90,12 @@ class Systray(base._Widget, window._Window):
 
     supported_backends = {"x11"}
 
+    # Icons are placed relative to the widget when it is drawn
+    redraw_on_move = True
+    # The icons use our drawer's pixmap as their background, so it needs to be
+    # filled when we draw
+    render_in_thread = False
+
     defaults = [
         ("icon_size", 20, "Icon width"),
         ("padding", 5, "Padding between icons"),
@@ -201,11 +207,11 @@ class Systray(base._Widget, window._Window):
             info = icon.window.get_property("_XEMBED_INFO", unpack=int)
 
             if not info:
-                self.bar.draw()
+                self.bar.draw(self)
                 return False
 
             if info[1]:
-                self.bar.draw()
+                self.bar.draw(self)
 
         return False
 
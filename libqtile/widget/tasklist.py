@@ -396,7 +396,7 @@ class TaskList(base._Widget, base.PaddingMixin, base.MarginMixin):
 
     def update(self, window=None):
         if not window or window in self.windows:
-            self.bar.draw()
+            self.bar.draw(self)
 
     def remove_icon_cache(self, window):
         wid = window.wid
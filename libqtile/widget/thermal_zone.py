@@ -1,4 +1,4 @@
-from libqtile.log_utils import logger
+from libqtile.core.sampler import file_source
 from libqtile.widget import base
 
 
@@ -28,14 +28,14 @@ class ThermalZone(base.InLoopPollText):
         super().__init__("", **config)
         self.add_defaults(ThermalZone.defaults)
 
-    def poll(self):
-        try:
-            with open(self.zone) as f:
-                value = round(int(f.read().rstrip()) / 1000)
-        except OSError:
-            logger.exception("%s does not exist", self.zone)
-            return "err!"
+    def sources(self):
+        return [file_source(self.zone)]
 
+    def on_error(self, error):
+        return "err!"
+
+    def parse(self, temp):
+        value = round(int(temp.rstrip()) / 1000)
         variables = dict()
         variables["temp"] = str(value)
         output = self.format.format(**variables)
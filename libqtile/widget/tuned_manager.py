@@ -2,6 +2,7 @@ import re
 import subprocess
 
 from libqtile import bar
+from libqtile.utils import create_task
 from libqtile.widget import base
 
 
@@ -37,7 +38,8 @@ class TunedManager(base.BackgroundPoll):
         self.add_defaults(TunedManager.defaults)
         self.length_type = bar.CALCULATED
         self.regex = re.compile(r"Current active profile:\s+(\S+)")
-        self.current_mode = self.find_mode()
+        # Found by the first poll, rather than by running tuned-adm while configuring
+        self.current_mode = ""
 
         self.add_callbacks(
             {
@@ -48,36 +50,41 @@ class TunedManager(base.BackgroundPoll):
             }
         )
 
-    def _configure(self, qtile, bar):
-        base.BackgroundPoll._configure(self, qtile, bar)
-        self.text = self.find_mode()
-
     def poll(self):
-        return self.find_mode()
+        self.current_mode = self.find_mode()
+        return self.current_mode
 
     def find_mode(self):
-        result = subprocess.run("tuned-adm active", shell=True, capture_output=True, text=True)
-        output = result.stdout
+        try:
+            output = self.call_process("tuned-adm active", shell=True, check=False, timeout=10)
+        except (subprocess.SubprocessError, OSError):
+            return ""
         mode = self.regex.findall(output)
         if not mode:
             return ""
         return mode[0]
 
     def update_bar(self):
-        self.current_mode = self.find_mode()
-        self.text = self.current_mode
-        self.bar.draw()
+        self.force_update()
 
     def execute_command(self, index: int):
         argument = self.modes[index]  # pyright: ignore
+        # Switching the profile takes a while, so don't wait for it here
+        create_task(self._set_mode(argument))
+
+    async def _set_mode(self, mode: str):
         try:
-            subprocess.run(["tuned-adm", "profile", argument], check=True)
-            self.update_bar()
-        except subprocess.CalledProcessError as e:
+            await self.acall_process(["tuned-adm", "profile", mode], timeout=60)
+        except (subprocess.SubprocessError, OSError) as e:
             self.update(f"Error setting mode: {e}")
+        else:
+            self.update_bar()
 
     def _change_mode(self, step=1):
-        next_index: int = (self.modes.index(self.current_mode) + step) % len(self.modes)  # pyright: ignore
+        if self.current_mode in self.modes:  # pyright: ignore
+            next_index: int = (self.modes.index(self.current_mode) + step) % len(self.modes)  # pyright: ignore
+        else:
+            next_index = 0
         self.execute_command(next_index)
 
     def next_mode(self):
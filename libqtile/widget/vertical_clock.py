@@ -87,7 +87,7 @@ class VerticalClock(Clock):
         for layout, fmt in zip(self.layouts, self.format):
             layout.text = time.strftime(fmt)
             layout.width = self.bar.size
-        self.draw()
+        self.request_draw()
 
     @property
     def can_draw(self):
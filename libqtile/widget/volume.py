@@ -49,6 +49,7 @@ class VolumeBase(base._TextBox):
         self.images = {}
         self.volume = None
         self.is_mute = False
+        self._images_task = None
 
     def _configure(self, qtile, parent_bar):
         if self.theme_path:
@@ -72,7 +73,9 @@ class VolumeBase(base._TextBox):
             else:  # self.volume >= 80:
                 img_name = "audio-volume-high"
 
-            self.drawer.draw_image(self.images[img_name])
+            # The icons are drawn once they have been decoded
+            if img_name in self.images:
+                self.drawer.draw_image(self.images[img_name])
         elif self.emoji:
             if len(self.emoji_list) < 4:
                 self.emoji_list = ["\U0001f507", "\U0001f508", "\U0001f509", "\U0001f50a"]
@@ -93,19 +96,44 @@ class VolumeBase(base._TextBox):
                 self.mute_format if self.is_mute or self.volume < 0 else self.unmute_format
             ).format(volume=self.volume)
 
+    image_names = (
+        "audio-volume-high",
+        "audio-volume-low",
+        "audio-volume-medium",
+        "audio-volume-muted",
+    )
+
     def setup_images(self):
         from libqtile import images
 
-        names = (
-            "audio-volume-high",
-            "audio-volume-low",
-            "audio-volume-medium",
-            "audio-volume-muted",
-        )
-        d_images = images.Loader(self.theme_path)(*names)
-        new_height = self.bar.size - 2
+        d_images = images.Loader(self.theme_path)(*self.image_names)
+        for img in d_images.values():
+            img.resize(height=self.bar.size - 2)
+        self._set_images(d_images)
+
+    def load_images(self):
+        """Load the icons in the background, drawing the widget once they are decoded"""
+        self._images_task = create_task(self._load_images())
+
+    async def _load_images(self):
+        from libqtile import images
+
+        try:
+            d_images = await images.Loader(self.theme_path).load_async(
+                *self.image_names, height=self.bar.size - 2
+            )
+        except Exception:
+            logger.exception("Could not load the volume icons from %s", self.theme_path)
+            return
+        finally:
+            self._images_task = None
+        self._set_images(d_images)
+        if self.volume is not None:
+            self._update_drawer()
+        self.bar.draw(self)
+
+    def _set_images(self, d_images):
         for name, img in d_images.items():
-            img.resize(height=new_height)
             if img.width > self.length:
                 self.length = img.width + self.padding * 2
             self.images[name] = img
@@ -116,6 +144,11 @@ class VolumeBase(base._TextBox):
         else:
             base._TextBox.draw(self)
 
+    def finalize(self):
+        if self._images_task is not None:
+            self._images_task.cancel()
+        base._TextBox.finalize(self)
+
 
 class Volume(VolumeBase):
     """Widget that display and change volume
@@ -170,7 +203,7 @@ class Volume(VolumeBase):
     def timer_setup(self):
         self._volume_task = create_task(self.do_volume())
         if self.theme_path:
-            self.setup_images()
+            self.load_images()
 
     def create_amixer_command(self, *args) -> str:
         cmd = ["amixer"]
@@ -186,7 +219,7 @@ class Volume(VolumeBase):
 
     def button_press(self, x, y, button):
         base._TextBox.button_press(self, x, y, button)
-        self.draw()
+        self.request_draw()
 
     async def do_volume(self):
         vol, muted = await self.get_volume()
@@ -196,7 +229,7 @@ class Volume(VolumeBase):
             # Update the underlying canvas size before actually attempting
             # to figure out how big it is and draw it.
             self._update_drawer()
-            self.bar.draw()
+            self.bar.draw(self)
         await asyncio.sleep(self.update_interval)
         self._volume_task = create_task(self.do_volume())
 
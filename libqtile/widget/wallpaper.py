@@ -83,4 +83,4 @@ class Wallpaper(base._TextBox):
             self.wallpaper_command.pop()
         else:
             self.qtile.paint_screen(self.bar.screen, cur_image, self.option)
-        self.draw()
+        self.request_draw()
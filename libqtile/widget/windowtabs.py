@@ -56,4 +56,4 @@ class WindowTabs(base._TextBox):
                 task = task.join(self.selected)
             names.append(task)
         self.text = self.separator.join(names)
-        self.bar.draw()
+        self.bar.draw(self)
@@ -1,6 +1,7 @@
 import re
 import subprocess
 
+from libqtile.core.processes import runner
 from libqtile.log_utils import logger
 from libqtile.pangocffi import markup_escape_text
 from libqtile.widget.generic_poll_text import GenPollCommand
@@ -8,17 +9,14 @@ from libqtile.widget.generic_poll_text import GenPollCommand
 
 def get_private_ip(interface_name):
     try:
-        result = subprocess.run(
-            ["ip", "-brief", "addr", "show", "dev", interface_name],
-            capture_output=True,
-            text=True,
-            check=True,
+        output = runner.run_sync(
+            ["ip", "-brief", "addr", "show", "dev", interface_name], timeout=5
         )
-    except (subprocess.CalledProcessError, OSError):
+    except (subprocess.SubprocessError, OSError):
         logger.exception(f"Couldn't get the IP for {interface_name}:")
         return "N/A"
 
-    output = result.stdout.strip()
+    output = output.strip()
     parts = output.split()
     if len(parts) > 2 and parts[1] == "UP":
         ip_address = parts[2].split("/")[0]
@@ -144,6 +142,11 @@ class WlanIw(GenPollCommand):
         self.add_defaults(WlanIw.defaults)
         self.ethernet_interface_not_found = False
 
+    async def apoll(self):
+        out = await self.acall_process(self.cmd, check=False, stderr=True, timeout=5)
+        # Getting the IP runs ip, so this is done on a worker thread
+        return await self.qtile.run_in_executor(self.parse, out)
+
     def parse(self, raw: str):
         essid, quality = parse_iw_output(raw)
         return process_essid_and_quality(
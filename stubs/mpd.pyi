@@ -1,3 +0,0 @@
-class MPDClient: ...
-class ConnectionError: ...
-class CommandError: ...
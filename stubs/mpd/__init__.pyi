@@ -0,0 +1,5 @@
+class MPDError(Exception): ...
+class ConnectionError(MPDError): ...
+class ProtocolError(MPDError): ...
+class CommandError(MPDError): ...
+class MPDClient: ...
@@ -0,0 +1,14 @@
+from collections.abc import AsyncIterator, Iterable
+from typing import Any
+
+from mpd.base import MPDClientBase
+
+class MPDClient(MPDClientBase):
+    def __init__(self, use_unicode: bool | None = ...) -> None: ...
+    async def connect(self, host: str, port: int = ..., loop: Any = ...) -> None: ...
+    @property
+    def connected(self) -> bool: ...
+    def disconnect(self) -> None: ...
+    def idle(self, subsystems: Iterable[str] = ...) -> AsyncIterator[list[str]]: ...
+    def noidle(self) -> None: ...
+    def _write_command(self, command: str, args: Any = ...) -> None: ...
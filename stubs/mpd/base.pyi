@@ -0,0 +1,12 @@
+from typing import Any, TypeVar
+
+_T = TypeVar("_T")
+
+class mpd_commands:
+    def __init__(self, *commands: str, is_direct: bool = ..., is_binary: bool = ...) -> None: ...
+    def __call__(self, ob: _T) -> _T: ...
+
+def mpd_command_provider[T](cls: T) -> T: ...
+
+class MPDClientBase:
+    def __getattr__(self, attr: str) -> Any: ...
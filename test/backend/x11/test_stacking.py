@@ -0,0 +1,77 @@
+import pytest
+
+from libqtile.backend.x11.stacking import StackingOrder
+
+
+def apply(stack, ops):
+    for wid, sibling, above in ops:
+        stack.restack(wid, sibling, above)
+
+
+def test_restack():
+    stack = StackingOrder([1, 2, 3, 4])
+    stack.restack(1, 3)
+    assert list(stack) == [2, 3, 1, 4]
+    stack.restack(4, 2, above=False)
+    assert list(stack) == [4, 2, 3, 1]
+    stack.restack(2)
+    assert list(stack) == [4, 3, 1, 2]
+    stack.restack(2, above=False)
+    assert list(stack) == [2, 4, 3, 1]
+    assert not stack.stale
+
+
+def test_create_destroy():
+    stack = StackingOrder([1, 2])
+    stack.add(3)
+    assert list(stack) == [1, 2, 3]
+    stack.remove(1)
+    stack.remove(42)
+    assert list(stack) == [2, 3]
+    assert not stack.stale
+
+
+def test_unknown_sibling_marks_stale():
+    stack = StackingOrder([1, 2, 3])
+    stack.restack(1, 42)
+    assert list(stack) == [2, 3, 1]
+    assert stack.stale
+    stack.reset([3, 2, 1])
+    assert not stack.stale
+
+
+@pytest.mark.parametrize(
+    "order,desired,requests",
+    [
+        ([1, 2, 3, 4], [1, 2, 3, 4], 0),
+        ([1, 2, 3, 4], [4, 1, 2, 3], 1),
+        ([1, 2, 3, 4], [2, 3, 4, 1], 1),
+        ([1, 2, 3, 4], [4, 3, 2, 1], 3),
+        ([1, 2, 3, 4, 5, 6], [2, 4, 6], 0),
+        ([1, 2, 3, 4, 5, 6], [6, 2, 4], 1),
+        ([1, 2, 3, 4, 5, 6], [5, 1, 2, 3, 6, 4], 2),
+        ([1, 2, 3], [1, 42, 3], 0),
+    ],
+)
+def test_plan_is_minimal(order, desired, requests):
+    stack = StackingOrder(order)
+    ops = stack.plan(desired)
+    assert len(ops) == requests
+
+    apply(stack, ops)
+    known = [wid for wid in desired if wid in order]
+    assert [wid for wid in stack if wid in known] == known
+    # Windows that weren't asked to move keep their relative order
+    others = [wid for wid in order if wid not in known]
+    assert [wid for wid in stack if wid in others] == others
+
+
+def test_is_stacked():
+    stack = StackingOrder([1, 2, 3])
+    assert stack.is_stacked(3)
+    assert stack.is_stacked(1, above=False)
+    assert not stack.is_stacked(2)
+    assert stack.is_stacked(2, 1)
+    assert stack.is_stacked(2, 3, above=False)
+    assert not stack.is_stacked(3, 1)
+    assert not stack.is_stacked(42)
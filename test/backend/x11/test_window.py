@@ -881,3 +881,48 @@ def test_multiple_wm_types(xmanager):
     kde_override = conn.atoms["_KDE_NET_WM_WINDOW_TYPE_OVERRIDE"]
     w.set_property("_NET_WM_WINDOW_TYPE", [kde_override, normal])
     assert w.get_wm_type() == "normal"
+
+
+def many_widgets_bar():
+    widgets = [libqtile.widget.TextBox(str(i % 10), fontsize=8, padding=2) for i in range(40)]
+    return libqtile.bar.Bar(widgets, 24)
+
+
+class ManyWidgetsConfig(BareConfig):
+    screens = [
+        libqtile.config.Screen(top=many_widgets_bar()),
+        libqtile.config.Screen(top=many_widgets_bar()),
+    ]
+
+
+DRAW_BARS = """
+import time
+start = time.perf_counter()
+for _ in range(50):
+    for screen in self.screens:
+        screen.top._actual_draw()
+self._test_draw_time = (time.perf_counter() - start) / 50
+"""
+
+
+@dualmonitor
+@pytest.mark.parametrize("xmanager", [ManyWidgetsConfig], indirect=True)
+def test_widget_drawers_are_widget_sized(xmanager, record_property):
+    bars = "[screen.top for screen in self.screens]"
+    widget_bytes = int(
+        xmanager.c.eval(f"sum(w.drawer.pixmap_bytes for b in {bars} for w in b.widgets)")
+    )
+    bar_bytes = int(xmanager.c.eval(f"sum(b.drawer.pixmap_bytes for b in {bars})"))
+    record_property("widget_pixmap_bytes", widget_bytes)
+    record_property("bar_pixmap_bytes", bar_bytes)
+
+    # All of the widgets together need no more pixmap memory than the bars that
+    # hold them, rather than a bar-sized pixmap each
+    assert 0 < widget_bytes <= bar_bytes
+
+    xmanager.c.eval(DRAW_BARS)
+    record_property("bar_draw_seconds", float(xmanager.c.eval("self._test_draw_time")))
+    assert (
+        int(xmanager.c.eval(f"sum(w.drawer.pixmap_bytes for b in {bars} for w in b.widgets)"))
+        == widget_bytes
+    )
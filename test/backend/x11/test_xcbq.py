@@ -48,3 +48,18 @@ def test_edid_decoding_ev2460():
     assert make == "ENC"
     assert model == "EV2460"
     assert serial == "22806129"
+
+
+def test_xkb_parse_symbols():
+    parse = xcbq.Xkb.parse_symbols
+    assert parse("pc+us+inet(evdev)") == ["us"]
+    assert parse("pc+us(dvorak)+ru:2+inet(evdev)+group(alt_shift_toggle)") == [
+        "us dvorak",
+        "ru",
+    ]
+    assert parse("pc+gb+de(nodeadkeys):3+inet(evdev)+compose(menu)") == [
+        "gb",
+        "",
+        "de nodeadkeys",
+    ]
+    assert parse("") == []
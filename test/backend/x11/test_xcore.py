@@ -1,7 +1,15 @@
+import shutil
+import time
+from types import SimpleNamespace
+
 import pytest
+import xcffib
+import xcffib.xproto
 
+from libqtile import bar, config, widget
 from libqtile.backend import get_core
 from libqtile.backend.x11 import core
+from test.helpers import BareConfig, Retry
 from test.test_manager import ManagerConfig
 
 
@@ -65,3 +73,227 @@ def test_clear_focus_empty_group(xmanager, conn):
 
     active = conn.default_screen.root.get_property("_NET_ACTIVE_WINDOW", unpack=int)
     assert active[0] == 0
+
+
+def test_compress_events():
+    property_notify = xcffib.xproto.PropertyNotifyEvent.synthetic
+    unmap_notify = xcffib.xproto.UnmapNotifyEvent.synthetic
+
+    def configure_request(wid, value_mask, x=0, y=0, width=0, height=0):
+        return xcffib.xproto.ConfigureRequestEvent.synthetic(
+            0, 1, wid, 0, x, y, width, height, 0, value_mask
+        )
+
+    cw = xcffib.xproto.ConfigWindow
+    events = [
+        property_notify(10, 1, 0, 0),
+        configure_request(10, cw.X | cw.Y, x=5, y=5),
+        configure_request(10, cw.X | cw.Width, x=7, width=100),
+        property_notify(10, 1, 1, 0),
+        property_notify(10, 2, 2, 0),
+        property_notify(20, 1, 3, 0),
+        configure_request(10, cw.Height, height=50),
+        property_notify(10, 1, 4, 0),
+        unmap_notify(1, 10, False),
+        property_notify(10, 1, 5, 0),
+        configure_request(20, cw.X, x=1),
+        configure_request(10, cw.Y, y=1),
+    ]
+
+    compressed = core.compress_events(events)
+    assert compressed == [
+        events[2],
+        events[4],
+        events[5],
+        events[6],
+        events[7],
+        events[8],
+        events[9],
+        events[10],
+        events[11],
+    ]
+
+    # The adjacent configure requests were merged into the last one
+    merged = compressed[0]
+    assert merged.value_mask == cw.X | cw.Y | cw.Width
+    assert (merged.x, merged.y, merged.width) == (7, 5, 100)
+
+    # ...but not those with other events between them, or for other windows
+    assert compressed[3].value_mask == cw.Height
+    assert compressed[-2].value_mask == cw.X
+    assert compressed[-1].value_mask == cw.Y
+
+
+def test_event_stats(display, monkeypatch):
+    xcore = get_core("x11", display)
+    try:
+        xcore.qtile = SimpleNamespace(windows_map={})
+        wm_name = xcore.conn.atoms["_NET_WM_NAME"]
+        wm_class = xcore.conn.atoms["WM_CLASS"]
+
+        # A burst of title changes for each of two windows, and a class change
+        events = [
+            xcffib.xproto.PropertyNotifyEvent.synthetic(wid, wm_name, i, 0)
+            for i in range(10)
+            for wid in (1, 2)
+        ]
+        events.append(xcffib.xproto.PropertyNotifyEvent.synthetic(1, wm_class, 10, 0))
+
+        before = xcore.event_stats()
+        queue = iter([*events, None])
+        monkeypatch.setattr(xcore.conn.conn, "poll_for_event", lambda: next(queue))
+        xcore._xpoll()
+
+        stats = xcore.event_stats()
+        assert stats["dispatched"] - before["dispatched"] == 3
+        assert stats["compressed"] - before["compressed"] == 18
+    finally:
+        xcore.finalize()
+
+
+def test_xpoll_throughput(display, monkeypatch, record_property):
+    """Micro-benchmark of event dispatch through Core._xpoll"""
+    xcore = get_core("x11", display)
+    try:
+        xcore.qtile = SimpleNamespace(windows_map={})
+        root = xcore._root.wid
+        wm_name = xcore.conn.atoms["_NET_WM_NAME"]
+
+        events = []
+        for i in range(1000):
+            events.append(xcffib.xproto.PropertyNotifyEvent.synthetic(i, wm_name, 0, 0))
+            events.append(xcffib.xproto.ExposeEvent.synthetic(i, 0, 0, 10, 10, 0))
+            events.append(
+                xcffib.xproto.EnterNotifyEvent.synthetic(0, 0, root, i, 0, 0, 0, 0, 0, 0, 0, 0)
+            )
+
+        rounds = 10
+        elapsed = 0.0
+        for _ in range(rounds):
+            queue = iter([*events, None])
+            monkeypatch.setattr(xcore.conn.conn, "poll_for_event", lambda: next(queue))
+            start = time.perf_counter()
+            xcore._xpoll()
+            elapsed += time.perf_counter() - start
+
+        assert xcore.event_stats() == {"dispatched": rounds * len(events), "compressed": 0}
+        record_property("xpoll_events_per_second", round(rounds * len(events) / elapsed))
+    finally:
+        xcore.finalize()
+
+
+COUNT_KEY_REQUESTS = """
+requests = self.core._test_key_requests = []
+core = self.core.conn.conn.core
+core.GrabKey = lambda *a, f=core.GrabKey, r=requests: r.append("grab") or f(*a)
+core.UngrabKey = lambda *a, f=core.UngrabKey, r=requests: r.append("ungrab") or f(*a)
+"""
+
+
+@pytest.mark.parametrize("xmanager", [ManagerConfig], indirect=True)
+def test_key_grabs_are_diffed(xmanager):
+    def requests():
+        requests = xmanager.c.eval("self.core._test_key_requests")
+        xmanager.c.eval("self.core._test_key_requests.clear()")
+        return eval(requests)
+
+    xmanager.c.eval(COUNT_KEY_REQUESTS)
+    grabs = xmanager.c.eval("sorted(self.core._key_grabs)")
+
+    # Setting the same bindings again doesn't touch the server
+    xmanager.c.eval("self._set_keys(self.config.keys)")
+    assert requests() == []
+    assert xmanager.c.eval("sorted(self.core._key_grabs)") == grabs
+
+    # Dropping a binding only ungrabs that binding
+    xmanager.c.eval("self._set_keys(self.config.keys[1:])")
+    dropped = requests()
+    assert dropped
+    assert set(dropped) == {"ungrab"}
+    assert xmanager.c.eval("len(self.keys_map)") == xmanager.c.eval("len(self.config.keys) - 1")
+
+    # ...and restoring it only grabs that binding again
+    xmanager.c.eval("self._set_keys(self.config.keys)")
+    assert requests() == ["grab"] * len(dropped)
+    assert xmanager.c.eval("sorted(self.core._key_grabs)") == grabs
+
+
+COUNT_FOCUS_REQUESTS = """
+requests = self.core._test_focus_requests = []
+core = self.core.conn.conn.core
+for name in ("GrabButton", "UngrabButton", "ChangeProperty"):
+    setattr(core, name, lambda *a, f=getattr(core, name), n=name, r=requests: r.append(n) or f(*a))
+"""
+
+
+@pytest.mark.parametrize("xmanager", [ManagerConfig], indirect=True)
+def test_focus_request_budget(xmanager, record_property):
+    def requests():
+        requests = xmanager.c.eval("self.core._test_focus_requests")
+        xmanager.c.eval("self.core._test_focus_requests.clear()")
+        return eval(requests)
+
+    xmanager.test_window("one")
+    xmanager.test_window("two")
+    xmanager.c.eval(COUNT_FOCUS_REQUESTS)
+
+    # Switching focus re-grabs the click on the old window with a single
+    # AnyModifier grab per button, rather than one per lock mask combination
+    xmanager.c.group.next_window()
+    switched = requests()
+    record_property("focus_switch_requests", len(switched))
+    assert switched.count("GrabButton") == 3
+    assert "UngrabButton" not in switched
+
+    # Focusing the window that is already focused doesn't need to touch the
+    # server's grabs or properties at all
+    xmanager.c.eval("self.current_window.focus(False)")
+    refocused = requests()
+    record_property("refocus_requests", len(refocused))
+    assert refocused == []
+
+
+class KeyboardLayoutConfig(BareConfig):
+    screens = [
+        config.Screen(
+            top=bar.Bar([widget.KeyboardLayout(configured_keyboards=["us", "us dvorak"])], 20)
+        )
+    ]
+
+
+RECORD_LAYOUT_CHANGES = """
+from libqtile import hook
+self._test_layout_changes = []
+hook.subscribe.keyboard_layout_change(self._test_layout_changes.append)
+"""
+
+
+@pytest.mark.skipif(shutil.which("setxkbmap") is None, reason="setxkbmap not found")
+@pytest.mark.parametrize("xmanager", [KeyboardLayoutConfig], indirect=True)
+def test_keyboard_layout_groups(xmanager, conn):
+    keyboardlayout = xmanager.c.widget["keyboardlayout"]
+
+    @Retry(ignore_exceptions=(AssertionError,))
+    def assert_layout(layout):
+        assert xmanager.c.eval("self.core.keyboard_layout") == layout
+        assert keyboardlayout.info()["text"] == layout.upper()
+
+    # The configured layouts are loaded as the groups of one keymap
+    @Retry(ignore_exceptions=(AssertionError,))
+    def assert_groups():
+        assert conn.xkeyboard.layouts == ["us", "us dvorak"]
+
+    assert_groups()
+    assert_layout("us")
+    xmanager.c.eval(RECORD_LAYOUT_CHANGES)
+
+    # Switching the group updates the widget through the core's XkbNotify handler
+    keyboardlayout.next_keyboard()
+    assert_layout("us dvorak")
+    assert conn.xkeyboard.get_group() == 1
+
+    # ...as does another client switching it
+    conn.xkeyboard.lock_group(0)
+    assert_layout("us")
+
+    assert xmanager.c.eval("self._test_layout_changes") == repr(["us dvorak", "us"])
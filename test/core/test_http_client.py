@@ -0,0 +1,120 @@
+import asyncio
+import os
+import stat
+import time
+
+from libqtile.core.http_client import HttpClient, Response
+
+
+def test_ttl(httpbin, tmp_path):
+    async def run():
+        client = HttpClient(cache_dir=str(tmp_path))
+        url = f"{httpbin.url}/uuid"
+        first = await client.fetch(url, ttl=60)
+        assert not first.cached
+
+        # Fresh responses are used again, even by another client after a restart
+        assert (await client.fetch(url, ttl=60)).body == first.body
+        await client.close()
+        restarted = HttpClient(cache_dir=str(tmp_path))
+        response = await restarted.fetch(url, ttl=60)
+        assert response.cached
+        assert response.json() == first.json()
+        assert restarted.info()["fetched"] == 0
+
+        # But not once they are older than the TTL
+        assert (await restarted.fetch(url, ttl=0)).body != first.body
+        assert restarted.info()["fetched"] == 1
+        await restarted.close()
+
+        assert client.info()["fetched"] == 1
+        assert client.info()["cached"] == 1
+
+    asyncio.run(run())
+
+
+def test_revalidate(httpbin, tmp_path):
+    async def run():
+        client = HttpClient(cache_dir=str(tmp_path))
+        url = f"{httpbin.url}/etag/abc"
+        first = await client.fetch(url)
+        response = await client.fetch(url)
+        assert response.status == 200
+        assert response.body == first.body
+        assert response.cached
+        assert client.info()["revalidated"] == 1
+        await client.close()
+
+    asyncio.run(run())
+
+
+def test_coalesce(httpbin, tmp_path):
+    async def run():
+        client = HttpClient(cache_dir=str(tmp_path))
+        url = f"{httpbin.url}/delay/0.2"
+        responses = await asyncio.gather(*(client.fetch(url) for _ in range(3)))
+        assert len({response.body for response in responses}) == 1
+        info = client.info()
+        assert info["fetched"] == 1
+        assert info["coalesced"] == 2
+        await client.close()
+
+    asyncio.run(run())
+
+
+def test_session_per_loop(httpbin, tmp_path):
+    client = HttpClient(cache_dir=str(tmp_path))
+
+    async def fetch():
+        await client.fetch(f"{httpbin.url}/uuid")
+        return client._session
+
+    first = asyncio.run(fetch())
+    # Another loop gets a session of its own, and the first one is closed
+    second = asyncio.run(fetch())
+    assert second is not first
+    assert first.closed
+    asyncio.run(client.close())
+    assert second.closed
+
+
+def test_post_not_cached(httpbin, tmp_path):
+    async def run():
+        client = HttpClient(cache_dir=str(tmp_path))
+        url = f"{httpbin.url}/anything"
+        for _ in range(2):
+            response = await client.fetch(url, method="POST", data=b"data", ttl=60)
+            assert response.json()["data"] == "data"
+        assert client.info()["fetched"] == 2
+        assert not list(tmp_path.iterdir())
+        await client.close()
+
+    asyncio.run(run())
+
+
+def test_cache_files_are_private(tmp_path):
+    cache_dir = tmp_path / "http"
+    client = HttpClient(cache_dir=str(cache_dir))
+    client._save("key", Response(200, b"body", {}, time.time(), False))
+    assert stat.S_IMODE(cache_dir.stat().st_mode) == 0o700
+    for name in ("key", "key.json"):
+        assert stat.S_IMODE((cache_dir / name).stat().st_mode) == 0o600
+    assert client._load("key").body == b"body"
+
+
+def test_prune(tmp_path):
+    client = HttpClient(cache_dir=str(tmp_path), max_cache_bytes=20, max_cache_age=3600)
+    now = time.time()
+    for key, age in (("old", 7200), ("used", 100), ("recent", 10), ("new", 0)):
+        for name in (key, key + ".json"):
+            (tmp_path / name).write_bytes(b"x" * 5)
+            os.utime(tmp_path / name, (now - age, now - age))
+
+    # Responses that are too old go, and then those used longest ago until they fit
+    client._prune()
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "new",
+        "new.json",
+        "recent",
+        "recent.json",
+    ]
@@ -0,0 +1,172 @@
+import asyncio
+import subprocess
+import threading
+import time
+
+import pytest
+
+from libqtile.core.processes import ProcessRunner
+
+
+def test_run():
+    async def run():
+        runner = ProcessRunner()
+        assert await runner.run(["echo", "hello"]) == "hello\n"
+        assert await runner.run("echo $((1 + 1))", shell=True) == "2\n"
+
+        with pytest.raises(subprocess.CalledProcessError):
+            await runner.run("false", shell=True)
+        assert (
+            await runner.run("echo out; echo err >&2; false", shell=True, check=False) == "out\n"
+        )
+        assert await runner.run("echo err >&2", shell=True, stderr=True, check=False) == "err\n"
+        assert runner.info()["failures"] == 1
+
+    asyncio.run(run())
+
+
+def test_timeout():
+    async def run():
+        runner = ProcessRunner()
+        with pytest.raises(subprocess.TimeoutExpired):
+            await runner.run(["sleep", "10"], timeout=0.1)
+        info = runner.info()
+        assert info["timeouts"] == 1
+        assert info["running"] == 0
+
+    asyncio.run(run())
+
+
+def test_cache():
+    async def run():
+        runner = ProcessRunner()
+        command = "od -An -N8 -tx8 /dev/urandom"
+
+        # Identical commands at the same time share a run
+        first, second = await asyncio.gather(
+            runner.run(command, shell=True, cache=60), runner.run(command, shell=True, cache=60)
+        )
+        assert first == second
+        # and later ones use the cached output, until it expires
+        assert await runner.run(command, shell=True, cache=60) == first
+        assert runner.info()["runs"] == 1
+        assert runner.info()["cached"] == 2
+
+        assert await runner.run(command, shell=True) != first
+
+    asyncio.run(run())
+
+
+def test_max_processes():
+    async def run():
+        runner = ProcessRunner(max_processes=2)
+        most = 0
+
+        async def watch():
+            nonlocal most
+            while True:
+                most = max(most, runner.running)
+                await asyncio.sleep(0.01)
+
+        watcher = asyncio.create_task(watch())
+        await asyncio.gather(*(runner.run(["sleep", "0.1"]) for _ in range(5)))
+        watcher.cancel()
+        assert most == 2
+        assert runner.info()["runs"] == 5
+
+    asyncio.run(run())
+
+
+def test_run_sync_from_thread():
+    async def run():
+        runner = ProcessRunner(max_processes=1)
+        runner.loop = asyncio.get_running_loop()
+        loop = asyncio.get_running_loop()
+
+        # Worker threads run commands on the loop, sharing its limits
+        output = await loop.run_in_executor(None, runner.run_sync, ["echo", "thread"])
+        assert output == "thread\n"
+
+    asyncio.run(run())
+
+    # Without a loop, commands are run straight away
+    runner = ProcessRunner()
+    assert runner.run_sync(["echo", "sync"]) == "sync\n"
+    with pytest.raises(subprocess.TimeoutExpired):
+        runner.run_sync(["sleep", "10"], timeout=0.1)
+
+
+def test_run_sync_subprocess_arguments(tmp_path):
+    runner = ProcessRunner()
+    # Arguments of subprocess.run() are passed on
+    assert runner.run_sync(["pwd"], cwd=str(tmp_path)) == f"{tmp_path}\n"
+    assert runner.run_sync("echo $FOO", shell=True, env={"FOO": "bar"}) == "bar\n"
+    # And stderr can be given as it is to subprocess.run()
+    command = "echo out; echo err >&2"
+    assert runner.run_sync(command, shell=True, stderr=subprocess.DEVNULL) == "out\n"
+    assert runner.run_sync(command, shell=True, stderr=True) == "out\nerr\n"
+
+
+def test_run_sync_on_loop():
+    async def run():
+        runner = ProcessRunner(loop_timeout=0.1)
+        runner.loop = asyncio.get_running_loop()
+        # Commands that block the loop are killed sooner
+        with pytest.raises(subprocess.TimeoutExpired):
+            runner.run_sync(["sleep", "10"])
+
+    asyncio.run(run())
+
+
+def test_run_sync_max_processes():
+    async def run():
+        runner = ProcessRunner(max_processes=2)
+        runner.loop = asyncio.get_running_loop()
+        loop = asyncio.get_running_loop()
+        most = 0
+
+        async def watch():
+            nonlocal most
+            while True:
+                most = max(most, runner.running)
+                await asyncio.sleep(0.01)
+
+        def run_sync(**kwargs):
+            return runner.run_sync(["sleep", "0.1"], **kwargs)
+
+        watcher = asyncio.create_task(watch())
+        # Whether they are run on the loop, leaving stderr alone like call_process()
+        # does, or straight from the thread, as given arguments for subprocess.run()
+        await asyncio.gather(
+            *(loop.run_in_executor(None, lambda: run_sync(stderr=None)) for _ in range(4)),
+            *(loop.run_in_executor(None, lambda: run_sync(cwd="/")) for _ in range(4)),
+        )
+        watcher.cancel()
+        assert most <= 4
+        info = runner.info()
+        assert info["runs"] == 8
+        assert info["running"] == 0
+        assert info["waiting"] == 0
+
+    asyncio.run(run())
+
+    # Commands run without a loop wait for a turn too
+    runner = ProcessRunner(max_processes=1)
+    runner._sync_semaphore.acquire()
+    threading.Timer(0.2, runner._sync_semaphore.release).start()
+    started = time.monotonic()
+    assert runner.run_sync(["echo", "waited"]) == "waited\n"
+    assert time.monotonic() - started >= 0.2
+
+
+def test_run_sync_on_loop_waits_for_a_turn():
+    async def run():
+        runner = ProcessRunner(max_processes=1, loop_timeout=0.1)
+        runner.loop = asyncio.get_running_loop()
+        runner._sync_semaphore.acquire()
+        # The loop isn't frozen waiting for a turn
+        with pytest.raises(subprocess.TimeoutExpired):
+            runner.run_sync(["echo", "never"])
+        assert runner.info()["timeouts"] == 1
+
+    asyncio.run(run())
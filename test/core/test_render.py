@@ -0,0 +1,102 @@
+import asyncio
+
+import cairocffi
+import pytest
+
+from libqtile.core.render import Rasterizer, RenderScheduler
+
+
+class FakeCore:
+    def __init__(self):
+        self.frames = []
+
+    def request_frame(self, callback):
+        self.frames.append(callback)
+
+    def frame(self):
+        callback = self.frames.pop(0)
+        callback()
+
+
+def test_redraws_are_coalesced():
+    core = FakeCore()
+    renderer = RenderScheduler(core)
+    drawn = []
+
+    for i in range(10):
+        renderer.schedule("bar", lambda i=i: drawn.append(("bar", i)))
+        renderer.schedule("widget", lambda: drawn.append("widget"))
+
+    # Only one frame is requested however many redraws are
+    assert len(core.frames) == 1
+    core.frame()
+    assert drawn == [("bar", 9), "widget"]
+    assert renderer.info() == dict(
+        requests=20, frames=1, renders=2, pending=0, rasterized=0, rasterize_failures=0
+    )
+
+
+def test_cancel():
+    core = FakeCore()
+    renderer = RenderScheduler(core)
+    drawn = []
+
+    def draw_bar():
+        drawn.append("bar")
+        # e.g. the bar redrawing a widget that had asked to be redrawn
+        renderer.cancel("widget")
+
+    renderer.schedule("bar", draw_bar)
+    renderer.schedule("widget", lambda: drawn.append("widget"))
+    renderer.schedule("popup", lambda: drawn.append("popup"))
+    renderer.cancel("popup")
+    core.frame()
+    assert drawn == ["bar"]
+
+
+def test_redraws_during_a_frame_wait_for_the_next():
+    core = FakeCore()
+    renderer = RenderScheduler(core)
+    drawn = []
+
+    def draw():
+        drawn.append("widget")
+        renderer.schedule("widget", draw)
+
+    renderer.schedule("widget", draw)
+    core.frame()
+    assert drawn == ["widget"]
+    assert len(core.frames) == 1
+    core.frame()
+    assert drawn == ["widget", "widget"]
+
+
+def test_errors_dont_stop_the_frame():
+    core = FakeCore()
+    renderer = RenderScheduler(core)
+    drawn = []
+
+    renderer.schedule("broken", lambda: 1 / 0)
+    renderer.schedule("widget", lambda: drawn.append("widget"))
+    core.frame()
+    assert drawn == ["widget"]
+
+
+@pytest.mark.asyncio
+async def test_rasterize_on_worker_thread():
+    rasterizer = Rasterizer()
+    recording = cairocffi.RecordingSurface(cairocffi.CONTENT_COLOR_ALPHA, None)
+    with cairocffi.Context(recording) as ctx:
+        ctx.set_source_rgb(1, 0, 0)
+        ctx.rectangle(0, 0, 4, 2)
+        ctx.fill()
+
+    done = asyncio.get_running_loop().create_future()
+    rasterizer.submit(recording, 4, 2, 2, done.set_result)
+    image = await done
+    rasterizer.finalize()
+
+    # The image is rendered at the given scale
+    assert (image.get_width(), image.get_height()) == (8, 4)
+    assert bytes(image.get_data()[:4]) == b"\x00\x00\xff\xff"  # BGRA
+    assert rasterizer.info() == dict(rasterized=1, rasterize_failures=0)
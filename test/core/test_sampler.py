@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+
+from libqtile.core.sampler import Sampler, Source, file_source, read_file
+
+
+class FakeQtile:
+    def call_later(self, delay, func, *args):
+        return asyncio.get_running_loop().call_later(delay, func, *args)
+
+    def run_in_executor(self, func, *args):
+        return asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+
+def test_sources_are_read_once_per_interval():
+    reads = []
+
+    def read(name):
+        reads.append(name)
+        if name == "broken":
+            raise OSError("Can't read")
+        return name.upper()
+
+    async def run():
+        sampler = Sampler(FakeQtile())
+        samples = []
+        a = sampler.subscribe(0.05, lambda *s: samples.append(("a", *s)), Source(read, ("x",)))
+        b = sampler.subscribe(
+            0.05, lambda *s: samples.append(("b", *s)), Source(read, ("x",)), Source(read, ("y",))
+        )
+        c = sampler.subscribe(
+            0.05, lambda *s: samples.append(("c", *s)), Source(read, ("broken",))
+        )
+        for _ in range(200):
+            if samples:
+                break
+            await asyncio.sleep(0.005)
+
+        # One read of each source for all of the subscriptions
+        assert sorted(reads) == ["broken", "x", "y"]
+        # and subscriptions to sources that failed are skipped
+        assert sorted(samples) == [("a", "X"), ("b", "X", "Y")]
+        assert sampler.info() == dict(reads=3, samples=2, subscriptions=3)
+
+        for subscription in (a, b, c):
+            subscription.cancel()
+        assert sampler.info()["subscriptions"] == 0
+        assert not sampler._timers
+
+        sampler.finalize()
+
+    asyncio.run(run())
+
+
+def test_read_now():
+    def read(name):
+        if name == "broken":
+            raise OSError("Can't read")
+        return name.upper()
+
+    async def run():
+        sampler = Sampler(FakeQtile())
+        assert await sampler.read_now(Source(read, ("x",)), Source(read, ("y",))) == ["X", "Y"]
+        assert sampler.info() == dict(reads=2, samples=0, subscriptions=0)
+
+        with pytest.raises(OSError):
+            await sampler.read_now(Source(read, ("x",)), Source(read, ("broken",)))
+
+    asyncio.run(run())
+
+
+def test_read_file(tmp_path):
+    path = tmp_path / "stat"
+    path.write_text("1 2 3\n")
+    assert file_source(str(path)) == file_source(str(path))
+    assert file_source(str(path)).read() == "1 2 3\n"
+
+    # The file is kept open and read again from the start
+    with open(path, "r+") as f:
+        f.write("4 5 6\n" * 1000)
+    assert read_file(str(path)) == "4 5 6\n" * 1000
@@ -0,0 +1,128 @@
+import asyncio
+import sys
+
+import pytest
+
+from libqtile.core.watchers import CommandWatch, FileWatch, Throttle, UeventWatch
+
+
+async def wait_for(condition):
+    for _ in range(200):
+        if condition():
+            return
+        await asyncio.sleep(0.005)
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux only")
+def test_file_watch(tmp_path):
+    path = tmp_path / "brightness"
+    path.write_text("10\n")
+
+    async def run():
+        changed = []
+        watch = FileWatch([str(path), str(tmp_path / "missing")])
+        watch.start(changed.append)
+
+        path.write_text("20\n")
+        await wait_for(lambda: changed)
+        assert changed[0] == str(path)
+
+        watch.stop()
+        changed.clear()
+        path.write_text("30\n")
+        await asyncio.sleep(0.05)
+        assert not changed
+
+    asyncio.run(run())
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux only")
+def test_file_watch_add(tmp_path):
+    path = tmp_path / "brightness"
+    missing = tmp_path / "missing"
+    path.write_text("10\n")
+
+    async def run():
+        changed = []
+        watch = FileWatch([str(path), str(missing)])
+        watch.start(changed.append)
+        assert watch.watching(str(path))
+        assert not watch.watching(str(missing))
+        assert not watch.add(str(missing))
+
+        missing.write_text("1\n")
+        assert watch.add(str(missing))
+        assert watch.watching(str(missing))
+        missing.write_text("2\n")
+        await wait_for(lambda: changed)
+        assert changed[0] == str(missing)
+
+        # The watch is dropped once the file has gone
+        missing.unlink()
+        await wait_for(lambda: not watch.watching(str(missing)))
+        assert not watch.watching(str(missing))
+
+        watch.stop()
+
+    asyncio.run(run())
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux only")
+def test_file_watch_nothing_to_watch(tmp_path):
+    async def run():
+        with pytest.raises(OSError):
+            FileWatch([str(tmp_path / "missing")]).start(print)
+
+    asyncio.run(run())
+
+
+def test_uevent_parsing():
+    events = []
+    watch = UeventWatch("power_supply")
+    watch._event(
+        b"change@/devices/BAT0\0ACTION=change\0SUBSYSTEM=power_supply\0POWER_SUPPLY_CAPACITY=42\0",
+        events.append,
+    )
+    watch._event(b"add@/devices/usb1\0ACTION=add\0SUBSYSTEM=usb\0", events.append)
+    assert events == [dict(ACTION="change", SUBSYSTEM="power_supply", POWER_SUPPLY_CAPACITY="42")]
+
+
+def test_command_watch_restarts():
+    async def run():
+        lines = []
+        watch = CommandWatch("printf 'a\\nb\\n'", shell=True, restart_delay=0.01)
+        watch.start(lines.append)
+
+        # The command is started again when it exits
+        await wait_for(lambda: len(lines) >= 4)
+        assert lines[:4] == ["a", "b", "a", "b"]
+
+        watch.stop()
+        await asyncio.sleep(0)
+        count = len(lines)
+        await asyncio.sleep(0.1)
+        assert len(lines) == count
+
+    asyncio.run(run())
+
+
+def test_throttle():
+    async def run():
+        calls = []
+        throttle = Throttle(0.05, lambda: calls.append(None))
+
+        # The first call is straight away, the rest are put off and are then one call
+        for _ in range(10):
+            throttle()
+        assert len(calls) == 1
+        await wait_for(lambda: len(calls) == 2)
+        await asyncio.sleep(0.1)
+        assert len(calls) == 2
+
+        throttle()
+        throttle()
+        throttle.cancel()
+        await asyncio.sleep(0.1)
+        assert len(calls) == 3
+
+    asyncio.run(run())
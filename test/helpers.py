@@ -220,6 +220,10 @@ class TestManager:
         # that aren't explicitly testing the debounce opt out of it.
         if not hasattr(config_class, "screen_change_debounce_timeout"):
             config_class.screen_change_debounce_timeout = 0
+        # Likewise, tests expect redraws to happen as soon as the event loop is idle
+        # rather than on the next frame.
+        if not hasattr(config_class, "max_fps"):
+            config_class.max_fps = 0
 
         multiprocessing.set_start_method("fork", force=True)
         readlogs, writelogs = os.pipe()
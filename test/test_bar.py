@@ -790,3 +790,171 @@ def test_dont_reserve_bar(no_reserve_manager, bar_x, bar_y, bar_w, bar_h):
     assert bar_y == int(bar.eval("self.y"))
     assert bar_w == bar_info["width"]
     assert bar_h == bar_info["height"]
+
+
+class ManyWidgetsConfig(GBConfig):
+    screens = [
+        libqtile.config.Screen(
+            top=libqtile.bar.Bar(
+                [
+                    libqtile.widget.TextBox(str(i % 10), name=f"text{i}", fontsize=8, padding=2)
+                    for i in range(40)
+                ],
+                24,
+            )
+        )
+    ]
+
+
+COUNT_WIDGET_DRAWS = """
+self._actual_draw()
+self._test_draws = []
+for w in self.widgets:
+    w.draw = lambda w=w, f=w.draw, draws=self._test_draws: draws.append(w.name) or f()
+"""
+
+UPDATE_WIDGET = """
+import time
+self._test_draws.clear()
+start = time.perf_counter()
+self.widgets[{index}].update({text!r})
+self._actual_draw()
+self._test_draw_time = time.perf_counter() - start
+"""
+
+
+@pytest.mark.parametrize("manager", [ManyWidgetsConfig], indirect=True)
+def test_bar_only_redraws_dirty_widgets(manager, record_property):
+    bar = manager.c.bar["top"]
+    bar.eval(COUNT_WIDGET_DRAWS)
+
+    def update(index, text):
+        bar.eval(UPDATE_WIDGET.format(index=index, text=text))
+        return eval(bar.eval("self._test_draws")), float(bar.eval("self._test_draw_time"))
+
+    # A widget that changes its width is redrawn, but the ones after it are
+    # only moved
+    draws, seconds = update(20, "a much wider text")
+    record_property("grow_widget_draws", len(draws))
+    record_property("grow_seconds", seconds)
+    assert draws == ["text20"]
+
+    draws, seconds = update(20, "0")
+    record_property("shrink_widget_draws", len(draws))
+    record_property("shrink_seconds", seconds)
+    assert draws == ["text20"]
+
+    # Whereas redrawing the bar redraws everything
+    bar.eval("self._test_draws.clear(); self.draw(); self._actual_draw()")
+    assert len(eval(bar.eval("self._test_draws"))) == 40
+
+
+class PacedConfig(ManyWidgetsConfig):
+    max_fps = 10
+
+
+@pytest.mark.parametrize("manager", [PacedConfig], indirect=True)
+def test_redraws_are_frame_paced(manager, record_property):
+    @Retry(ignore_exceptions=(AssertionError,))
+    def rendered():
+        stats = manager.c.stats()["render"]
+        assert stats["pending"] == 0
+        return stats
+
+    before = rendered()
+    # Every widget asks to be redrawn several times before the next frame
+    manager.c.bar["top"].eval("[w.request_draw() for w in self.widgets * 5]")
+    after = rendered()
+
+    requests = after["requests"] - before["requests"]
+    renders = after["renders"] - before["renders"]
+    record_property("redraw_requests", requests)
+    record_property("redraws", renders)
+    assert requests == 200
+    assert 40 <= renders < requests
+    assert after["frames"] - before["frames"] <= 2
+
+
+SET_TEXTS = """
+for text in {texts!r}:
+    self.widgets[0].layout.text = text
+    self.widgets[0].layout.width
+"""
+
+
+@pytest.mark.parametrize("manager", [ManyWidgetsConfig], indirect=True)
+def test_text_layouts_are_reused(manager, record_property):
+    def layout_stats():
+        return manager.c.stats()["caches"]["text_layouts"]
+
+    texts = ["1", "22", "333"]
+    manager.c.bar["top"].eval(SET_TEXTS.format(texts=texts))
+    before = layout_stats()
+
+    # Going back to text that was laid out before doesn't lay it out again
+    manager.c.bar["top"].eval(SET_TEXTS.format(texts=texts * 10))
+    after = layout_stats()
+    record_property("text_layout_hit_rate", after["hit_rate"])
+    assert after["misses"] == before["misses"]
+    assert after["hits"] - before["hits"] == 30
+    assert manager.c.stats()["caches"]["text_extents"]["hits"] > 0
+
+
+@pytest.mark.parametrize("manager", [ManyWidgetsConfig], indirect=True)
+def test_measure_leaves_layout_alone(manager):
+    bar = manager.c.bar["top"]
+    text = bar.eval("self.widgets[0].layout.text")
+    width = bar.eval("self.widgets[0].layout.width")
+
+    measured = eval(bar.eval("self.widgets[0].layout.measure('a much longer text')"))
+    assert measured[0] > int(width)
+    assert bar.eval("self.widgets[0].layout.text") == text
+    assert bar.eval("self.widgets[0].layout.width") == width
+
+    # Markup is measured without its tags, and isn't mistaken for the same plain text
+    plain = eval(bar.eval("self.drawer.max_layout_size(['<b>a</b>'], 'sans', 12)"))
+    markup = eval(bar.eval("self.drawer.max_layout_size(['<b>a</b>'], 'sans', 12, True)"))
+    assert markup[0] < plain[0]
+
+
+class ThreadedConfig(GBConfig):
+    screens = [
+        libqtile.config.Screen(
+            top=libqtile.bar.Bar(
+                [
+                    libqtile.widget.TextBox(str(i % 10), name=f"text{i}", fontsize=8, padding=2)
+                    for i in range(40)
+                ],
+                24,
+                threaded_rendering=True,
+            )
+        )
+    ]
+
+
+@pytest.mark.parametrize("manager", [ThreadedConfig], indirect=True)
+def test_threaded_rendering(manager, record_property):
+    bar = manager.c.bar["top"]
+
+    @Retry(ignore_exceptions=(AssertionError,))
+    def rendered(count=None):
+        assert bar.eval("any(w.drawer.rendering for w in self.widgets)") == "False"
+        stats = manager.c.stats()["render"]
+        if count is not None:
+            assert stats["rasterized"] >= count
+        return stats
+
+    before = rendered()
+    bar.eval("self.draw()")
+    # Every widget is rendered on a worker thread
+    after = rendered(before["rasterized"] + 40)
+    record_property("rasterized", after["rasterized"] - before["rasterized"])
+    assert after["rasterized"] - before["rasterized"] >= 40
+    assert after["rasterize_failures"] == 0
+
+    # Only the last of several draws in a row needs to be shown
+    widget = manager.c.widget["text0"]
+    for text in ["a", "bb", "ccc"]:
+        widget.update(text)
+    rendered(after["rasterized"] + 1)
+    assert widget.eval("self.drawer._presented_serial == self.drawer._render_serial") == "True"
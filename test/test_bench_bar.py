@@ -0,0 +1,58 @@
+import asyncio
+
+import cairocffi
+
+from libqtile import bar, widget
+from libqtile.backend.offscreen.core import Core
+from libqtile.scripts.bench_bar import BarBench
+
+
+def test_offscreen_drawer():
+    window = Core().create_internal(0, 0, 20, 10)
+    drawer = window.create_drawer(10, 10)
+    drawer.clear("ff0000")
+    drawer.draw(offsetx=10)
+    window.surface.flush()
+
+    data = window.surface.get_data()
+    stride = window.surface.get_stride()
+    # Nothing has been drawn on the left, red (BGRA) on the right
+    assert bytes(data[0:4]) == b"\x00\x00\x00\x00"
+    assert bytes(data[stride - 4 : stride]) == b"\x00\x00\xff\xff"
+
+    # Copying what was drawn to the left
+    assert drawer.move(10, 0, 0, 0, 10, 10)
+    window.surface.flush()
+    assert bytes(data[0:4]) == b"\x00\x00\xff\xff"
+
+    # A resized window keeps what has been drawn
+    window.place(0, 0, 30, 10, 0, None)
+    assert window.surface.get_width() == 30
+    window.surface.flush()
+    assert bytes(window.surface.get_data()[0:4]) == b"\x00\x00\xff\xff"
+    window.kill()
+
+
+def test_bench_bar(tmp_path):
+    widgets = [widget.TextBox("one"), widget.Spacer(), widget.TextBox("two")]
+    bench = BarBench(bar.Bar(widgets, 24), width=400, height=300)
+
+    async def run():
+        await bench.configure()
+        try:
+            return bench.render(5), bench.snapshot(str(tmp_path))
+        finally:
+            bench.finalize()
+
+    stats, paths = asyncio.run(run())
+
+    assert [s.name for s in stats] == ["textbox", "spacer", "textbox"]
+    for s in stats:
+        assert len(s.times) == len(s.allocations) == 5
+        assert s.mean > 0
+
+    assert len(paths) == 4
+    image = cairocffi.ImageSurface.create_from_png(str(tmp_path / "bar.png"))
+    assert (image.get_width(), image.get_height()) == (400, 24)
+    image = cairocffi.ImageSurface.create_from_png(paths[1])
+    assert (image.get_width(), image.get_height()) == (widgets[0].width, 24)
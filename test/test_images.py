@@ -3,6 +3,7 @@ test_images.py contains unittests for libqtile.images.Img
 and its supporting code.
 """
 
+import asyncio
 import os
 from copy import copy
 from glob import glob
@@ -375,3 +376,153 @@ class TestLoader:
         names = ("audio-asdlfjasdvolume-muted", "audio-volume-muted")
         with pytest.raises(images.LoadingError):
             loader(*names)
+
+
+def test_linear_gradient_is_cached():
+    gradient = images.linear_gradient(["ff0000", "0000ff"], 20)
+    assert gradient.get_color_stops() == [
+        (0.0, 1.0, 0.0, 0.0, 1.0),
+        (1.0, 0.0, 0.0, 1.0, 1.0),
+    ]
+    assert images.linear_gradient(["ff0000", "0000ff"], 20) is gradient
+    assert images.linear_gradient(["ff0000", "0000ff"], 30) is not gradient
+    # Colours given as lists are drawn, but not cached
+    gradient = images.linear_gradient([[255, 0, 0], [0, 0, 255]], 20)
+    assert images.linear_gradient([[255, 0, 0], [0, 0, 255]], 20) is not gradient
+
+
+def path_key(path, size):
+    return (path, os.stat(path).st_mtime_ns, size, size)
+
+
+class TestImageCache:
+    @pytest.fixture(autouse=True)
+    def cache(self, monkeypatch):
+        cache = images.ImageCache(1024 * 1024)
+        monkeypatch.setattr(images, "cache", cache)
+        return cache
+
+    def test_shared(self, cache):
+        path = os.path.join(DATA_DIR, "png", "audio-volume-muted.png")
+        img0 = images.Img.from_path(path)
+        img0.resize(height=12)
+        img1 = images.Img.from_path(path)
+        img1.resize(height=12)
+        assert img1.surface is img0.surface
+
+        # Images are only decoded once for each size, and painted once per colour
+        img2 = images.Img.from_path(path)
+        img2.resize(height=48)
+        assert img2.surface is not img0.surface
+        masked = copy(img0).paint_mask("#ff0000")
+        assert masked.surface is not img0.surface
+        assert bytes(masked.surface.get_data()) != bytes(img0.surface.get_data())
+        assert copy(img0).paint_mask("#ff0000").surface is masked.surface
+        assert len(cache) == 4
+
+    def test_file_changed(self, cache, tmp_path):
+        path = tmp_path / "icon.png"
+        path.write_bytes(
+            open(os.path.join(DATA_DIR, "png", "audio-volume-muted.png"), "rb").read()
+        )
+        surface = images.Img.from_path(str(path)).surface
+        path.write_bytes(
+            open(os.path.join(DATA_DIR, "png", "battery-caution-charging.png"), "rb").read()
+        )
+        os.utime(path, ns=(0, 0))
+        assert images.Img.from_path(str(path)).surface is not surface
+
+    def test_budget(self, cache):
+        path = os.path.join(DATA_DIR, "png", "audio-volume-muted.png")
+        for height in (10, 20, 30):
+            img = images.Img.from_path(path)
+            img.resize(height=height)
+            img.surface
+        assert len(cache) == 4
+        assert cache.bytes == 4 * (24 * 24 + 10 * 10 + 20 * 20 + 30 * 30)
+
+        # The least recently used are dropped once they take too much memory
+        cache.max_bytes = cache.bytes - 1
+        assert len(cache) == 3
+        assert cache.get(path_key(path, 10)) is None
+        assert cache.bytes <= cache.max_bytes
+
+        # Images bigger than the whole cache aren't cached at all
+        cache.max_bytes = 100
+        img = images.Img.from_path(path)
+        img.surface
+        assert len(cache) == 0
+
+    def test_shared_surface_not_finished(self, cache, rgba_pixel_data):
+        path = os.path.join(DATA_DIR, "png", "audio-volume-muted.png")
+        img0 = images.Img.from_path(path)
+        img0.resize(height=24)
+        img1 = images.Img.from_path(path)
+        img1.resize(height=24)
+        assert img1.surface is img0.surface
+
+        # Pasting an image that isn't cached drops the surface from the cache, which
+        # img0 still paints
+        overlay = images.Img.from_data(rgba_pixel_data, cairocffi.FORMAT_ARGB32, 24, 24)
+        img1.paste(overlay)
+        with cairocffi.Context(img0.surface) as ctx:
+            ctx.paint()
+        assert img1.surface is not img0.surface
+
+    def test_data_not_cached(self, cache, rgba_pixel_data):
+        img = images.Img.from_data(rgba_pixel_data, cairocffi.FORMAT_ARGB32, 24, 24)
+        img.surface
+        assert len(cache) == 0
+
+
+def test_loader_remembers_paths(monkeypatch, tmp_path):
+    icon = tmp_path / "icons" / "audio-volume-muted.png"
+    icon.parent.mkdir()
+    icon.write_bytes(open(os.path.join(DATA_DIR, "png", "audio-volume-muted.png"), "rb").read())
+
+    scans = []
+    scan_files = images.scan_files
+
+    def counting_scan_files(directory, *names):
+        scans.append(names)
+        return scan_files(directory, *names)
+
+    monkeypatch.setattr(images, "scan_files", counting_scan_files)
+    loader = images.Loader(str(tmp_path))
+    assert loader("audio-volume-muted")["audio-volume-muted"].path == str(icon)
+    assert loader("audio-volume-muted")["audio-volume-muted"].path == str(icon)
+    assert len(scans) == 1
+
+    # Files that have been removed are looked for again
+    moved = tmp_path / "audio-volume-muted.png"
+    icon.rename(moved)
+    assert loader("audio-volume-muted")["audio-volume-muted"].path == str(moved)
+    assert len(scans) == 2
+
+
+def test_load_async(monkeypatch):
+    cache = images.ImageCache(1024 * 1024)
+    monkeypatch.setattr(images, "cache", cache)
+    path = os.path.join(DATA_DIR, "png", "audio-volume-muted.png")
+
+    async def run():
+        # Images loaded at the same time are only decoded once
+        img0, img1 = await asyncio.gather(
+            images.Img.load_async(path, height=12), images.Img.load_async(path, height=12)
+        )
+        assert img0.height == 12
+        assert img0.surface is img1.surface
+        assert img0.surface.get_height() == 12
+        assert len(cache) == 2
+
+        # And they share the surfaces of images loaded synchronously
+        img2 = images.Img.from_path(path)
+        img2.resize(height=12)
+        assert img2.surface is img0.surface
+
+        loaded = await images.Loader(os.path.join(DATA_DIR, "png")).load_async(
+            "audio-volume-muted"
+        )
+        assert loaded["audio-volume-muted"].default_surface is img0.default_surface
+
+    asyncio.run(run())
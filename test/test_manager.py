@@ -1118,6 +1118,15 @@ def test_change_loglevel(manager, backend_name):
         assert manager.c.core.eval("lib.WLR_SILENT == lib.wlr_log_get_verbosity()") == "True"
 
 
+@manager_config
+def test_stats(manager):
+    stats = manager.c.stats()
+    assert set(stats) == {"render", "caches", "sampler", "processes", "http"}
+    images = stats["caches"]["images"]
+    assert images["max_bytes"] == 64 * 1024 * 1024
+    assert images["bytes"] >= 0
+
+
 def test_switch_groups_cursor_warp(manager_nospawn):
     class SwitchGroupsCursorWarpConfig(ManagerConfig):
         cursor_warp = True
@@ -1,5 +1,6 @@
 import asyncio
 import os
+import subprocess
 from collections import OrderedDict
 from pathlib import Path
 from tempfile import TemporaryDirectory
@@ -208,3 +209,43 @@ async def test_concurrent_acall_processes():
         assert result.strip() == f"test{i}"
 
     assert len(utils.ASYNC_PIDS) == 0
+
+
+@pytest.mark.asyncio
+async def test_acall_process_timeout():
+    # Commands are waited for however long they take, unless given a timeout
+    assert await utils.acall_process("sleep 0.2; echo slow", shell=True) == "slow\n"
+    with pytest.raises(subprocess.TimeoutExpired):
+        await utils.acall_process(["sleep", "10"], timeout=0.1)
+
+
+def test_lru_cache():
+    cache = utils.LRUCache(2, name="test_lru_cache")
+    cache["a"] = 1
+    cache["b"] = 2
+    assert cache.get("a") == 1
+    # "b" is now the least recently used
+    cache["c"] = 3
+    assert "b" not in cache
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+    stats = utils.cache_stats()["test_lru_cache"]
+    assert stats == dict(hits=2, misses=1, evictions=1, size=2, hit_rate=0.667)
+
+    # Caches with the same name share their statistics
+    other = utils.LRUCache(2, name="test_lru_cache")
+    other["a"] = 1
+    other.clear()
+    cache.pop("a")
+    assert utils.cache_stats()["test_lru_cache"]["size"] == 1
+
+
+def test_rgb_is_cached():
+    utils.rgb("#0a0b0c")
+    hits = utils.cache_stats()["colours"]["hits"]
+    assert utils.rgb("#0a0b0c") == (10 / 255, 11 / 255, 12 / 255, 1.0)
+    assert utils.cache_stats()["colours"]["hits"] == hits + 1
+    # Lists can't be cached, but are still parsed
+    assert utils.rgb([255, 0, 0]) == (1.0, 0.0, 0.0, 1.0)
@@ -6,9 +6,17 @@ import subprocess
 import pytest
 
 from libqtile.bar import Bar
+from libqtile.core import http_client
 from libqtile.widget.base import ORIENTATION_HORIZONTAL
 
 
+@pytest.fixture(autouse=True)
+def http_cache(tmp_path, monkeypatch):
+    """Keep the responses that widgets fetch out of the user's cache"""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.setattr(http_client.client, "_cache_dir", None)
+
+
 @pytest.fixture(scope="function")
 def fake_bar():
     return FakeBar([])
@@ -22,7 +30,7 @@ class FakeBar(Bar):
         self.window = window
         self.horizontal = ORIENTATION_HORIZONTAL
 
-    def draw(self):
+    def draw(self, widget=None):
         pass
 
 
@@ -54,6 +62,11 @@ def fake_qtile():
     class FakeQtile:
         def __init__(self):
             self.register_widget = no_op
+            self.cancel_draw = no_op
+
+        # There are no frames to wait for so draw straight away
+        def schedule_draw(self, key, func):
+            func()
 
         # Widgets call call_soon(asyncio.create_task, self._config_async)
         # at _configure. The coroutine needs to be run in a loop to suppress
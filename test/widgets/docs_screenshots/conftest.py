@@ -120,7 +120,7 @@ def screenshot_manager(
             widget_class._configure(self, bar, screen)
 
             # By setting `has_mirrors` to True, the drawer will keep a copy of the latest
-            # contents in a separate RecordingSurface which we can access for our screenshots.
+            # contents in a separate image which we can access for our screenshots.
             self.drawer.has_mirrors = True
 
         @expose_command()
@@ -142,7 +142,7 @@ def screenshot_manager(
             Bar._configure(self, qtile, screen, **kwargs)
 
             # By setting `has_mirrors` to True, the drawer will keep a copy of the latest
-            # contents in a separate RecordingSurface which we can access for our screenshots.
+            # contents in a separate image which we can access for our screenshots.
             self.drawer.has_mirrors = True
 
         @expose_command()
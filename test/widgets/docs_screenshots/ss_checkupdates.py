@@ -6,7 +6,9 @@ from test.widgets.test_check_updates import MockPopen, MockSpawn
 
 @pytest.fixture
 def widget(monkeypatch):
-    monkeypatch.setattr("libqtile.widget.base.subprocess.check_output", MockSpawn.call_process)
+    monkeypatch.setattr(
+        "libqtile.widget.check_updates.CheckUpdates.call_process", MockSpawn.call_process
+    )
     monkeypatch.setattr("libqtile.widget.check_updates.Popen", MockPopen)
     yield libqtile.widget.CheckUpdates
 
@@ -38,7 +38,8 @@ def widget(monkeypatch):
 )
 def ss_hddbusygraph(screenshot_manager):
     widget = screenshot_manager.c.widget["hddbusygraph"]
-    widget.eval(f"self.values={values}")
+    widget.eval("self.lag_cycles = 1")
+    widget.eval(f"list(map(self.push, reversed({values})))")
     widget.eval(f"self.maxvalue={max(values)}")
     widget.eval("self.draw()")
     screenshot_manager.take_screenshot()
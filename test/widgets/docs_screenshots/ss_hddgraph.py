@@ -33,7 +33,8 @@ def widget(monkeypatch):
 )
 def ss_hddgraph(screenshot_manager):
     widget = screenshot_manager.c.widget["hddgraph"]
-    widget.eval(f"self.values={values}")
+    widget.eval("self.lag_cycles = 1")
+    widget.eval(f"list(map(self.push, reversed({values})))")
     widget.eval("self.maxvalue=400")
     widget.eval("self.draw()")
     screenshot_manager.take_screenshot()
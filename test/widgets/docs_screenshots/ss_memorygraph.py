@@ -47,6 +47,7 @@ def widget(monkeypatch):
 )
 def ss_memorygraph(screenshot_manager):
     widget = screenshot_manager.c.widget["memorygraph"]
-    widget.eval(f"self.values={values}")
+    widget.eval("self.lag_cycles = 1")
+    widget.eval(f"list(map(self.push, reversed({values})))")
     widget.eval("self.draw()")
     screenshot_manager.take_screenshot()
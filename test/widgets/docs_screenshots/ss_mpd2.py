@@ -1,15 +1,23 @@
-import sys
+from functools import partial
 
 import pytest
 
 import libqtile.widget
-from test.widgets.test_mpd2widget import MockMPD
+from test.helpers import Retry
+from test.widgets.test_mpd2widget import FakeMPD
 
 
 @pytest.fixture
-def widget(monkeypatch):
-    monkeypatch.setitem(sys.modules, "mpd", MockMPD("mpd"))
-    yield libqtile.widget.Mpd2
+def mpd_server():
+    server = FakeMPD()
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def widget(mpd_server):
+    yield partial(libqtile.widget.Mpd2, host="127.0.0.1", port=mpd_server.port)
 
 
 @pytest.mark.parametrize(
@@ -31,9 +39,14 @@ def ss_mpd2(screenshot_manager):
     ],
     indirect=True,
 )
-def ss_mpd2_idle(screenshot_manager):
+def ss_mpd2_idle(screenshot_manager, mpd_server):
+    mpd_server.change("player", index=3, state="stop")
     widget = screenshot_manager.c.widget["mpd2"]
-    widget.eval("self.client.force_idle()")
-    widget.eval("self.update(self.poll())")
+
+    @Retry(ignore_exceptions=(AssertionError,))
+    def assert_idle():
+        assert widget.info()["text"] == "■ MPD not playing"
+
+    assert_idle()
     widget.eval("self.bar.draw()")
     screenshot_manager.take_screenshot()
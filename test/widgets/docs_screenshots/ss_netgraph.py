@@ -50,7 +50,8 @@ def widget(monkeypatch):
 )
 def ss_netgraph(screenshot_manager):
     widget = screenshot_manager.c.widget["netgraph"]
-    widget.eval(f"self.values={values}")
+    widget.eval("self.lag_cycles = 1")
+    widget.eval(f"list(map(self.push, reversed({values})))")
     widget.eval(f"self.maxvalue={max(values)}")
     widget.eval("self.draw()")
     screenshot_manager.take_screenshot()
@@ -1,15 +1,13 @@
 import pytest
 
 from libqtile.widget import nvidia_sensors
-from test.widgets.test_nvidia_sensors import MockNvidiaSMI
+from test.widgets.test_nvidia_sensors import MockNvidiaSMI, MockWatch
 
 
 @pytest.fixture
 def widget(monkeypatch):
     monkeypatch.setattr(MockNvidiaSMI, "temperature", "65")
-    monkeypatch.setattr(
-        nvidia_sensors.NvidiaSensors, "call_process", MockNvidiaSMI.get_temperature
-    )
+    monkeypatch.setattr(nvidia_sensors.NvidiaSensors, "watches", lambda self: [MockWatch()])
     yield nvidia_sensors.NvidiaSensors
 
 
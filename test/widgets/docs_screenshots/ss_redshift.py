@@ -1,12 +1,12 @@
 import pytest
 
 import libqtile.widget
-from test.widgets.test_redshift import mock_run
+from test.widgets.test_redshift import mock_acall_process
 
 
 @pytest.fixture
 def widget(monkeypatch):
-    monkeypatch.setattr("subprocess.run", mock_run)
+    monkeypatch.setattr("libqtile.widget.redshift.Redshift.acall_process", mock_acall_process)
     yield libqtile.widget.redshift.Redshift
 
 
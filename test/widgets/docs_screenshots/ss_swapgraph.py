@@ -45,6 +45,7 @@ def widget(monkeypatch):
 )
 def ss_swapgraph(screenshot_manager):
     widget = screenshot_manager.c.widget["swapgraph"]
-    widget.eval(f"self.values={values}")
+    widget.eval("self.lag_cycles = 1")
+    widget.eval(f"list(map(self.push, reversed({values})))")
     widget.eval("self.draw()")
     screenshot_manager.take_screenshot()
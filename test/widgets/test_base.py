@@ -3,8 +3,9 @@ import pytest
 import libqtile.bar
 import libqtile.config
 from libqtile.command.base import expose_command
+from libqtile.core.watchers import FileWatch
 from libqtile.widget import Spacer, TextBox
-from libqtile.widget.base import BackgroundPoll, _Widget
+from libqtile.widget.base import BackgroundPoll, EventText, _Widget
 from test.helpers import BareConfig, Retry
 
 
@@ -108,6 +109,38 @@ def test_mirrors_different_bar(minimal_conf_noscreen, manager_nospawn):
     assert [w["name"] for w in screen1] == ["mirror"]
 
 
+COUNT_MIRROR_RASTERS = """
+self._test_rasters = 0
+self._test_surface = self.drawer.last_surface
+self.drawer._update_last_surface = lambda *args, f=self.drawer._update_last_surface, w=self: (
+    setattr(w, "_test_rasters", w._test_rasters + 1) or f(*args)
+)
+self.draw()
+"""
+
+
+def test_mirrors_share_raster(minimal_conf_noscreen, manager_nospawn):
+    """Mirrors paint an image that the widget renders once per draw."""
+    config = minimal_conf_noscreen
+    tbox = TextBox("Testing Mirrors")
+    config.fake_screens = [
+        libqtile.config.Screen(
+            top=libqtile.bar.Bar([tbox], 10), x=200 * i, y=0, width=200, height=600
+        )
+        for i in range(4)
+    ]
+
+    manager_nospawn.start(config)
+    widget = manager_nospawn.c.widget["textbox"]
+    assert widget.eval("len(self._mirrors)") == "3"
+
+    widget.eval(COUNT_MIRROR_RASTERS)
+    assert widget.eval("self._test_rasters") == "1"
+    # The image is reused as long as the widget's size doesn't change
+    assert widget.eval("self.drawer.last_surface is self._test_surface") == "True"
+    assert widget.eval("self.drawer.last_surface.get_width() == self.width") == "True"
+
+
 def test_mirrors_stretch(minimal_conf_noscreen, manager_nospawn):
     """Verify that mirror widgets stretch according to their own bar"""
     config = minimal_conf_noscreen
@@ -162,6 +195,43 @@ def test_threadpolltext_update_interval_none(minimal_conf_noscreen, manager_nosp
     assert widget.info()["text"] == "Poll count: 1"
 
 
+class WatchingWidget(EventText):
+    def __init__(self, path, **config):
+        EventText.__init__(self, **config)
+        self.path = path
+
+    def watches(self):
+        return [FileWatch([self.path])]
+
+    def poll(self):
+        with open(self.path) as f:
+            return f.read().strip()
+
+
+def test_eventtext_updates_on_change(minimal_conf_noscreen, manager_nospawn, tmp_path):
+    """Check that the widget is updated when what it watches changes"""
+    path = tmp_path / "value"
+    path.write_text("before")
+    config = minimal_conf_noscreen
+    watching = WatchingWidget(str(path), update_interval=None)
+    config.screens = [libqtile.config.Screen(top=libqtile.bar.Bar([watching], 10))]
+
+    manager_nospawn.start(config)
+    widget = manager_nospawn.c.widget["watchingwidget"]
+
+    # Widget is polled immediately when configured
+    assert widget.info()["text"] == "before"
+
+    @Retry(ignore_exceptions=(AssertionError,))
+    def assert_text(text):
+        assert widget.info()["text"] == text
+
+    # and again when the file changes, without a timer
+    path.write_text("after")
+    assert_text("after")
+    assert widget.eval("len(self._watching)") == "1"
+
+
 class ScrollingTextConfig(BareConfig):
     screens = [
         libqtile.config.Screen(
@@ -239,6 +309,63 @@ def test_text_scroll_long_text(manager):
     wait_for_scroll(widget)
 
 
+SCROLL_TICKS = """
+import time
+self._test_text_draws = 0
+self.layout.draw = lambda *args, f=self.layout.draw, w=self, **kwargs: (
+    setattr(w, "_test_text_draws", w._test_text_draws + 1) or f(*args, **kwargs)
+)
+start = time.process_time()
+for i in range(100):
+    self._scroll_offset = i
+    self.draw()
+self._test_tick_time = (time.process_time() - start) / 100
+del self.layout.draw
+"""
+
+# How scrolling used to draw: render the whole text again for every step
+RENDER_EVERY_TICK = """
+self._draw_scrolled_text = lambda x, y, height, w=self: w.layout.draw(
+    x - w._scroll_offset, y
+)
+"""
+
+
+@scrolling_text_config
+def test_text_scroll_is_prerendered(manager, record_property):
+    """
+    Scrolling paints an image of the text rendered once, rather than rendering the
+    text for every step.
+    """
+    widget = manager.c.widget["longer_text"]
+    assert widget.eval("self._should_scroll") == "True"
+
+    def ticks():
+        widget.eval(SCROLL_TICKS)
+        return int(widget.eval("self._test_text_draws")), float(
+            widget.eval("self._test_tick_time")
+        )
+
+    widget.eval("self.draw()")
+    draws, seconds = ticks()
+    record_property("prerendered_tick_seconds", seconds)
+    assert draws == 0
+
+    widget.eval(RENDER_EVERY_TICK)
+    draws, seconds = ticks()
+    record_property("render_every_tick_seconds", seconds)
+    assert draws == 100
+    widget.eval("del self._draw_scrolled_text")
+
+    # The image is rendered again when the text changes
+    @Retry(ignore_exceptions=(AssertionError,))
+    def rendered_text():
+        assert widget.eval("self._scroll_raster_key[0]") == "Other text " * 5
+
+    widget.update("Other text " * 5)
+    rendered_text()
+
+
 @scrolling_text_config
 def test_scroll_fixed_width(manager):
     widget = manager.c.widget["fixed_width"]
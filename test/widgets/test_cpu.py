@@ -7,6 +7,7 @@ import pytest
 import libqtile.config
 import libqtile.widget
 from libqtile.bar import Bar
+from test.helpers import Retry
 
 
 class MockPsutil(ModuleType):
@@ -41,5 +42,10 @@ def cpu_manager(monkeypatch, manager_nospawn, minimal_conf_noscreen):
     yield manager_nospawn
 
 
+@Retry(ignore_exceptions=(AssertionError,))
+def assert_text(manager, text):
+    assert manager.c.widget["cpu"].info()["text"] == text
+
+
 def test_cpu(cpu_manager):
-    assert cpu_manager.c.widget["cpu"].info()["text"] == "CPU 0.5GHz 2.6%"
+    assert_text(cpu_manager, "CPU 0.5GHz 2.6%")
@@ -3,6 +3,7 @@ import libqtile.config
 import libqtile.confreader
 import libqtile.layout
 from libqtile.widget import CurrentLayout
+from test.helpers import Retry
 
 
 def get_widget_config(widget, config):
@@ -17,6 +18,12 @@ def get_widget_config(widget, config):
     return config
 
 
+@Retry(ignore_exceptions=(AssertionError,))
+def wait_for_icons(widget):
+    # The icons are decoded in the background
+    assert widget.eval("self.icons_loaded") == "True"
+
+
 def test_current_layout(manager_nospawn, minimal_conf_noscreen):
     config = get_widget_config(CurrentLayout(), minimal_conf_noscreen)
     manager_nospawn.start(config)
@@ -55,6 +62,7 @@ def test_current_layout_icon_mode(manager_nospawn, minimal_conf_noscreen):
     config = get_widget_config(CurrentLayout(mode="icon"), minimal_conf_noscreen)
     manager_nospawn.start(config)
     widget = manager_nospawn.c.widget["currentlayout"]
+    wait_for_icons(widget)
     img_length = int(widget.eval("self.img_length"))
     padding = int(widget.eval("self.padding"))
     text_length = int(widget.eval("super(type(self), self).calculate_length()"))
@@ -75,6 +83,7 @@ def test_current_layout_text_mode(manager_nospawn, minimal_conf_noscreen):
     config = get_widget_config(CurrentLayout(mode="text"), minimal_conf_noscreen)
     manager_nospawn.start(config)
     widget = manager_nospawn.c.widget["currentlayout"]
+    wait_for_icons(widget)
     img_length = int(widget.eval("self.img_length"))
     padding = int(widget.eval("self.padding"))
     text_length = int(widget.eval("super(type(self), self).calculate_length()"))
@@ -95,6 +104,7 @@ def test_current_layout_both_mode(manager_nospawn, minimal_conf_noscreen):
     config = get_widget_config(CurrentLayout(mode="both"), minimal_conf_noscreen)
     manager_nospawn.start(config)
     widget = manager_nospawn.c.widget["currentlayout"]
+    wait_for_icons(widget)
     img_length = int(widget.eval("self.img_length"))
     padding = int(widget.eval("self.padding"))
     text_length = int(widget.eval("super(type(self), self).calculate_length()"))
@@ -105,3 +115,25 @@ def test_current_layout_both_mode(manager_nospawn, minimal_conf_noscreen):
     widget.bar.fake_button_press(0, 0, button=3)
     length = int(widget.eval("self.length"))
     assert length == text_length + img_length + padding
+
+
+class NoIconsCurrentLayout(CurrentLayout):
+    def find_icon_file_path(self, layout_name):
+        return None
+
+
+def test_current_layout_icons_missing(manager_nospawn, minimal_conf_noscreen):
+    config = get_widget_config(NoIconsCurrentLayout(mode="icon"), minimal_conf_noscreen)
+    manager_nospawn.start(config)
+    widget = manager_nospawn.c.widget["noiconscurrentlayout"]
+
+    @Retry(ignore_exceptions=(AssertionError,))
+    def wait_for_text():
+        assert widget.eval("self.mode") == "text"
+
+    # Without icons, the layout's name is shown
+    wait_for_text()
+    assert widget.info()["text"] == "columns"
+    text_length = int(widget.eval("super(type(self), self).calculate_length()"))
+    assert int(widget.eval("self.length")) == text_length
+    assert "Could not load the layout icons" in manager_nospawn.get_log_buffer()
@@ -18,14 +18,15 @@ class DunstStatus:
         return cls.PAUSED
 
 
-def mock_check_output(args):
-    status = str(DunstStatus.PAUSED).lower()
-    return status.encode()
+def mock_call_process(self, args, **kwargs):
+    return str(DunstStatus.PAUSED).lower()
 
 
 @pytest.fixture(scope="function")
 def patched_dnd(monkeypatch):
-    monkeypatch.setattr("libqtile.widget.do_not_disturb.check_output", mock_check_output)
+    monkeypatch.setattr(
+        "libqtile.widget.do_not_disturb.DoNotDisturb.call_process", mock_call_process
+    )
 
     class PatchedDND(dnd.DoNotDisturb):
         def __init__(self, **config):
@@ -2,6 +2,7 @@ import pytest
 
 import libqtile
 from libqtile.widget import gen_poll_url, generic_poll_text
+from test.helpers import Retry
 
 
 def test_gen_poll_text():
@@ -92,3 +93,30 @@ def test_gen_poll_command(manager_nospawn, minimal_conf_noscreen):
     manager_nospawn.start(config)
     command = manager_nospawn.c.widget["genpollcommand"]
     assert command.info()["text"] == "hello"
+
+
+def test_gen_poll_command_watch(manager_nospawn, minimal_conf_noscreen, tmp_path):
+    state = tmp_path / "state"
+    state.write_text("before")
+    trigger = tmp_path / "trigger"
+    gpcommand = generic_poll_text.GenPollCommand(
+        cmd=f"cat {state}",
+        shell=True,
+        update_interval=None,
+        watch_cmd=f"while [ ! -e {trigger} ]; do sleep 0.05; done; echo changed; sleep 60",
+    )
+    config = minimal_conf_noscreen
+    config.screens = [libqtile.config.Screen(top=libqtile.bar.Bar([gpcommand], 10))]
+    manager_nospawn.start(config)
+    command = manager_nospawn.c.widget["genpollcommand"]
+    assert command.info()["text"] == "before"
+
+    # The widget updates when the watched command prints something
+    state.write_text("after")
+    trigger.touch()
+
+    @Retry(ignore_exceptions=(AssertionError,))
+    def assert_updated():
+        assert command.info()["text"] == "after"
+
+    assert_updated()
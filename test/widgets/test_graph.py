@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+from libqtile.bar import Bar
+from libqtile.scripts.bench_bar import BarBench
+from libqtile.widget.graph import _Graph
+
+
+class Graph(_Graph):
+    def sources(self):
+        return []
+
+    def update_graph(self):
+        self.push(0)
+
+
+def run_graph(func, **config):
+    # Draw the graph to an offscreen window
+    graph = Graph(frequency=1000, **config)
+    bench = BarBench(Bar([graph], 20), width=200, height=100)
+
+    async def run():
+        await bench.configure()
+        try:
+            func(graph)
+        finally:
+            bench.finalize()
+
+    asyncio.run(run())
+
+
+def test_graph_samples():
+    def check(graph):
+        graph.lag_cycles = 1
+        for value in (5, 1, 3):
+            graph.push(value)
+        assert list(graph.values) == [3, 1, 5, 0]
+        assert graph.maxvalue == 5
+
+        graph.push(2)
+        graph.push(2)
+        assert list(graph.values) == [2, 2, 3, 1]
+        assert graph.maxvalue == 3
+
+        # Compensating for lag
+        graph.lag_cycles = 2
+        graph.push(1)
+        assert list(graph.values) == [1, 1, 2, 2]
+        assert graph.maxvalue == 2
+
+        graph.fulfill(4)
+        assert list(graph.values) == [4, 4, 4, 4]
+        assert graph.maxvalue == 2
+        graph.lag_cycles = 1
+        graph.push(0)
+        assert graph.maxvalue == 4
+
+    run_graph(check, samples=4)
+
+
+@pytest.mark.parametrize("graph_type", ["box", "line", "linefill"])
+def test_graph_shifts_raster(graph_type):
+    def check(graph):
+        graph.lag_cycles = 1
+        for value in (2, 7, 4, 9, 1, 6):
+            graph.push(value)
+        graph.draw()
+        first = graph._raster
+
+        # The scale is the same, so the last raster is shifted
+        graph.push(3)
+        graph.draw()
+        shifted = graph._raster
+        assert shifted is not first
+        assert graph._raster_key is not None
+
+        # and it looks like the graph drawn from scratch
+        graph._raster = None
+        graph._new_samples = 0
+        graph.draw()
+        redrawn = graph._raster
+        shifted.flush()
+        redrawn.flush()
+        difference = max(
+            abs(a - b) for a, b in zip(bytes(shifted.get_data()), bytes(redrawn.get_data()))
+        )
+        assert difference <= (0 if graph_type == "box" else 8)
+
+        # Nothing new: the raster is reused
+        graph.draw()
+        assert graph._raster is redrawn
+
+    # Two pixels per sample
+    run_graph(
+        check,
+        samples=20,
+        width=40,
+        margin_x=0,
+        border_width=0,
+        type=graph_type,
+    )
@@ -5,6 +5,7 @@ import pytest
 import libqtile.bar
 import libqtile.config
 from libqtile import widget
+from test.helpers import Retry
 
 TEST_DIR = path.dirname(path.abspath(__file__))
 DATA_DIR = path.join(TEST_DIR, "..", "data", "png")
@@ -27,9 +28,14 @@ def test_default_settings(manager_nospawn, minimal_conf_noscreen, screen, locati
     manager_nospawn.start(config)
     bar = manager_nospawn.c.bar[location]
 
-    info = bar.info()
-    for dimension in ["height", "width"]:
-        assert info["widgets"][0][dimension] == info[attribute]
+    # The image is decoded in the background
+    @Retry(ignore_exceptions=(AssertionError,))
+    def assert_size():
+        info = bar.info()
+        for dimension in ["height", "width"]:
+            assert info["widgets"][0][dimension] == info[attribute]
+
+    assert_size()
 
 
 no_img = widget.Image()
@@ -74,8 +80,29 @@ def test_no_scale(manager_nospawn, minimal_conf_noscreen):
     manager_nospawn.start(config)
     bar = manager_nospawn.c.bar["top"]
 
-    info = bar.info()
-    assert info["widgets"][0]["width"] == 24
+    @Retry(ignore_exceptions=(AssertionError,))
+    def assert_width():
+        assert bar.info()["widgets"][0]["width"] == 24
+
+    assert_width()
+
+
+def test_update(manager_nospawn, minimal_conf_noscreen):
+    img2 = widget.Image(filename=IMAGE_FILE, scale=False)
+
+    config = minimal_conf_noscreen
+    config.screens = [libqtile.config.Screen(top=libqtile.bar.Bar([img2], 40))]
+
+    manager_nospawn.start(config)
+    bar = manager_nospawn.c.bar["top"]
+
+    @Retry(ignore_exceptions=(AssertionError,))
+    def assert_width(width):
+        assert bar.info()["widgets"][0]["width"] == width
+
+    assert_width(24)
+    manager_nospawn.c.widget["image"].update("/this/file/does/not/exist")
+    assert_width(0)
 
 
 def test_no_image(manager_nospawn, minimal_conf_noscreen):
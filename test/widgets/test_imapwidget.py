@@ -1,45 +1,115 @@
+import asyncio
 import sys
 from importlib import reload
 from types import ModuleType
 
 import pytest
 
-from test.widgets.conftest import FakeBar
 
+class FakeKeyring(ModuleType):
+    valid = True
 
-class FakeIMAP(ModuleType):
-    class IMAP4_SSL:  # noqa: N801
-        def __init__(self, *args, **kwargs):
-            pass
+    def get_password(self, _app, user):
+        if self.valid:
+            return "password"
+        return None
 
-        def login(self, username, password):
-            self.username = username
-            self.password = password
 
-        def status(self, path, *args, **kwargs):
-            if not (self.username and self.password):
-                return False, None
+class FakeIMAPServer:
+    """A local stand-in for an IMAP server, which knows just enough of the protocol"""
 
-            return ("OK", [f'"{path}" (UNSEEN 2)'.encode()])
+    def __init__(self, idle=True, esearch=False, password="secret"):
+        self.idle = idle
+        self.esearch = esearch
+        self.password = password
+        # An untagged response to send once, that is too long to be read as a line
+        self.long_response = False
+        self.unseen = [1, 2]
+        self.commands = []
+        self.searches = []
+        self.idling = asyncio.Event()
+        self._writers = []
 
-        def logout(self):
-            pass
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
 
+    def stop(self):
+        self.drop_connections()
+        self.server.close()
 
-class FakeKeyring(ModuleType):
-    valid = True
+    def new_mail(self, unseen):
+        self.unseen = unseen
+        for writer in self._writers:
+            writer.write(f"* {len(unseen)} EXISTS\r\n".encode())
 
-    def get_password(self, _app, user):
-        if self.valid:
-            return "password"
-        return None
+    def drop_connections(self):
+        for writer in self._writers:
+            writer.close()
+        self._writers.clear()
+        self.idling.clear()
+
+    async def _readline(self, reader, writer):
+        line = (await reader.readline()).decode().rstrip("\r\n")
+        # Turn literals into quoted strings
+        while line.endswith("}"):
+            line, _, length = line[:-1].rpartition("{")
+            writer.write(b"+ Ready for literal\r\n")
+            data = await reader.readexactly(int(length))
+            line += '"' + data.decode() + '"'
+            line += (await reader.readline()).decode().rstrip("\r\n")
+        return line
+
+    async def _handle(self, reader, writer):
+        self._writers.append(writer)
+        writer.write(b"* OK IMAP4rev1 ready\r\n")
+        idle_tag = None
+        while line := await self._readline(reader, writer):
+            if idle_tag is not None:
+                if line == "DONE":
+                    writer.write(f"{idle_tag} OK IDLE terminated\r\n".encode())
+                    idle_tag = None
+                    self.idling.clear()
+                continue
+
+            tag, command, *args = line.split(" ")
+            self.commands.append(command)
+            if command == "LOGIN":
+                if args != ['"qtile"', f'"{self.password}"']:
+                    writer.write(f"{tag} NO wrong password\r\n".encode())
+                    continue
+            elif command == "CAPABILITY":
+                capabilities = "IMAP4rev1"
+                if self.idle:
+                    capabilities += " IDLE"
+                if self.esearch:
+                    capabilities += " ESEARCH"
+                writer.write(f"* CAPABILITY {capabilities}\r\n".encode())
+            elif command == "SEARCH":
+                self.searches.append(" ".join(args))
+                if self.long_response:
+                    self.long_response = False
+                    writer.write(b"* OK " + b"x" * (2 * 1024 * 1024) + b"\r\n")
+                if args[0] == "RETURN":
+                    unseen = f'* ESEARCH (TAG "{tag}") COUNT {len(self.unseen)}'
+                else:
+                    unseen = " ".join(["* SEARCH", *map(str, self.unseen)])
+                writer.write(unseen.encode() + b"\r\n")
+            elif command == "IDLE":
+                if not self.idle:
+                    writer.write(f"{tag} BAD unknown command\r\n".encode())
+                    continue
+                writer.write(b"+ idling\r\n")
+                idle_tag = tag
+                self.idling.set()
+                continue
+            writer.write(f"{tag} OK {command} completed\r\n".encode())
+            await writer.drain()
 
 
 @pytest.fixture()
 def patched_imap(monkeypatch):
-    monkeypatch.delitem(sys.modules, "imaplib", raising=False)
     monkeypatch.delitem(sys.modules, "keyring", raising=False)
-    monkeypatch.setitem(sys.modules, "imaplib", FakeIMAP("imaplib"))
     monkeypatch.setitem(sys.modules, "keyring", FakeKeyring("keyring"))
     from libqtile.widget import imapwidget
 
@@ -47,29 +117,162 @@ def patched_imap(monkeypatch):
     yield imapwidget
 
 
-def test_imapwidget(fake_qtile, monkeypatch, fake_window, patched_imap):
-    imap = patched_imap.ImapWidget(user="qtile")
-    fakebar = FakeBar([imap], window=fake_window)
-    imap._configure(fake_qtile, fakebar)
-    text = imap.poll()
-    assert text == "INBOX: 2"
+async def wait_for(condition):
+    for _ in range(200):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("Timed out")
 
 
-def test_imapwidget_with_password(fake_qtile, monkeypatch, fake_window, patched_imap):
-    # keyring should not be called
-    patched_imap.keyring.valid = False
-    imap = patched_imap.ImapWidget(user="qtile", password="password")
-    fakebar = FakeBar([imap], window=fake_window)
-    imap._configure(fake_qtile, fakebar)
-    text = imap.poll()
-    assert text == "INBOX: 2"
+def make_widget(imapwidget, server, **config):
+    widget = imapwidget.ImapWidget(
+        user="qtile",
+        password="secret",
+        server="127.0.0.1",
+        port=server.port,
+        ssl=False,
+        reconnect_delay=0.01,
+        **config,
+    )
+    texts = []
+    widget.update = texts.append
+    return widget, texts
+
+
+@pytest.mark.asyncio
+async def test_imapwidget_idle(patched_imap):
+    server = FakeIMAPServer()
+    await server.start()
+    widget, texts = make_widget(patched_imap, server)
+    widget.timer_setup()
+    try:
+        await wait_for(lambda: texts == ["INBOX: 2"])
 
+        # The server tells the widget about new mail
+        await asyncio.wait_for(server.idling.wait(), 2)
+        server.new_mail([1, 2, 3])
+        await wait_for(lambda: texts[-1] == "INBOX: 3")
 
-def test_imapwidget_password_none(fake_qtile, monkeypatch, fake_window, patched_imap):
+        # Mail is counted on one connection, which is only logged in to once
+        assert server.commands.count("LOGIN") == 1
+        assert server.commands.count("IDLE") == 2
+    finally:
+        widget._task.cancel()
+        server.stop()
+
+
+@pytest.mark.asyncio
+async def test_imapwidget_idle_timeout(patched_imap):
+    server = FakeIMAPServer()
+    await server.start()
+    widget, texts = make_widget(patched_imap, server, idle_timeout=0.05)
+    widget.timer_setup()
+    try:
+        # IDLE is restarted after a NOOP, without counting mail again
+        await wait_for(lambda: server.commands.count("IDLE") >= 3)
+        assert "NOOP" in server.commands
+        assert server.commands.count("SEARCH") == 1
+    finally:
+        widget._task.cancel()
+        server.stop()
+
+
+@pytest.mark.asyncio
+async def test_imapwidget_no_idle(patched_imap):
+    server = FakeIMAPServer(idle=False)
+    await server.start()
+    widget, texts = make_widget(patched_imap, server, update_interval=0.05)
+    widget.timer_setup()
+    try:
+        await wait_for(lambda: server.commands.count("SEARCH") >= 3)
+        assert "IDLE" not in server.commands
+        # STATUS mustn't be used on the examined mailbox
+        assert "STATUS" not in server.commands
+        assert server.searches[-1] == "UNSEEN"
+        assert server.commands.count("LOGIN") == 1
+        assert texts[-1] == "INBOX: 2"
+    finally:
+        widget._task.cancel()
+        server.stop()
+
+
+@pytest.mark.asyncio
+async def test_imapwidget_reconnect(patched_imap):
+    server = FakeIMAPServer()
+    await server.start()
+    widget, texts = make_widget(patched_imap, server, hide_no_unseen=True)
+    widget.timer_setup()
+    try:
+        await asyncio.wait_for(server.idling.wait(), 2)
+        server.unseen = []
+        server.drop_connections()
+        await wait_for(lambda: texts[-1] == "")
+        assert server.commands.count("LOGIN") == 2
+    finally:
+        widget._task.cancel()
+        server.stop()
+
+
+@pytest.mark.asyncio
+async def test_imapwidget_esearch(patched_imap):
+    server = FakeIMAPServer(esearch=True)
+    await server.start()
+    widget, texts = make_widget(patched_imap, server)
+    widget.timer_setup()
+    try:
+        await wait_for(lambda: texts == ["INBOX: 2"])
+        assert server.searches == ["RETURN (COUNT) UNSEEN"]
+    finally:
+        widget._task.cancel()
+        server.stop()
+
+
+@pytest.mark.asyncio
+async def test_imapwidget_literal_password(patched_imap):
+    server = FakeIMAPServer(password="sécret")
+    await server.start()
+    widget, texts = make_widget(patched_imap, server)
+    widget.password = "sécret"
+    widget.timer_setup()
+    try:
+        await wait_for(lambda: texts == ["INBOX: 2"])
+    finally:
+        widget._task.cancel()
+        server.stop()
+
+
+@pytest.mark.asyncio
+async def test_imapwidget_long_response(patched_imap):
+    server = FakeIMAPServer()
+    server.long_response = True
+    await server.start()
+    widget, texts = make_widget(patched_imap, server)
+    widget.timer_setup()
+    try:
+        # The widget reconnects, rather than giving up
+        await wait_for(lambda: texts == ["INBOX: 2"])
+        assert server.commands.count("LOGIN") == 2
+    finally:
+        widget._task.cancel()
+        server.stop()
+
+
+def test_imapwidget_password_none(patched_imap):
     patched_imap.keyring.valid = False
 
-    imap = patched_imap.ImapWidget(user="qtile")
-    fakebar = FakeBar([imap], window=fake_window)
-    imap._configure(fake_qtile, fakebar)
-    text = imap.poll()
-    assert text == "No password error"
+    widget = patched_imap.ImapWidget(user="qtile")
+    texts = []
+    widget.update = texts.append
+    widget.timer_setup()
+    assert texts == ["No password error"]
+
+
+def test_imapwidget_keyring(patched_imap):
+    widget = patched_imap.ImapWidget(user="qtile")
+    assert widget.password == "password"
+
+    # keyring should not be called
+    patched_imap.keyring.valid = False
+    widget = patched_imap.ImapWidget(user="qtile", password="secret")
+    assert widget.password == "secret"
@@ -0,0 +1,163 @@
+import asyncio
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+from libqtile.widget.maildir import Maildir
+
+
+@pytest.fixture
+def maildir(tmp_path):
+    for folder in ("INBOX", "spam"):
+        for sub_dir in ("cur", "new", "tmp"):
+            (tmp_path / folder / sub_dir).mkdir(parents=True)
+    (tmp_path / "INBOX" / "new" / "1").touch()
+    (tmp_path / "INBOX" / "new" / ".hidden").touch()
+    (tmp_path / "INBOX" / "cur" / "2:2,S").touch()
+    return tmp_path
+
+
+def make_widget(**config):
+    widget = Maildir(**config)
+
+    def run_in_executor(func, *args):
+        return asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    widget.qtile = SimpleNamespace(run_in_executor=run_in_executor)
+    return widget
+
+
+def handler(widget):
+    """Handle events as EventText does, updating the widget after each"""
+
+    def handle(event):
+        widget.on_event(event)
+        widget.tick()
+
+    return handle
+
+
+async def counted(widget):
+    """Wait for the subfolders being counted on worker threads"""
+    while widget._scanning:
+        await asyncio.sleep(0.01)
+
+
+def test_maildir_poll(maildir):
+    async def run():
+        widget = make_widget(maildir_path=str(maildir), sub_folders=["INBOX", "spam"])
+        widget.tick()
+        # The subfolders are counted on a worker thread
+        assert widget._scanning
+        await counted(widget)
+        assert widget.poll() == "INBOX: 1 spam: 0"
+
+        widget = make_widget(maildir_path=str(maildir), sub_folders=["INBOX", "spam"], total=True)
+        widget.tick()
+        await counted(widget)
+        assert widget.poll() == "INBOX: 1"
+
+    asyncio.run(run())
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux only")
+def test_maildir_watch(maildir, monkeypatch):
+    new = maildir / "INBOX" / "new"
+    widget = make_widget(maildir_path=str(maildir), sub_folders=["INBOX"])
+    monkeypatch.setattr(widget, "timeout_add", lambda delay, func: None)
+
+    async def run():
+        (watch,) = widget.watches()
+        watch.start(handler(widget))
+        widget._watching.append(watch)
+        widget.tick()
+        await counted(widget)
+        assert widget.poll() == "INBOX: 1"
+
+        # Mails arriving, being read and being deleted update the count
+        (new / "3").touch()
+        (new / "4").touch()
+        (new / "1").rename(maildir / "INBOX" / "cur" / "1:2,S")
+        await asyncio.sleep(0.05)
+        assert widget.poll() == "INBOX: 2"
+
+        (new / "3").unlink()
+        await asyncio.sleep(0.05)
+        assert widget.poll() == "INBOX: 1"
+
+        # Everything is counted again if changes were lost
+        (new / "5").touch()
+        watch.stop()
+        widget.on_event(None)
+        await counted(widget)
+        assert widget.poll() == "INBOX: 2"
+
+        # Changes made while a folder is counted are applied once it is
+        widget.on_event(None)
+        (new / "5").unlink()
+        widget.on_event(str(new / "5"))
+        (new / "6").touch()
+        widget.on_event(str(new / "6"))
+        await counted(widget)
+        assert widget.poll() == "INBOX: 2"
+        assert widget._new[str(new)] == {"4", "6"}
+
+    asyncio.run(run())
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux only")
+def test_maildir_watch_missing_folders(maildir, monkeypatch):
+    spam = maildir / "spam" / "new"
+    spam.rmdir()
+    widget = make_widget(maildir_path=str(maildir), sub_folders=["INBOX", "spam"])
+    retries = []
+
+    def timeout_add(delay, func):
+        retries.append(func)
+        return func
+
+    monkeypatch.setattr(widget, "timeout_add", timeout_add)
+
+    async def run():
+        (watch,) = widget.watches()
+        watch.start(handler(widget))
+        widget._watching.append(watch)
+        widget.tick()
+        await counted(widget)
+        assert widget.poll() == "INBOX: 1 spam: 0"
+        # The missing folder is tried again later
+        assert len(retries) == 1
+
+        # and is watched once it is created
+        spam.mkdir()
+        (spam / "1").touch()
+        retries.pop()()
+        await counted(widget)
+        assert widget.poll() == "INBOX: 1 spam: 1"
+        assert watch.watching(str(spam))
+        assert not retries
+
+        (spam / "2").touch()
+        await asyncio.sleep(0.05)
+        assert widget.poll() == "INBOX: 1 spam: 2"
+
+        # A folder that is removed and created again is watched again too
+        for mail in spam.iterdir():
+            mail.unlink()
+        spam.rmdir()
+        await asyncio.sleep(0.05)
+        assert widget.poll() == "INBOX: 1 spam: 0"
+        assert len(retries) == 1
+
+        spam.mkdir()
+        (spam / "3").touch()
+        retries.pop()()
+        await counted(widget)
+        (spam / "4").touch()
+        await asyncio.sleep(0.05)
+        assert widget.poll() == "INBOX: 1 spam: 2"
+
+        watch.stop()
+
+    asyncio.run(run())
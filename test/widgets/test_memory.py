@@ -6,6 +6,7 @@ import pytest
 
 import libqtile.bar
 import libqtile.config
+from test.helpers import Retry
 
 
 def no_op(*args, **kwargs):
@@ -50,7 +51,12 @@ def test_memory_defaults(manager_nospawn, minimal_conf_noscreen, patched_memory)
     config = minimal_conf_noscreen
     config.screens = [libqtile.config.Screen(top=libqtile.bar.Bar([widget], 10))]
     manager_nospawn.start(config)
-    assert manager_nospawn.c.widget["memory"].info()["text"] == " 2417M/ 7802M"
+
+    @Retry(ignore_exceptions=(AssertionError,))
+    def assert_text():
+        assert manager_nospawn.c.widget["memory"].info()["text"] == " 2417M/ 7802M"
+
+    assert_text()
 
 
 @pytest.mark.parametrize(
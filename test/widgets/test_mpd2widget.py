@@ -1,99 +1,164 @@
-import sys
-from types import ModuleType
+import asyncio
+import shlex
+import threading
 
 import pytest
 
 import libqtile.config
 from libqtile import widget
+from test.helpers import Retry
 
 
-class MockMPD(ModuleType):
-    class ConnectionError(Exception):
-        pass
+class FakeMPD:
+    """
+    A local stand-in for an MPD server, which knows just enough of the protocol. It
+    runs on its own thread, so that Qtile can connect to it from its own process.
+    """
 
-    class CommandError(Exception):
-        pass
-
-    class MPDClient:
-        tracks = [
-            {"title": "Never gonna give you up", "artist": "Rick Astley", "song": "0"},
-            {"title": "Sweet Caroline", "artist": "Neil Diamond"},
-            {"title": "Marea", "artist": "Fred Again.."},
-            {},
-            {"title": "Sweden", "performer": "C418"},
-        ]
-
-        def __init__(self):
-            self._index = 0
-            self._connected = False
-            self._state_override = True
-            self._status = {"state": "pause"}
-
-        @property
-        def _current_song(self):
-            return self.tracks[self._index]
-
-        def ping(self):
-            if not self._connected:
-                raise ConnectionError()
-            return self._state_override
-
-        def connect(self, host, port):
-            return True
-
-        def command_list_ok_begin(self):
-            pass
-
-        def status(self):
-            return self._status
-
-        def currentsong(self):
-            return self._index + 1
-
-        def command_list_end(self):
-            return (self.status(), self._current_song)
-
-        def close(self):
-            pass
-
-        def disconnect(self):
-            pass
-
-        def pause(self):
-            self._status["state"] = "pause"
-
-        def play(self):
-            self._status["state"] = "play"
-
-        def stop(self):
-            self._status["state"] = "stop"
-
-        def next(self):
-            self._index = (self._index + 1) % len(self.tracks)
+    tracks = [
+        {"title": "Never gonna give you up", "artist": "Rick Astley", "song": "0", "time": "213"},
+        {"title": "Sweet Caroline", "artist": "Neil Diamond"},
+        {"title": "Marea", "artist": "Fred Again.."},
+        {},
+        {"title": "Sweden", "performer": "C418"},
+    ]
 
-        def previous(self):
-            self._index = (self._index - 1) % len(self.tracks)
+    def __init__(self):
+        self.index = 0
+        self.status = {"state": "pause"}
+        self.commands = []
+        # The changes that each connection hasn't been told about yet
+        self._pending = {}
+        # The subsystems that each idling connection is waiting for changes to
+        self._idling = {}
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        self._server = asyncio.run_coroutine_threadsafe(
+            asyncio.start_server(self._handle, "127.0.0.1", 0), self._loop
+        ).result()
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    def stop(self):
+        def stop():
+            self._drop_connections()
+            self._server.close()
+            self._loop.stop()
+
+        self._loop.call_soon_threadsafe(stop)
+        self._thread.join()
+
+    def change(self, subsystem, index=None, **status):
+        """Change the state, as another MPD client would"""
+
+        def change():
+            if index is not None:
+                self.index = index
+            self.status.update(status)
+            self._changed(subsystem)
+
+        self._loop.call_soon_threadsafe(change)
+
+    def drop_connections(self):
+        self._loop.call_soon_threadsafe(self._drop_connections)
+
+    def _drop_connections(self):
+        for writer in self._pending:
+            writer.close()
+        self._pending.clear()
+        self._idling.clear()
+
+    def _changed(self, subsystem):
+        for pending in self._pending.values():
+            pending.add(subsystem)
+        for writer in list(self._idling):
+            self._notify(writer)
+
+    def _notify(self, writer):
+        subsystems = self._idling[writer]
+        changed = [s for s in self._pending[writer] if not subsystems or s in subsystems]
+        if changed:
+            for subsystem in changed:
+                writer.write(f"changed: {subsystem}\n".encode())
+                self._pending[writer].discard(subsystem)
+            writer.write(b"OK\n")
+            del self._idling[writer]
+
+    async def _handle(self, reader, writer):
+        self._pending[writer] = set()
+        command_list = None
+        writer.write(b"OK MPD 0.23.5\n")
+        async for line in reader:
+            command, *args = shlex.split(line.decode())
+            self.commands.append(command)
+            if command == "command_list_ok_begin":
+                command_list = []
+            elif command == "command_list_end":
+                # Each command's response ends with list_OK rather than OK
+                for listed, listed_args in command_list:
+                    response = self._command(listed, listed_args)
+                    writer.write(response.removesuffix("OK\n").encode() + b"list_OK\n")
+                writer.write(b"OK\n")
+                command_list = None
+            elif command_list is not None:
+                command_list.append((command, args))
+            elif command == "idle":
+                self._idling[writer] = set(args)
+                self._notify(writer)
+            elif command == "noidle":
+                if self._idling.pop(writer, None) is not None:
+                    writer.write(b"OK\n")
+            else:
+                writer.write(self._command(command, args).encode())
+
+    def _command(self, command, args):
+        state = self.status["state"]
+        if command == "status":
+            return "".join(f"{k}: {v}\n" for k, v in self.status.items()) + "OK\n"
+        if command == "currentsong":
+            track = self.tracks[self.index]
+            return "".join(f"{k}: {v}\n" for k, v in track.items()) + "OK\n"
+        if command == "play":
+            self.status["state"] = "play"
+        elif command == "pause":
+            self.status["state"] = "pause" if state == "play" else "play"
+        elif command == "stop":
+            self.status["state"] = "stop"
+        elif command == "next":
+            self.index = (self.index + 1) % len(self.tracks)
+        elif command == "previous":
+            self.index = (self.index - 1) % len(self.tracks)
+        elif command not in ("ping", "password"):
+            return f'ACK [5@0] {{{command}}} unknown command "{command}"\n'
+        if command not in ("ping", "password"):
+            self._changed("player")
+        return "OK\n"
 
-        def add_states(self):
-            self._status.update(
-                {"repeat": "1", "random": "1", "single": "1", "consume": "1", "updating_db": "1"}
-            )
 
-        def force_idle(self):
-            self._status["state"] = "stop"
-            self._index = 3
+@pytest.fixture
+def mpd_server():
+    server = FakeMPD()
+    server.start()
+    yield server
+    server.stop()
 
 
 @pytest.fixture
-def mpd2_manager(manager_nospawn, monkeypatch, minimal_conf_noscreen, request):
-    monkeypatch.setitem(sys.modules, "mpd", MockMPD("mpd"))
-    monkeypatch.setattr("libqtile.widget.mpd2widget.MPDClient", MockMPD.MPDClient)
-
+def mpd2_manager(manager_nospawn, minimal_conf_noscreen, mpd_server, request):
     config = minimal_conf_noscreen
     config.screens = [
         libqtile.config.Screen(
             top=libqtile.bar.Bar(
-                [widget.Mpd2(**getattr(request, "param", dict()))],
+                [
+                    widget.Mpd2(
+                        host="127.0.0.1",
+                        port=mpd_server.port,
+                        reconnect_delay=0.1,
+                        **getattr(request, "param", dict()),
+                    )
+                ],
                 50,
             ),
         )
@@ -103,70 +168,56 @@ def mpd2_manager(manager_nospawn, monkeypatch, minimal_conf_noscreen, request):
     yield manager_nospawn
 
 
+@Retry(ignore_exceptions=(AssertionError,))
+def assert_text(manager, text):
+    assert manager.c.widget["mpd2"].info()["text"] == text
+
+
 def test_mpd2_widget_display_and_actions(mpd2_manager):
-    widget = mpd2_manager.c.widget["mpd2"]
-    assert widget.info()["text"] == "⏸ Rick Astley/Never gonna give you up [-----]"
+    assert_text(mpd2_manager, "⏸ Rick Astley/Never gonna give you up [-----]")
 
     # Button 1 toggles state
     mpd2_manager.c.bar["top"].fake_button_press(0, 0, 1)
-    widget.eval("self.update(self.poll())")
-    assert widget.info()["text"] == "▶ Rick Astley/Never gonna give you up [-----]"
+    assert_text(mpd2_manager, "▶ Rick Astley/Never gonna give you up [-----]")
 
     # Button 3 stops
     mpd2_manager.c.bar["top"].fake_button_press(0, 0, 3)
-    widget.eval("self.update(self.poll())")
-    assert widget.info()["text"] == "■ Rick Astley/Never gonna give you up [-----]"
+    assert_text(mpd2_manager, "■ Rick Astley/Never gonna give you up [-----]")
 
     # Button 1 toggles state
     mpd2_manager.c.bar["top"].fake_button_press(0, 0, 1)
-    widget.eval("self.update(self.poll())")
-    assert widget.info()["text"] == "▶ Rick Astley/Never gonna give you up [-----]"
+    assert_text(mpd2_manager, "▶ Rick Astley/Never gonna give you up [-----]")
 
     mpd2_manager.c.bar["top"].fake_button_press(0, 0, 1)
-    widget.eval("self.update(self.poll())")
-    assert widget.info()["text"] == "⏸ Rick Astley/Never gonna give you up [-----]"
+    assert_text(mpd2_manager, "⏸ Rick Astley/Never gonna give you up [-----]")
 
     # Button 5 is "next"
     mpd2_manager.c.bar["top"].fake_button_press(0, 0, 5)
-    widget.eval("self.update(self.poll())")
-    assert widget.info()["text"] == "⏸ Neil Diamond/Sweet Caroline [-----]"
+    assert_text(mpd2_manager, "⏸ Neil Diamond/Sweet Caroline [-----]")
 
     mpd2_manager.c.bar["top"].fake_button_press(0, 0, 5)
-    widget.eval("self.update(self.poll())")
-    assert widget.info()["text"] == "⏸ Fred Again../Marea [-----]"
+    assert_text(mpd2_manager, "⏸ Fred Again../Marea [-----]")
 
     # Button 4 is previous
     mpd2_manager.c.bar["top"].fake_button_press(0, 0, 4)
-    widget.eval("self.update(self.poll())")
-    assert widget.info()["text"] == "⏸ Neil Diamond/Sweet Caroline [-----]"
+    assert_text(mpd2_manager, "⏸ Neil Diamond/Sweet Caroline [-----]")
 
     mpd2_manager.c.bar["top"].fake_button_press(0, 0, 4)
-    widget.eval("self.update(self.poll())")
-    assert widget.info()["text"] == "⏸ Rick Astley/Never gonna give you up [-----]"
+    assert_text(mpd2_manager, "⏸ Rick Astley/Never gonna give you up [-----]")
 
 
-def test_mpd2_widget_extra_info(mpd2_manager):
+def test_mpd2_widget_extra_info(mpd2_manager, mpd_server):
     """Quick test to check extra info is displayed ok."""
-    widget = mpd2_manager.c.widget["mpd2"]
-
-    # Inject everything to make test quicker
-    widget.eval("self.client.add_states()")
+    assert_text(mpd2_manager, "⏸ Rick Astley/Never gonna give you up [-----]")
+    mpd_server.change("options", repeat="1", random="1", single="1", consume="1", updating_db="1")
+    assert_text(mpd2_manager, "⏸ Rick Astley/Never gonna give you up [rz1cU]")
 
-    # Update widget and check text
-    widget.eval("self.update(self.poll())")
-    assert widget.info()["text"] == "⏸ Rick Astley/Never gonna give you up [rz1cU]"
 
-
-def test_mpd2_widget_idle_message(mpd2_manager):
+def test_mpd2_widget_idle_message(mpd2_manager, mpd_server):
     """Quick test to check idle message."""
-    widget = mpd2_manager.c.widget["mpd2"]
-
-    # Inject everything to make test quicker
-    widget.eval("self.client.force_idle()")
-
-    # Update widget and check text
-    widget.eval("self.update(self.poll())")
-    assert widget.info()["text"] == "■ MPD IDLE[-----]"
+    assert_text(mpd2_manager, "⏸ Rick Astley/Never gonna give you up [-----]")
+    mpd_server.change("player", index=3, state="stop")
+    assert_text(mpd2_manager, "■ MPD IDLE[-----]")
 
 
 @pytest.mark.parametrize(
@@ -174,8 +225,7 @@ def test_mpd2_widget_idle_message(mpd2_manager):
 )
 def test_mpd2_widget_current_song(mpd2_manager):
     """Quick test to check currentsong info"""
-    widget = mpd2_manager.c.widget["mpd2"]
-    assert widget.info()["text"] == "1: Rick Astley/Never gonna give you up"
+    assert_text(mpd2_manager, "1: Rick Astley/Never gonna give you up")
 
 
 @pytest.mark.parametrize(
@@ -185,13 +235,67 @@ def test_mpd2_widget_current_song(mpd2_manager):
 )
 def test_mpd2_widget_custom_undefined_value(mpd2_manager):
     """Quick test to check undefined_value option"""
-    widget = mpd2_manager.c.widget["mpd2"]
-    assert widget.info()["text"] == "Never gonna give you up (Unknown)"
+    assert_text(mpd2_manager, "Never gonna give you up (Unknown)")
 
 
-def test_mpd2_widget_dynamic_artist_value(mpd2_manager):
+def test_mpd2_widget_dynamic_artist_value(mpd2_manager, mpd_server):
     """Quick test to check dynamic artist value"""
-    widget = mpd2_manager.c.widget["mpd2"]
-    widget.eval("self.client._index = 4")
-    widget.eval("self.update(self.poll())")
-    assert widget.info()["text"] == "⏸ C418/Sweden [-----]"
+    assert_text(mpd2_manager, "⏸ Rick Astley/Never gonna give you up [-----]")
+    mpd_server.change("player", index=4)
+    assert_text(mpd2_manager, "⏸ C418/Sweden [-----]")
+
+
+@pytest.mark.parametrize(
+    "mpd2_manager", [{"status_format": "{remaining}", "update_interval": 0.1}], indirect=True
+)
+def test_mpd2_widget_elapsed(mpd2_manager, mpd_server):
+    """The elapsed time is counted by the widget, rather than asked of mpd"""
+    mpd_server.change("player", state="play", elapsed="13.000", duration="213.000")
+
+    @Retry(ignore_exceptions=(AssertionError, ValueError))
+    def remaining():
+        remaining = float(mpd2_manager.c.widget["mpd2"].info()["text"])
+        assert remaining <= 200
+        return remaining
+
+    first = remaining()
+    statuses = mpd_server.commands.count("status")
+
+    @Retry(ignore_exceptions=(AssertionError,))
+    def assert_counting():
+        assert remaining() <= first - 0.5
+
+    assert_counting()
+    assert mpd_server.commands.count("status") == statuses
+
+
+def test_mpd2_widget_reconnect(mpd2_manager, mpd_server):
+    assert_text(mpd2_manager, "⏸ Rick Astley/Never gonna give you up [-----]")
+    logins = mpd_server.commands.count("status")
+    mpd_server.drop_connections()
+
+    @Retry(ignore_exceptions=(AssertionError,))
+    def assert_reconnected():
+        assert mpd_server.commands.count("status") > logins
+
+    assert_reconnected()
+    assert_text(mpd2_manager, "⏸ Rick Astley/Never gonna give you up [-----]")
+
+
+def test_mpd2_widget_status_in_one_command_list(mpd2_manager, mpd_server):
+    """The status and current song are asked for together"""
+    assert_text(mpd2_manager, "⏸ Rick Astley/Never gonna give you up [-----]")
+    start = mpd_server.commands.index("command_list_ok_begin")
+    assert mpd_server.commands[start : start + 4] == [
+        "command_list_ok_begin",
+        "status",
+        "currentsong",
+        "command_list_end",
+    ]
+
+
+def test_mpd2_widget_deprecated_idletimeout(caplog):
+    widget.Mpd2(idletimeout=10)
+    records = [r for r in caplog.records if r.msg.startswith("The use of")]
+    assert records
+    assert "`idletimeout` is deprecated" in records[0].msg
@@ -1,5 +1,6 @@
 import pytest
 
+from libqtile.core.watchers import Watch
 from libqtile.widget.nvidia_sensors import NvidiaSensors, _all_sensors_names_correct
 from test.widgets.conftest import FakeBar
 
@@ -15,37 +16,64 @@ def test_nvidia_sensors_input_regex():
 
 
 class MockNvidiaSMI:
-    # nvidia-smi --query-gpu=temperature.gpu --format=csv,noheader
-    # outputs one number for temperature with one gpu.
+    # nvidia-smi --query-gpu=index,temperature.gpu --format=csv,noheader --loop-ms=2000
+    # outputs the index and temperature of each gpu every loop.
     temperature = "20"
 
     @classmethod
-    def get_temperature(cls, *args, **kwargs):
-        return cls.temperature
+    def get_line(cls):
+        return f"0, {cls.temperature}"
+
+
+class MockWatch(Watch):
+    def start(self, callback):
+        callback(MockNvidiaSMI.get_line())
+
+    def stop(self):
+        pass
 
 
 @pytest.fixture
 def fake_nvidia(fake_qtile, monkeypatch, fake_window):
     n = NvidiaSensors()
-    # Replace internal call_process since we cant rely
-    # on the test computer having the required hardware.
-    monkeypatch.setattr(n, "call_process", MockNvidiaSMI.get_temperature)
     fakebar = FakeBar([n], window=fake_window)
     n._configure(fake_qtile, fakebar)
     return n
 
 
+def test_nvidia_sensors_command():
+    n = NvidiaSensors(format="{temp} {perf}", gpu_bus_id="01:00.0", update_interval=5)
+    (watch,) = n.watches()
+    assert watch.command == (
+        "nvidia-smi -i 01:00.0 --query-gpu=index,pstate,temperature.gpu "
+        "--format=csv,noheader --loop-ms=5000"
+    )
+
+
 def test_nvidia_sensors_foreground_colour(fake_nvidia):
     # Initial temperature
+    fake_nvidia.on_event(MockNvidiaSMI.get_line())
     fake_nvidia.poll()
     assert fake_nvidia.layout.colour == fake_nvidia.foreground_normal
 
     # Simulate GPU overheating
     MockNvidiaSMI.temperature = "90"
+    fake_nvidia.on_event(MockNvidiaSMI.get_line())
     fake_nvidia.poll()
     assert fake_nvidia.layout.colour == fake_nvidia.foreground_alert
 
     # And cooling back down
     MockNvidiaSMI.temperature = "20"
+    fake_nvidia.on_event(MockNvidiaSMI.get_line())
     fake_nvidia.poll()
     assert fake_nvidia.layout.colour == fake_nvidia.foreground_normal
+
+
+def test_nvidia_sensors_multiple_gpus(fake_nvidia):
+    fake_nvidia.on_event("0, 40")
+    fake_nvidia.on_event("1, 50")
+    assert fake_nvidia.poll() == "40°C - 50°C"
+
+    # Each GPU keeps its latest reading
+    fake_nvidia.on_event("1, 55")
+    assert fake_nvidia.poll() == "40°C - 55°C"
@@ -5,15 +5,17 @@ from libqtile.confreader import Config
 from libqtile.widget import redshift
 
 
-def mock_run(argv, check):
-    pass
+async def mock_acall_process(self, command, **kwargs):
+    return ""
 
 
 @pytest.fixture(scope="function")
 def patched_redshift(monkeypatch):
     class PatchedRedshift(redshift.Redshift):
         def __init__(self, **config):
-            monkeypatch.setattr("subprocess.run", mock_run)
+            monkeypatch.setattr(
+                "libqtile.widget.redshift.Redshift.acall_process", mock_acall_process
+            )
             redshift.Redshift.__init__(self, **config)
             self.name = "redshift"
 
@@ -7,6 +7,7 @@ import pytest
 import libqtile.config
 import libqtile.widget
 from libqtile.bar import Bar
+from test.helpers import Retry
 
 
 class Temp:
@@ -27,6 +28,10 @@ class MockPsutil(ModuleType):
 def sensors_manager(monkeypatch, manager_nospawn, minimal_conf_noscreen, request):
     params = getattr(request, "param", dict())
     monkeypatch.setitem(sys.modules, "psutil", MockPsutil("psutil"))
+    if "no_sensors" in params:
+        monkeypatch.setattr(
+            MockPsutil, "sensors_temperatures", staticmethod(lambda fahrenheit=False: {})
+        )
     from libqtile.widget import sensors
 
     reload(sensors)
@@ -41,41 +46,56 @@ def sensors_manager(monkeypatch, manager_nospawn, minimal_conf_noscreen, request
     yield manager_nospawn
 
 
+@Retry(ignore_exceptions=(AssertionError,))
+def assert_text(manager, text):
+    assert manager.c.widget["thermalsensor"].info()["text"] == text
+
+
+@Retry(ignore_exceptions=(AssertionError,))
+def assert_colour(manager, colour):
+    assert manager.c.widget["thermalsensor"].eval("self.layout.colour") == colour
+
+
 def test_thermal_sensor_metric(sensors_manager):
-    assert sensors_manager.c.widget["thermalsensor"].info()["text"] == "45.0°C"
+    assert_text(sensors_manager, "45.0°C")
 
 
 @pytest.mark.parametrize("sensors_manager", [{"metric": False}], indirect=True)
 def test_thermal_sensor_imperial(sensors_manager):
-    assert sensors_manager.c.widget["thermalsensor"].info()["text"] == "113.0°F"
+    assert_text(sensors_manager, "113.0°F")
 
 
 @pytest.mark.parametrize("sensors_manager", [{"tag_sensor": "NVME"}], indirect=True)
 def test_thermal_sensor_tagged_sensor(sensors_manager):
-    assert sensors_manager.c.widget["thermalsensor"].info()["text"] == "56.3°C"
+    assert_text(sensors_manager, "56.3°C")
 
 
 @pytest.mark.parametrize("sensors_manager", [{"tag_sensor": "does_not_exist"}], indirect=True)
 def test_thermal_sensor_unknown_sensor(sensors_manager):
-    assert sensors_manager.c.widget["thermalsensor"].info()["text"] == "N/A"
+    assert_text(sensors_manager, "N/A")
+
+
+@pytest.mark.parametrize("sensors_manager", [{"no_sensors": True}], indirect=True)
+def test_thermal_sensor_no_sensors(sensors_manager):
+    assert_text(sensors_manager, "Temperature sensors not found")
 
 
 @pytest.mark.parametrize(
     "sensors_manager", [{"format": "{tag}: {temp:.0f}{unit}"}], indirect=True
 )
 def test_thermal_sensor_format(sensors_manager):
-    assert sensors_manager.c.widget["thermalsensor"].info()["text"] == "CPU: 45°C"
+    assert_text(sensors_manager, "CPU: 45°C")
 
 
 def test_thermal_sensor_colour_normal(sensors_manager):
-    assert sensors_manager.c.widget["thermalsensor"].eval("self.layout.colour") == "ffffff"
+    assert_colour(sensors_manager, "ffffff")
 
 
 @pytest.mark.parametrize("sensors_manager", [{"threshold": 30}], indirect=True)
 def test_thermal_sensor_colour_alert(sensors_manager):
-    assert sensors_manager.c.widget["thermalsensor"].eval("self.layout.colour") == "ff0000"
+    assert_colour(sensors_manager, "ff0000")
 
 
 @pytest.mark.parametrize("sensors_manager", [{"set_defaults": True}], indirect=True)
 def test_thermal_sensor_widget_defaults(sensors_manager):
-    assert sensors_manager.c.widget["thermalsensor"].eval("self.layout.colour") == "123456"
+    assert_colour(sensors_manager, "123456")
@@ -1,6 +1,9 @@
+import asyncio
 import os
+from types import SimpleNamespace
 
 from libqtile import widget
+from libqtile.core.sampler import Sampler
 
 
 def test_thermal_zone_getting_value():
@@ -19,3 +22,19 @@ def test_thermal_zone_getting_value():
     thermal_zone.layout = FakeLayout()
     output = thermal_zone.poll()
     assert output == "22°C"
+
+
+def test_thermal_zone_missing():
+    async def run():
+        loop = asyncio.get_running_loop()
+        qtile = SimpleNamespace(run_in_executor=lambda f, *a: loop.run_in_executor(None, f, *a))
+        qtile.sampler = Sampler(qtile)
+
+        thermal_zone = widget.ThermalZone(zone="/does/not/exist")
+        thermal_zone.qtile = qtile
+        texts = []
+        thermal_zone.update = texts.append
+        await thermal_zone._read_now(thermal_zone.sources())
+        assert texts == ["err!"]
+
+    asyncio.run(run())
@@ -1,34 +1,46 @@
-from unittest.mock import MagicMock, patch
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
 
 from libqtile.widget.tuned_manager import TunedManager
 
 
 def test_find_mode():
-    # Mocking subprocess.run to return a specific output
-    with patch("subprocess.run") as mock_run:
-        mock_run.return_value.stdout = "Current active profile: balanced-battery\n"
+    # Mocking call_process to return a specific output
+    with patch.object(TunedManager, "call_process") as mock_call:
+        mock_call.return_value = "Current active profile: balanced-battery\n"
 
         widget = TunedManager()
         mode = widget.find_mode()
 
         assert mode == "balanced-battery"
-        assert mock_run.call_count == 2  # Called during init and explicitly
+        assert mock_call.call_count == 1  # Not called during init
+
+
+def test_poll():
+    with patch.object(TunedManager, "call_process") as mock_call:
+        mock_call.return_value = "Current active profile: powersave\n"
+
+        widget = TunedManager()
+        assert widget.poll() == "powersave"
+        assert widget.current_mode == "powersave"
 
 
-def test_update_bar():
+@pytest.mark.asyncio
+async def test_execute_command():
     with (
-        patch("subprocess.run") as mock_run,
-        patch.object(TunedManager, "bar", create=True) as mock_bar,
+        patch.object(TunedManager, "acall_process", new_callable=AsyncMock) as mock_call,
+        patch.object(TunedManager, "update_bar") as mock_update_bar,
     ):
-        mock_run.return_value.stdout = "Current active profile: powersave\n"
-        mock_bar.draw = MagicMock()
-
         widget = TunedManager()
-        widget.update_bar()
+        widget.execute_command(2)
+        await asyncio.sleep(0)
 
-        assert widget.current_mode == "powersave"
-        assert widget.text == "powersave"
-        mock_bar.draw.assert_called_once()
+        mock_call.assert_awaited_once_with(
+            ["tuned-adm", "profile", "throughput-performance"], timeout=60
+        )
+        mock_update_bar.assert_called_once()
 
 
 def test_next_mode():
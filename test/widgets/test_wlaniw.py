@@ -38,20 +38,15 @@ def mock_open(output):
     return MockOpen
 
 
-def mock_subprocess_run_get_ip(*args, **kwargs):
-    class IP:
-        @property
-        def stdout(self):
-            return f"wlan        UP             {IP_ADDRESS}/24 fe80::f9c:223f:324a:30dc/64"
-
-    return IP()
+def mock_run_sync_get_ip(*args, **kwargs):
+    return f"wlan        UP             {IP_ADDRESS}/24 fe80::f9c:223f:324a:30dc/64"
 
 
 @pytest.fixture
 def patched_wlaniw(monkeypatch):
     from libqtile.widget import wlaniw
 
-    monkeypatch.setattr(wlaniw.subprocess, "run", mock_subprocess_run_get_ip)
+    monkeypatch.setattr(wlaniw.runner, "run_sync", mock_run_sync_get_ip)
     yield wlaniw
 
 